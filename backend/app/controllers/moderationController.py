@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
 from typing import List, Optional
 
 from ..models.models import (
@@ -6,6 +6,9 @@ from ..models.models import (
     Ban,
     ReportCreate,
     ReportDecisionRequest,
+    ReportDecisionItem,
+    ReportGroup,
+    ModerationStats,
 )
 from ..services.moderationService import ModerationService
 from backend.app.dependencies import get_current_user, admin_required
@@ -54,6 +57,38 @@ def decide_report(
     return response
 
 
+@router.post("/reports/decisions")
+def decide_reports(
+    payload: List[ReportDecisionItem],
+    admin: dict = Depends(admin_required),
+):
+    """
+    POST /moderation/reports/decisions
+
+    Body:
+    [
+      {"reportId": 12, "action": "confirm", "banOption": "7d"},
+      {"reportId": 13, "action": "reject", "banOption": null}
+    ]
+
+    Admin-only: decide many reports at once. Each entry gets its own result;
+    entries that can't be decided don't stop the others.
+    """
+    try:
+        results = moderation_service.decide_reports(
+            decisions=payload,
+            admin_username=admin["username"],
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "message": "Reports decided",
+        "decided": sum(1 for r in results if r.ok),
+        "results": results,
+    }
+
+
 # ─────────────────────────────────────────────
 # 1. Reporting a review (user or admin)
 # ─────────────────────────────────────────────
@@ -125,6 +160,46 @@ def get_reports(
     return moderation_service.list_reports(status=status)  # type: ignore[arg-type]
 
 
+@router.get("/reports/page")
+def get_reports_page(
+    status: Optional[str] = Query(
+        None,
+        description='Optional status filter: "pending", "confirmed", or "rejected"',
+    ),
+    reasonType: Optional[str] = Query(None, alias="reasonType"),
+    reportedBy: Optional[str] = Query(None, alias="reportedBy"),
+    movieTitle: Optional[str] = Query(None, alias="movieTitle"),
+    cursor: Optional[str] = Query(None, description="nextCursor of the previous page"),
+    amount: int = Query(20, ge=1, le=100),
+    descending: bool = Query(True, description="Newest reports first"),
+    include_body: bool = Query(True, description="Include review bodies in snapshots"),
+    admin: dict = Depends(admin_required),
+):
+    """
+    GET /moderation/reports/page?status=pending&amount=50
+    GET /moderation/reports/page?reasonType=spam&include_body=false&cursor=...
+
+    Admin-only: one page of reports ordered by dateReported, plus the
+    cursor for the next page (null on the last one).
+    """
+    if status is not None and status not in {"pending", "confirmed", "rejected"}:
+        raise HTTPException(status_code=400, detail="Invalid status value")
+
+    try:
+        return moderation_service.page_reports(
+            status=status,  # type: ignore[arg-type]
+            reason_type=reasonType,
+            reported_by=reportedBy,
+            movie_title=movieTitle,
+            cursor=cursor,
+            amount=amount,
+            descending=descending,
+            include_body=include_body,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.get(
     "/reports/review/{movie_title}/{review_user}",
     response_model=List[Report],
@@ -142,6 +217,75 @@ def get_reports_for_review(
     return moderation_service.list_reports_for_review(movie_title, review_user)
 
 
+# ─────────────────────────────────────────────
+# 2b. Grouped moderation queue (admin only)
+# ─────────────────────────────────────────────
+
+@router.get("/queue", response_model=List[ReportGroup])
+def get_report_groups(
+    amount: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    admin: dict = Depends(admin_required),
+):
+    """
+    GET /moderation/queue?amount=20&offset=0
+
+    Admin-only: pending reports grouped per review, most reported first.
+    Each entry has the pending count, distinct reporters, a reasonType
+    histogram and the latest snapshot.
+    """
+    return moderation_service.list_report_groups(amount=amount, offset=offset)
+
+
+@router.get("/queue/next", response_model=List[ReportGroup])
+def get_next_report_groups(
+    k: int = Query(10, ge=1, le=100, description="How many reviews to return"),
+    admin: dict = Depends(admin_required),
+):
+    """
+    GET /moderation/queue/next?k=10
+
+    Admin-only: the k pending reviews with the highest priority (report
+    count, how fast reports arrive, author penalties, review visibility),
+    highest first.
+    """
+    return moderation_service.next_report_groups(k=k)
+
+
+@router.post("/queue/{movie_title}/{review_user}/decision")
+def decide_report_group(
+    movie_title: str,
+    review_user: str,
+    payload: ReportDecisionRequest,
+    admin: dict = Depends(admin_required),
+):
+    """
+    POST /moderation/queue/{movie_title}/{review_user}/decision
+
+    Body: same as /reports/{report_id}/decision.
+
+    Admin-only: confirm or reject every pending report against the review
+    at once (one penalty and at most one ban).
+    """
+    try:
+        reports, ban = moderation_service.decide_report_group(
+            movie_title=movie_title,
+            review_user=review_user,
+            decision=payload,
+            admin_username=admin["username"],
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    response = {
+        "message": "Reports decided successfully",
+        "reports": reports,
+    }
+    if ban is not None:
+        response["ban"] = ban
+    return response
+
+
 # ─────────────────────────────────────────────
 # 4. Bans listing (admin only)
 # ─────────────────────────────────────────────
@@ -161,4 +305,28 @@ def get_bans(
 
     Admin-only: list all bans, or only bans for a specific userName.
     """
-    return moderation_service.list_bans(user_name=userName)
\ No newline at end of file
+    return moderation_service.list_bans(user_name=userName)
+
+
+# ─────────────────────────────────────────────
+# 5. Dashboard statistics (admin only)
+# ─────────────────────────────────────────────
+
+@router.get("/stats", response_model=ModerationStats)
+def get_moderation_stats(
+    request: Request,
+    days: int = Query(30, ge=1, le=366, description="Days of reportsPerDay, ending today (UTC)"),
+    top: int = Query(10, ge=1, le=100, description="How many topMovies to return"),
+    admin: dict = Depends(admin_required),
+):
+    """
+    GET /moderation/stats?days=30&top=10
+
+    Admin-only: report counts per status, reports per day, median
+    time-to-decision, bans per option, active bans, the most reported
+    movies and the ban-expiry sweeper's metrics (banExpiry, per worker).
+    """
+    sweeper = getattr(request.app.state, "ban_expiry_service", None)
+    return moderation_service.moderation_stats(
+        days=days, top=top, ban_expiry=sweeper.snapshot() if sweeper is not None else None
+    )
@@ -5,17 +5,101 @@ from pydantic import BaseModel
 from ..services.reviewService import ReviewService
 from ..models.models import Review
 from ..dependencies import get_current_user, ensure_not_banned
-from ..models.models import ReviewCreate, ReviewUpdate
+from ..models.models import ReviewCreate, ReviewUpdate, ReviewVote
 
 router = APIRouter(prefix="/reviews", tags=["Reviews"])
+# Queries across movies; kept out of /reviews so no path can be taken for a movie title
+all_reviews_router = APIRouter(prefix="/all-reviews", tags=["Reviews"])
 review_service = ReviewService()
 
 
 
+@all_reviews_router.get("/search", response_model=List[Dict[str, Any]])
+def search_reviews(
+    q: str = Query(..., min_length=1, description="Words to search for in review titles and bodies"),
+    limit: int = Query(10, ge=1, le=100),
+):
+    """
+    Full-text search over all reviews of all movies, best matches first.
+    Example: /all-reviews/search?q=time+travel&limit=5
+    """
+    try:
+        return review_service.search_reviews(q, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@all_reviews_router.get("/stats", response_model=Dict[str, Optional[Dict[str, Any]]])
+def get_rating_stats_bulk(
+    titles: List[str] = Query(..., description="Movie titles; repeat the parameter for each title"),
+):
+    """
+    Rating stats for several movies in one call. Unknown titles map to null.
+    Example: /all-reviews/stats?titles=Joker&titles=Morbius
+    """
+    if len(titles) > 100:
+        raise HTTPException(status_code=400, detail="At most 100 titles per request")
+    return review_service.get_rating_stats_bulk(titles)
+
+
+@router.get("/by-user/{username}", response_model=List[Dict[str, Any]])
+def get_reviews_by_user(
+    username: str,
+    amount: int = Query(10, ge=1, le=100),
+    offset: int = Query(0, ge=0, description="Number of reviews to skip"),
+):
+    """
+    All reviews written by a user, across movies, ordered by movie title.
+    Example: /reviews/by-user/alice?offset=10&amount=10
+    """
+    try:
+        reviews = review_service.get_reviews_by_user(username, amount, offset=offset)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not reviews:
+        raise HTTPException(status_code=404, detail="No reviews found for this user")
+    return reviews
+
+
+@router.get("/{movieTitle}/stats", response_model=Dict[str, Any])
+def get_rating_stats(movieTitle: str):
+    """
+    1-10 rating histogram, average, median and percentiles for a movie.
+    Example: /reviews/Joker/stats
+    """
+    try:
+        return review_service.get_rating_stats(movieTitle)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
 @router.get("/{movieTitle}", response_model=List[Dict[str, Any]])
-def get_reviews(movieTitle: str, amount: int = Query(10, ge=1, le=100)):
-    """Get reviews for a specific movie, limited by amount."""
-    reviews = review_service.get_reviews(movieTitle, amount)
+def get_reviews(
+    movieTitle: str,
+    amount: int = Query(10, ge=1, le=100),
+    offset: int = Query(0, ge=0, description="Number of reviews to skip"),
+    sort_by: str = Query(None, description="Sort by: usefulness, date or rating"),
+    descending: bool = Query(True, description="Sort in descending order"),
+    fields: str = Query(None, description="Comma-separated columns, e.g. title,rating,body"),
+    preview_chars: int = Query(None, ge=0, description="Cut review bodies to this many characters"),
+):
+    """
+    Get reviews for a specific movie, limited by amount.
+    Example: /reviews/Joker?sort_by=usefulness&offset=10&amount=10
+    Example: /reviews/Joker?fields=user,title,rating,body&preview_chars=200
+    """
+    try:
+        reviews = review_service.get_reviews(
+            movieTitle,
+            amount,
+            offset=offset,
+            sort_by=sort_by,
+            descending=descending,
+            fields=[f.strip() for f in fields.split(",") if f.strip()] if fields is not None else None,
+            preview_chars=preview_chars,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if not reviews:
         raise HTTPException(status_code=404, detail="No reviews found for this movie")
     return reviews
@@ -35,6 +119,23 @@ def create_review(
 
 
 
+@router.post("/{movieTitle}/{username}/vote")
+def vote_review(
+    movieTitle: str,
+    username: str,
+    vote: ReviewVote,
+    current_user: dict = Depends(ensure_not_banned),
+):
+    """
+    Mark a review as useful / not useful. Voting twice the same way is ignored.
+    Example: POST /reviews/Joker/alice/vote {"useful": true}
+    """
+    try:
+        return review_service.vote_review(movieTitle, username, vote.useful, current_user)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.put("/{movieTitle}/{username}")
 def update_review(
     movieTitle: str,
@@ -1,7 +1,7 @@
 from fastapi import Depends, HTTPException, Header
 from backend.app.repositories.usersRepo import find_user_by_username
 from backend.app.repositories.adminRepo import find_admin_by_name
-import time
+from backend.app.repositories import activeBans
 
 def get_current_user(x_username: str = Header(...)):
     """
@@ -39,8 +39,9 @@ def ensure_not_banned(user: dict = Depends(get_current_user)) -> dict:
 
     Behaviour:
     - Only applies to normal users (role == "user").
-    - Looks up the full user record via find_user_by_username to access banExpiresAt.
-    - If banExpiresAt is a future Unix timestamp, raises 403.
+    - Looks the user up in the in-memory active-ban table (activeBans), so
+      no file is read for the check.
+    - If the user's ban expiry is in the future, raises 403.
     - Admins are never blocked by this dependency.
 
     Returns:
@@ -51,29 +52,10 @@ def ensure_not_banned(user: dict = Depends(get_current_user)) -> dict:
     if user.get("role") != "user":
         return user
 
-    # Reload full record so we can see banExpiresAt, penalties, etc.
-    record = find_user_by_username(user.get("username"))
-    if not record:
-        # If the user somehow isn't in users.json, just allow (CSV-only etc.)
-        return user
-
-    ban_expires_at = record.get("banExpiresAt")
-    if ban_expires_at is None:
-        # No ban recorded
-        return user
-
-    try:
-        expires = float(ban_expires_at)
-    except (TypeError, ValueError):
-        # Corrupt / non-numeric value → treat as unbanned
-        return user
-
-    # If ban expiry is in the future, block the action
-    if expires > time.time():
+    if activeBans.is_banned(user.get("username")):
         raise HTTPException(
             status_code=403,
             detail="User is currently banned and cannot perform this action",
         )
 
-    # Ban is in the past → treat as unbanned
-    return user
\ No newline at end of file
+    return user
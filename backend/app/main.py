@@ -1,11 +1,37 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from .controllers.movieController import router as movie_router
 from .controllers.authController import router as auth_router
-from .controllers.reviewController import router as review_router
+from .controllers.reviewController import router as review_router, all_reviews_router
 from .controllers.moderationController import router as moderation_router
 from backend.app.controllers.watchlistController import router as watchlist_router
+from .services.banExpiryService import BanExpiryService
+from .services.searchIndexService import SearchIndexService
+
+ban_expiry_service = BanExpiryService()
+search_index_service = SearchIndexService()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Background sweeper clearing bans as they expire
+    stop = asyncio.Event()
+    sweeper = asyncio.create_task(ban_expiry_service.run(stop))
+    # Background rebuild of stale search segments
+    refresher = asyncio.create_task(search_index_service.run(stop))
+    try:
+        yield
+    finally:
+        stop.set()
+        await sweeper
+        await refresher
+
 
-app = FastAPI(title="Rotten Eggs Movie Review System")
+app = FastAPI(title="Rotten Eggs Movie Review System", lifespan=lifespan)
+# Read by /moderation/stats
+app.state.ban_expiry_service = ban_expiry_service
 
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -22,5 +48,6 @@ app.add_middleware(
 app.include_router(movie_router)
 app.include_router(auth_router)
 app.include_router(review_router)
+app.include_router(all_reviews_router)
 app.include_router(moderation_router)
 app.include_router(watchlist_router) 
\ No newline at end of file
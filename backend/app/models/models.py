@@ -1,6 +1,6 @@
 from __future__ import annotations
 from pydantic import BaseModel, Field
-from typing import List, Optional, Literal, Annotated
+from typing import Any, List, Optional, Literal, Annotated
 from datetime import date, datetime
 
 
@@ -75,6 +75,11 @@ class ReviewCreate(BaseModel):
     body: str
 
 
+class ReviewVote(BaseModel):
+    # True = "this review was useful", False = "not useful"
+    useful: bool
+
+
 class ReviewSnapshot(BaseModel):
     """
     Embedded copy of a review at the moment it was reported.
@@ -145,6 +150,77 @@ class ReportDecisionRequest(BaseModel):
     banOption: Optional[Literal["3d", "7d", "30d"]] = None
 
 
+class ReportGroup(BaseModel):
+    """
+    One entry of the moderation queue (GET /moderation/queue): the pending
+    reports against one review, summarised.
+    """
+    movieTitle: str
+    reviewUser: str
+
+    reportCount: int  # pending reports
+    distinctReporters: int
+    reasons: dict[str, int]  # reasonType → pending reports
+
+    latestReportId: int
+    latestReportedAt: datetime
+    latestSnapshot: ReviewSnapshot
+
+    # Only set by GET /moderation/queue/next (higher = handle first)
+    priority: Optional[float] = None
+
+
+class ReportDecisionItem(ReportDecisionRequest):
+    """
+    One entry of the body of POST /moderation/reports/decisions
+
+    {"reportId": 12, "action": "confirm" | "reject", "banOption": "3d" | "7d" | "30d" | null}
+    """
+    reportId: int
+
+
+class ReportDecisionResult(BaseModel):
+    """
+    Outcome for one entry of a batch decision: the decided report (and ban,
+    if one was applied), or the reason it was skipped.
+    """
+    reportId: int
+    ok: bool
+    report: Optional[Report] = None
+    ban: Optional[Ban] = None
+    error: Optional[str] = None
+
+
+class MovieReportCount(BaseModel):
+    """Reports (any status) filed against reviews of one movie."""
+    movieTitle: str
+    reports: int
+
+
+class ModerationStats(BaseModel):
+    """
+    Admin dashboard figures returned by GET /moderation/stats.
+    """
+    pending: int
+    confirmed: int
+    rejected: int
+
+    # "YYYY-MM-DD" (UTC) → reports filed that day, oldest day first
+    reportsPerDay: dict[str, int]
+
+    # dateReported → handledAt over decided reports; None if none decided
+    medianDecisionSeconds: Optional[float] = None
+
+    bansPerOption: dict[str, int]  # banOption → bans issued
+    activeBans: int
+
+    topMovies: List[MovieReportCount]  # most reported first
+
+    # This worker's ban-expiry sweeper: sweeps, expired, userWrites,
+    # lastSweepAt, lastSweepSeconds, activeBans, nextExpiry
+    banExpiry: Optional[dict[str, Any]] = None
+
+
 # ─────────────────────────────────────────────────────────────
 # 4. Bans (bans.json)
 # ─────────────────────────────────────────────────────────────
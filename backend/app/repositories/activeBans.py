@@ -0,0 +1,178 @@
+"""
+Active bans kept in memory for ensure_not_banned.
+
+Checking a ban used to re-read users.json on every review write to get the
+user's banExpiresAt. Instead this module holds
+
+  _EXPIRES  userName → banExpiresAt (Unix timestamp) of every active ban
+  _HEAP     min-heap of (banExpiresAt, userName) to find the next expiry
+
+so a check is one dictionary lookup. The table is loaded from users.json
+and fed by the code that sets or moves bans: ModerationService when it
+writes banExpiresAt, the username rename and the expiry sweep. Other
+users.json writes (watchlists, penalties, sign-ups) leave it alone.
+
+Each of those ban changes also replaces a small signal file beside
+users.json ("users.json.bans"). Other workers compare its stamp (mtime_ns,
+inode) with the one they loaded, like RecordLog.sync, and reload when it
+moved. Ban checks look at the signal at most every RECHECK_SECONDS, so they
+do no file I/O in between; the writers and the sweeper, which already hold
+the users.json lock, look every time. Bans edited into users.json by hand
+are picked up on restart.
+
+Heap entries are invalidated lazily: an entry counts only while _EXPIRES
+still holds the same expiry for that user.
+"""
+from __future__ import annotations
+
+import heapq
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from . import usersRepo
+
+SIGNAL_SUFFIX = ".bans"
+# Longest a ban check trusts the table before looking at the signal file
+RECHECK_SECONDS = 1.0
+
+_EXPIRES: Dict[str, float] = {}
+_HEAP: List[Tuple[float, str]] = []
+_SOURCE: Optional[Path] = None
+_STAMP: Optional[Tuple[int, int]] = None
+_CHECKED_AT: Optional[float] = None
+_LOCK = threading.Lock()
+
+
+def _signal_path() -> Path:
+    return usersRepo.DATA_PATH.with_name(usersRepo.DATA_PATH.name + SIGNAL_SUFFIX)
+
+
+def _stamp(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_ino)
+
+
+def _ensure_loaded(recheck: bool = True) -> None:
+    """
+    (Re)load active bans if another worker changed them since the last load
+    (caller holds _LOCK). With recheck=False the signal file is only looked
+    at once RECHECK_SECONDS have passed since the last look.
+    """
+    global _EXPIRES, _HEAP, _SOURCE, _STAMP, _CHECKED_AT
+    if _SOURCE == usersRepo.DATA_PATH:
+        if not recheck and time.monotonic() - (_CHECKED_AT or 0.0) < RECHECK_SECONDS:
+            return
+        stamp = _stamp(_signal_path())
+        _CHECKED_AT = time.monotonic()
+        if _STAMP == stamp:
+            return
+    else:
+        stamp = _stamp(_signal_path())
+        _CHECKED_AT = time.monotonic()
+    now = time.time()
+    expires: Dict[str, float] = {}
+    for user in usersRepo.load_users():
+        try:
+            ts = float(user.get("banExpiresAt"))
+        except (TypeError, ValueError):
+            continue
+        if ts > now and user.get("userName"):
+            expires[user["userName"]] = ts
+    _EXPIRES = expires
+    _HEAP = [(ts, name) for name, ts in expires.items()]
+    heapq.heapify(_HEAP)
+    _SOURCE = usersRepo.DATA_PATH
+    _STAMP = stamp
+
+
+def _publish() -> None:
+    """
+    Replace the signal file after a ban change so other workers reload
+    (caller holds _LOCK, the users.json lock and a freshly checked table).
+    """
+    global _STAMP
+    path = _signal_path()
+    with tempfile.NamedTemporaryFile(
+        "w", dir=path.parent, prefix=path.name + ".", suffix=".tmp", delete=False,
+    ) as f:
+        f.write(str(time.time()))
+    os.replace(f.name, path)
+    _STAMP = _stamp(path)
+
+
+def ban_expires_at(username: str) -> Optional[float]:
+    """Expiry of the user's active ban, or None if they aren't banned."""
+    with _LOCK:
+        _ensure_loaded(recheck=False)
+        expires = _EXPIRES.get(username)
+    if expires is None or expires <= time.time():
+        return None
+    return expires
+
+
+def is_banned(username: str) -> bool:
+    return ban_expires_at(username) is not None
+
+
+def set_ban(username: str, expires_at: float) -> None:
+    """
+    Record (or replace) the user's ban expiry, as just written to users.json.
+    Called under the users.json lock.
+    """
+    with _LOCK:
+        _ensure_loaded()
+        _EXPIRES[username] = expires_at
+        heapq.heappush(_HEAP, (expires_at, username))
+        _publish()
+
+
+def rename(old_username: str, new_username: str) -> None:
+    """Move the user's ban, as just renamed in users.json. Called under the users.json lock."""
+    with _LOCK:
+        _ensure_loaded()
+        expires = _EXPIRES.pop(old_username, None)
+        if expires is not None:
+            _EXPIRES[new_username] = expires
+            heapq.heappush(_HEAP, (expires, new_username))
+            _publish()
+
+
+def pop_expired(now: Optional[float] = None) -> List[Tuple[str, float]]:
+    """
+    Remove and return (userName, banExpiresAt) of every ban that has run
+    out. Called under the users.json lock by the sweep that clears them.
+    """
+    now = time.time() if now is None else now
+    expired: List[Tuple[str, float]] = []
+    with _LOCK:
+        _ensure_loaded()
+        while _HEAP and _HEAP[0][0] <= now:
+            expires, username = heapq.heappop(_HEAP)
+            if _EXPIRES.get(username) == expires:
+                del _EXPIRES[username]
+                expired.append((username, expires))
+        if expired:
+            _publish()
+    return expired
+
+
+def next_expiry() -> Optional[float]:
+    """Earliest expiry among active bans (skipping stale heap entries)."""
+    with _LOCK:
+        _ensure_loaded(recheck=False)
+        while _HEAP and _EXPIRES.get(_HEAP[0][1]) != _HEAP[0][0]:
+            heapq.heappop(_HEAP)
+        return _HEAP[0][0] if _HEAP else None
+
+
+def active_count() -> int:
+    with _LOCK:
+        _ensure_loaded(recheck=False)
+        return len(_EXPIRES)
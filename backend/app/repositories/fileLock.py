@@ -0,0 +1,69 @@
+"""
+Advisory locks around files shared by threads and worker processes.
+
+Some writes must not interleave with the same write in another uvicorn
+worker: folding a journal into movieReviews.csv, read-modify-write of
+users.json. file_lock(path) holds fcntl.flock on a sibling "<name>.lock"
+file for the duration. The lock is re-entrant within a thread and also
+serializes the threads of one process. Where fcntl is missing (Windows)
+only the threads of this process are serialized.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not on POSIX
+    fcntl = None  # type: ignore[assignment]
+
+LOCK_SUFFIX = ".lock"
+
+
+class _PathLock:
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.depth = 0
+        self.fd: Optional[int] = None
+
+
+_LOCKS: Dict[str, _PathLock] = {}
+_LOCKS_GUARD = threading.Lock()
+
+
+def lock_path(path: Path) -> Path:
+    return path.with_name(path.name + LOCK_SUFFIX)
+
+
+def _path_lock(path: Path) -> _PathLock:
+    key = str(lock_path(path))
+    with _LOCKS_GUARD:
+        lock = _LOCKS.get(key)
+        if lock is None:
+            lock = _PathLock()
+            _LOCKS[key] = lock
+        return lock
+
+
+@contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    """Hold the exclusive lock for `path` (threads and processes)."""
+    lock = _path_lock(path)
+    with lock.lock:
+        lock.depth += 1
+        try:
+            if lock.depth == 1 and fcntl is not None:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                lock.fd = os.open(lock_path(path), os.O_RDWR | os.O_CREAT, 0o644)
+                fcntl.flock(lock.fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            lock.depth -= 1
+            if lock.depth == 0 and lock.fd is not None:
+                # Closing the descriptor releases the flock
+                os.close(lock.fd)
+                lock.fd = None
@@ -1,12 +1,22 @@
 from __future__ import annotations
 
 from pathlib import Path
-import csv
 import json
-from datetime import datetime, timedelta
-from typing import List, Optional, Literal, Dict, Any
-
-from ..models.models import ReviewSnapshot, Report, Ban
+import base64
+import bisect
+import heapq
+import math
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Literal, Dict, Any, Iterator, Tuple
+
+from ..models.models import ReviewSnapshot, Report, ReportGroup, Ban
+from .recordLog import RecordLog
+from . import reportedReviewIndex, reviewReportCounter, usersRepo
+from .reviewFields import to_int
+from .reviewsRepo import review_file_exists, find_user_row_at
 
 # ─────────────────────────────────────────────────────────────
 # Paths
@@ -21,28 +31,13 @@ IMDB_DIR = DATA_DIR / "imdb"
 REPORTS_FILE = DATA_DIR / "reports.json"
 BANS_FILE = DATA_DIR / "bans.json"
 
-
-# ─────────────────────────────────────────────────────────────
-# Helper JSON load/save
-# ─────────────────────────────────────────────────────────────
-
-def _read_json_list(path: Path) -> List[Dict[str, Any]]:
-    if not path.exists():
-        return []
-    try:
-        raw = path.read_text(encoding="utf-8").strip()
-        if not raw:
-            return []
-        return json.loads(raw)
-    except json.JSONDecodeError:
-        # If corrupted, bubble up – service/controller can decide how to handle
-        raise
-
-
-def _write_json_list(path: Path, items: List[Dict[str, Any]]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as f:
-        json.dump(items, f, indent=2)
+# Weights of the moderation queue priority (see ReviewGroup.priority)
+PRIORITY_WEIGHTS = {
+    "reports": 1.0,
+    "rate": 1.0,
+    "penalties": 0.5,
+    "visibility": 0.25,
+}
 
 
 # ─────────────────────────────────────────────────────────────
@@ -54,52 +49,37 @@ def build_snapshot_and_increment_reports(
     review_user: str,
 ) -> ReviewSnapshot:
     """
-    Load movieReviews.csv for a movie, find the row for review_user,
-    increment its Reports counter, write CSV back, and return a ReviewSnapshot
-    reflecting the new reportCount.
+    Find review_user's row in a movie's movieReviews.csv, count one more
+    report for it and return a ReviewSnapshot reflecting the new reportCount.
+
+    The increment goes to the movie's report counter journal
+    (reviewReportCounter) instead of rewriting the CSV; the counts are folded
+    back into the "Reports" column in batches.
 
     Raises:
         FileNotFoundError if CSV doesn't exist.
         ValueError if the review_user can't be found.
     """
     csv_path = IMDB_DIR / movie_title / "movieReviews.csv"
-    if not csv_path.exists():
+    if not review_file_exists(csv_path):
         raise FileNotFoundError(f"No reviews found for movie '{movie_title}'")
 
-    with csv_path.open("r", newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        rows = list(reader)
-        fieldnames = reader.fieldnames or []
-
-    target_index: Optional[int] = None
-    for i, row in enumerate(rows):
-        if row.get("User") == review_user:
-            target_index = i
-            break
-
-    if target_index is None:
+    found = find_user_row_at(csv_path, review_user)
+    if found is None:
         raise ValueError(
             f"Review not found for movie '{movie_title}' and user '{review_user}'"
         )
+    row_index, row = found
 
-    row = rows[target_index]
-
-    # Current reports value (blank/missing/invalid → 0)
+    # Folded count (blank/missing/invalid → 0) plus pending increments
     raw_reports = row.get("Reports", "")
     try:
         current_reports = int(raw_reports)
     except (ValueError, TypeError):
         current_reports = 0
 
-    new_reports = current_reports + 1
-    row["Reports"] = str(new_reports)
-    rows[target_index] = row
-
-    # Write updated CSV back
-    with csv_path.open("w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(rows)
+    new_reports = current_reports + reviewReportCounter.increment(csv_path.parent, review_user)
+    reportedReviewIndex.record_report(csv_path.parent, review_user, row_index, current_reports)
 
     # Build snapshot according to spec
     def _int(value: Any) -> int:
@@ -131,20 +111,387 @@ def build_snapshot_and_increment_reports(
 # Reports: load/save/list/create/update
 # ─────────────────────────────────────────────────────────────
 
+def _as_utc(moment: datetime) -> datetime:
+    """Naive datetimes are UTC (written with utcnow)."""
+    return moment.replace(tzinfo=timezone.utc) if moment.tzinfo is None else moment
+
+
+def _date_key(report: Report) -> Tuple[float, int]:
+    """Sort key for dateReported order."""
+    return (_as_utc(report.dateReported).timestamp(), report.reportId)
+
+
+def _decision_seconds(report: Report) -> Optional[float]:
+    """Time from filing to decision, for decided reports."""
+    if report.status == "pending" or report.handledAt is None:
+        return None
+    return (_as_utc(report.handledAt) - _as_utc(report.dateReported)).total_seconds()
+
+
+class ReviewGroup:
+    """Pending reports against one review (movieTitle, review user)."""
+
+    def __init__(self):
+        self.ids: set = set()
+        self.reporters: Dict[str, int] = {}
+        self.reasons: Dict[str, int] = {}
+        self.earliest: Optional[Tuple[float, int]] = None
+        self.latest: Optional[Tuple[float, int]] = None
+
+    def add(self, report: Report) -> None:
+        self.ids.add(report.reportId)
+        self.reporters[report.reportedBy] = self.reporters.get(report.reportedBy, 0) + 1
+        self.reasons[report.reasonType] = self.reasons.get(report.reasonType, 0) + 1
+        key = _date_key(report)
+        if self.earliest is None or key < self.earliest:
+            self.earliest = key
+        if self.latest is None or key > self.latest:
+            self.latest = key
+
+    def remove(self, report: Report, by_id: Dict[int, Report]) -> None:
+        self.ids.discard(report.reportId)
+        for counts, name in ((self.reporters, report.reportedBy), (self.reasons, report.reasonType)):
+            counts[name] -= 1
+            if not counts[name]:
+                del counts[name]
+        key = _date_key(report)
+        if key in (self.earliest, self.latest):
+            keys = [_date_key(by_id[i]) for i in self.ids]
+            self.earliest = min(keys, default=None)
+            self.latest = max(keys, default=None)
+
+    def priority(self, latest: Report, penalties: int) -> float:
+        """
+        Impact score: more reports, reports arriving faster (per hour
+        between the first and latest pending report), a repeat offender
+        and a widely seen review (totalVotes) all push it up.
+        """
+        count = len(self.ids)
+        hours = max((self.latest[0] - self.earliest[0]) / 3600, 1.0)
+        return (
+            PRIORITY_WEIGHTS["reports"] * math.log1p(count)
+            + PRIORITY_WEIGHTS["rate"] * math.log1p(count / hours)
+            + PRIORITY_WEIGHTS["penalties"] * penalties
+            + PRIORITY_WEIGHTS["visibility"] * math.log1p(max(latest.review.totalVotes, 0))
+        )
+
+
+class CountRanking:
+    """
+    Keys ordered by a count that only moves by one at a time, highest
+    first. `order` is kept sorted by swapping a key to the edge of its
+    run of equal counts before moving it, so add/remove are O(1) and the
+    top k is a slice.
+    """
+
+    def __init__(self):
+        self.order: List[Any] = []
+        self.position: Dict[Any, int] = {}
+        self.counts: Dict[Any, int] = {}
+        # count → (start, length) of its run in `order`
+        self.runs: Dict[int, Tuple[int, int]] = {}
+
+    def _swap(self, key: Any, to: int) -> None:
+        other = self.order[to]
+        frm = self.position[key]
+        self.order[frm], self.order[to] = other, key
+        self.position[other], self.position[key] = frm, to
+
+    def _shrink(self, count: int, from_start: bool) -> None:
+        start, length = self.runs[count]
+        if length == 1:
+            del self.runs[count]
+        else:
+            self.runs[count] = (start + 1, length - 1) if from_start else (start, length - 1)
+
+    def _grow(self, count: int, at: int) -> None:
+        if count in self.runs:
+            start, length = self.runs[count]
+            self.runs[count] = (min(start, at), length + 1)
+        else:
+            self.runs[count] = (at, 1)
+
+    def add(self, key: Any) -> None:
+        count = self.counts.get(key, 0)
+        if count == 0 and key not in self.position:
+            self.position[key] = len(self.order)
+            self.order.append(key)
+            self._grow(0, len(self.order) - 1)
+        # Move to the front of its run, which then joins the run above
+        at = self.runs[count][0]
+        self._swap(key, at)
+        self._shrink(count, from_start=True)
+        self._grow(count + 1, at)
+        self.counts[key] = count + 1
+
+    def remove(self, key: Any) -> None:
+        count = self.counts[key]
+        start, length = self.runs[count]
+        at = start + length - 1
+        # Move to the back of its run, which then joins the run below
+        self._swap(key, at)
+        self._shrink(count, from_start=False)
+        self._grow(count - 1, at)
+        self.counts[key] = count - 1
+
+    def top(self, k: int) -> List[Tuple[Any, int]]:
+        found = []
+        for key in self.order[:k]:
+            if not self.counts[key]:
+                break
+            found.append((key, self.counts[key]))
+        return found
+
+
+class ReportStore(RecordLog):
+    """
+    reports.json (+ journal) with lookups by reportId and the INDEXES below.
+
+    The secondary indexes hold ids and are sorted back into file order when
+    listed. by_date keeps every (dateReported, reportId) key sorted for
+    paging.
+
+    Dashboard aggregates are kept alongside: reports per UTC day, the
+    sorted time-to-decision of decided reports, and movies ranked by
+    report count.
+    """
+
+    INDEXES = {
+        "by_status": lambda r: r.status,
+        "by_review": lambda r: (r.review.movieTitle, r.review.user),
+        "by_movie": lambda r: r.review.movieTitle,
+        "by_reporter": lambda r: r.reportedBy,
+        "by_reason": lambda r: r.reasonType,
+    }
+
+    def __init__(self, path: Path):
+        super().__init__(path, "reportId")
+
+    def _reset(self) -> None:
+        super()._reset()
+        self.by_id: Dict[int, Report] = {}
+        self.position: Dict[int, int] = {}
+        self.by_date: List[Tuple[float, int]] = []
+        # Moderation queue: pending reports grouped per review, and a
+        # max-heap of (-priority, seq, review) over them. Heap entries are
+        # invalidated lazily: `scores` holds each review's current entry.
+        self.groups: Dict[Tuple[str, str], ReviewGroup] = {}
+        self.dirty: set = set()
+        self.heap: List[Tuple[float, int, Tuple[str, str]]] = []
+        self.scores: Dict[Tuple[str, str], Tuple[float, int]] = {}
+        self.heap_seq = 0
+        self.heap_penalties: Any = None
+        self.per_day: Dict[str, int] = {}
+        self.decision_seconds: List[float] = []
+        self.movie_ranking = CountRanking()
+        for name in self.INDEXES:
+            setattr(self, name, {})
+
+    def _put(self, record: Dict[str, Any]) -> None:
+        report = Report.model_validate(record)
+        report_id = report.reportId
+        previous = self.by_id.get(report_id)
+        if previous is None:
+            self.position[report_id] = len(self.position)
+        else:
+            for name, key in self.INDEXES.items():
+                getattr(self, name)[key(previous)].discard(report_id)
+            old = _date_key(previous)
+            del self.by_date[bisect.bisect_left(self.by_date, old)]
+            if previous.status == "pending":
+                self._ungroup(previous)
+            self._tally(previous, -1)
+        self.by_id[report_id] = report
+        self._tally(report, 1)
+        for name, key in self.INDEXES.items():
+            getattr(self, name).setdefault(key(report), set()).add(report_id)
+        if report.status == "pending":
+            review = (report.review.movieTitle, report.review.user)
+            self.groups.setdefault(review, ReviewGroup()).add(report)
+            self.dirty.add(review)
+        # Reports mostly arrive in date order, so this is usually an append
+        bisect.insort(self.by_date, _date_key(report))
+        super()._put(record)
+
+    def _tally(self, report: Report, sign: int) -> None:
+        """Add (sign=1) or take back (sign=-1) a report's share of the aggregates."""
+        day = _as_utc(report.dateReported).date().isoformat()
+        self.per_day[day] = self.per_day.get(day, 0) + sign
+        if not self.per_day[day]:
+            del self.per_day[day]
+        seconds = _decision_seconds(report)
+        if seconds is not None:
+            if sign > 0:
+                bisect.insort(self.decision_seconds, seconds)
+            else:
+                del self.decision_seconds[bisect.bisect_left(self.decision_seconds, seconds)]
+        if sign > 0:
+            self.movie_ranking.add(report.review.movieTitle)
+        else:
+            self.movie_ranking.remove(report.review.movieTitle)
+
+    def median_decision_seconds(self) -> Optional[float]:
+        seconds = self.decision_seconds
+        if not seconds:
+            return None
+        middle = len(seconds) // 2
+        if len(seconds) % 2:
+            return seconds[middle]
+        return (seconds[middle - 1] + seconds[middle]) / 2
+
+    def _ungroup(self, report: Report) -> None:
+        review = (report.review.movieTitle, report.review.user)
+        group = self.groups[review]
+        group.remove(report, self.by_id)
+        if not group.ids:
+            del self.groups[review]
+        self.dirty.add(review)
+
+    def _push(self, review: Tuple[str, str], penalties: Dict[str, int]) -> None:
+        group = self.groups.get(review)
+        if group is None:
+            self.scores.pop(review, None)
+            return
+        score = group.priority(self.by_id[group.latest[1]], penalties.get(review[1], 0))
+        self.heap_seq += 1
+        self.scores[review] = (score, self.heap_seq)
+        heapq.heappush(self.heap, (-score, self.heap_seq, review))
+
+    def top(self, k: int, penalties_version: Any, penalties: Dict[str, int]) -> List[Tuple[Tuple[str, str], float]]:
+        """
+        The k highest-priority reviews. Groups changed since the last call
+        are re-pushed (O(log n) each); a change in authors' penalties
+        rescores everything once.
+        """
+        if penalties_version != self.heap_penalties or len(self.heap) > 2 * len(self.groups) + 64:
+            self.heap, self.scores, self.dirty = [], {}, set()
+            for review, group in self.groups.items():
+                self.heap_seq += 1
+                score = group.priority(self.by_id[group.latest[1]], penalties.get(review[1], 0))
+                self.scores[review] = (score, self.heap_seq)
+                self.heap.append((-score, self.heap_seq, review))
+            heapq.heapify(self.heap)
+            self.heap_penalties = penalties_version
+        for review in self.dirty:
+            self._push(review, penalties)
+        self.dirty = set()
+
+        found: List[Tuple[float, int, Tuple[str, str]]] = []
+        while self.heap and len(found) < k:
+            entry = heapq.heappop(self.heap)
+            if self.scores.get(entry[2]) == (-entry[0], entry[1]):
+                found.append(entry)
+            # else: stale entry, dropped
+        for entry in found:
+            heapq.heappush(self.heap, entry)
+        return [(review, -neg) for neg, _, review in found]
+
+    def select(self, ids) -> List[Report]:
+        # Copies, so callers can edit a report and hand it to replace_report
+        return [self.by_id[i].model_copy() for i in sorted(ids, key=self.position.__getitem__)]
+
+    def all(self) -> List[Report]:
+        return [self.by_id[i].model_copy() for i in self.records]
+
+    def page(
+        self,
+        filters: Dict[str, Any],
+        after: Optional[Tuple[float, int]],
+        amount: int,
+        descending: bool,
+    ) -> Tuple[List[Report], bool]:
+        """
+        Up to `amount` reports matching every filter (index name → key), in
+        dateReported order, starting after the `after` key. Returns the page
+        and whether more matches follow.
+        """
+        candidates = None
+        if filters:
+            sets = sorted((getattr(self, name).get(key, set()) for name, key in filters.items()), key=len)
+            candidates = sets[0]
+            others = sets[1:]
+
+        if candidates is not None and len(candidates) * 16 < len(self.by_date):
+            # Selective filter: sort its few matches instead of walking all keys
+            keys = sorted(
+                (_date_key(self.by_id[i]) for i in candidates if all(i in o for o in others)),
+                reverse=descending,
+            )
+            if after is not None:
+                keys = [k for k in keys if (k < after if descending else k > after)]
+        else:
+            if descending:
+                stop = len(self.by_date) if after is None else bisect.bisect_left(self.by_date, after)
+                keys = (self.by_date[i] for i in range(stop - 1, -1, -1))
+            else:
+                start = 0 if after is None else bisect.bisect_right(self.by_date, after)
+                keys = (self.by_date[i] for i in range(start, len(self.by_date)))
+            if candidates is not None:
+                keys = (k for k in keys if k[1] in candidates and all(k[1] in o for o in others))
+
+        page: List[Report] = []
+        for key in keys:
+            if len(page) == amount:
+                return page, True
+            page.append(self.by_id[key[1]].model_copy())
+        return page, False
+
+
+_REPORTS_LOCK = threading.RLock()
+_REPORT_STORE: Optional[ReportStore] = None
+
+
+def _report_store() -> ReportStore:
+    """
+    The store for the current REPORTS_FILE, caught up with the journal.
+    Callers hold _REPORTS_LOCK while using it.
+    """
+    global _REPORT_STORE
+    store = _REPORT_STORE
+    if store is None or store.snapshot_path != REPORTS_FILE:
+        store = ReportStore(REPORTS_FILE)
+        _REPORT_STORE = store
+    else:
+        store.sync()
+    return store
+
+
 def load_reports() -> List[Report]:
-    raw = _read_json_list(REPORTS_FILE)
-    return [Report.model_validate(r) for r in raw]
+    with _REPORTS_LOCK:
+        return _report_store().all()
 
 
 def save_reports(reports: List[Report]) -> None:
-    data = [r.model_dump(mode="json") for r in reports]
-    _write_json_list(REPORTS_FILE, data)
+    """Replace every report: written as a fresh snapshot with an empty journal."""
+    with _REPORTS_LOCK:
+        _report_store().compact([r.model_dump(mode="json") for r in reports])
+
 
+def compact_reports() -> None:
+    with _REPORTS_LOCK:
+        _report_store().compact()
 
-def _next_report_id(reports: List[Report]) -> int:
-    if not reports:
-        return 1
-    return max(r.reportId for r in reports) + 1
+
+def rename_user_in_reports(old_name: str, new_name: str) -> int:
+    """
+    Rename a user as reporter and as review author in every report, as
+    journaled updates. Returns the number of reports changed.
+    """
+    with _REPORTS_LOCK:
+        store = _report_store()
+        changed = []
+        for record in store.items():
+            review = record.get("review") or {}
+            if record.get("reportedBy") != old_name and review.get("user") != old_name:
+                continue
+            update = dict(record)
+            if record.get("reportedBy") == old_name:
+                update["reportedBy"] = new_name
+            if review.get("user") == old_name:
+                update["review"] = {**review, "user": new_name}
+            changed.append(update)
+        store.update_many(changed)
+    return len(changed)
 
 
 def create_report_for_review(
@@ -164,58 +511,229 @@ def create_report_for_review(
     # 1) CSV bump + snapshot
     snapshot = build_snapshot_and_increment_reports(movie_title, review_user)
 
-    # 2) Load existing reports
-    reports = load_reports()
-    new_id = _next_report_id(reports)
-
-    # 3) Create new Report
-    now = datetime.utcnow()
-    report = Report(
-        reportId=new_id,
-        review=snapshot,
-        reportedBy=reported_by,
-        status="pending",
-        dateReported=now,
-        reasonType=reason_type,
-        reason=reason,
-        handledByAdmin=None,
-        handledAt=None,
-        banDurationSeconds=None,
-    )
+    with _REPORTS_LOCK, _report_store().locked() as store:
+        # 2) Next id from the indexed store; the file lock keeps it unique
+        # across workers until the report is journaled
+        new_id = store.next_key()
+
+        # 3) Create new Report
+        now = datetime.utcnow()
+        report = Report(
+            reportId=new_id,
+            review=snapshot,
+            reportedBy=reported_by,
+            status="pending",
+            dateReported=now,
+            reasonType=reason_type,
+            reason=reason,
+            handledByAdmin=None,
+            handledAt=None,
+            banDurationSeconds=None,
+        )
 
-    # 4) Persist
-    reports.append(report)
-    save_reports(reports)
+        # 4) Persist: one journal line, the store is updated in place
+        store.add(report.model_dump(mode="json"))
 
-    return report
+    return report.model_copy()
+
+
+@contextmanager
+def reports_locked() -> Iterator[None]:
+    """
+    Hold reports.json for a read-check-write sequence (deciding reports):
+    the thread lock and the file lock, so no other thread or worker can
+    change a report in between. The functions of this module may be called
+    inside; bans and users.json may be locked after it, never before.
+    """
+    with _REPORTS_LOCK, _report_store().locked():
+        yield
 
 
 def get_report_by_id(report_id: int) -> Optional[Report]:
-    for r in load_reports():
-        if r.reportId == report_id:
-            return r
-    return None
+    with _REPORTS_LOCK:
+        report = _report_store().by_id.get(report_id)
+        return report.model_copy() if report is not None else None
 
 
 def replace_report(updated: Report) -> None:
     """
     Replace a report with the same reportId in reports.json.
     """
-    reports = load_reports()
-    for idx, r in enumerate(reports):
-        if r.reportId == updated.reportId:
-            reports[idx] = updated
-            save_reports(reports)
-            return
-    # If not found, treat as logic error – service should have checked first.
-    raise ValueError(f"Report with id {updated.reportId} not found")
+    with _REPORTS_LOCK:
+        store = _report_store()
+        if updated.reportId not in store.by_id:
+            # If not found, treat as logic error – service should have checked first.
+            raise ValueError(f"Report with id {updated.reportId} not found")
+        # Journaled as an update record holding only the changed fields
+        store.update(updated.model_dump(mode="json"))
+
+
+def replace_reports(updated: List[Report]) -> None:
+    """
+    Replace several reports at once: one journal write for all of them.
+    Nothing is written if any reportId is unknown.
+    """
+    with _REPORTS_LOCK:
+        store = _report_store()
+        for report in updated:
+            if report.reportId not in store.by_id:
+                raise ValueError(f"Report with id {report.reportId} not found")
+        store.update_many([r.model_dump(mode="json") for r in updated])
 
 
 def list_reports(status: Optional[Literal["pending", "confirmed", "rejected"]] = None) -> List[Report]:
-    reports = load_reports()
-    if status is None:
-        return reports
-    return [r for r in reports if r.status == status]
+    with _REPORTS_LOCK:
+        store = _report_store()
+        if status is None:
+            return store.all()
+        return store.select(store.by_status.get(status, ()))
+
+
+def _encode_cursor(report: Report) -> str:
+    timestamp, report_id = _date_key(report)
+    return base64.urlsafe_b64encode(f"{timestamp!r}:{report_id}".encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[float, int]:
+    try:
+        timestamp, report_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+        return (float(timestamp), int(report_id))
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+
+def page_reports(
+    *,
+    status: Optional[Literal["pending", "confirmed", "rejected"]] = None,
+    reason_type: Optional[str] = None,
+    reported_by: Optional[str] = None,
+    movie_title: Optional[str] = None,
+    cursor: Optional[str] = None,
+    amount: int = 20,
+    descending: bool = True,
+) -> Tuple[List[Report], Optional[str]]:
+    """
+    One page of reports ordered by dateReported (then reportId), filtered
+    through the store's indexes. Returns the page and the cursor for the
+    next one (None on the last page). Cursors are opaque to callers and
+    stay valid while reports are added or decided.
+
+    Raises:
+        ValueError for a malformed cursor.
+    """
+    filters = {
+        name: value
+        for name, value in (
+            ("by_status", status),
+            ("by_reason", reason_type),
+            ("by_reporter", reported_by),
+            ("by_movie", movie_title),
+        )
+        if value is not None
+    }
+    after = _decode_cursor(cursor) if cursor else None
+    with _REPORTS_LOCK:
+        page, more = _report_store().page(filters, after, amount, descending)
+    return page, (_encode_cursor(page[-1]) if more else None)
+
+
+def _group_summary(store: ReportStore, review: Tuple[str, str], group: ReviewGroup) -> ReportGroup:
+    latest = store.by_id[group.latest[1]]
+    return ReportGroup(
+        movieTitle=review[0],
+        reviewUser=review[1],
+        reportCount=len(group.ids),
+        distinctReporters=len(group.reporters),
+        reasons=dict(group.reasons),
+        latestReportId=latest.reportId,
+        latestReportedAt=latest.dateReported,
+        latestSnapshot=latest.review.model_copy(),
+    )
+
+
+def list_report_groups(amount: int = 20, offset: int = 0) -> List[ReportGroup]:
+    """
+    The moderation queue: one entry per review with pending reports, most
+    reported first (ties: most recently reported first).
+    """
+    with _REPORTS_LOCK:
+        store = _report_store()
+        ordered = sorted(
+            store.groups.items(),
+            key=lambda item: (len(item[1].ids), item[1].latest),
+            reverse=True,
+        )
+        return [_group_summary(store, review, group) for review, group in ordered[offset:offset + amount]]
+
+
+def get_report_group(movie_title: str, review_user: str) -> Optional[ReportGroup]:
+    with _REPORTS_LOCK:
+        store = _report_store()
+        group = store.groups.get((movie_title, review_user))
+        return _group_summary(store, (movie_title, review_user), group) if group else None
+
+
+def list_group_reports(movie_title: str, review_user: str) -> List[Report]:
+    """Pending reports of one review, in file order."""
+    with _REPORTS_LOCK:
+        store = _report_store()
+        group = store.groups.get((movie_title, review_user))
+        return store.select(group.ids) if group else []
+
+
+_PENALTIES: Tuple[Any, Dict[str, int]] = (None, {})
+
+
+def _author_penalties() -> Tuple[Any, Dict[str, int]]:
+    """userName → penalties from users.json, re-read when the file changes."""
+    global _PENALTIES
+    path = usersRepo.DATA_PATH
+    try:
+        st = os.stat(path)
+        version = (str(path), st.st_mtime_ns, st.st_size)
+    except OSError:
+        version = (str(path), None)
+    if _PENALTIES[0] != version:
+        users = usersRepo.load_users() if version[1] is not None else []
+        _PENALTIES = (version, {u.get("userName"): to_int(u.get("penalties")) for u in users})
+    return _PENALTIES
+
+
+def next_report_groups(k: int = 10) -> List[ReportGroup]:
+    """The k pending reviews with the highest priority, highest first."""
+    version, penalties = _author_penalties()
+    with _REPORTS_LOCK:
+        store = _report_store()
+        groups = []
+        for review, score in store.top(k, version, penalties):
+            group = _group_summary(store, review, store.groups[review])
+            group.priority = round(score, 4)
+            groups.append(group)
+        return groups
+
+
+def report_stats(days: int = 30, top: int = 10) -> Dict[str, Any]:
+    """
+    Report aggregates kept by the store: counts per status, reports per UTC
+    day for the last `days` days (oldest first), median time-to-decision
+    and the `top` most reported movies.
+    """
+    today = datetime.now(timezone.utc).date()
+    with _REPORTS_LOCK:
+        store = _report_store()
+        stats: Dict[str, Any] = {
+            status: len(store.by_status.get(status, ()))
+            for status in ("pending", "confirmed", "rejected")
+        }
+        stats["reportsPerDay"] = {
+            day: store.per_day.get(day, 0)
+            for day in ((today - timedelta(days=back)).isoformat() for back in range(days - 1, -1, -1))
+        }
+        stats["medianDecisionSeconds"] = store.median_decision_seconds()
+        stats["topMovies"] = [
+            {"movieTitle": movie, "reports": count} for movie, count in store.movie_ranking.top(top)
+        ]
+    return stats
 
 
 def list_pending_reports() -> List[Report]:
@@ -227,32 +745,81 @@ def list_reports_for_review(movie_title: str, review_user: str) -> List[Report]:
     All reports for a specific review (movie_title + review_user),
     across all statuses.
     """
-    reports = load_reports()
-    return [
-        r
-        for r in reports
-        if r.review.movieTitle == movie_title and r.review.user == review_user
-    ]
+    with _REPORTS_LOCK:
+        store = _report_store()
+        return store.select(store.by_review.get((movie_title, review_user), ()))
 
 
 # ─────────────────────────────────────────────────────────────
 # Bans: load/save/list/create
 # ─────────────────────────────────────────────────────────────
 
+class BanStore(RecordLog):
+    """bans.json (+ journal) with a running count of bans per banOption."""
+
+    def __init__(self, path: Path):
+        super().__init__(path, "banId")
+
+    def _reset(self) -> None:
+        super()._reset()
+        self.by_option: Dict[str, int] = {}
+
+    def _put(self, record: Dict[str, Any]) -> None:
+        previous = self.records.get(record["banId"])
+        if previous is not None:
+            self.by_option[previous["banOption"]] -= 1
+        self.by_option[record["banOption"]] = self.by_option.get(record["banOption"], 0) + 1
+        super()._put(record)
+
+
+_BANS_LOCK = threading.RLock()
+_BAN_LOG: Optional[BanStore] = None
+
+
+def _ban_log() -> BanStore:
+    """bans.json (+ journal) for the current BANS_FILE; callers hold _BANS_LOCK."""
+    global _BAN_LOG
+    log = _BAN_LOG
+    if log is None or log.snapshot_path != BANS_FILE:
+        log = BanStore(BANS_FILE)
+        _BAN_LOG = log
+    else:
+        log.sync()
+    return log
+
+
 def load_bans() -> List[Ban]:
-    raw = _read_json_list(BANS_FILE)
+    with _BANS_LOCK:
+        raw = _ban_log().items()
     return [Ban.model_validate(b) for b in raw]
 
 
 def save_bans(bans: List[Ban]) -> None:
-    data = [b.model_dump(mode="json") for b in bans]
-    _write_json_list(BANS_FILE, data)
+    """Replace every ban: written as a fresh snapshot with an empty journal."""
+    with _BANS_LOCK:
+        _ban_log().compact([b.model_dump(mode="json") for b in bans])
+
+
+def compact_bans() -> None:
+    with _BANS_LOCK:
+        _ban_log().compact()
 
 
-def _next_ban_id(bans: List[Ban]) -> int:
-    if not bans:
-        return 1
-    return max(b.banId for b in bans) + 1
+def rename_user_in_bans(old_name: str, new_name: str) -> int:
+    """
+    Rename a user wherever a ban names them (banned user, reporter, review
+    author), as journaled updates. Returns the number of bans changed.
+    """
+    fields = ("userName", "reportedBy", "reviewUser")
+    with _BANS_LOCK:
+        log = _ban_log()
+        changed = [
+            {**record, **{f: new_name for f in fields if record.get(f) == old_name}}
+            for record in log.items()
+            if any(record.get(f) == old_name for f in fields)
+        ]
+        log.update_many(changed)
+    return len(changed)
 
 
 def add_ban(
@@ -276,29 +843,53 @@ def add_ban(
       - compute ban_duration_seconds (3/7/30 days)
       - update users.json.banExpiresAt separately
     """
-    bans = load_bans()
-    new_id = _next_ban_id(bans)
-    banned_at = banned_at or datetime.utcnow()
-    banned_until = banned_at + timedelta(seconds=ban_duration_seconds)
-
-    ban = Ban(
-        banId=new_id,
-        userName=user_name,
-        reportedBy=reported_by,
-        reportId=report_id,
-        movieTitle=movie_title,
-        reviewUser=review_user,
-        reasonType=reason_type,
+    return add_bans([dict(
+        user_name=user_name,
+        reported_by=reported_by,
+        report_id=report_id,
+        movie_title=movie_title,
+        review_user=review_user,
+        reason_type=reason_type,
         reason=reason,
-        banOption=ban_option,
-        banDurationSeconds=ban_duration_seconds,
-        bannedAt=banned_at,
-        bannedUntil=banned_until,
-    )
+        ban_option=ban_option,
+        ban_duration_seconds=ban_duration_seconds,
+        banned_at=banned_at,
+    )])[0]
+
 
-    bans.append(ban)
-    save_bans(bans)
-    return ban
+def add_bans(specs: List[Dict[str, Any]]) -> List[Ban]:
+    """
+    Create several bans (each spec holds add_ban's keyword arguments) with
+    a single journal write. Ids are assigned in order.
+    """
+    with _BANS_LOCK, _ban_log().locked() as log:
+        # Held until the bans are journaled, so other workers can't take these ids
+        next_id = log.next_key()
+        bans: List[Ban] = []
+        for offset, spec in enumerate(specs):
+            banned_at = spec.get("banned_at") or datetime.utcnow()
+            bans.append(Ban(
+                banId=next_id + offset,
+                userName=spec["user_name"],
+                reportedBy=spec["reported_by"],
+                reportId=spec["report_id"],
+                movieTitle=spec["movie_title"],
+                reviewUser=spec["review_user"],
+                reasonType=spec["reason_type"],
+                reason=spec.get("reason"),
+                banOption=spec["ban_option"],
+                banDurationSeconds=spec["ban_duration_seconds"],
+                bannedAt=banned_at,
+                bannedUntil=banned_at + timedelta(seconds=spec["ban_duration_seconds"]),
+            ))
+        log.add_many([b.model_dump(mode="json") for b in bans])
+    return bans
+
+
+def bans_per_option() -> Dict[str, int]:
+    """Bans issued so far, per banOption."""
+    with _BANS_LOCK:
+        return {option: count for option, count in _ban_log().by_option.items() if count}
 
 
 def list_bans(user_name: Optional[str] = None) -> List[Ban]:
@@ -141,6 +141,31 @@ def update_movie_csv() -> None:
         print(f"Updated {movie_title}")
 
 
+def compute_movie_rating_updates(csv_path: Path) -> Dict[str, Any]:
+    """
+    Aggregate fields for metadata.json (average rating and counts) computed
+    from a movieReviews.csv.
+    """
+    # Vectorized over the cached column arrays instead of re-parsing every row
+    from .reviewColumns import columns_for_csv
+
+    columns = columns_for_csv(csv_path)
+    if columns is not None:
+        total_user_reviews = len(columns)
+        total_ratings_count = int(columns.rated().size)
+        avg_rating = columns.average_rating()
+    else:
+        total_user_reviews = 0
+        total_ratings_count = 0
+        avg_rating = None
+
+    updates = {}
+    updates["movieIMDbRating"] = avg_rating
+    updates["totalRatingCount"] = total_ratings_count
+    updates["totalUserReviews"] = total_user_reviews
+    return updates
+
+
 def recompute_movie_ratings(movie_title: str) -> None:
     """
     Recompute average rating and counts for a movie from its movieReviews.csv
@@ -153,35 +178,13 @@ def recompute_movie_ratings(movie_title: str) -> None:
     if not metadata_path.exists():
         return
 
-    ratings: list[float] = []
-    total_user_reviews = 0
-
-    if csv_path.exists():
-        with csv_path.open("r", newline="", encoding="utf-8") as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                total_user_reviews += 1
-                rating_val = None
-                # check common rating column names
-                for key in ("User's Rating out of 10", "rating", "User Rating", "Rating"):
-                    if key in row and row.get(key) not in (None, "", " "):
-                        rating_val = row.get(key)
-                        break
-                if rating_val is not None and str(rating_val).strip() != "":
-                    try:
-                        ratings.append(float(rating_val))
-                    except Exception:
-                        pass
-
-    total_ratings_count = len(ratings)
-    avg_rating = None
-    if total_ratings_count > 0:
-        avg_rating = round(sum(ratings) / total_ratings_count, 1)
+    updates = compute_movie_rating_updates(csv_path)
+    apply_movie_rating_updates(movie_title, updates)
 
-    updates = {}
-    updates["movieIMDbRating"] = avg_rating
-    updates["totalRatingCount"] = total_ratings_count
-    updates["totalUserReviews"] = total_user_reviews
+
+def apply_movie_rating_updates(movie_title: str, updates: Dict[str, Any]) -> None:
+    """Write aggregate fields into a movie's metadata.json."""
+    metadata_path = DATA_PATH / movie_title / "metadata.json"
 
     # Use update_movies to write safely (it serializes dates)
     try:
@@ -0,0 +1,233 @@
+"""
+JSON list files kept as a snapshot plus an append-only journal.
+
+reports.json and bans.json used to be rewritten whole for every new report,
+status change or ban. Each list is now two files:
+
+  data/reports.json          (snapshot, the same JSON list as before)
+  data/reports.log.jsonl     (JSON-lines journal)
+  {"op": "add", "item": {...}}                        (new record)
+  {"op": "update", "id": <key>, "set": {"status": ...}} (changed fields)
+
+Reading the list is the snapshot with the journal replayed on top, in
+order. A write is one O_APPEND line; once COMPACT_AFTER journal lines have
+piled up the merged list is written as a new snapshot.
+
+Compaction holds the snapshot's file lock (fileLock) and first renames the
+journal aside to "<journal>.compacting". Lines other processes append from
+then on start a fresh journal, so none is dropped with the old one. The
+aside file is replayed, the snapshot written (temp file + os.replace) and
+only then is the aside file removed. Loading replays a leftover aside file
+between the snapshot and the journal; replay is idempotent ("add" of a
+known key replaces it), so a crash anywhere in between loses nothing.
+
+Like reviewVoteStore, other processes' lines are picked up by replaying the
+journal tail before each operation, and a new snapshot (different inode)
+triggers a full reload. Writes that pick new keys (next_key) run inside
+locked(), which holds the same file lock from the sync to the append, so
+two processes never journal the same key.
+"""
+from __future__ import annotations
+
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from . import fileLock
+
+JOURNAL_SUFFIX = ".log.jsonl"
+COMPACTING_SUFFIX = ".compacting"
+
+COMPACT_AFTER = 1000
+
+
+def _stamp(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_ino)
+
+
+def journal_path(snapshot_path: Path) -> Path:
+    return snapshot_path.with_name(snapshot_path.stem + JOURNAL_SUFFIX)
+
+
+def compacting_path(snapshot_path: Path) -> Path:
+    journal = journal_path(snapshot_path)
+    return journal.with_name(journal.name + COMPACTING_SUFFIX)
+
+
+class RecordLog:
+    """Records of one snapshot + journal pair, keyed by the `key` field."""
+
+    def __init__(self, snapshot_path: Path, key: str):
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path(snapshot_path)
+        self.compacting_path = compacting_path(snapshot_path)
+        self.key = key
+        self.records: Dict[Any, Dict[str, Any]] = {}
+        self.journal_lines = 0
+        self.snapshot_stamp: Optional[Tuple[int, int]] = None
+        self.journal_offset = 0
+        self._reload()
+
+    # ── Hooks for subclasses keeping derived indexes ──
+
+    def _reset(self) -> None:
+        self.records = {}
+
+    def _put(self, record: Dict[str, Any]) -> None:
+        self.records[record[self.key]] = record
+
+    # ── Loading / syncing with other processes ──
+
+    def _reload(self) -> None:
+        self._reset()
+        self.journal_lines = 0
+        self.journal_offset = 0
+        self.snapshot_stamp = _stamp(self.snapshot_path)
+        if self.snapshot_stamp is not None:
+            raw = self.snapshot_path.read_text(encoding="utf-8").strip()
+            # A corrupted snapshot bubbles up as JSONDecodeError, as before
+            for record in json.loads(raw) if raw else []:
+                self._put(record)
+        # Left behind by an interrupted compaction
+        self._replay_file(self.compacting_path, 0)
+        self._replay_tail()
+
+    def _replay_file(self, path: Path, offset: int) -> int:
+        """Apply the complete lines of `path` from `offset`; returns the bytes consumed."""
+        try:
+            with path.open("rb") as f:
+                f.seek(offset)
+                data = f.read()
+        except FileNotFoundError:
+            return 0
+        # Only consume complete lines; a partial last line is read next time
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            try:
+                self._apply(json.loads(line))
+            except (json.JSONDecodeError, KeyError, TypeError):
+                continue
+            self.journal_lines += 1
+        return end
+
+    def _replay_tail(self) -> None:
+        self.journal_offset += self._replay_file(self.journal_path, self.journal_offset)
+
+    def sync(self) -> None:
+        if _stamp(self.snapshot_path) != self.snapshot_stamp:
+            self._reload()
+        else:
+            self._replay_tail()
+
+    def _apply(self, entry: Dict[str, Any]) -> None:
+        if entry["op"] == "add":
+            self._put(entry["item"])
+        elif entry["op"] == "update":
+            current = self.records.get(entry["id"])
+            if current is not None:
+                self._put({**current, **entry["set"]})
+
+    # ── Reads ──
+
+    def items(self) -> List[Dict[str, Any]]:
+        return list(self.records.values())
+
+    def next_key(self) -> int:
+        """The key after the largest one; only unique across processes inside locked()."""
+        return max(self.records, default=0) + 1
+
+    @contextmanager
+    def locked(self) -> Iterator["RecordLog"]:
+        """Hold the snapshot's file lock, caught up with every other process's lines."""
+        with fileLock.file_lock(self.snapshot_path):
+            self.sync()
+            yield self
+
+    # ── Writes ──
+
+    def _append(self, entries: List[Dict[str, Any]]) -> None:
+        if not entries:
+            return
+        for entry in entries:
+            self._apply(entry)
+        data = "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in entries).encode("utf-8")
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        # Single O_APPEND write so concurrent processes never interleave lines
+        fd = os.open(self.journal_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, data)
+            # Our own lines are already applied; skip them when replaying
+            if os.fstat(fd).st_size == self.journal_offset + len(data):
+                self.journal_offset += len(data)
+        finally:
+            os.close(fd)
+        self.journal_lines += len(entries)
+        if self.journal_lines >= COMPACT_AFTER:
+            self.compact()
+
+    def add(self, record: Dict[str, Any]) -> None:
+        self.add_many([record])
+
+    def add_many(self, records: List[Dict[str, Any]]) -> None:
+        """Journal new records with one write."""
+        self._append([{"op": "add", "item": r} for r in records])
+
+    def update(self, record: Dict[str, Any]) -> None:
+        self.update_many([record])
+
+    def update_many(self, records: List[Dict[str, Any]]) -> None:
+        """Journal the fields of each record that differ from the stored one, with one write."""
+        entries = []
+        for record in records:
+            current = self.records.get(record[self.key], {})
+            changes = {k: v for k, v in record.items() if current.get(k) != v}
+            if changes:
+                entries.append({"op": "update", "id": record[self.key], "set": changes})
+        self._append(entries)
+
+    def _write_snapshot(self, records: List[Dict[str, Any]]) -> None:
+        self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.snapshot_path.with_name(self.snapshot_path.name + ".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(records, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.snapshot_path)
+
+    def compact(self, records: Optional[List[Dict[str, Any]]] = None) -> None:
+        """
+        Write `records` (default: the merged list) as the snapshot and
+        retire the journal lines it covers.
+        """
+        with fileLock.file_lock(self.snapshot_path):
+            if self.compacting_path.exists():
+                # An interrupted compaction: reload to replay its lines
+                self._reload()
+                self._write_snapshot(self.items())
+                self.compacting_path.unlink()
+            else:
+                # Another process may have compacted since our last look
+                self.sync()
+            try:
+                os.replace(self.journal_path, self.compacting_path)
+            except FileNotFoundError:
+                pass
+            else:
+                # Lines appended after our reload but before the rename
+                self._replay_file(self.compacting_path, self.journal_offset)
+            if records is not None:
+                self._reset()
+                for record in records:
+                    self._put(record)
+            self._write_snapshot(self.items())
+            try:
+                self.compacting_path.unlink()
+            except FileNotFoundError:
+                pass
+            self.snapshot_stamp = _stamp(self.snapshot_path)
+            self.journal_offset = 0
+            self.journal_lines = 0
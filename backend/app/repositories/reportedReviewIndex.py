@@ -0,0 +1,383 @@
+"""
+Index of reported reviews for reportsRepo.load_all_reports.
+
+Listing reported reviews used to load every review of every movie just to
+keep the few with Reports > 0. Instead each movie keeps a small map of its
+reported rows:
+
+  data/imdb/<MovieTitle>/movieReviews.reported.json
+  {
+    "format": 1,
+    "version": [mtime_ns, size],       # CSV version the map describes
+    "rows": <data row count>,
+    "reviews": {"<User>": [rowIndex, reports], ...}
+  }
+
+`reports` is the folded "Reports" column; pending counts still come from
+reviewReportCounter. A review that has only pending reports is added to
+the map (with reports 0) when it is reported or the map is rebuilt, so the
+listing can read its row directly. A listing therefore reads only the reported rows.
+
+Like reviewUserIndex, a movie is rebuilt only when its CSV version changed
+underneath the map (sidecar first, then the reviewColumns arrays), and
+writes going through reviewsRepo, the report counter fold and the username
+rename patch the in-memory map. The sidecar is only rewritten on a rebuild.
+
+So that a listing doesn't have to visit every movie, the movies that have
+(or had) a reported review are registered in one JSON-lines file next to
+the movie directories:
+
+  data/imdb/reportedMovies.log
+  {"movie": "<MovieTitle>"}   (movie gained a reported review)
+  {"complete": true}          (every movie reported so far is listed above)
+
+A movie is appended (one O_APPEND write) the first time this process sees
+it with a reported review, normally when it is reported. The first listing
+on a corpus without the "complete" line scans every movie once, under a
+file lock, and appends what it found. Other processes' lines are picked up
+by replaying the file's tail.
+
+One review per user per movie is assumed: only a user's first row is kept.
+"""
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from . import fileLock, reviewsRepo, reviewColumns
+from .reviewFields import to_int
+
+Version = Optional[Tuple[int, int]]
+
+REPORTED_FILENAME = "movieReviews.reported.json"
+REPORTED_FORMAT = 1
+REGISTRY_FILENAME = "reportedMovies.log"
+
+
+class MovieReported:
+    """User → [rowIndex, folded report count] for the reported reviews of one movie."""
+
+    def __init__(self, version: Version, reviews: Dict[str, List[int]], rows: int):
+        self.version = version
+        self.reviews = reviews
+        self.rows = rows
+
+    def append(self, user: str, reports: int) -> None:
+        if user and reports > 0 and user not in self.reviews:
+            self.reviews[user] = [self.rows, reports]
+        self.rows += 1
+
+    def update(self, index: int, row: Dict[str, Any]) -> None:
+        user = row.get("User")
+        reports = to_int(row.get("Reports"))
+        entry = self.reviews.get(user) if user else None
+        if entry is not None and entry[0] == index:
+            entry[1] = reports
+        elif user and entry is None and reports > 0:
+            self.reviews[user] = [index, reports]
+
+    def delete(self, index: int) -> None:
+        self.rows -= 1
+        # Rows after the deleted one move up by one
+        for user in list(self.reviews):
+            entry = self.reviews[user]
+            if entry[0] == index:
+                del self.reviews[user]
+            elif entry[0] > index:
+                entry[0] -= 1
+
+    def rename(self, old_user: str, new_user: str) -> None:
+        entry = self.reviews.pop(old_user, None)
+        if entry is not None and new_user not in self.reviews:
+            self.reviews[new_user] = entry
+
+
+def _scan(csv_path: Path, users: Iterable[str] = ()) -> MovieReported:
+    """
+    Build the map from the movie's column arrays, also locating `users`' rows.
+    Reviews with only pending reports are kept too (with their folded count).
+    """
+    # Read lock-free: folds hold the counter's lock while patching this index
+    from .reviewReportCounter import read_pending
+
+    columns = reviewColumns.columns_for_csv(csv_path)
+    if columns is None:
+        return MovieReported(None, {}, 0)
+    wanted = set(users)
+    mask = columns.current_reports(read_pending(csv_path.parent)) > 0
+    if wanted:
+        codes = [code for code, user in enumerate(columns.users) if user in wanted]
+        mask |= np.isin(columns.user_codes, codes)
+    reviews: Dict[str, List[int]] = {}
+    for index in np.flatnonzero(mask).tolist():
+        user = columns.users[columns.user_codes[index]]
+        if user and user not in reviews:
+            reviews[user] = [index, int(columns.reports[index])]
+    return MovieReported(columns.version, reviews, len(columns))
+
+
+def _from_rows(version: Version, rows: List[Dict[str, Any]]) -> MovieReported:
+    reviews: Dict[str, List[int]] = {}
+    for index, row in enumerate(rows):
+        user = row.get("User")
+        reports = to_int(row.get("Reports"))
+        if user and reports > 0 and user not in reviews:
+            reviews[user] = [index, reports]
+    return MovieReported(version, reviews, len(rows))
+
+
+def _read_sidecar(path: Path) -> Optional[MovieReported]:
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            raw = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if raw.get("format") != REPORTED_FORMAT:
+        return None
+    version = tuple(raw["version"]) if raw.get("version") else None
+    return MovieReported(version, raw.get("reviews") or {}, int(raw.get("rows") or 0))  # type: ignore[arg-type]
+
+
+def _write_sidecar(movie: MovieReported, path: Path) -> None:
+    with tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", dir=path.parent, prefix=path.name + ".", suffix=".tmp", delete=False,
+    ) as f:
+        json.dump({
+            "format": REPORTED_FORMAT,
+            "version": list(movie.version) if movie.version else None,
+            "rows": movie.rows,
+            "reviews": movie.reviews,
+        }, f, ensure_ascii=False)
+    os.replace(f.name, path)
+
+
+def _load_movie(csv_path: Path, version: Version) -> MovieReported:
+    sidecar = csv_path.with_name(REPORTED_FILENAME)
+    movie = _read_sidecar(sidecar) if sidecar.exists() else None
+    if movie is None or movie.version != version:
+        movie = _scan(csv_path)
+        try:
+            _write_sidecar(movie, sidecar)
+        except OSError:
+            pass
+    return movie
+
+
+# ─────────────────────────────────────────────────────────────
+# In-memory index, keyed by movie directory
+# ─────────────────────────────────────────────────────────────
+
+_MOVIES: Dict[str, MovieReported] = {}
+_LOCK = threading.RLock()
+
+
+class _Registry:
+    """Titles of the movies under one root that have reported reviews."""
+
+    def __init__(self, root: Path):
+        self.path = root / REGISTRY_FILENAME
+        self.movies: set = set()
+        self.complete = False
+        self.inode: Optional[int] = None
+        self.offset = 0
+
+    def sync(self) -> None:
+        try:
+            with self.path.open("rb") as f:
+                inode = os.fstat(f.fileno()).st_ino
+                if inode != self.inode:
+                    self.movies, self.complete, self.offset = set(), False, 0
+                    self.inode = inode
+                f.seek(self.offset)
+                data = f.read()
+        except FileNotFoundError:
+            return
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if entry.get("movie"):
+                self.movies.add(entry["movie"])
+            if entry.get("complete"):
+                self.complete = True
+        self.offset += end
+
+    def append(self, entries: List[Dict[str, Any]]) -> None:
+        data = "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in entries).encode("utf-8")
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+        self.sync()
+
+
+_REGISTRIES: Dict[str, _Registry] = {}
+
+
+def _registry(root: Path) -> _Registry:
+    """The root's registry (caller holds _LOCK)."""
+    registry = _REGISTRIES.get(str(root))
+    if registry is None:
+        registry = _REGISTRIES[str(root)] = _Registry(root)
+    return registry
+
+
+def _register(movie_dir: Path, movie: Optional[MovieReported]) -> None:
+    """Register the movie if it has a reported review (caller holds _LOCK)."""
+    if movie is None or not movie.reviews:
+        return
+    register_movie(movie_dir)
+
+
+def register_movie(movie_dir: Path) -> None:
+    """
+    List the movie as having reported reviews. For writers that add reported
+    rows without going through reviewsRepo, e.g. the bulk ingest.
+    """
+    with _LOCK:
+        registry = _registry(movie_dir.parent)
+        if movie_dir.name in registry.movies:
+            return
+        registry.sync()
+        if movie_dir.name not in registry.movies:
+            try:
+                registry.append([{"movie": movie_dir.name}])
+            except OSError:
+                pass
+
+
+def reported_movies(root: Path) -> List[Path]:
+    """
+    Directories of the movies under `root` that have (or had) reported
+    reviews, including reviews whose reports are still pending.
+    """
+    with _LOCK:
+        registry = _registry(root)
+        registry.sync()
+        if not registry.complete:
+            _build_registry(root, registry)
+        return [root / title for title in sorted(registry.movies)]
+
+
+def _build_registry(root: Path, registry: _Registry) -> None:
+    """One scan of every movie, for a corpus never registered (caller holds _LOCK)."""
+    from .reviewReportCounter import JOURNAL_FILENAME, FOLDING_FILENAME
+
+    with fileLock.file_lock(registry.path):
+        registry.sync()
+        if registry.complete:
+            return
+        found = []
+        if root.exists():
+            for movie_dir in root.iterdir():
+                if not movie_dir.is_dir():
+                    continue
+                pending = (movie_dir / JOURNAL_FILENAME).exists() or (movie_dir / FOLDING_FILENAME).exists()
+                movie = _current(movie_dir, register=False)
+                if pending or (movie is not None and movie.reviews):
+                    found.append({"movie": movie_dir.name})
+        registry.append(found + [{"complete": True}])
+
+
+def _current(movie_dir: Path, register: bool = True) -> Optional[MovieReported]:
+    """The movie's map, rebuilt if its reviews changed (caller holds _LOCK)."""
+    csv_path = movie_dir / "movieReviews.csv"
+    version = reviewsRepo.review_file_version(csv_path)
+    key = str(movie_dir)
+    if version is None:
+        _MOVIES.pop(key, None)
+        return None
+    movie = _MOVIES.get(key)
+    if movie is None or movie.version != version:
+        movie = _load_movie(csv_path, version)
+        _MOVIES[key] = movie
+        if register:
+            _register(movie_dir, movie)
+    return movie
+
+
+def reported(movie_dir: Path, users: Iterable[str] = ()) -> Dict[str, Tuple[int, int]]:
+    """
+    (rowIndex, folded reports) of the movie's reported reviews, keyed by user.
+
+    `users` are reviews with pending reports; any not in the map yet (reported
+    from another process) are located once and kept.
+    """
+    with _LOCK:
+        movie = _current(movie_dir)
+        if movie is None:
+            return {}
+        missing = [user for user in users if user not in movie.reviews]
+        if missing:
+            found = _scan(movie_dir / "movieReviews.csv", missing)
+            if found.version == movie.version:
+                for user in missing:
+                    if user in found.reviews:
+                        movie.reviews[user] = found.reviews[user]
+        return {user: (entry[0], entry[1]) for user, entry in movie.reviews.items()}
+
+
+def record_report(movie_dir: Path, user: str, index: int, reports: int) -> None:
+    """`user`'s review (row `index`, `reports` folded) was just reported."""
+    with _LOCK:
+        movie = _current(movie_dir)
+        if movie is not None and user not in movie.reviews:
+            movie.reviews[user] = [index, reports]
+        _register(movie_dir, movie)
+
+
+# ─────────────────────────────────────────────────────────────
+# Incremental maintenance (called from reviewsRepo writes)
+# ─────────────────────────────────────────────────────────────
+
+def _patch(movie_dir: Path, old_version: Version, new_version: Version, apply) -> None:
+    with _LOCK:
+        key = str(movie_dir)
+        cached = _MOVIES.get(key)
+        if cached is None:
+            return
+        if cached.version != old_version:
+            # Changed elsewhere in between; next lookup rebuilds it
+            del _MOVIES[key]
+            return
+        apply(cached)
+        cached.version = new_version
+        _register(movie_dir, cached)
+
+
+def record_append(movie_dir: Path, old_version: Version, new_version: Version, user: str, reports: int) -> None:
+    _patch(movie_dir, old_version, new_version, lambda m: m.append(user, reports))
+
+
+def record_update(movie_dir: Path, old_version: Version, new_version: Version, index: int, row: Dict[str, Any]) -> None:
+    _patch(movie_dir, old_version, new_version, lambda m: m.update(index, row))
+
+
+def record_delete(movie_dir: Path, old_version: Version, new_version: Version, index: int) -> None:
+    _patch(movie_dir, old_version, new_version, lambda m: m.delete(index))
+
+
+def record_rename(
+    movie_dir: Path,
+    old_version: Version,
+    new_version: Version,
+    old_user: str,
+    new_user: str,
+) -> None:
+    _patch(movie_dir, old_version, new_version, lambda m: m.rename(old_user, new_user))
+
+
+def record_rewrite(movie_dir: Path, new_version: Version, rows: List[Dict[str, Any]]) -> None:
+    """The reviews were rewritten from `rows` (e.g. report counts folded in)."""
+    with _LOCK:
+        movie = _MOVIES[str(movie_dir)] = _from_rows(new_version, rows)
+        _register(movie_dir, movie)
@@ -1,7 +1,8 @@
 from pathlib import Path
 from typing import List, Dict, Any
 
-from ..repositories.reviewsRepo import load_all_reviews
+from ..repositories import reportedReviewIndex, reviewReportCounter, reviewsRepo
+from .reviewFields import to_int
 
 # Base path: project_root/data/imdb
 DATA_PATH = Path(__file__).resolve().parents[3] / "data" / "imdb"
@@ -9,40 +10,47 @@ DATA_PATH = Path(__file__).resolve().parents[3] / "data" / "imdb"
 
 def load_all_reports() -> List[Dict[str, Any]]:
     """
-    Scan all movie review CSVs and return only reviews that have been reported
-    at least once.
+    Return every review, across all movies, that has been reported at least
+    once.
 
     Semantics of the CSV "Reports" column after the moderation rework:
       - It stores the *number of times* a review has been reported.
       - Blank, missing, or non-numeric values are treated as 0.
       - Any review with Reports > 0 is considered "reported".
 
+    Report counts not yet folded into the CSV (reviewReportCounter) are
+    added on top of the column.
+
+    Only the movies registered by reportedReviewIndex as having reported
+    reviews are visited, and only their reported rows are read, so the cost
+    follows the number of reported reviews rather than the size of the
+    corpus.
+
     Each returned review dict will have:
       - "Reports" normalised to an int
       - an extra "reportCount" key mirroring that integer
     """
-    all_reviews: List[Dict[str, Any]] = []
     reported_reviews: List[Dict[str, Any]] = []
 
-    # Collect reviews for every movie folder under data/imdb
-    for movie_dir in DATA_PATH.iterdir():
-        if not movie_dir.is_dir():
+    for movie_dir in reportedReviewIndex.reported_movies(DATA_PATH):
+        pending = reviewReportCounter.pending_counts(movie_dir)
+        reported = reportedReviewIndex.reported(movie_dir, pending)
+        indices = sorted(
+            index for user, (index, reports) in reported.items()
+            if reports + pending.get(user, 0) > 0
+        )
+        if not indices:
             continue
-        all_reviews.extend(load_all_reviews(movie_dir.name))
-
-    # Filter only those with Reports > 0, normalising the count
-    for review in all_reviews:
-        raw_reports = review.get("Reports", "")
-        try:
-            count = int(raw_reports)
-        except (ValueError, TypeError):
-            count = 0
-
-        if count > 0:
-            # Copy so we don't mutate the original reference unexpectedly
-            normalised = dict(review)
-            normalised["Reports"] = count
-            normalised["reportCount"] = count
-            reported_reviews.append(normalised)
-
-    return reported_reviews
\ No newline at end of file
+
+        rows = reviewsRepo.read_review_rows(movie_dir / "movieReviews.csv", indices)
+        # Guards against the file changing between lookup and read
+        rows = [r for r in rows if r.get("User") in reported]
+        for review in reviewReportCounter.overlay(movie_dir, rows):
+            count = to_int(review.get("Reports"))
+            if count > 0:
+                normalised = dict(review)
+                normalised["Reports"] = count
+                normalised["reportCount"] = count
+                reported_reviews.append(normalised)
+
+    return reported_reviews
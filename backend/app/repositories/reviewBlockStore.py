@@ -0,0 +1,393 @@
+"""
+Compressed block storage for a movie's reviews.
+
+Review bodies are most of the bytes in data/imdb and compress well, so a
+movie's reviews can be stored as movieReviews.blocks instead of
+movieReviews.csv (see reviewsRepo.REVIEW_STORAGE). The file is a series of
+independently compressed frames of up to ROWS_PER_BLOCK CSV records, followed
+by a JSON block index and a fixed-size trailer:
+
+  MAGIC
+  frame 0 | frame 1 | ...                      zlib / lzma compressed CSV text
+  index JSON  {"codec", "header", "blocks": [[offset, length, rows], ...]}
+  trailer     <index offset: uint64 LE><index length: uint64 LE> MAGIC
+
+A page of reviews decompresses only the frames that hold its rows;
+decompressed frames are kept in a small LRU cache keyed by file version.
+
+Appends never rewrite earlier frames: the last (partial) frame is
+recompressed with the new rows, written after the current end of the file
+together with a new index and trailer, and the old frame becomes garbage.
+Once garbage outweighs live data the file is rewritten. Full rewrites go
+through a temp file + os.replace like write_reviews_file.
+
+An append cut short by a crash, or still being written while a reader
+opens the file, leaves no valid trailer at the end. Readers then fall
+back to the last complete trailer before it, which still describes every
+earlier frame; the torn bytes are garbage for the next append. Appends
+hold fileLock on the file so two workers never append at once.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import json
+import lzma
+import os
+import struct
+import tempfile
+import threading
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from . import fileLock
+from .reviewFileReader import row_builder
+
+Version = Optional[Tuple[int, int]]
+
+BLOCKS_FILENAME = "movieReviews.blocks"
+MAGIC = b"RVBLK01\n"
+_TRAILER = struct.Struct("<QQ")
+TRAILER_SIZE = _TRAILER.size + len(MAGIC)
+
+ROWS_PER_BLOCK = 64
+DEFAULT_CODEC = os.environ.get("REVIEW_BLOCK_CODEC", "zlib")
+BLOCK_CACHE_SIZE = 256
+# Appends leave the superseded last frame behind; rewrite the file once the
+# garbage is larger than both the live frames and this many bytes
+COMPACT_MIN_GARBAGE = 1 << 16
+
+CODECS = {
+    "zlib": (lambda data: zlib.compress(data, 6), zlib.decompress),
+    "lzma": (lambda data: lzma.compress(data, preset=6), lzma.decompress),
+}
+
+
+class BlockIndex:
+    """Header, codec and frame table of one .blocks file."""
+
+    def __init__(self, version: Version, codec: str, header: List[str], blocks: List[List[int]]):
+        self.version = version
+        self.codec = codec
+        self.header = header
+        self.blocks = blocks  # [offset, length, rows]
+        self.starts: List[int] = []
+        total = 0
+        for _, _, rows in blocks:
+            self.starts.append(total)
+            total += rows
+        self.rows = total
+
+    def locate(self, index: int) -> Tuple[int, int]:
+        """(block number, position inside the block) of a row."""
+        lo, hi = 0, len(self.starts) - 1
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self.starts[mid] <= index:
+                lo = mid
+            else:
+                hi = mid - 1
+        return lo, index - self.starts[lo]
+
+
+def _version(path: Path) -> Version:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _encode_rows(header: List[str], rows: Iterable[Dict[str, Any]]) -> bytes:
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=header, extrasaction="ignore")
+    writer.writerows(rows)
+    return buf.getvalue().encode("utf-8")
+
+
+def _decode_rows(data: bytes) -> List[List[str]]:
+    reader = csv.reader(io.StringIO(data.decode("utf-8"), newline=""))
+    return [values for values in reader if values]
+
+
+def _tail(index_offset: int, index_bytes: bytes) -> bytes:
+    return index_bytes + _TRAILER.pack(index_offset, len(index_bytes)) + MAGIC
+
+
+def _index_bytes(codec: str, header: List[str], blocks: List[List[int]]) -> bytes:
+    return json.dumps({"codec": codec, "header": header, "blocks": blocks}).encode("utf-8")
+
+
+# ─────────────────────────────────────────────────────────────
+# Writing
+# ─────────────────────────────────────────────────────────────
+
+def write_blocks(
+    path: Path,
+    header: List[str],
+    rows: Iterable[Dict[str, Any]],
+    codec: Optional[str] = None,
+    rows_per_block: int = ROWS_PER_BLOCK,
+) -> None:
+    """Write all rows as a fresh .blocks file (atomic replace)."""
+    codec = codec or DEFAULT_CODEC
+    compress = CODECS[codec][0]
+    blocks: List[List[int]] = []
+    with tempfile.NamedTemporaryFile(
+        "wb", dir=path.parent, prefix=path.name + ".", suffix=".tmp", delete=False,
+    ) as f:
+        f.write(MAGIC)
+        batch: List[Dict[str, Any]] = []
+
+        def flush() -> None:
+            frame = compress(_encode_rows(header, batch))
+            blocks.append([f.tell(), len(frame), len(batch)])
+            f.write(frame)
+            batch.clear()
+
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= rows_per_block:
+                flush()
+        if batch:
+            flush()
+        f.write(_tail(f.tell(), _index_bytes(codec, header, blocks)))
+    os.chmod(f.name, 0o644)  # mkstemp creates 0600
+    os.replace(f.name, path)
+
+
+def append_rows(path: Path, rows: List[Dict[str, Any]], rows_per_block: int = ROWS_PER_BLOCK) -> None:
+    """Append rows, recompressing only the last partial frame."""
+    with fileLock.file_lock(path):
+        _append_rows(path, rows, rows_per_block)
+
+
+def _append_rows(path: Path, rows: List[Dict[str, Any]], rows_per_block: int) -> None:
+    index = read_index(path)
+    if index is None:
+        raise FileNotFoundError(path)
+    compress = CODECS[index.codec][0]
+    blocks = [list(b) for b in index.blocks]
+
+    carry: List[Dict[str, Any]] = []
+    if blocks and blocks[-1][2] < rows_per_block:
+        build = row_builder(index.header)
+        carry = [build(v) for v in _block_values(path, index, len(blocks) - 1)]
+        blocks.pop()
+    pending = carry + list(rows)
+
+    # New frames go after the current end (trailer, or a torn append); the
+    # old index becomes garbage
+    frames = bytearray()
+    offset = index.version[1]  # type: ignore[index]
+    for i in range(0, len(pending), rows_per_block):
+        batch = pending[i:i + rows_per_block]
+        frame = compress(_encode_rows(index.header, batch))
+        blocks.append([offset, len(frame), len(batch)])
+        frames += frame
+        offset += len(frame)
+
+    live = sum(b[1] for b in blocks)
+    if offset - live > max(live, COMPACT_MIN_GARBAGE):
+        # Mostly garbage: rewrite compactly
+        write_blocks(path, index.header, read_all(path)[1] + list(rows), index.codec, rows_per_block)
+        return
+
+    with path.open("ab") as f:
+        f.write(bytes(frames) + _tail(offset, _index_bytes(index.codec, index.header, blocks)))
+
+
+# ─────────────────────────────────────────────────────────────
+# Reading
+# ─────────────────────────────────────────────────────────────
+
+_INDEXES: Dict[str, BlockIndex] = {}
+_BLOCKS: "OrderedDict[Tuple[str, Version, int], List[List[str]]]" = OrderedDict()
+_LOCK = threading.Lock()
+
+
+def read_index(path: Path) -> Optional[BlockIndex]:
+    version = _version(path)
+    if version is None:
+        return None
+    key = str(path)
+    with _LOCK:
+        cached = _INDEXES.get(key)
+    if cached is not None and cached.version == version:
+        return cached
+
+    with path.open("rb") as f:
+        raw = _last_index(f, version[1])
+    if raw is None:
+        raise ValueError(f"{path} is not a review block file")
+    index = BlockIndex(version, raw["codec"], raw["header"], raw["blocks"])
+    with _LOCK:
+        _INDEXES[key] = index
+    return index
+
+
+def _index_ending_at(f, end: int) -> Optional[Dict[str, Any]]:
+    """The index whose trailer ends at byte `end`, or None if there is none."""
+    if end < len(MAGIC) + TRAILER_SIZE:
+        return None
+    f.seek(end - TRAILER_SIZE)
+    trailer = f.read(TRAILER_SIZE)
+    if trailer[-len(MAGIC):] != MAGIC:
+        return None
+    index_offset, index_length = _TRAILER.unpack(trailer[:_TRAILER.size])
+    if index_offset + index_length != end - TRAILER_SIZE:
+        return None
+    f.seek(index_offset)
+    try:
+        return json.loads(f.read(index_length).decode("utf-8"))
+    except (UnicodeDecodeError, ValueError):
+        return None
+
+
+def _magic_end_before(f, before: int) -> int:
+    """End offset of the last MAGIC ending before `before` (past the file header), or -1."""
+    pos = before - 1
+    while pos > len(MAGIC):
+        start = max(len(MAGIC), pos - (1 << 16))
+        f.seek(start)
+        found = f.read(pos - start).rfind(MAGIC)
+        if found >= 0:
+            return start + found + len(MAGIC)
+        if start == len(MAGIC):
+            return -1
+        # Overlap so a MAGIC across the chunk boundary is seen
+        pos = start + len(MAGIC) - 1
+    return -1
+
+
+def _last_index(f, size: int) -> Optional[Dict[str, Any]]:
+    """The index of the last complete trailer: normally at EOF, else before a torn append."""
+    end = size
+    while end > 0:
+        raw = _index_ending_at(f, end)
+        if raw is not None:
+            return raw
+        end = _magic_end_before(f, end)
+    return None
+
+
+def _block_values(path: Path, index: BlockIndex, block_no: int) -> List[List[str]]:
+    key = (str(path), index.version, block_no)
+    with _LOCK:
+        values = _BLOCKS.get(key)
+        if values is not None:
+            _BLOCKS.move_to_end(key)
+            return values
+    offset, length, _ = index.blocks[block_no]
+    with path.open("rb") as f:
+        f.seek(offset)
+        frame = f.read(length)
+    values = _decode_rows(CODECS[index.codec][1](frame))
+    with _LOCK:
+        _BLOCKS[key] = values
+        while len(_BLOCKS) > BLOCK_CACHE_SIZE:
+            _BLOCKS.popitem(last=False)
+    return values
+
+
+def count_rows(path: Path) -> int:
+    index = read_index(path)
+    return index.rows if index is not None else 0
+
+
+def read_range(
+    path: Path,
+    start: int,
+    stop: int,
+    fields: Optional[Sequence[str]] = None,
+    preview_chars: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Rows [start, stop) in file order, decompressing only their frames."""
+    index = read_index(path)
+    if index is None:
+        return []
+    build = row_builder(index.header, fields, preview_chars)
+    start = max(start, 0)
+    stop = min(stop, index.rows)
+    rows: List[Dict[str, Any]] = []
+    i = start
+    while i < stop:
+        block_no, pos = index.locate(i)
+        values = _block_values(path, index, block_no)
+        take = values[pos:pos + (stop - i)]
+        rows.extend(build(v) for v in take)
+        i += len(take)
+        if not take:
+            break
+    return rows
+
+
+def read_rows(
+    path: Path,
+    indices: Sequence[int],
+    fields: Optional[Sequence[str]] = None,
+    preview_chars: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Rows at arbitrary positions, in the given order."""
+    index = read_index(path)
+    if index is None:
+        return []
+    build = row_builder(index.header, fields, preview_chars)
+    rows: List[Dict[str, Any]] = []
+    for i in indices:
+        if not 0 <= i < index.rows:
+            continue
+        block_no, pos = index.locate(i)
+        values = _block_values(path, index, block_no)
+        if pos < len(values):
+            rows.append(build(values[pos]))
+    return rows
+
+
+def read_all(path: Path) -> Tuple[List[str], List[Dict[str, Any]]]:
+    """(header, rows) of the whole file, like csv.DictReader."""
+    index = read_index(path)
+    if index is None:
+        return [], []
+    return list(index.header), read_range(path, 0, index.rows)
+
+
+# ─────────────────────────────────────────────────────────────
+# Conversion
+# ─────────────────────────────────────────────────────────────
+
+def pack_csv(
+    csv_path: Path,
+    codec: Optional[str] = None,
+    remove_csv: bool = True,
+    rows_per_block: int = ROWS_PER_BLOCK,
+) -> Path:
+    """Convert a movieReviews.csv into movieReviews.blocks beside it."""
+    blocks_path = csv_path.with_name(BLOCKS_FILENAME)
+    with csv_path.open("r", newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        header = list(reader.fieldnames or [])
+        write_blocks(blocks_path, header, reader, codec, rows_per_block)
+    if remove_csv:
+        csv_path.unlink()
+    return blocks_path
+
+
+def unpack_csv(blocks_path: Path, remove_blocks: bool = True) -> Path:
+    """Convert movieReviews.blocks back into movieReviews.csv."""
+    csv_path = blocks_path.with_name("movieReviews.csv")
+    header, rows = read_all(blocks_path)
+    with tempfile.NamedTemporaryFile(
+        "w", newline="", encoding="utf-8",
+        dir=csv_path.parent, prefix=csv_path.name + ".", suffix=".tmp", delete=False,
+    ) as f:
+        writer = csv.DictWriter(f, fieldnames=header)
+        writer.writeheader()
+        writer.writerows(rows)
+    os.chmod(f.name, 0o644)  # mkstemp creates 0600
+    os.replace(f.name, csv_path)
+    if remove_blocks:
+        blocks_path.unlink()
+    return csv_path
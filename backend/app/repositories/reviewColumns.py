@@ -0,0 +1,267 @@
+"""
+Columnar (NumPy) view of a movie's reviews for statistics.
+
+Parsing movieReviews.csv string-by-string for every average or histogram is
+slow, so each movie's numeric columns are parsed once into arrays and cached:
+
+  - in memory, keyed by CSV path and version (mtime_ns, size)
+  - on disk beside the CSV as movieReviews.columns.npz
+
+Arrays (all the same length, one entry per CSV row, in file order):
+  rating        float64   "User's Rating out of 10" (NaN if blank/invalid)
+  useful_votes  int64     "Usefulness Vote" as folded into the CSV
+  total_votes   int64     "Total Votes" as folded into the CSV
+  reports       int64     "Reports" as folded into the CSV
+  date_ordinal  int64     "Date of Review" as a date ordinal (0 if unknown)
+  user_codes    int32     index into `users` (interned "User" column)
+
+Votes and reports not yet folded live in reviewVoteStore and
+reviewReportCounter; vote_ratio() and current_reports() take those pending
+counts and add them.
+"""
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import reviewsRepo
+from .reviewFields import to_int, date_ordinal
+
+Version = Optional[Tuple[int, int]]
+
+COLUMNS_FILENAME = "movieReviews.columns.npz"
+
+# Older CSVs used different headers for the rating column
+RATING_KEYS = ("User's Rating out of 10", "rating", "User Rating", "Rating")
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+STATS_PERCENTILES = (10, 25, 50, 75, 90)
+
+
+class ReviewColumns:
+    """Column arrays for the reviews of one movie."""
+
+    def __init__(
+        self,
+        version: Version,
+        rating: np.ndarray,
+        useful_votes: np.ndarray,
+        total_votes: np.ndarray,
+        reports: np.ndarray,
+        date_ordinal: np.ndarray,
+        user_codes: np.ndarray,
+        users: List[str],
+    ):
+        self.version = version
+        self.rating = rating
+        self.useful_votes = useful_votes
+        self.total_votes = total_votes
+        self.reports = reports
+        self.date_ordinal = date_ordinal
+        self.user_codes = user_codes
+        self.users = users
+        self._rating_stats: Optional[Dict[str, Any]] = None
+
+    def __len__(self) -> int:
+        return int(self.rating.shape[0])
+
+    # ── Reductions ──
+
+    def rated(self) -> np.ndarray:
+        """Ratings with blank/invalid entries dropped."""
+        return self.rating[~np.isnan(self.rating)]
+
+    def average_rating(self) -> Optional[float]:
+        rated = self.rated()
+        if rated.size == 0:
+            return None
+        return round(float(rated.mean()), 1)
+
+    def vote_ratio(self, pending: Optional[Mapping[str, Sequence[int]]] = None) -> Optional[float]:
+        """
+        Share of all votes that marked a review as useful, including
+        `pending` (usefulDelta, totalDelta) per review user from reviewVoteStore.
+        """
+        useful = int(self.useful_votes.sum())
+        total = int(self.total_votes.sum())
+        for delta in (pending or {}).values():
+            useful += delta[0]
+            total += delta[1]
+        if total == 0:
+            return None
+        return useful / total
+
+    def year_histogram(self) -> Dict[int, int]:
+        """Number of reviews per calendar year (unknown dates skipped)."""
+        known = self.date_ordinal[self.date_ordinal > 0]
+        if known.size == 0:
+            return {}
+        days = (known - _EPOCH_ORDINAL).astype("datetime64[D]")
+        years = days.astype("datetime64[Y]").astype(np.int64) + 1970
+        values, counts = np.unique(years, return_counts=True)
+        return {int(y): int(c) for y, c in zip(values, counts)}
+
+    def current_reports(self, pending: Dict[str, int]) -> np.ndarray:
+        """
+        The reports column plus `pending` (reviewReportCounter.pending_counts),
+        matched to rows through the interned users.
+        """
+        if not pending:
+            return self.reports
+        extra = np.array([pending.get(user, 0) for user in self.users], dtype=np.int64)
+        return self.reports + extra[self.user_codes]
+
+    def rating_stats(self) -> Dict[str, Any]:
+        """
+        1–10 histogram, median and percentiles of the rating column.
+        Computed once per ReviewColumns object, i.e. once per CSV version.
+        """
+        if self._rating_stats is not None:
+            return self._rating_stats
+        rated = self.rated()
+        if rated.size == 0:
+            histogram = np.zeros(10, dtype=np.int64)
+            median = None
+            percentiles = {f"p{p}": None for p in STATS_PERCENTILES}
+            average = None
+        else:
+            buckets = np.clip(np.rint(rated), 1, 10).astype(np.int64)
+            histogram = np.bincount(buckets, minlength=11)[1:11]
+            values = np.percentile(rated, STATS_PERCENTILES)
+            percentiles = {f"p{p}": round(float(v), 2) for p, v in zip(STATS_PERCENTILES, values)}
+            median = round(float(np.median(rated)), 2)
+            average = round(float(rated.mean()), 2)
+        self._rating_stats = {
+            "reviewCount": len(self),
+            "ratingCount": int(rated.size),
+            "average": average,
+            "median": median,
+            "histogram": {str(i + 1): int(c) for i, c in enumerate(histogram)},
+            "percentiles": percentiles,
+        }
+        return self._rating_stats
+
+    # ── Persistence ──
+
+    def save(self, path: Path) -> None:
+        # Unique temp name: two workers may rebuild the same movie at once
+        with tempfile.NamedTemporaryFile(
+            "wb", dir=path.parent, prefix=path.name + ".", suffix=".tmp", delete=False
+        ) as f:
+            np.savez(
+                f,
+                version=np.array(self.version or (-1, -1), dtype=np.int64),
+                rating=self.rating,
+                useful_votes=self.useful_votes,
+                total_votes=self.total_votes,
+                reports=self.reports,
+                date_ordinal=self.date_ordinal,
+                user_codes=self.user_codes,
+                users=np.array(self.users, dtype=np.str_),
+            )
+        os.replace(f.name, path)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["ReviewColumns"]:
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                version = tuple(int(v) for v in data["version"])
+                return cls(
+                    version=None if version == (-1, -1) else version,  # type: ignore[arg-type]
+                    rating=data["rating"],
+                    useful_votes=data["useful_votes"],
+                    total_votes=data["total_votes"],
+                    reports=data["reports"],
+                    date_ordinal=data["date_ordinal"],
+                    user_codes=data["user_codes"],
+                    users=[str(u) for u in data["users"]],
+                )
+        except (OSError, KeyError, ValueError):
+            return None
+
+
+def build_columns(csv_path: Path) -> ReviewColumns:
+    """Parse a movie's reviews file once into column arrays."""
+    version = reviewsRepo.review_file_version(csv_path)
+    rating: List[float] = []
+    useful: List[int] = []
+    total: List[int] = []
+    reports: List[int] = []
+    dates: List[int] = []
+    codes: List[int] = []
+    interned: Dict[str, int] = {}
+
+    for raw in reviewsRepo.read_review_file(csv_path)[1]:
+        row = {(k.strip() if k is not None else k): v for k, v in raw.items()}
+
+        value = float("nan")
+        for key in RATING_KEYS:
+            cell = row.get(key)
+            if cell not in (None, "", " "):
+                try:
+                    value = float(cell)
+                except (ValueError, TypeError):
+                    pass
+                break
+        rating.append(value)
+
+        useful.append(to_int(row.get("Usefulness Vote")))
+        total.append(to_int(row.get("Total Votes")))
+        reports.append(to_int(row.get("Reports")))
+        dates.append(date_ordinal(row.get("Date of Review")))
+        codes.append(interned.setdefault(row.get("User") or "", len(interned)))
+
+    return ReviewColumns(
+        version=version,
+        rating=np.array(rating, dtype=np.float64),
+        useful_votes=np.array(useful, dtype=np.int64),
+        total_votes=np.array(total, dtype=np.int64),
+        reports=np.array(reports, dtype=np.int64),
+        date_ordinal=np.array(dates, dtype=np.int64),
+        user_codes=np.array(codes, dtype=np.int32),
+        users=list(interned),
+    )
+
+
+_CACHE: Dict[str, ReviewColumns] = {}
+_LOCK = threading.Lock()
+
+
+def columns_for_csv(csv_path: Path) -> Optional[ReviewColumns]:
+    """
+    Column arrays for the given CSV, from memory, the .npz cache beside it,
+    or a fresh parse (which then refreshes both caches).
+    Returns None if the CSV does not exist.
+    """
+    version = reviewsRepo.review_file_version(csv_path)
+    if version is None:
+        return None
+    key = str(csv_path)
+    with _LOCK:
+        cached = _CACHE.get(key)
+    if cached is not None and cached.version == version:
+        return cached
+
+    cache_path = csv_path.with_name(COLUMNS_FILENAME)
+    columns = ReviewColumns.load(cache_path) if cache_path.exists() else None
+    if columns is None or columns.version != version:
+        columns = build_columns(csv_path)
+        try:
+            columns.save(cache_path)
+        except OSError:
+            pass  # read-only data dir: keep the in-memory copy only
+
+    with _LOCK:
+        _CACHE[key] = columns
+    return columns
+
+
+def load_review_columns(movieTitle: str) -> Optional[ReviewColumns]:
+    return columns_for_csv(reviewsRepo.DATA_PATH / movieTitle / "movieReviews.csv")
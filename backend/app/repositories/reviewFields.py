@@ -0,0 +1,42 @@
+from datetime import datetime
+from typing import Any
+
+# Formats seen in the "Date of Review" column. save_review writes "%d %B %Y"
+# (e.g. "17 November 2025"); imported IMDb dumps use the same layout.
+DATE_FORMATS = ("%d %B %Y", "%d %b %Y", "%Y-%m-%d")
+
+
+def to_int(value: Any) -> int:
+    """Parse a CSV cell as int; blank/missing/invalid → 0."""
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        try:
+            return int(float(value))
+        except (ValueError, TypeError):
+            return 0
+
+
+def to_float(value: Any) -> float:
+    """Parse a CSV cell as float; blank/missing/invalid → 0.0."""
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return 0.0
+
+
+def date_ordinal(value: Any) -> int:
+    """
+    Convert a free-text "Date of Review" (e.g. "13 March 2003") into a
+    proleptic Gregorian ordinal so dates can be compared as integers.
+    Unparseable values → 0 (sorted as oldest).
+    """
+    if not value:
+        return 0
+    text = str(value).strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).toordinal()
+        except ValueError:
+            continue
+    return 0
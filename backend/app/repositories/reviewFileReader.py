@@ -0,0 +1,332 @@
+"""
+Memory-mapped random access to movieReviews.csv.
+
+csv.DictReader over a text stream has to read and decode the whole file to
+get to row N. Here the file is mmap'ed read-only (so the OS page cache is
+shared by every uvicorn worker) and an offset index records the byte range of
+every CSV record. A page of reviews then only decodes and parses the bytes of
+the rows it returns.
+
+The offset index is an int64 array of record start offsets followed by the
+end-of-file offset, so record i spans offsets[i]:offsets[i + 1]. It is cached
+in memory and beside the CSV as movieReviews.offsets.npz, tagged with the CSV
+version (mtime_ns, size). Appends through reviewsRepo extend it in place;
+any other change rebuilds it on next use.
+
+Writers must replace the CSV atomically (write a temp file, then os.replace)
+rather than truncating it in place, so an open map never points past the end
+of a shrunk file.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import mmap
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+Version = Optional[Tuple[int, int]]
+
+OFFSETS_FILENAME = "movieReviews.offsets.npz"
+
+
+class OffsetIndex:
+    """Header fields plus byte offsets of every record in one CSV file."""
+
+    def __init__(self, version: Version, header: List[str], offsets: np.ndarray):
+        self.version = version
+        self.header = header
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return max(int(self.offsets.shape[0]) - 1, 0)
+
+    def save(self, path: Path) -> None:
+        # Unique temp name: two workers may rebuild the same index at once
+        with tempfile.NamedTemporaryFile(
+            "wb", dir=path.parent, prefix=path.name + ".", suffix=".tmp", delete=False
+        ) as f:
+            np.savez(
+                f,
+                version=np.array(self.version or (-1, -1), dtype=np.int64),
+                header=np.array(self.header, dtype=np.str_),
+                offsets=self.offsets,
+            )
+        os.replace(f.name, path)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["OffsetIndex"]:
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                version = tuple(int(v) for v in data["version"])
+                return cls(
+                    None if version == (-1, -1) else version,  # type: ignore[arg-type]
+                    [str(h) for h in data["header"]],
+                    data["offsets"],
+                )
+        except (OSError, KeyError, ValueError):
+            return None
+
+
+def _version(csv_path: Path) -> Version:
+    try:
+        st = csv_path.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+@contextmanager
+def _mapped(csv_path: Path) -> Iterator[Optional[mmap.mmap]]:
+    with csv_path.open("rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield None
+            return
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield mm
+        finally:
+            mm.close()
+
+
+def _record_ends(mm: mmap.mmap, start: int) -> Iterator[int]:
+    """
+    Yield the end offset of each CSV record from `start` on.
+
+    Whether a newline ends a record depends on csv's quoting rules: a '"'
+    only opens a quoted field at the start of a field, so a bare quote in an
+    unquoted field (`5" tall`) must not be counted. Rather than re-implement
+    that, csv.reader is fed the file one line at a time; it pulls exactly the
+    lines of one record before returning it, so the offset after its last
+    line is the record's end.
+    """
+    size = len(mm)
+    pos = start
+
+    def lines() -> Iterator[str]:
+        nonlocal pos
+        while pos < size:
+            newline = mm.find(b"\n", pos)
+            end = size if newline == -1 else newline + 1
+            line = mm[pos:end]
+            pos = end
+            yield line.decode("utf-8", errors="replace")
+
+    last = start
+    try:
+        for _ in csv.reader(lines()):
+            last = pos
+            yield pos
+    except csv.Error:
+        pass
+    if last < size:
+        # Unterminated quoted field: the rest of the file is one record
+        yield size
+
+
+def build_offsets(csv_path: Path) -> OffsetIndex:
+    version = _version(csv_path)
+    with _mapped(csv_path) as mm:
+        if mm is None:
+            return OffsetIndex(version, [], np.zeros(1, dtype=np.int64))
+        ends = _record_ends(mm, 0)
+        header_end = next(ends, len(mm))
+        header_line = mm[0:header_end].decode("utf-8-sig")
+        header = next(csv.reader(io.StringIO(header_line)), [])
+
+        starts: List[int] = []
+        start = header_end
+        for end in ends:
+            # Skip blank lines the same way csv.DictReader does
+            if mm[start:end].strip():
+                starts.append(start)
+            start = end
+        starts.append(len(mm))
+    return OffsetIndex(version, header, np.array(starts, dtype=np.int64))
+
+
+# ─────────────────────────────────────────────────────────────
+# Offset index cache
+# ─────────────────────────────────────────────────────────────
+
+_CACHE: Dict[str, OffsetIndex] = {}
+_LOCK = threading.Lock()
+
+
+def offsets_for_csv(csv_path: Path) -> Optional[OffsetIndex]:
+    version = _version(csv_path)
+    if version is None:
+        return None
+    key = str(csv_path)
+    with _LOCK:
+        cached = _CACHE.get(key)
+    if cached is not None and cached.version == version:
+        return cached
+
+    cache_path = csv_path.with_name(OFFSETS_FILENAME)
+    index = OffsetIndex.load(cache_path) if cache_path.exists() else None
+    if index is None or index.version != version:
+        index = build_offsets(csv_path)
+        try:
+            index.save(cache_path)
+        except OSError:
+            pass
+
+    with _LOCK:
+        _CACHE[key] = index
+    return index
+
+
+def record_append(csv_path: Path, old_version: Version, new_version: Version) -> None:
+    """A single record was appended: extend the cached index to the new EOF."""
+    key = str(csv_path)
+    with _LOCK:
+        cached = _CACHE.get(key)
+        if cached is None or cached.version != old_version or new_version is None:
+            _CACHE.pop(key, None)
+            return
+        cached.offsets = np.append(cached.offsets, np.int64(new_version[1]))
+        cached.version = new_version
+
+
+# ─────────────────────────────────────────────────────────────
+# Reads
+# ─────────────────────────────────────────────────────────────
+
+def _to_dict(header: List[str], values: List[str]) -> Dict[str, Any]:
+    # Same shape csv.DictReader produces for short/long rows
+    row: Dict[Any, Any] = dict(zip(header, values))
+    if len(values) > len(header):
+        row[None] = values[len(header):]
+    for key in header[len(values):]:
+        row[key] = None
+    return row
+
+
+RowBuilder = Callable[[List[str]], Dict[str, Any]]
+
+
+def row_builder(
+    header: List[str],
+    fields: Optional[Sequence[str]] = None,
+    preview_chars: Optional[int] = None,
+) -> RowBuilder:
+    """
+    Turn parsed CSV values into a row dict. With `fields` only those columns
+    (matched on stripped header names) are copied; with `preview_chars` the
+    "Review" body is cut to that many characters. Both happen before the dict
+    is built, so unused columns and long bodies are never kept around.
+    Without either the row has the csv.DictReader shape.
+    """
+    if fields is None and preview_chars is None:
+        return lambda values: _to_dict(header, values)
+
+    wanted = None if fields is None else set(fields)
+    columns = [
+        (i, name.strip())
+        for i, name in enumerate(header)
+        if wanted is None or name.strip() in wanted
+    ]
+    body = next((i for i, name in columns if name == "Review"), None)
+
+    def build(values: List[str]) -> Dict[str, Any]:
+        row = {name: values[i] if i < len(values) else None for i, name in columns}
+        if preview_chars is not None and body is not None and body < len(values):
+            row["Review"] = values[body][:preview_chars]
+        return row
+
+    return build
+
+
+def _parse(chunk: bytes) -> List[List[str]]:
+    # A range may end in blank lines; csv.DictReader skips those too
+    reader = csv.reader(io.StringIO(chunk.decode("utf-8"), newline=""))
+    return [values for values in reader if values]
+
+
+@contextmanager
+def _open_indexed(csv_path: Path) -> Iterator[Tuple[Optional[OffsetIndex], Optional[mmap.mmap]]]:
+    """
+    Map the CSV together with an offset index that describes exactly the
+    mapped file (the file may be replaced between the two steps; retry then).
+    """
+    f = None
+    mm = None
+    index = None
+    try:
+        for _ in range(3):
+            index = offsets_for_csv(csv_path)
+            if index is None:
+                break
+            try:
+                f = csv_path.open("rb")
+            except FileNotFoundError:
+                index = None
+                break
+            st = os.fstat(f.fileno())
+            if (st.st_mtime_ns, st.st_size) == index.version:
+                if st.st_size:
+                    mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                break
+            f.close()
+            f = None
+            index = None
+        yield index, mm
+    finally:
+        if mm is not None:
+            mm.close()
+        if f is not None:
+            f.close()
+
+
+def count_rows(csv_path: Path) -> int:
+    index = offsets_for_csv(csv_path)
+    return len(index) if index is not None else 0
+
+
+def read_range(
+    csv_path: Path,
+    start: int,
+    stop: int,
+    fields: Optional[Sequence[str]] = None,
+    preview_chars: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Rows [start, stop) in file order, parsing only their bytes."""
+    with _open_indexed(csv_path) as (index, mm):
+        if index is None or mm is None:
+            return []
+        start = max(start, 0)
+        stop = min(stop, len(index))
+        if start >= stop:
+            return []
+        chunk = mm[int(index.offsets[start]):int(index.offsets[stop])]
+        build = row_builder(index.header, fields, preview_chars)
+    return [build(values) for values in _parse(chunk)]
+
+
+def read_rows(
+    csv_path: Path,
+    indices: Sequence[int],
+    fields: Optional[Sequence[str]] = None,
+    preview_chars: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Rows at arbitrary positions (e.g. a sorted page), in the given order."""
+    rows: List[Dict[str, Any]] = []
+    with _open_indexed(csv_path) as (index, mm):
+        if index is None or mm is None:
+            return []
+        build = row_builder(index.header, fields, preview_chars)
+        for i in indices:
+            if not 0 <= i < len(index):
+                continue
+            chunk = mm[int(index.offsets[i]):int(index.offsets[i + 1])]
+            parsed = _parse(chunk)
+            if parsed:
+                rows.append(build(parsed[0]))
+    return rows
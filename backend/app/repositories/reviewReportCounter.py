@@ -0,0 +1,269 @@
+"""
+Review report counts kept outside movieReviews.csv.
+
+Reporting a review used to read and rewrite the whole CSV to add one to its
+"Reports" column. Increments are instead appended to a per-movie journal:
+
+  data/imdb/<MovieTitle>/movieReviews.reports.log   (JSON lines)
+  {"user": "<ReviewUser>"}                 (one more report)
+  {"user": "<ReviewUser>", "forget": true}  (review deleted)
+
+Each increment is a single O_APPEND write, so concurrent reporters never
+lose a count. Reads add the pending counts on top of the CSV column. Once
+REPORTS_FOLD_AT increments are pending the counts are folded into the CSV
+in one rewrite: the journal is first renamed aside, so increments made
+while folding land in a fresh journal instead of being dropped.
+
+Folding holds a file lock on the renamed journal, plus reviewsRepo's
+review_lock while it reads and rewrites the CSV so that concurrent review
+writes are not overwritten. Before rewriting, it appends the CSV version it
+starts from to the renamed journal:
+
+  {"base": [mtime_ns, size]}
+
+A renamed journal left behind by a crash is finished before the live
+journal is used: if its base is missing or still the CSV's version the
+counts never reached the CSV and are folded now; otherwise the rewrite
+happened and the file is only removed. Counts are never applied twice.
+
+Other processes' increments are picked up by replaying the journal tail;
+a journal with a different inode (folded elsewhere) is replayed from the
+start.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from . import fileLock, reviewsRepo, reportedReviewIndex
+from .reviewFields import to_int
+
+JOURNAL_FILENAME = "movieReviews.reports.log"
+FOLDING_FILENAME = JOURNAL_FILENAME + ".folding"
+
+REPORTS_FOLD_AT = 256
+
+
+class MovieReports:
+    """Pending report counts for the reviews of one movie."""
+
+    def __init__(self, movie_dir: Path):
+        self.movie_dir = movie_dir
+        self.lock = threading.Lock()
+        self.pending: Dict[str, int] = {}
+        self.pending_reports = 0
+        self.journal_inode: Optional[int] = None
+        self.journal_offset = 0
+
+    @property
+    def journal_path(self) -> Path:
+        return self.movie_dir / JOURNAL_FILENAME
+
+    def _apply(self, record: Dict[str, Any]) -> None:
+        user = record["user"]
+        if record.get("forget"):
+            self.pending_reports -= self.pending.pop(user, 0)
+            return
+        self.pending[user] = self.pending.get(user, 0) + 1
+        self.pending_reports += 1
+
+    def sync(self) -> None:
+        folding = self.movie_dir / FOLDING_FILENAME
+        if folding.exists():
+            # Waits out a fold in progress; finishes one that crashed
+            with fileLock.file_lock(folding):
+                _finish_fold(self.movie_dir)
+        try:
+            f = self.journal_path.open("rb")
+        except FileNotFoundError:
+            self.pending, self.pending_reports = {}, 0
+            self.journal_inode, self.journal_offset = None, 0
+            return
+        with f:
+            st = os.fstat(f.fileno())
+            if st.st_ino != self.journal_inode or st.st_size < self.journal_offset:
+                self.pending, self.pending_reports = {}, 0
+                self.journal_inode, self.journal_offset = st.st_ino, 0
+            f.seek(self.journal_offset)
+            data = f.read()
+        # Only consume complete lines; a partial last line is read next time
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            try:
+                self._apply(json.loads(line))
+            except (json.JSONDecodeError, KeyError):
+                continue
+        self.journal_offset += end
+
+    def record(self, record: Dict[str, Any]) -> None:
+        """Append one journal line; callers sync first and apply it through sync."""
+        data = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        fd = os.open(self.journal_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+        self.sync()
+
+
+# ─────────────────────────────────────────────────────────────
+# Module-level store
+# ─────────────────────────────────────────────────────────────
+
+_MOVIES: Dict[str, MovieReports] = {}
+_LOCK = threading.Lock()
+
+
+def _movie_reports(movie_dir: Path) -> MovieReports:
+    key = str(movie_dir)
+    with _LOCK:
+        reports = _MOVIES.get(key)
+        if reports is None:
+            reports = MovieReports(movie_dir)
+            _MOVIES[key] = reports
+        return reports
+
+
+def increment(movie_dir: Path, review_user: str) -> int:
+    """Count one more report of `review_user`'s review; returns its pending count."""
+    reports = _movie_reports(movie_dir)
+    with reports.lock:
+        reports.sync()
+        reports.record({"user": review_user})
+        count = reports.pending.get(review_user, 0)
+        fold = reports.pending_reports >= REPORTS_FOLD_AT
+    if fold:
+        fold_reports(movie_dir)
+    return count
+
+
+def pending_count(movie_dir: Path, review_user: str) -> int:
+    reports = _movie_reports(movie_dir)
+    with reports.lock:
+        reports.sync()
+        return reports.pending.get(review_user, 0)
+
+
+def pending_counts(movie_dir: Path) -> Dict[str, int]:
+    """Pending report count of every review of the movie that has one."""
+    reports = _movie_reports(movie_dir)
+    with reports.lock:
+        reports.sync()
+        return dict(reports.pending)
+
+
+def read_pending(movie_dir: Path) -> Dict[str, int]:
+    """
+    Pending report counts read straight from the journal files, without
+    taking the movie's locks, for indexes rebuilt while holding their own
+    lock. A fold in progress may still be counted.
+    """
+    counted = MovieReports(movie_dir)
+    for path in (movie_dir / FOLDING_FILENAME, counted.journal_path):
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            continue
+        for line in data.splitlines():
+            try:
+                record = json.loads(line)
+                if "base" not in record:
+                    counted._apply(record)
+            except (json.JSONDecodeError, KeyError, TypeError):
+                continue
+    return {user: count for user, count in counted.pending.items() if count > 0}
+
+
+def overlay(movie_dir: Path, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Add pending report counts to the "Reports" column of CSV rows (in place)."""
+    reports = _movie_reports(movie_dir)
+    with reports.lock:
+        reports.sync()
+        pending = dict(reports.pending)
+    if not pending:
+        return rows
+    for row in rows:
+        count = pending.get(row.get("User"))
+        # Projected rows may leave the column out
+        if count and "Reports" in row:
+            row["Reports"] = str(to_int(row["Reports"]) + count)
+    return rows
+
+
+def record_delete(movie_dir: Path, review_user: str) -> None:
+    """The review was deleted: drop its pending count."""
+    reports = _movie_reports(movie_dir)
+    with reports.lock:
+        reports.sync()
+        if review_user in reports.pending:
+            reports.record({"user": review_user, "forget": True})
+
+
+def _finish_fold(movie_dir: Path) -> None:
+    """
+    Fold the renamed-aside journal into the CSV, unless its base marker
+    shows that already happened, and remove it. Caller holds the file lock
+    on the renamed journal (and may hold the movie's MovieReports.lock).
+    """
+    folding = movie_dir / FOLDING_FILENAME
+    csv_path = movie_dir / "movieReviews.csv"
+    try:
+        data = folding.read_bytes()
+    except FileNotFoundError:
+        return
+    # Re-read the renamed journal: it may hold lines appended since our sync
+    folded = MovieReports(movie_dir)
+    base = None
+    for line in data.splitlines():
+        try:
+            record = json.loads(line)
+            if "base" in record:
+                base = tuple(record["base"]) if record["base"] else None
+            else:
+                folded._apply(record)
+        except (json.JSONDecodeError, KeyError, TypeError):
+            continue
+    # Review appends, updates and deletes wait from the version check until
+    # the rewrite has landed
+    with reviewsRepo.review_lock(csv_path):
+        version = reviewsRepo.review_file_version(csv_path)
+        if folded.pending and version is not None and base in (None, version):
+            if base is None:
+                fd = os.open(folding, os.O_WRONLY | os.O_APPEND)
+                try:
+                    os.write(fd, (json.dumps({"base": list(version)}) + "\n").encode("utf-8"))
+                finally:
+                    os.close(fd)
+            fieldnames, rows = reviewsRepo.read_review_file(csv_path)
+            for row in rows:
+                count = folded.pending.get(row.get("User"))
+                if count:
+                    row["Reports"] = str(to_int(row.get("Reports")) + count)
+            if "Reports" not in fieldnames:
+                fieldnames = [*fieldnames, "Reports"]
+            reviewsRepo.write_reviews_file(csv_path, rows, fieldnames)
+            reportedReviewIndex.record_rewrite(movie_dir, reviewsRepo.review_file_version(csv_path), rows)
+    folding.unlink()
+
+
+def fold_reports(movie_dir: Path) -> None:
+    """Write pending counts into the movie's reviews file with a single rewrite."""
+    reports = _movie_reports(movie_dir)
+    csv_path = movie_dir / "movieReviews.csv"
+    folding = movie_dir / FOLDING_FILENAME
+    with reports.lock, fileLock.file_lock(folding):
+        # Finishes a fold left behind by a crash before using the journal
+        reports.sync()
+        if not reports.pending or not reviewsRepo.review_file_exists(csv_path):
+            return
+        try:
+            os.replace(reports.journal_path, folding)
+        except FileNotFoundError:
+            # Folded by another process in the meantime
+            reports.sync()
+            return
+        _finish_fold(movie_dir)
+        reports.sync()
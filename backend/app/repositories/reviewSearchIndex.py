@@ -0,0 +1,419 @@
+"""
+Full-text search over review titles and bodies across all movies.
+
+Each movie has one index segment stored beside its CSV:
+
+  data/imdb/<MovieTitle>/movieReviews.search.json   (base segment)
+  data/imdb/<MovieTitle>/movieReviews.search.log    (JSON-lines journal)
+
+Base segment layout:
+  {
+    "format": 1,
+    "movie": "<MovieTitle>",
+    "version": [mtime_ns, size],         # CSV version the segment describes
+    "docs": {"<User>": ["<Review Title>", <token count>], ...},
+    "postings": {"<token>": {"<User>": <term frequency>, ...}, ...}
+  }
+
+Reviews are identified by (movie, User) since a user reviews a movie at most
+once; row positions shift on delete so they are not stored.
+
+Review writes through reviewsRepo append "upsert"/"delete" records to the
+journal instead of rewriting the base; the journal is folded back into the
+base once it grows past JOURNAL_COMPACT_AT records.
+
+Queries are scored with BM25 over the in-memory segments. The segments are
+loaded from disk on the first query, which also builds, synchronously, the
+segments of movies that have none yet, so a fresh corpus is searchable
+straight away. After that, queries never stat or read a CSV. refresh(), run
+in the background by SearchIndexService, rebuilds the segments that are
+missing or whose version no longer matches the CSV (edits made elsewhere,
+or another worker's writes), in parallel across movies. Until then queries
+use the last good segment.
+"""
+from __future__ import annotations
+
+import heapq
+import json
+import math
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from . import reviewsRepo
+
+Version = Optional[Tuple[int, int]]
+
+SEGMENT_FILENAME = "movieReviews.search.json"
+JOURNAL_FILENAME = "movieReviews.search.log"
+SEGMENT_FORMAT = 1
+JOURNAL_COMPACT_AT = 200
+
+# BM25 parameters (standard defaults)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    if not text:
+        return []
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _term_counts(title: Optional[str], body: Optional[str]) -> Tuple[Dict[str, int], int]:
+    counts: Dict[str, int] = {}
+    tokens = tokenize(title) + tokenize(body)
+    for tok in tokens:
+        counts[tok] = counts.get(tok, 0) + 1
+    return counts, len(tokens)
+
+
+# ─────────────────────────────────────────────────────────────
+# Segment
+# ─────────────────────────────────────────────────────────────
+
+class Segment:
+    """Inverted index for the reviews of one movie."""
+
+    def __init__(
+        self,
+        movie: str,
+        version: Version,
+        docs: Optional[Dict[str, List[Any]]] = None,
+        postings: Optional[Dict[str, Dict[str, int]]] = None,
+    ):
+        self.movie = movie
+        self.version = version
+        self.docs: Dict[str, List[Any]] = docs or {}
+        self.postings: Dict[str, Dict[str, int]] = postings or {}
+        self.total_length = sum(length for _, length in self.docs.values())
+        self.journal_records = 0
+        # user → tokens of their review, so a delete only visits those lists
+        self.user_terms: Dict[str, List[str]] = {}
+        for tok, plist in self.postings.items():
+            for user in plist:
+                self.user_terms.setdefault(user, []).append(tok)
+
+    def upsert(self, user: str, title: str, terms: Dict[str, int], length: int) -> None:
+        if user in self.docs:
+            self.delete(user)
+        self.docs[user] = [title, length]
+        self.total_length += length
+        for tok, tf in terms.items():
+            self.postings.setdefault(tok, {})[user] = tf
+        self.user_terms[user] = list(terms)
+
+    def delete(self, user: str) -> None:
+        doc = self.docs.pop(user, None)
+        if doc is None:
+            return
+        self.total_length -= doc[1]
+        for tok in self.user_terms.pop(user, ()):
+            plist = self.postings.get(tok)
+            if plist is None:
+                continue
+            plist.pop(user, None)
+            if not plist:
+                del self.postings[tok]
+
+    def apply(self, record: Dict[str, Any]) -> None:
+        if record.get("op") == "upsert":
+            self.upsert(record["user"], record["title"], record["terms"], record["length"])
+        elif record.get("op") == "delete":
+            self.delete(record["user"])
+        self.version = _as_version(record.get("version"))
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "format": SEGMENT_FORMAT,
+            "movie": self.movie,
+            "version": list(self.version) if self.version else None,
+            "docs": self.docs,
+            "postings": self.postings,
+        }
+
+
+def _as_version(raw: Any) -> Version:
+    return tuple(raw) if raw else None  # type: ignore[return-value]
+
+
+def _build_segment(movie: str, csv_path: Path) -> Segment:
+    segment = Segment(movie, reviewsRepo.review_file_version(csv_path))
+    for raw in reviewsRepo.read_review_file(csv_path)[1]:
+        row = {(k.strip() if k is not None else k): v for k, v in raw.items()}
+        user = row.get("User")
+        if not user:
+            continue
+        terms, length = _term_counts(row.get("Review Title"), row.get("Review"))
+        segment.upsert(user, row.get("Review Title") or "", terms, length)
+    return segment
+
+
+def _write_segment(segment: Segment, movie_dir: Path) -> None:
+    path = movie_dir / SEGMENT_FILENAME
+    with tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", dir=movie_dir, prefix=path.name + ".", suffix=".tmp", delete=False
+    ) as f:
+        json.dump(segment.to_json(), f, ensure_ascii=False)
+    os.replace(f.name, path)
+    journal = movie_dir / JOURNAL_FILENAME
+    if journal.exists():
+        journal.unlink()
+    segment.journal_records = 0
+
+
+def _build_segment_file(args: Tuple[str, str]) -> str:
+    """Process-pool worker: build and persist one movie's segment."""
+    movie, movie_dir = args
+    movie_dir_path = Path(movie_dir)
+    segment = _build_segment(movie, movie_dir_path / "movieReviews.csv")
+    _write_segment(segment, movie_dir_path)
+    return movie
+
+
+def _read_segment(movie: str, movie_dir: Path) -> Optional[Segment]:
+    path = movie_dir / SEGMENT_FILENAME
+    if not path.exists():
+        return None
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            raw = json.load(f)
+    except (json.JSONDecodeError, OSError):
+        return None
+    if raw.get("format") != SEGMENT_FORMAT:
+        return None
+    segment = Segment(movie, _as_version(raw.get("version")), raw.get("docs"), raw.get("postings"))
+
+    journal = movie_dir / JOURNAL_FILENAME
+    if journal.exists():
+        with journal.open("r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    segment.apply(json.loads(line))
+                except (json.JSONDecodeError, KeyError):
+                    # Torn last write – drop the segment so it gets rebuilt
+                    return None
+                segment.journal_records += 1
+    return segment
+
+
+# ─────────────────────────────────────────────────────────────
+# Segment cache
+# ─────────────────────────────────────────────────────────────
+
+_SEGMENTS: Dict[str, Segment] = {}
+_LOADED_ROOT: Optional[Path] = None
+_LOCK = threading.Lock()
+# Data root whose missing segments were built by a first query
+_COMPLETE_ROOT: Optional[Path] = None
+_BUILD_LOCK = threading.Lock()
+
+
+def _movie_dir(movie: str) -> Path:
+    return reviewsRepo.DATA_PATH / movie
+
+
+def _ensure_loaded() -> None:
+    """Load every persisted segment once per data root (caller holds _LOCK)."""
+    global _LOADED_ROOT
+    root = reviewsRepo.DATA_PATH
+    if _LOADED_ROOT == root:
+        return
+    _SEGMENTS.clear()
+    if root.exists():
+        for movie_dir in root.iterdir():
+            if movie_dir.is_dir():
+                segment = _read_segment(movie_dir.name, movie_dir)
+                if segment is not None:
+                    _SEGMENTS[str(movie_dir)] = segment
+    _LOADED_ROOT = root
+
+
+def build_index(movies: Optional[Iterable[str]] = None, workers: Optional[int] = None) -> List[str]:
+    """
+    (Re)build segments for the given movies (default: every movie whose
+    segment is missing or stale). Movies are built in parallel worker
+    processes; pass workers=1 to build in-process.
+
+    Returns the titles that were rebuilt.
+    """
+    if movies is None:
+        movies = _stale_movies()
+    jobs = [(title, str(_movie_dir(title))) for title in movies]
+    if not jobs:
+        return []
+
+    if workers == 1 or len(jobs) == 1:
+        built = [_build_segment_file(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            built = list(pool.map(_build_segment_file, jobs))
+
+    # Swap the fresh segments in; queries kept using the old ones meanwhile
+    fresh = {title: _read_segment(title, _movie_dir(title)) for title in built}
+    with _LOCK:
+        _ensure_loaded()
+        for title, segment in fresh.items():
+            if segment is not None:
+                _SEGMENTS[str(_movie_dir(title))] = segment
+    return built
+
+
+def _movie_versions() -> List[Tuple[str, Version]]:
+    if not reviewsRepo.DATA_PATH.exists():
+        return []
+    result = []
+    for movie_dir in sorted(reviewsRepo.DATA_PATH.iterdir()):
+        if not movie_dir.is_dir():
+            continue
+        version = reviewsRepo.reviews_version(movie_dir.name)
+        if version is not None:
+            result.append((movie_dir.name, version))
+    return result
+
+
+def _stale_movies() -> List[str]:
+    """Movies whose segment is missing or doesn't match the CSV on disk."""
+    versions = _movie_versions()
+    with _LOCK:
+        _ensure_loaded()
+        for key in [k for k in _SEGMENTS if Path(k).name not in dict(versions)]:
+            del _SEGMENTS[key]  # movie's reviews are gone
+        return [
+            title for title, version in versions
+            if getattr(_SEGMENTS.get(str(_movie_dir(title))), "version", None) != version
+        ]
+
+
+def refresh(workers: Optional[int] = None) -> List[str]:
+    """Background upkeep: rebuild stale or missing segments. Returns the rebuilt titles."""
+    return build_index(workers=workers)
+
+
+def _build_missing() -> None:
+    """
+    Build the segments that don't exist yet, once per data root. Stale
+    segments are left to refresh(); queries keep using them meanwhile.
+    """
+    global _COMPLETE_ROOT
+    root = reviewsRepo.DATA_PATH
+    if _COMPLETE_ROOT == root:
+        return
+    with _BUILD_LOCK:
+        if _COMPLETE_ROOT == root:
+            return
+        versions = _movie_versions()
+        with _LOCK:
+            _ensure_loaded()
+            missing = [title for title, _ in versions if str(_movie_dir(title)) not in _SEGMENTS]
+        build_index(missing)
+        _COMPLETE_ROOT = root
+
+
+def _current_segments() -> List[Segment]:
+    _build_missing()
+    with _LOCK:
+        _ensure_loaded()
+        return list(_SEGMENTS.values())
+
+
+# ─────────────────────────────────────────────────────────────
+# Query
+# ─────────────────────────────────────────────────────────────
+
+def search(query: str, limit: int = 10) -> List[Dict[str, Any]]:
+    """
+    BM25 top-k over all review titles + bodies.
+
+    Each hit: {"movieTitle", "user", "reviewTitle", "score"}.
+    """
+    terms = set(tokenize(query))
+    if not terms:
+        return []
+
+    segments = _current_segments()
+    total_docs = sum(len(s.docs) for s in segments)
+    if total_docs == 0:
+        return []
+    avgdl = (sum(s.total_length for s in segments) / total_docs) or 1.0
+
+    scores: Dict[Tuple[int, str], float] = {}
+    for term in terms:
+        df = sum(len(s.postings.get(term, ())) for s in segments)
+        if df == 0:
+            continue
+        idf = math.log(1 + (total_docs - df + 0.5) / (df + 0.5))
+        for seg_idx, segment in enumerate(segments):
+            plist = segment.postings.get(term)
+            if not plist:
+                continue
+            for user, tf in plist.items():
+                dl = segment.docs[user][1]
+                norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * dl / avgdl)
+                key = (seg_idx, user)
+                scores[key] = scores.get(key, 0.0) + idf * tf * (BM25_K1 + 1) / norm
+
+    top = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+    return [
+        {
+            "movieTitle": segments[seg_idx].movie,
+            "user": user,
+            "reviewTitle": segments[seg_idx].docs[user][0],
+            "score": round(score, 4),
+        }
+        for (seg_idx, user), score in top
+    ]
+
+
+# ─────────────────────────────────────────────────────────────
+# Incremental maintenance (called from reviewsRepo writes)
+# ─────────────────────────────────────────────────────────────
+
+def _journal(movie: str, old_version: Version, new_version: Version, record: Dict[str, Any]) -> None:
+    movie_dir = _movie_dir(movie)
+    key = str(movie_dir)
+    with _LOCK:
+        if _LOADED_ROOT != reviewsRepo.DATA_PATH:
+            return  # not loaded in this process: the load/refresh catches up
+        segment = _SEGMENTS.get(key)
+        if segment is None:
+            return  # never built: refresh() builds it
+        stale = segment.version != old_version
+        record["version"] = list(new_version) if new_version else None
+        segment.apply(record)
+        if stale:
+            # Keep serving it with this write applied, but don't persist a
+            # journal on a base that doesn't match; refresh() rebuilds it
+            segment.version = None
+            return
+
+        if segment.journal_records + 1 >= JOURNAL_COMPACT_AT:
+            _write_segment(segment, movie_dir)
+            return
+        with (movie_dir / JOURNAL_FILENAME).open("a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        segment.journal_records += 1
+
+
+def record_upsert(movie: str, old_version: Version, new_version: Version, row: Dict[str, Any]) -> None:
+    terms, length = _term_counts(row.get("Review Title"), row.get("Review"))
+    _journal(movie, old_version, new_version, {
+        "op": "upsert",
+        "user": row.get("User"),
+        "title": row.get("Review Title") or "",
+        "length": length,
+        "terms": terms,
+    })
+
+
+def record_delete(movie: str, old_version: Version, new_version: Version, user: str) -> None:
+    _journal(movie, old_version, new_version, {"op": "delete", "user": user})
@@ -0,0 +1,188 @@
+"""
+Precomputed per-movie orderings ("permutation arrays") for review listings.
+
+For every movie we keep, per sort field, a list of (key, rowIndex) pairs in
+ascending key order. A sorted page is then just a slice of that list, so a
+request never has to sort the whole movieReviews.csv.
+
+Orderings are cached in memory and tagged with the CSV version
+(mtime_ns, size). Writes going through reviewsRepo patch the cached orderings
+in place (bisect insert/remove) and move them to the new version; any other
+change to the file (moderation, username rename, manual edits) shows up as a
+version mismatch and triggers a rebuild on next read.
+
+Usefulness votes not yet folded into the CSV (reviewVoteStore) are part of
+the usefulness key. Each read passes the pending deltas in; the rows whose
+delta changed since the last read are moved to their new place.
+"""
+from __future__ import annotations
+
+import bisect
+import threading
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from .reviewFields import to_int, to_float, date_ordinal
+
+Version = Optional[Tuple[int, int]]
+
+VOTES_FIELD = "usefulness"
+
+# sort_by value → how to compute the key from a CSV row
+SORT_FIELDS: Dict[str, Callable[[Dict[str, Any]], float]] = {
+    "usefulness": lambda row: to_int(row.get("Usefulness Vote")),
+    "date": lambda row: date_ordinal(row.get("Date of Review")),
+    "rating": lambda row: to_float(row.get("User's Rating out of 10")),
+}
+
+
+class MovieOrderings:
+    """Sorted (key, rowIndex) lists for one movie, one per sort field."""
+
+    def __init__(self, version: Version, rows: List[Dict[str, Any]]):
+        self.version = version
+        # Pending usefulness deltas already added to the keys, by review user
+        self._votes: Dict[str, int] = {}
+        # Per-row keys, needed to find an entry again when a row changes
+        self._keys: Dict[str, List[float]] = {
+            field: [key_fn(row) for row in rows]
+            for field, key_fn in SORT_FIELDS.items()
+        }
+        self._sorted: Dict[str, List[Tuple[float, int]]] = {
+            field: sorted((k, i) for i, k in enumerate(keys))
+            for field, keys in self._keys.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self._keys["date"])
+
+    def page(self, field: str, offset: int, amount: int, descending: bool = True) -> List[int]:
+        """Row indices for one page of the listing ordered by `field`."""
+        entries = self._sorted[field]
+        if descending:
+            start = len(entries) - 1 - offset
+            stop = max(start - amount, -1)
+            return [entries[i][1] for i in range(start, stop, -1)]
+        return [idx for _, idx in entries[offset:offset + amount]]
+
+    def _key(self, field: str, row: Dict[str, Any]) -> float:
+        key = SORT_FIELDS[field](row)
+        if field == VOTES_FIELD:
+            key += self._votes.get(row.get("User"), 0)
+        return key
+
+    def _move(self, field: str, index: int, new_key: float) -> None:
+        entries = self._sorted[field]
+        old_key = self._keys[field][index]
+        del entries[bisect.bisect_left(entries, (old_key, index))]
+        self._keys[field][index] = new_key
+        bisect.insort(entries, (new_key, index))
+
+    def append(self, row: Dict[str, Any]) -> None:
+        index = len(self)
+        for field in SORT_FIELDS:
+            key = self._key(field, row)
+            self._keys[field].append(key)
+            bisect.insort(self._sorted[field], (key, index))
+
+    def update(self, index: int, row: Dict[str, Any]) -> None:
+        for field in SORT_FIELDS:
+            self._move(field, index, self._key(field, row))
+
+    def delete(self, index: int) -> None:
+        for field in SORT_FIELDS:
+            keys = self._keys[field]
+            entries = self._sorted[field]
+            del entries[bisect.bisect_left(entries, (keys[index], index))]
+            del keys[index]
+            # Rows after the deleted one move up by one; order is unchanged
+            for pos, (key, i) in enumerate(entries):
+                if i > index:
+                    entries[pos] = (key, i - 1)
+
+    def apply_votes(self, votes: Mapping[str, int], locate: Callable[[str], List[int]]) -> None:
+        """
+        Bring the usefulness keys in line with `votes` (pending usefulness
+        delta per review user); `locate` gives a user's row indices.
+        """
+        for user in set(self._votes) | set(votes):
+            old, new = self._votes.get(user, 0), votes.get(user, 0)
+            if old == new:
+                continue
+            keys = self._keys[VOTES_FIELD]
+            for index in locate(user):
+                if index < len(keys):
+                    self._move(VOTES_FIELD, index, keys[index] + new - old)
+            if new:
+                self._votes[user] = new
+            else:
+                self._votes.pop(user, None)
+
+
+# ─────────────────────────────────────────────────────────────
+# Module-level cache keyed by CSV path
+# ─────────────────────────────────────────────────────────────
+
+_CACHE: Dict[str, MovieOrderings] = {}
+_LOCK = threading.Lock()
+
+
+def get_orderings(
+    movie_key: str,
+    version: Version,
+    load_rows: Callable[[], List[Dict[str, Any]]],
+    votes: Optional[Mapping[str, int]] = None,
+    locate: Optional[Callable[[str], List[int]]] = None,
+) -> MovieOrderings:
+    """
+    Return the orderings for a movie, rebuilding them from load_rows() if
+    nothing is cached or the cached copy belongs to an older file version.
+
+    votes (pending usefulness delta per review user) are applied to the
+    usefulness ordering, locating the changed users' rows with locate().
+    """
+    with _LOCK:
+        orderings = _CACHE.get(movie_key)
+    if orderings is None or orderings.version != version:
+        orderings = MovieOrderings(version, load_rows())
+        with _LOCK:
+            _CACHE[movie_key] = orderings
+    if votes is not None and locate is not None:
+        with _LOCK:
+            orderings.apply_votes(votes, locate)
+    return orderings
+
+
+def _patch(movie_key: str, old_version: Version, new_version: Version, apply) -> None:
+    with _LOCK:
+        cached = _CACHE.get(movie_key)
+        if cached is None:
+            return
+        if cached.version != old_version:
+            # Someone else changed the file in between; rebuild lazily
+            _CACHE.pop(movie_key, None)
+            return
+        apply(cached)
+        cached.version = new_version
+
+
+def record_append(movie_key: str, old_version: Version, new_version: Version, row: Dict[str, Any]) -> None:
+    _patch(movie_key, old_version, new_version, lambda o: o.append(row))
+
+
+def record_update(
+    movie_key: str,
+    old_version: Version,
+    new_version: Version,
+    index: int,
+    row: Dict[str, Any],
+) -> None:
+    _patch(movie_key, old_version, new_version, lambda o: o.update(index, row))
+
+
+def record_delete(movie_key: str, old_version: Version, new_version: Version, index: int) -> None:
+    _patch(movie_key, old_version, new_version, lambda o: o.delete(index))
+
+
+def invalidate(movie_key: str) -> None:
+    with _LOCK:
+        _CACHE.pop(movie_key, None)
@@ -0,0 +1,508 @@
+"""
+Storage engines behind reviewsRepo.
+
+Every engine stores the reviews of one movie as an ordered list of rows with
+the CSV_HEADERS columns and is addressed by the movie's logical
+data/imdb/<MovieTitle>/movieReviews.csv path (the data root and title are
+taken from it), so callers and derived indexes do not care where the rows
+actually live. Engines are picked with REVIEW_STORAGE:
+
+  csv         movieReviews.csv per movie (default)
+  compressed  movieReviews.blocks per movie (see reviewBlockStore)
+  sqlite      one data/imdb/reviews.sqlite3 database (WAL mode)
+
+The two file engines read whichever file a movie currently has and only
+differ in the format a full rewrite produces, so a movie can be moved
+between them one rewrite at a time. The SQLite engine only sees movies that
+were written to or migrated into the database (see backend/migrate_reviews.py).
+
+version() returns a value that changes on every write; the in-memory indexes
+use it the same way they use a file's (mtime_ns, size).
+"""
+from __future__ import annotations
+
+import abc
+import csv
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from . import reviewsRepo, reviewBlockStore, reviewFileReader, reviewUserIndex
+from .reviewFields import date_ordinal
+
+Version = Optional[Tuple[int, int]]
+Row = Dict[str, Any]
+
+
+class ReviewStorage(abc.ABC):
+    """
+    Interface of a storage engine. Rows come back shaped like csv.DictReader
+    rows; the default update/delete implementations work on top of
+    read_all + rewrite.
+    """
+
+    name = ""
+
+    @abc.abstractmethod
+    def exists(self, moviePath: Path) -> bool:
+        ...
+
+    @abc.abstractmethod
+    def version(self, moviePath: Path) -> Version:
+        ...
+
+    @abc.abstractmethod
+    def read_all(self, moviePath: Path) -> Tuple[List[str], List[Row]]:
+        """(fieldnames, rows) in stored order."""
+
+    @abc.abstractmethod
+    def read_range(
+        self,
+        moviePath: Path,
+        start: int,
+        stop: int,
+        fields: Optional[Sequence[str]] = None,
+        preview_chars: Optional[int] = None,
+    ) -> List[Row]:
+        ...
+
+    @abc.abstractmethod
+    def read_rows(
+        self,
+        moviePath: Path,
+        indices: Sequence[int],
+        fields: Optional[Sequence[str]] = None,
+        preview_chars: Optional[int] = None,
+    ) -> List[Row]:
+        ...
+
+    @abc.abstractmethod
+    def append_rows(self, moviePath: Path, rows: List[Row]) -> None:
+        ...
+
+    @abc.abstractmethod
+    def rewrite(self, moviePath: Path, rows: Iterable[Row], fieldnames: Sequence[str]) -> None:
+        """Replace all rows of a movie."""
+
+    @abc.abstractmethod
+    def drop(self, moviePath: Path) -> None:
+        """Remove a movie's rows from this engine (used by migrations)."""
+
+    @abc.abstractmethod
+    def find_user_rows(self, moviePath: Path, username: str) -> List[Tuple[int, Row]]:
+        """(index, normalized row) of every row written by `username`, without a full scan."""
+
+    def _scan_user_rows(self, moviePath: Path, username: str) -> List[Tuple[int, Row]]:
+        """find_user_rows by reading every row; the fallback of indexed lookups."""
+        return [
+            (i, row)
+            for i, row in enumerate(reviewsRepo._normalize_row(r) for r in self.read_all(moviePath)[1])
+            if row.get("User") == username
+        ]
+
+    def update_row(self, moviePath: Path, index: int, row: Row) -> None:
+        rows = [reviewsRepo._normalize_row(r) for r in self.read_all(moviePath)[1]]
+        rows[index] = row
+        self.rewrite(moviePath, rows, reviewsRepo.CSV_HEADERS)
+
+    def delete_rows(self, moviePath: Path, indices: Sequence[int]) -> None:
+        drop = set(indices)
+        rows = [
+            reviewsRepo._normalize_row(r)
+            for i, r in enumerate(self.read_all(moviePath)[1])
+            if i not in drop
+        ]
+        self.rewrite(moviePath, rows, reviewsRepo.CSV_HEADERS)
+
+
+# ─────────────────────────────────────────────────────────────
+# File engines: movieReviews.csv / movieReviews.blocks
+# ─────────────────────────────────────────────────────────────
+
+class CsvStorage(ReviewStorage):
+    """One movieReviews.csv per movie, read through the mmap offset index."""
+
+    name = "csv"
+
+    def stored_path(self, moviePath: Path) -> Path:
+        """The file actually holding the reviews: .blocks if present, else the CSV."""
+        blocks = moviePath.with_name(reviewBlockStore.BLOCKS_FILENAME)
+        return blocks if blocks.exists() else moviePath
+
+    @staticmethod
+    def _is_blocks(path: Path) -> bool:
+        return path.name == reviewBlockStore.BLOCKS_FILENAME
+
+    def exists(self, moviePath: Path) -> bool:
+        return self.stored_path(moviePath).exists()
+
+    def version(self, moviePath: Path) -> Version:
+        try:
+            st = self.stored_path(moviePath).stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def read_all(self, moviePath: Path) -> Tuple[List[str], List[Row]]:
+        path = self.stored_path(moviePath)
+        if self._is_blocks(path):
+            return reviewBlockStore.read_all(path)
+        if not path.exists():
+            return [], []
+        with path.open("r", newline="", encoding="utf-8") as csvFile:
+            reader = csv.DictReader(csvFile)
+            rows = list(reader)
+            return list(reader.fieldnames or []), rows
+
+    def read_range(self, moviePath, start, stop, fields=None, preview_chars=None):
+        path = self.stored_path(moviePath)
+        if self._is_blocks(path):
+            return reviewBlockStore.read_range(path, start, stop, fields, preview_chars)
+        return reviewFileReader.read_range(path, start, stop, fields, preview_chars)
+
+    def read_rows(self, moviePath, indices, fields=None, preview_chars=None):
+        path = self.stored_path(moviePath)
+        if self._is_blocks(path):
+            return reviewBlockStore.read_rows(path, indices, fields, preview_chars)
+        return reviewFileReader.read_rows(path, indices, fields, preview_chars)
+
+    def find_user_rows(self, moviePath: Path, username: str) -> List[Tuple[int, Row]]:
+        """
+        The user's row numbers come from reviewUserIndex (one movie checked)
+        and only those rows are read. Movies outside DATA_PATH, or a file
+        replaced between lookup and read, fall back to a scan.
+        """
+        if moviePath.parent.parent != reviewsRepo.DATA_PATH:
+            return self._scan_user_rows(moviePath, username)
+        indices = reviewUserIndex.movie_rows(moviePath.parent.name, username)
+        rows = [reviewsRepo._normalize_row(r) for r in self.read_rows(moviePath, indices)] if indices else []
+        if len(rows) != len(indices) or any(row.get("User") != username for row in rows):
+            return self._scan_user_rows(moviePath, username)
+        return list(zip(indices, rows))
+
+    def append_rows(self, moviePath: Path, rows: List[Row]) -> None:
+        path = self.stored_path(moviePath)
+        if self._is_blocks(path):
+            reviewBlockStore.append_rows(path, rows)
+            return
+        old_version = self.version(moviePath)
+        # Append using canonical CSV_HEADERS so fieldnames are consistent
+        with moviePath.open("a", newline="", encoding="utf-8") as csvFile:
+            writer = csv.DictWriter(csvFile, fieldnames=reviewsRepo.CSV_HEADERS)
+            writer.writerows(rows)
+        if len(rows) == 1:
+            reviewFileReader.record_append(moviePath, old_version, self.version(moviePath))
+
+    def rewrite(self, moviePath: Path, rows: Iterable[Row], fieldnames: Sequence[str]) -> None:
+        # Temp file + os.replace: readers holding the old file mmap'ed keep a
+        # consistent copy. The temp name is unique so concurrent rewrites
+        # never write into each other's file.
+        with tempfile.NamedTemporaryFile(
+            "w", newline="", encoding="utf-8",
+            dir=moviePath.parent, prefix=moviePath.name + ".", suffix=".tmp", delete=False,
+        ) as csvFile:
+            writer = csv.DictWriter(csvFile, fieldnames=list(fieldnames))
+            writer.writeheader()
+            writer.writerows(rows)
+        os.chmod(csvFile.name, 0o644)  # mkstemp creates 0600
+        os.replace(csvFile.name, moviePath)
+        blocks = moviePath.with_name(reviewBlockStore.BLOCKS_FILENAME)
+        if blocks.exists():
+            blocks.unlink()
+
+    def drop(self, moviePath: Path) -> None:
+        for path in (moviePath, moviePath.with_name(reviewBlockStore.BLOCKS_FILENAME)):
+            if path.exists():
+                path.unlink()
+
+
+class CompressedStorage(CsvStorage):
+    """Like CsvStorage, but full rewrites produce movieReviews.blocks."""
+
+    name = "compressed"
+
+    def rewrite(self, moviePath: Path, rows: Iterable[Row], fieldnames: Sequence[str]) -> None:
+        reviewBlockStore.write_blocks(
+            moviePath.with_name(reviewBlockStore.BLOCKS_FILENAME), list(fieldnames), rows
+        )
+        if moviePath.exists():
+            moviePath.unlink()
+
+
+# ─────────────────────────────────────────────────────────────
+# SQLite engine
+# ─────────────────────────────────────────────────────────────
+
+DB_FILENAME = "reviews.sqlite3"
+
+# CSV column → table column
+SQL_COLUMNS = {
+    "Movie Title": "movie_title",
+    "Date of Review": "review_date",
+    "User": "user",
+    "Usefulness Vote": "useful_votes",
+    "Total Votes": "total_votes",
+    "User's Rating out of 10": "rating",
+    "Review Title": "title",
+    "Review": "body",
+    "Reports": "reports",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS movies (
+    movie     TEXT PRIMARY KEY,
+    rev       INTEGER NOT NULL,
+    row_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS reviews (
+    movie        TEXT NOT NULL,
+    pos          INTEGER NOT NULL,
+    movie_title  TEXT,
+    review_date  TEXT,
+    user         TEXT,
+    useful_votes TEXT,
+    total_votes  TEXT,
+    rating       TEXT,
+    title        TEXT,
+    body         TEXT,
+    reports      TEXT,
+    date_ordinal INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS reviews_movie_pos ON reviews (movie, pos);
+CREATE INDEX IF NOT EXISTS reviews_user ON reviews (user, movie);
+CREATE INDEX IF NOT EXISTS reviews_movie_date ON reviews (movie, date_ordinal);
+"""
+
+
+def _cell(value: Any) -> str:
+    # Same text csv.DictWriter would store
+    return "" if value is None else str(value)
+
+
+class SqliteStorage(ReviewStorage):
+    """All movies in one SQLite database beside the movie folders."""
+
+    name = "sqlite"
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+
+    # ── Connections ──
+
+    def _db(self, moviePath: Path) -> sqlite3.Connection:
+        db_path = str(moviePath.parent.parent / DB_FILENAME)
+        conns = getattr(self._local, "conns", None)
+        if conns is None:
+            conns = self._local.conns = {}
+        conn = conns.get(db_path)
+        if conn is None:
+            conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            conns[db_path] = conn
+        return conn
+
+    @staticmethod
+    def _movie(moviePath: Path) -> str:
+        return moviePath.parent.name
+
+    def _bump(self, conn: sqlite3.Connection, movie: str, row_count: int) -> None:
+        conn.execute(
+            "INSERT INTO movies (movie, rev, row_count) VALUES (?, ?, ?) "
+            "ON CONFLICT(movie) DO UPDATE SET rev = excluded.rev, row_count = excluded.row_count",
+            (movie, time.time_ns(), row_count),
+        )
+
+    def _count(self, conn: sqlite3.Connection, movie: str) -> int:
+        found = conn.execute("SELECT row_count FROM movies WHERE movie = ?", (movie,)).fetchone()
+        return found[0] if found else 0
+
+    def _insert(self, conn: sqlite3.Connection, movie: str, start: int, rows: Iterable[Row]) -> int:
+        pos = start
+        batch = []
+        for raw in rows:
+            row = {(k.strip() if isinstance(k, str) else k): v for k, v in raw.items()}
+            batch.append(
+                (movie, pos)
+                + tuple(_cell(row.get(column)) for column in SQL_COLUMNS)
+                + (date_ordinal(row.get("Date of Review")),)
+            )
+            pos += 1
+        conn.executemany(
+            f"INSERT INTO reviews (movie, pos, {', '.join(SQL_COLUMNS.values())}, date_ordinal) "
+            f"VALUES ({', '.join('?' * (len(SQL_COLUMNS) + 3))})",
+            batch,
+        )
+        return pos
+
+    # ── Reads ──
+
+    @staticmethod
+    def _select(fields: Optional[Sequence[str]], preview_chars: Optional[int]) -> Tuple[str, List[str], list]:
+        columns = [c for c in SQL_COLUMNS if fields is None or c in fields]
+        exprs = []
+        params: list = []
+        for column in columns:
+            if column == "Review" and preview_chars is not None:
+                exprs.append("substr(body, 1, ?)")
+                params.append(preview_chars)
+            else:
+                exprs.append(SQL_COLUMNS[column])
+        return ", ".join(exprs) or "NULL", columns, params
+
+    def exists(self, moviePath: Path) -> bool:
+        return self.version(moviePath) is not None
+
+    def version(self, moviePath: Path) -> Version:
+        found = self._db(moviePath).execute(
+            "SELECT rev, row_count FROM movies WHERE movie = ?", (self._movie(moviePath),)
+        ).fetchone()
+        return (found[0], found[1]) if found else None
+
+    def read_all(self, moviePath: Path) -> Tuple[List[str], List[Row]]:
+        if not self.exists(moviePath):
+            return [], []
+        return list(SQL_COLUMNS), self.read_range(moviePath, 0, self._count(self._db(moviePath), self._movie(moviePath)))
+
+    def read_range(self, moviePath, start, stop, fields=None, preview_chars=None):
+        select, columns, params = self._select(fields, preview_chars)
+        cursor = self._db(moviePath).execute(
+            f"SELECT {select} FROM reviews WHERE movie = ? AND pos >= ? AND pos < ? ORDER BY pos",
+            params + [self._movie(moviePath), max(start, 0), stop],
+        )
+        return [dict(zip(columns, values)) for values in cursor]
+
+    def read_rows(self, moviePath, indices, fields=None, preview_chars=None):
+        if not indices:
+            return []
+        select, columns, params = self._select(fields, preview_chars)
+        cursor = self._db(moviePath).execute(
+            f"SELECT pos, {select} FROM reviews WHERE movie = ? AND pos IN ({', '.join('?' * len(indices))})",
+            params + [self._movie(moviePath), *indices],
+        )
+        by_pos = {values[0]: dict(zip(columns, values[1:])) for values in cursor}
+        return [by_pos[i] for i in indices if i in by_pos]
+
+    def find_user_rows(self, moviePath: Path, username: str) -> List[Tuple[int, Row]]:
+        # Without INDEXED BY the planner walks the whole movie through
+        # reviews_movie_pos to skip sorting the (few) matches
+        cursor = self._db(moviePath).execute(
+            f"SELECT pos, {', '.join(SQL_COLUMNS.values())} FROM reviews INDEXED BY reviews_user "
+            "WHERE user = ? AND movie = ? ORDER BY pos",
+            (username, self._movie(moviePath)),
+        )
+        return [
+            (values[0], reviewsRepo._normalize_row(dict(zip(SQL_COLUMNS, values[1:]))))
+            for values in cursor
+        ]
+
+    # ── Writes ──
+
+    def append_rows(self, moviePath: Path, rows: List[Row]) -> None:
+        conn = self._db(moviePath)
+        movie = self._movie(moviePath)
+        with _transaction(conn):
+            end = self._insert(conn, movie, self._count(conn, movie), rows)
+            self._bump(conn, movie, end)
+
+    def rewrite(self, moviePath: Path, rows: Iterable[Row], fieldnames: Sequence[str]) -> None:
+        conn = self._db(moviePath)
+        movie = self._movie(moviePath)
+        with _transaction(conn):
+            conn.execute("DELETE FROM reviews WHERE movie = ?", (movie,))
+            end = self._insert(conn, movie, 0, rows)
+            self._bump(conn, movie, end)
+
+    def update_row(self, moviePath: Path, index: int, row: Row) -> None:
+        conn = self._db(moviePath)
+        movie = self._movie(moviePath)
+        assignments = ", ".join(f"{column} = ?" for column in SQL_COLUMNS.values())
+        with _transaction(conn):
+            conn.execute(
+                f"UPDATE reviews SET {assignments}, date_ordinal = ? WHERE movie = ? AND pos = ?",
+                tuple(_cell(row.get(column)) for column in SQL_COLUMNS)
+                + (date_ordinal(row.get("Date of Review")), movie, index),
+            )
+            self._bump(conn, movie, self._count(conn, movie))
+
+    def delete_rows(self, moviePath: Path, indices: Sequence[int]) -> None:
+        conn = self._db(moviePath)
+        movie = self._movie(moviePath)
+        with _transaction(conn):
+            # From the back so earlier positions stay valid while shifting
+            for index in sorted(set(indices), reverse=True):
+                conn.execute("DELETE FROM reviews WHERE movie = ? AND pos = ?", (movie, index))
+                conn.execute("UPDATE reviews SET pos = pos - 1 WHERE movie = ? AND pos > ?", (movie, index))
+            self._bump(conn, movie, self._count(conn, movie) - len(set(indices)))
+
+    def drop(self, moviePath: Path) -> None:
+        conn = self._db(moviePath)
+        movie = self._movie(moviePath)
+        with _transaction(conn):
+            conn.execute("DELETE FROM reviews WHERE movie = ?", (movie,))
+            conn.execute("DELETE FROM movies WHERE movie = ?", (movie,))
+
+
+class _transaction:
+    """BEGIN IMMEDIATE … COMMIT/ROLLBACK on an autocommit connection."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+# ─────────────────────────────────────────────────────────────
+# Engine registry
+# ─────────────────────────────────────────────────────────────
+
+ENGINES: Dict[str, ReviewStorage] = {
+    engine.name: engine for engine in (CsvStorage(), CompressedStorage(), SqliteStorage())
+}
+
+
+def get_storage(name: str) -> ReviewStorage:
+    try:
+        return ENGINES[name]
+    except KeyError:
+        raise ValueError(f"Unknown review storage '{name}'. Use one of: {', '.join(ENGINES)}")
+
+
+def detect_storage(moviePath: Path) -> Optional[ReviewStorage]:
+    """The engine currently holding a movie's reviews (files first, then SQLite)."""
+    if moviePath.with_name(reviewBlockStore.BLOCKS_FILENAME).exists():
+        return ENGINES["compressed"]
+    if moviePath.exists():
+        return ENGINES["csv"]
+    if (moviePath.parent.parent / DB_FILENAME).exists() and ENGINES["sqlite"].exists(moviePath):
+        return ENGINES["sqlite"]
+    return None
+
+
+def migrate(moviePath: Path, target: str, keep_source: bool = False) -> Optional[str]:
+    """
+    Move one movie's reviews into the `target` engine. Returns the name of
+    the engine they came from, or None if there was nothing to move.
+    """
+    source = detect_storage(moviePath)
+    engine = get_storage(target)
+    if source is None:
+        return None
+    if source is engine:
+        return source.name
+    fieldnames, rows = source.read_all(moviePath)
+    engine.rewrite(moviePath, rows, fieldnames or reviewsRepo.CSV_HEADERS)
+    # csv <-> compressed rewrites already replace the other file themselves
+    if not keep_source and "sqlite" in (source.name, engine.name):
+        source.drop(moviePath)
+    return source.name
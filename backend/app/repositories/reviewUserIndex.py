@@ -0,0 +1,292 @@
+"""
+User → reviews index across all movies.
+
+Finding every review by one user used to mean opening every
+movieReviews.csv. Instead each movie keeps a small map of which rows belong
+to which user:
+
+  data/imdb/<MovieTitle>/movieReviews.users.json
+  {
+    "format": 1,
+    "version": [mtime_ns, size],       # CSV version the map describes
+    "rows": <data row count>,
+    "users": {"<User>": [rowIndex, ...], ...}
+  }
+
+In memory the per-movie maps are inverted into user → {movie: [rowIndex]}.
+A full scan (refresh) lists the movie directories, stats their CSVs and
+rebuilds only the movies whose version changed (sidecar first, CSV scan if
+the sidecar is stale too). It runs on first use and then at most every
+REFRESH_INTERVAL_SECONDS. In between, a lookup only stats the movies the
+index already lists for that user and rebuilds those that changed; a lookup
+within one movie (movie_rows) only checks that movie. Writes going through
+reviewsRepo patch the in-memory maps directly, so only edits made outside
+this process to a movie the user is not yet indexed under wait for the next
+scan. The sidecar is only rewritten on a rebuild, so after a restart a movie
+that was written to is rescanned once.
+
+Row indices count data rows the same way csv.DictReader and
+reviewFileReader do, so they can be handed to reviewFileReader.read_rows.
+"""
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from . import reviewsRepo
+
+Version = Optional[Tuple[int, int]]
+
+USERS_FILENAME = "movieReviews.users.json"
+USERS_FORMAT = 1
+REFRESH_INTERVAL_SECONDS = 30.0
+
+
+class MovieUsers:
+    """User → row indices for one movie."""
+
+    def __init__(self, version: Version, users: Dict[str, List[int]], rows: int):
+        self.version = version
+        self.users = users
+        self.rows = rows
+
+    def append(self, user: str) -> None:
+        if user:
+            self.users.setdefault(user, []).append(self.rows)
+        self.rows += 1
+
+    def delete(self, index: int) -> None:
+        self.rows -= 1
+        # Rows after the deleted one move up by one
+        for user in list(self.users):
+            rows = [i - 1 if i > index else i for i in self.users[user] if i != index]
+            if rows:
+                self.users[user] = rows
+            else:
+                del self.users[user]
+
+    def rename(self, old_user: str, new_user: str) -> None:
+        rows = self.users.pop(old_user, None)
+        if rows:
+            self.users[new_user] = sorted(self.users.get(new_user, []) + rows)
+
+
+def _build_movie(csv_path: Path) -> MovieUsers:
+    version = reviewsRepo.review_file_version(csv_path)
+    users: Dict[str, List[int]] = {}
+    raw_rows = reviewsRepo.read_review_file(csv_path)[1]
+    for index, raw in enumerate(raw_rows):
+        row = {(k.strip() if k is not None else k): v for k, v in raw.items()}
+        user = row.get("User")
+        if user:
+            users.setdefault(user, []).append(index)
+    return MovieUsers(version, users, len(raw_rows))
+
+
+def _read_sidecar(path: Path) -> Optional[MovieUsers]:
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            raw = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if raw.get("format") != USERS_FORMAT:
+        return None
+    version = tuple(raw["version"]) if raw.get("version") else None
+    return MovieUsers(version, raw.get("users") or {}, int(raw.get("rows") or 0))  # type: ignore[arg-type]
+
+
+def _write_sidecar(movie_users: MovieUsers, path: Path) -> None:
+    with tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", dir=path.parent, prefix=path.name + ".", suffix=".tmp", delete=False,
+    ) as f:
+        json.dump({
+            "format": USERS_FORMAT,
+            "version": list(movie_users.version) if movie_users.version else None,
+            "rows": movie_users.rows,
+            "users": movie_users.users,
+        }, f, ensure_ascii=False)
+    os.replace(f.name, path)
+
+
+def _load_movie(csv_path: Path, version: Version) -> MovieUsers:
+    sidecar = csv_path.with_name(USERS_FILENAME)
+    movie_users = _read_sidecar(sidecar) if sidecar.exists() else None
+    if movie_users is None or movie_users.version != version:
+        movie_users = _build_movie(csv_path)
+        try:
+            _write_sidecar(movie_users, sidecar)
+        except OSError:
+            pass
+    return movie_users
+
+
+# ─────────────────────────────────────────────────────────────
+# In-memory index: per-movie maps plus the inverted user view
+# ─────────────────────────────────────────────────────────────
+
+_MOVIES: Dict[str, MovieUsers] = {}
+_BY_USER: Dict[str, Dict[str, List[int]]] = {}
+_DATA_ROOT: Optional[Path] = None
+_SCANNED_AT: Optional[float] = None
+_LOCK = threading.RLock()
+
+
+def _unlink_movie(movie: str) -> None:
+    old = _MOVIES.pop(movie, None)
+    if old is None:
+        return
+    for user in old.users:
+        movies = _BY_USER.get(user)
+        if movies is not None:
+            movies.pop(movie, None)
+            if not movies:
+                del _BY_USER[user]
+
+
+def _link_movie(movie: str, movie_users: MovieUsers) -> None:
+    _MOVIES[movie] = movie_users
+    for user, rows in movie_users.users.items():
+        _BY_USER.setdefault(user, {})[movie] = rows
+
+
+def _reset_if_moved() -> None:
+    # DATA_PATH is swapped out in tests; never mix two data roots
+    global _DATA_ROOT, _SCANNED_AT
+    if _DATA_ROOT != reviewsRepo.DATA_PATH:
+        _MOVIES.clear()
+        _BY_USER.clear()
+        _DATA_ROOT = reviewsRepo.DATA_PATH
+        _SCANNED_AT = None
+
+
+def refresh() -> None:
+    """Bring the index up to date with every movie CSV on disk."""
+    global _SCANNED_AT
+    data_path = reviewsRepo.DATA_PATH
+    started = time.monotonic()
+    current: Dict[str, Version] = {}
+    if data_path.exists():
+        for movie_dir in data_path.iterdir():
+            if movie_dir.is_dir():
+                version = reviewsRepo.review_file_version(movie_dir / "movieReviews.csv")
+                if version is not None:
+                    current[movie_dir.name] = version
+
+    with _LOCK:
+        _reset_if_moved()
+        for movie in [m for m in _MOVIES if m not in current]:
+            _unlink_movie(movie)
+        stale = [
+            movie for movie, version in current.items()
+            if movie not in _MOVIES or _MOVIES[movie].version != version
+        ]
+        for movie in stale:
+            movie_users = _load_movie(data_path / movie / "movieReviews.csv", current[movie])
+            _unlink_movie(movie)
+            _link_movie(movie, movie_users)
+        _SCANNED_AT = started
+
+
+def _user_movies(username: str) -> Dict[str, List[int]]:
+    """
+    movie → row indices for `username`, scanning every movie only when the
+    last scan is older than REFRESH_INTERVAL_SECONDS and otherwise checking
+    just the movies already listed for the user.
+    """
+    with _LOCK:
+        _reset_if_moved()
+        scanned_at = _SCANNED_AT
+    if scanned_at is None or time.monotonic() - scanned_at >= REFRESH_INTERVAL_SECONDS:
+        refresh()
+    else:
+        with _LOCK:
+            listed = list(_BY_USER.get(username, {}))
+        for movie in listed:
+            _current_movie(movie)
+    with _LOCK:
+        return {movie: list(rows) for movie, rows in _BY_USER.get(username, {}).items()}
+
+
+def _current_movie(movie: str) -> Optional[MovieUsers]:
+    """The movie's map, rebuilt first if its CSV changed; None once the CSV is gone."""
+    csv_path = reviewsRepo.DATA_PATH / movie / "movieReviews.csv"
+    version = reviewsRepo.review_file_version(csv_path)
+    with _LOCK:
+        _reset_if_moved()
+        if version is None:
+            _unlink_movie(movie)
+            return None
+        cached = _MOVIES.get(movie)
+        if cached is None or cached.version != version:
+            cached = _load_movie(csv_path, version)
+            _unlink_movie(movie)
+            _link_movie(movie, cached)
+        return cached
+
+
+def locate(username: str) -> List[Tuple[str, int]]:
+    """(movie, rowIndex) of every review by `username`, ordered by movie title."""
+    movies = _user_movies(username)
+    return [(movie, index) for movie in sorted(movies) for index in movies[movie]]
+
+
+def movie_rows(movie: str, username: str) -> List[int]:
+    """Row indices of `username`'s reviews of one movie; only that movie is checked."""
+    cached = _current_movie(movie)
+    if cached is None:
+        return []
+    with _LOCK:
+        return list(cached.users.get(username, ()))
+
+
+def movies_for_user(username: str) -> List[str]:
+    """Titles of the movies `username` has reviewed."""
+    return sorted(_user_movies(username))
+
+
+# ─────────────────────────────────────────────────────────────
+# Incremental maintenance (called from reviewsRepo writes)
+# ─────────────────────────────────────────────────────────────
+
+def _patch(movie: str, old_version: Version, new_version: Version, apply) -> None:
+    with _LOCK:
+        _reset_if_moved()
+        cached = _MOVIES.get(movie)
+        if cached is None:
+            return
+        if cached.version != old_version:
+            # Changed elsewhere in between; next lookup rebuilds it
+            _unlink_movie(movie)
+            return
+        _unlink_movie(movie)
+        apply(cached)
+        cached.version = new_version
+        _link_movie(movie, cached)
+
+
+def record_append(movie: str, old_version: Version, new_version: Version, user: str) -> None:
+    _patch(movie, old_version, new_version, lambda m: m.append(user))
+
+
+def record_update(movie: str, old_version: Version, new_version: Version) -> None:
+    """A row was rewritten in place; its user (and so the map) is unchanged."""
+    _patch(movie, old_version, new_version, lambda m: None)
+
+
+def record_delete(movie: str, old_version: Version, new_version: Version, index: int) -> None:
+    _patch(movie, old_version, new_version, lambda m: m.delete(index))
+
+
+def record_rename(
+    movie: str,
+    old_version: Version,
+    new_version: Version,
+    old_user: str,
+    new_user: str,
+) -> None:
+    _patch(movie, old_version, new_version, lambda m: m.rename(old_user, new_user))
@@ -0,0 +1,390 @@
+"""
+Usefulness votes kept outside movieReviews.csv.
+
+Changing "Usefulness Vote"/"Total Votes" through update_review rewrites the
+whole CSV per click. Votes are instead recorded per movie in two sidecars:
+
+  data/imdb/<MovieTitle>/movieReviews.votes.json   (snapshot)
+  {
+    "voters":  {"<ReviewUser>": {"<Voter>": true|false, ...}, ...},
+    "pending": {"<ReviewUser>": [usefulDelta, totalDelta], ...},
+    "fold":    {"base": [mtime_ns, size], "deltas": {...}}   (while folding)
+  }
+  data/imdb/<MovieTitle>/movieReviews.votes.log    (JSON-lines journal)
+  {"user": "<ReviewUser>", "voter": "<Voter>", "useful": true}
+  {"user": "<ReviewUser>", "forget": true}          (review deleted)
+  {"rename": "<OldName>", "to": "<NewName>"}        (username changed)
+
+Each vote is one O_APPEND journal line written before vote() returns, so
+an acknowledged vote survives a crash and other workers see it (and its
+voter) on their next replay. Reads add the pending deltas on top of the
+CSV counts.
+
+Each voter has one vote per review: voting the same way again is a no-op,
+voting the other way flips it. Replaying a journal over a state that
+already holds a prefix of it gives the same state, which keeps folding
+crash-safe:
+
+  1. the journal is renamed aside (.folding); new votes start a new one
+  2. the snapshot is written with the voters and, under "fold", the
+     deltas being folded and the CSV version they apply to
+  3. the .folding journal is dropped, the CSV rewritten, and the snapshot
+     written again without "fold"
+
+A snapshot whose "fold" base still matches the CSV crashed before the
+rewrite; its deltas go back to "pending". A leftover .folding journal is
+replayed. Folds hold fileLock on the snapshot, so only one worker folds a
+movie at a time, and reviewsRepo.review_lock while rewriting the CSV, so a
+review written meanwhile is not lost.
+
+Sort orderings by usefulness add the pending usefulness deltas
+(pending_useful) to the CSV counts, so a vote moves its review right away.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import fileLock, reviewsRepo
+from .reviewFields import to_int
+
+SNAPSHOT_FILENAME = "movieReviews.votes.json"
+JOURNAL_FILENAME = "movieReviews.votes.log"
+FOLDING_FILENAME = JOURNAL_FILENAME + ".folding"
+
+VOTES_FOLD_AT = 5000
+
+
+def _stamp(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_ino)
+
+
+def _inode(path: Path) -> Optional[int]:
+    try:
+        return path.stat().st_ino
+    except FileNotFoundError:
+        return None
+
+
+class MovieVotes:
+    """Voter sets and pending count deltas for the reviews of one movie."""
+
+    def __init__(self, movie_dir: Path):
+        self.movie_dir = movie_dir
+        self.lock = threading.Lock()
+        self.voters: Dict[str, Dict[str, bool]] = {}
+        self.pending: Dict[str, List[int]] = {}
+        self.pending_votes = 0
+        self.snapshot_stamp: Optional[Tuple[int, int]] = None
+        self.journal_inode: Optional[int] = None
+        self.journal_offset = 0
+        self._reload()
+
+    @property
+    def snapshot_path(self) -> Path:
+        return self.movie_dir / SNAPSHOT_FILENAME
+
+    @property
+    def journal_path(self) -> Path:
+        return self.movie_dir / JOURNAL_FILENAME
+
+    @property
+    def folding_path(self) -> Path:
+        return self.movie_dir / FOLDING_FILENAME
+
+    @property
+    def csv_path(self) -> Path:
+        return self.movie_dir / "movieReviews.csv"
+
+    # ── Loading / syncing with other processes ──
+
+    def _read_snapshot(self) -> Dict[str, Any]:
+        try:
+            with self.snapshot_path.open("r", encoding="utf-8") as f:
+                return json.load(f) or {}
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _fold_unapplied(self, raw: Dict[str, Any]) -> bool:
+        fold = raw.get("fold")
+        if not fold:
+            return False
+        base = tuple(fold["base"]) if fold.get("base") else None
+        return base == reviewsRepo.review_file_version(self.csv_path)
+
+    def _recover_fold(self) -> None:
+        """A fold crashed before rewriting the CSV: put its deltas back in "pending"."""
+        with fileLock.file_lock(self.snapshot_path):
+            raw = self._read_snapshot()
+            if not self._fold_unapplied(raw):
+                return  # finished by the worker folding it
+            pending = raw.get("pending") or {}
+            for user, (useful, total) in raw["fold"]["deltas"].items():
+                delta = pending.setdefault(user, [0, 0])
+                delta[0] += useful
+                delta[1] += total
+            self._write_raw({"voters": raw.get("voters") or {}, "pending": pending})
+
+    def _reload(self) -> None:
+        if self._fold_unapplied(self._read_snapshot()):
+            self._recover_fold()
+        self.voters, self.pending, self.pending_votes = {}, {}, 0
+        self.snapshot_stamp = _stamp(self.snapshot_path)
+        raw = self._read_snapshot()
+        self.voters = raw.get("voters") or {}
+        # A "fold" left in the snapshot is already in the CSV (else recovered above)
+        self.pending = raw.get("pending") or {}
+        # A fold that crashed after renaming its journal aside
+        self._replay_file(self.folding_path, 0)
+        self.journal_inode = _inode(self.journal_path)
+        self.journal_offset = 0
+        self._replay_tail()
+
+    def _replay_file(self, path: Path, offset: int) -> int:
+        """Apply the complete lines of `path` after `offset`; returns bytes consumed."""
+        try:
+            with path.open("rb") as f:
+                f.seek(offset)
+                data = f.read()
+        except FileNotFoundError:
+            return 0
+        # Only consume complete lines; a partial last line is read next time
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            try:
+                self._apply(json.loads(line))
+            except (json.JSONDecodeError, KeyError, TypeError):
+                continue
+        return end
+
+    def _replay_tail(self) -> None:
+        self.journal_offset += self._replay_file(self.journal_path, self.journal_offset)
+
+    def sync(self) -> None:
+        journal_inode = _inode(self.journal_path)
+        moved = self.journal_inode is not None and journal_inode != self.journal_inode
+        if moved or _stamp(self.snapshot_path) != self.snapshot_stamp:
+            # Folded (or being folded) elsewhere
+            self._reload()
+        else:
+            self.journal_inode = journal_inode
+            self._replay_tail()
+
+    # ── State changes ──
+
+    def _apply(self, record: Dict[str, Any]) -> Optional[bool]:
+        """Apply one journal record; returns False for a duplicate vote."""
+        if "rename" in record:
+            self._rename(record["rename"], record["to"])
+            return None
+        user = record["user"]
+        if record.get("forget"):
+            self.voters.pop(user, None)
+            self.pending.pop(user, None)
+            return None
+        voter, useful = record["voter"], bool(record["useful"])
+        previous = self.voters.setdefault(user, {}).get(voter)
+        if previous == useful:
+            return False
+        delta = self.pending.setdefault(user, [0, 0])
+        if previous is None:
+            delta[1] += 1
+        delta[0] += (1 if useful else 0) - (1 if previous else 0)
+        self.voters[user][voter] = useful
+        self.pending_votes += 1
+        return True
+
+    def _rename(self, old: str, new: str) -> None:
+        # As review author
+        for table in (self.voters, self.pending):
+            if old in table and new not in table:
+                table[new] = table.pop(old)
+        # As voter
+        for voters in self.voters.values():
+            if old in voters and new not in voters:
+                voters[new] = voters.pop(old)
+
+    def involves(self, username: str) -> bool:
+        return username in self.voters or username in self.pending or any(
+            username in voters for voters in self.voters.values()
+        )
+
+    def record(self, record: Dict[str, Any]) -> None:
+        """Append one journal line; callers sync first and it is applied through sync."""
+        data = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        # Single O_APPEND write so concurrent processes never interleave lines
+        fd = os.open(self.journal_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+        self.sync()
+
+    def _write_raw(self, raw: Dict[str, Any]) -> None:
+        tmp = self.snapshot_path.with_name(SNAPSHOT_FILENAME + ".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(raw, f, ensure_ascii=False)
+        os.replace(tmp, self.snapshot_path)
+
+    def write_snapshot(self, fold: Optional[Dict[str, Any]] = None) -> None:
+        """Persist voters with pending deltas cleared (plus an in-progress `fold`)."""
+        raw: Dict[str, Any] = {"voters": self.voters, "pending": {}}
+        if fold is not None:
+            raw["fold"] = fold
+        self._write_raw(raw)
+        self.snapshot_stamp = _stamp(self.snapshot_path)
+
+
+# ─────────────────────────────────────────────────────────────
+# Module-level store
+# ─────────────────────────────────────────────────────────────
+
+_MOVIES: Dict[str, MovieVotes] = {}
+_LOCK = threading.Lock()
+
+
+def _movie_votes(movie: str) -> MovieVotes:
+    movie_dir = reviewsRepo.DATA_PATH / movie
+    key = str(movie_dir)
+    with _LOCK:
+        votes = _MOVIES.get(key)
+        if votes is None:
+            votes = MovieVotes(movie_dir)
+            _MOVIES[key] = votes
+        return votes
+
+
+def vote(movie: str, review_user: str, voter: str, useful: bool) -> bool:
+    """
+    Record `voter`'s vote on `review_user`'s review of `movie`.
+    Returns False if the voter already voted the same way.
+    """
+    votes = _movie_votes(movie)
+    with votes.lock:
+        votes.sync()
+        if votes.voters.get(review_user, {}).get(voter) == useful:
+            return False
+        votes.record({"user": review_user, "voter": voter, "useful": useful})
+        fold = votes.pending_votes >= VOTES_FOLD_AT
+    if fold:
+        fold_votes(movie)
+    return True
+
+
+def pending_delta(movie: str, review_user: str) -> Tuple[int, int]:
+    """(usefulDelta, totalDelta) not yet folded into the CSV."""
+    votes = _movie_votes(movie)
+    with votes.lock:
+        votes.sync()
+        useful, total = votes.pending.get(review_user, (0, 0))
+    return useful, total
+
+
+def pending_deltas(movie: str) -> Dict[str, Tuple[int, int]]:
+    """(usefulDelta, totalDelta) not yet folded into the CSV, per review user."""
+    votes = _movie_votes(movie)
+    with votes.lock:
+        votes.sync()
+        return {user: (delta[0], delta[1]) for user, delta in votes.pending.items()}
+
+
+def pending_useful(movie: str) -> Dict[str, int]:
+    """Usefulness delta not yet folded into the CSV, per review user."""
+    votes = _movie_votes(movie)
+    with votes.lock:
+        votes.sync()
+        return {user: delta[0] for user, delta in votes.pending.items() if delta[0]}
+
+
+def overlay(movie: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Add pending vote deltas to the vote columns of CSV rows (in place)."""
+    votes = _movie_votes(movie)
+    with votes.lock:
+        votes.sync()
+        pending = {user: list(delta) for user, delta in votes.pending.items()}
+    for row in rows:
+        delta = pending.get(row.get("User"))
+        if not delta:
+            continue
+        # Projected rows may leave out either column
+        if "Usefulness Vote" in row:
+            row["Usefulness Vote"] = str(to_int(row["Usefulness Vote"]) + delta[0])
+        if "Total Votes" in row:
+            row["Total Votes"] = str(to_int(row["Total Votes"]) + delta[1])
+    return rows
+
+
+def record_delete(movie: str, review_user: str) -> None:
+    """The review was deleted: drop its voters and pending deltas."""
+    votes = _movie_votes(movie)
+    with votes.lock:
+        votes.sync()
+        if review_user in votes.voters or review_user in votes.pending:
+            votes.record({"user": review_user, "forget": True})
+
+
+def rename_user(old_username: str, new_username: str) -> None:
+    """
+    Move `old_username`'s votes, as review author and as voter, to
+    `new_username` in every movie that has any, so pending deltas follow
+    the renamed rows and the old name keeps no voting history.
+    """
+    data_path = reviewsRepo.DATA_PATH
+    if not data_path.exists():
+        return
+    for movie_dir in data_path.iterdir():
+        if not ((movie_dir / SNAPSHOT_FILENAME).exists() or (movie_dir / JOURNAL_FILENAME).exists()):
+            continue
+        votes = _movie_votes(movie_dir.name)
+        with votes.lock:
+            votes.sync()
+            if votes.involves(old_username):
+                votes.record({"rename": old_username, "to": new_username})
+
+
+def fold_votes(movie: str) -> None:
+    """Write pending deltas into the movie's reviews file with a single rewrite."""
+    votes = _movie_votes(movie)
+    csv_path = votes.csv_path
+    with votes.lock, fileLock.file_lock(votes.snapshot_path):
+        votes.sync()
+        if not reviewsRepo.review_file_exists(csv_path):
+            return
+        # New votes go to a fresh journal while this one is folded
+        try:
+            os.replace(votes.journal_path, votes.folding_path)
+        except FileNotFoundError:
+            pass
+        # Lines appended since our last sync (replay is idempotent)
+        votes._replay_file(votes.folding_path, 0)
+        deltas = votes.pending
+        # Review appends, updates and deletes wait from the base version
+        # being recorded until the rewrite has landed
+        with reviewsRepo.review_lock(csv_path):
+            votes.write_snapshot(fold={
+                "base": list(reviewsRepo.review_file_version(csv_path) or ()),
+                "deltas": deltas,
+            })
+            votes.folding_path.unlink(missing_ok=True)
+            if deltas:
+                rows = reviewsRepo.load_all_reviews(movie)
+                for row in rows:
+                    delta = deltas.get(row.get("User"))
+                    if delta:
+                        row["Usefulness Vote"] = to_int(row.get("Usefulness Vote")) + delta[0]
+                        row["Total Votes"] = to_int(row.get("Total Votes")) + delta[1]
+                reviewsRepo.write_reviews_file(csv_path, rows)
+        votes.pending = {}
+        votes.pending_votes = 0
+        votes.write_snapshot()
+        # Votes journaled since the rename are replayed on the next sync
+        votes.journal_inode = _inode(votes.journal_path)
+        votes.journal_offset = 0
+        votes._replay_tail()
@@ -1,11 +1,20 @@
 from pathlib import Path
 import csv
-from typing import List, Dict, Any
+import os
+from contextlib import contextmanager
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from ..models.models import Review
 from ..repositories.moviesRepo import recompute_movie_ratings
+from . import fileLock, reviewSortIndex, reviewSearchIndex, reviewUserIndex, reviewVoteStore, reviewReportCounter, reportedReviewIndex, reviewStorage
 
 DATA_PATH = Path(__file__).resolve().parents[3] / "data" / "imdb"
 
+# Storage engine for reviews (see reviewStorage): "csv" (default),
+# "compressed" or "sqlite". The two file engines only differ in the format
+# full rewrites produce; reads follow whichever file the movie currently has,
+# with movieReviews.blocks taking precedence over movieReviews.csv.
+REVIEW_STORAGE = os.environ.get("REVIEW_STORAGE", "csv")
+
 
 CSV_HEADERS = [
     "Movie Title",
@@ -19,46 +28,210 @@ CSV_HEADERS = [
     "Reports"
 ]
 
+SORT_FIELDS = tuple(reviewSortIndex.SORT_FIELDS)
 
-def load_reviews(movieTitle: str, amount: int = 10) -> List[Dict[str, Any]]:
-    moviePath = DATA_PATH / movieTitle / "movieReviews.csv"
-    if not moviePath.exists():
+
+def _reviews_path(movieTitle: str) -> Path:
+    return DATA_PATH / movieTitle / "movieReviews.csv"
+
+
+def _storage() -> "reviewStorage.ReviewStorage":
+    return reviewStorage.get_storage(REVIEW_STORAGE)
+
+
+def stored_path(moviePath: Path) -> Path:
+    """The file actually holding a movie's reviews: .blocks if present, else the CSV."""
+    return reviewStorage.ENGINES["csv"].stored_path(moviePath)
+
+
+@contextmanager
+def review_lock(moviePath: Path) -> Iterator[None]:
+    """
+    Hold a movie's reviews for a read-modify-write: every write to the
+    reviews file (appends, updates, deletes and the vote/report folds that
+    rewrite it) runs under this lock, across threads and workers.
+
+    Take the vote and report stores' own locks before this one, never while
+    holding it.
+    """
+    with fileLock.file_lock(moviePath):
+        yield
+
+
+def review_file_exists(moviePath: Path) -> bool:
+    return _storage().exists(moviePath)
+
+
+def review_file_version(moviePath: Path) -> Optional[Tuple[int, int]]:
+    """
+    Cheap version stamp for a movie's reviews: (mtime_ns, size) of the file,
+    or the storage engine's equivalent. Used by in-memory indexes to detect
+    that the reviews changed underneath them.
+    Returns None if the movie has no reviews stored.
+    """
+    return _storage().version(moviePath)
+
+
+def reviews_version(movieTitle: str) -> Optional[Tuple[int, int]]:
+    return review_file_version(_reviews_path(movieTitle))
+
+
+def read_review_file(moviePath: Path) -> Tuple[List[str], List[Dict[str, Any]]]:
+    """
+    (fieldnames, rows) of a movie's reviews exactly as csv.DictReader returns
+    them, whichever storage engine the movie uses.
+    """
+    return _storage().read_all(moviePath)
+
+
+def _read_range(moviePath: Path, start: int, stop: int, **projection) -> List[Dict[str, Any]]:
+    return _storage().read_range(moviePath, start, stop, **projection)
+
+
+def _read_rows(moviePath: Path, indices: List[int], **projection) -> List[Dict[str, Any]]:
+    return _storage().read_rows(moviePath, indices, **projection)
+
+
+def _normalize_row(r: Dict[str, Any]) -> Dict[str, Any]:
+    # Normalize keys (strip whitespace) to avoid mismatched headers like ' Reports'
+    norm = { (k.strip() if k is not None else k): v for k, v in r.items() }
+    if "Review" in norm and norm["Review"] is not None:
+        norm["Review"] = norm["Review"].replace("\n", " ")  # replace newlines with space
+    return norm
+
+
+def read_review_rows(moviePath: Path, indices: List[int]) -> List[Dict[str, Any]]:
+    """
+    The rows at the given data-row indices of the reviews at moviePath
+    (normalized, in index order). Indices past the end are skipped.
+    """
+    return [_normalize_row(r) for r in _read_rows(moviePath, indices)]
+
+
+def load_reviews(
+    movieTitle: str,
+    amount: int = 10,
+    offset: int = 0,
+    sort_by: Optional[str] = None,
+    descending: bool = True,
+    fields: Optional[List[str]] = None,
+    preview_chars: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Return one page of reviews for a movie.
+
+    Without sort_by rows come back in file order. With sort_by
+    ("usefulness", "date" or "rating") the page is taken from the movie's
+    precomputed ordering instead of sorting all rows per request.
+
+    fields (CSV column names) limits the columns returned and preview_chars
+    cuts "Review" to that many characters; both are applied by the reader.
+    """
+    if sort_by is not None and sort_by not in SORT_FIELDS:
+        raise ValueError(f"Invalid sort field '{sort_by}'")
+
+    moviePath = _reviews_path(movieTitle)
+    if not review_file_exists(moviePath):
         return []
 
-    with moviePath.open("r", newline="", encoding="utf-8") as csvFile:
-        raw_rows = list(csv.DictReader(csvFile))
-        reviews = []
-        for r in raw_rows[:amount]:
-            # Normalize keys (strip whitespace) to avoid mismatched headers like ' Reports'
-            norm = { (k.strip() if k is not None else k): v for k, v in r.items() }
-            if "Review" in norm and norm["Review"] is not None:
-                norm["Review"] = norm["Review"].replace("\n", " ")  # replace newlines with space
-            reviews.append(norm)
-        return reviews
+    # Vote overlay matches rows on "User", so read it even if not requested
+    projection = {
+        "fields": None if fields is None else list(dict.fromkeys([*fields, "User"])),
+        "preview_chars": preview_chars,
+    }
+
+    # Rows are read through the mmap'ed offset index (or only the needed
+    # compressed blocks), so only the requested page is decoded and parsed
+    if sort_by is None:
+        raw_rows = _read_range(moviePath, offset, offset + amount, **projection)
+    else:
+        orderings = reviewSortIndex.get_orderings(
+            str(moviePath), reviews_version(movieTitle), lambda: load_all_reviews(movieTitle),
+            votes=reviewVoteStore.pending_useful(movieTitle),
+            locate=lambda user: reviewUserIndex.movie_rows(movieTitle, user),
+        )
+        indices = orderings.page(sort_by, offset, amount, descending)
+        raw_rows = _read_rows(moviePath, indices, **projection)
+    # Votes and reports not yet folded into the CSV
+    rows = reviewVoteStore.overlay(movieTitle, [_normalize_row(r) for r in raw_rows])
+    reviewReportCounter.overlay(moviePath.parent, rows)
+    if fields is not None and "User" not in fields:
+        for row in rows:
+            del row["User"]
+    return rows
 
 
 def load_all_reviews(movieTitle: str) -> List[Dict[str, Any]]:
-    moviePath = DATA_PATH / movieTitle / "movieReviews.csv"
-    if not moviePath.exists():
-        return []
+    return [_normalize_row(r) for r in read_review_file(_reviews_path(movieTitle))[1]]
+
+
+def load_reviews_by_user(username: str, amount: int = 10, offset: int = 0) -> List[Dict[str, Any]]:
+    """
+    One page of a user's reviews across all movies, ordered by movie title.
+    Only the CSVs that hold the page's rows are read.
+    """
+    located = reviewUserIndex.locate(username)[offset:offset + amount]
+
+    by_movie: Dict[str, List[int]] = {}
+    for movie, index in located:
+        by_movie.setdefault(movie, []).append(index)
+
+    reviews: List[Dict[str, Any]] = []
+    for movie, indices in by_movie.items():
+        rows = [_normalize_row(r) for r in _read_rows(_reviews_path(movie), indices)]
+        # Guards against the file changing between lookup and read
+        rows = [r for r in rows if r.get("User") == username]
+        reviewReportCounter.overlay(DATA_PATH / movie, rows)
+        reviews.extend(reviewVoteStore.overlay(movie, rows))
+    return reviews
+
+
+def find_indexed_review(movieTitle: str, username: str) -> Optional[Dict[str, Any]]:
+    """A user's review of one movie via the user index, with pending votes and reports applied."""
+    indices = reviewUserIndex.movie_rows(movieTitle, username)
+    rows = [_normalize_row(r) for r in _read_rows(_reviews_path(movieTitle), indices)]
+    rows = [r for r in rows if r.get("User") == username]
+    reviewReportCounter.overlay(DATA_PATH / movieTitle, rows)
+    return reviewVoteStore.overlay(movieTitle, rows)[0] if rows else None
 
-    with moviePath.open("r", newline="", encoding="utf-8") as csvFile:
-        raw_rows = list(csv.DictReader(csvFile))
-        rows: List[Dict[str, Any]] = []
-        for r in raw_rows:
-            # Normalize header keys (strip whitespace)
-            norm = { (k.strip() if k is not None else k): v for k, v in r.items() }
-            if "Review" in norm and norm["Review"] is not None:
-                norm["Review"] = norm["Review"].replace("\n", " ")  # remove newlines
-            rows.append(norm)
-        return rows
+
+def write_reviews_file(moviePath: Path, rows: List[Dict[str, Any]], fieldnames: List[str] = CSV_HEADERS) -> None:
+    """
+    Replace a movie's reviews in the configured storage engine. The file
+    engines write a temp file + os.replace, so readers holding the old file
+    mmap'ed keep a consistent copy.
+    """
+    _storage().rewrite(moviePath, rows, fieldnames)
+
+
+def _find_user_rows(movieTitle: str, username: str) -> List[Tuple[int, Dict[str, Any]]]:
+    return [
+        (i, r)
+        for i, r in _storage().find_user_rows(_reviews_path(movieTitle), username)
+        if r.get("Movie Title") == movieTitle
+    ]
+
+
+def find_user_row_at(moviePath: Path, username: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+    """
+    (rowIndex, row) of the first row written by `username` at moviePath, or
+    None. Engines look the user up in an index (reviewUserIndex for the file
+    engines, the (user, movie) index in SQLite) and read only their rows.
+    """
+    for i, r in _storage().find_user_rows(moviePath, username):
+        return i, r
+    return None
+
+
+def find_user_row(moviePath: Path, username: str) -> Optional[Dict[str, Any]]:
+    """First row written by `username` in the reviews at moviePath (normalized), or None."""
+    found = find_user_row_at(moviePath, username)
+    return found[1] if found else None
 
 
 def find_review_by_user(movieTitle: str, username: str):
-    rows = load_all_reviews(movieTitle)
-    for r in rows:
-        if r.get("User") == username:
-            return r
+    for _, r in _storage().find_user_rows(_reviews_path(movieTitle), username):
+        return r
     return None
 
 
@@ -82,11 +255,17 @@ def save_review(movieTitle: str, review: Review) -> None:
         "Reports": review.reportCount
     }
 
-    if moviePath.exists():
-        # Append using canonical CSV_HEADERS so fieldnames are consistent
-        with moviePath.open("a", newline="", encoding="utf-8") as csvFile:
-            writer = csv.DictWriter(csvFile, fieldnames=CSV_HEADERS)
-            writer.writerow(data)
+    if review_file_exists(moviePath):
+        with review_lock(moviePath):
+            old_version = reviews_version(movieTitle)
+            _storage().append_rows(moviePath, [data])
+            new_version = reviews_version(movieTitle)
+            reviewSortIndex.record_append(str(moviePath), old_version, new_version, data)
+            reviewSearchIndex.record_upsert(movieTitle, old_version, new_version, data)
+            reviewUserIndex.record_append(movieTitle, old_version, new_version, review.user)
+            reportedReviewIndex.record_append(
+                moviePath.parent, old_version, new_version, review.user, review.reportCount or 0
+            )
         # Recomputes fields after adding a review
         try:
             recompute_movie_ratings(movieTitle)
@@ -99,26 +278,27 @@ def save_review(movieTitle: str, review: Review) -> None:
 
 def update_review(movieTitle: str, username: str, updateFields: Dict[str, Any]) -> None:
     moviePath = DATA_PATH / movieTitle / "movieReviews.csv"
-    rows = load_all_reviews(movieTitle)
-
-    updated = False
-
-    for row in rows:
-        if row["Movie Title"] == movieTitle and row["User"] == username:
-            for key, value in updateFields.items():
-                if key in row:
-                    row[key] = value
-            updated = True
-            break
-
-    if not updated:
-        print("Unable to update (review not found)")
-        return
-
-    with moviePath.open("w", newline="", encoding="utf-8") as csvFile:
-        writer = csv.DictWriter(csvFile, fieldnames=CSV_HEADERS)
-        writer.writeheader()
-        writer.writerows(rows)
+    with review_lock(moviePath):
+        old_version = reviews_version(movieTitle)
+        found = _find_user_rows(movieTitle, username)
+
+        if not found:
+            print("Unable to update (review not found)")
+            return
+
+        updated_index, row = found[0]
+        for key, value in updateFields.items():
+            if key in row:
+                row[key] = value
+
+        _storage().update_row(moviePath, updated_index, row)
+        new_version = reviews_version(movieTitle)
+        reviewSortIndex.record_update(
+            str(moviePath), old_version, new_version, updated_index, row
+        )
+        reviewSearchIndex.record_upsert(movieTitle, old_version, new_version, row)
+        reviewUserIndex.record_update(movieTitle, old_version, new_version)
+        reportedReviewIndex.record_update(moviePath.parent, old_version, new_version, updated_index, row)
     # Recompute after updating a review
     try:
         recompute_movie_ratings(movieTitle)
@@ -128,21 +308,26 @@ def update_review(movieTitle: str, username: str, updateFields: Dict[str, Any])
 
 def delete_review(movieTitle: str, username: str) -> None:
     moviePath = DATA_PATH / movieTitle / "movieReviews.csv"
-    rows = load_all_reviews(movieTitle)
-
-    new_rows = [
-        r for r in rows
-        if not (r["Movie Title"] == movieTitle and r["User"] == username)
-    ]
+    with review_lock(moviePath):
+        old_version = reviews_version(movieTitle)
+        deleted = [i for i, _ in _find_user_rows(movieTitle, username)]
 
-    if len(new_rows) == len(rows):
-        print("Unable to delete (review not found)")
-        return
+        if not deleted:
+            print("Unable to delete (review not found)")
+            return
 
-    with moviePath.open("w", newline="", encoding="utf-8") as csvFile:
-        writer = csv.DictWriter(csvFile, fieldnames=CSV_HEADERS)
-        writer.writeheader()
-        writer.writerows(new_rows)
+        _storage().delete_rows(moviePath, deleted)
+        new_version = reviews_version(movieTitle)
+        reviewSearchIndex.record_delete(movieTitle, old_version, new_version, username)
+        # Delete from the back so earlier indices stay valid
+        for index in reversed(deleted):
+            reviewSortIndex.record_delete(str(moviePath), old_version, new_version, index)
+            reviewUserIndex.record_delete(movieTitle, old_version, new_version, index)
+            reportedReviewIndex.record_delete(moviePath.parent, old_version, new_version, index)
+            old_version = new_version
+    # Outside review_lock: the stores take their own lock first when folding
+    reviewVoteStore.record_delete(movieTitle, username)
+    reviewReportCounter.record_delete(moviePath.parent, username)
 
     print("Deletion successful")
     try:
@@ -1,12 +1,24 @@
+from contextlib import contextmanager
 from pathlib import Path
 import json, os
-from typing import List, Dict, Any, Optional
+from typing import Iterator, List, Dict, Any, Optional
 from ..models.models import User
+from . import fileLock
 
 # Path to users.json
 DATA_PATH = Path(__file__).resolve().parents[3] / "data" / "users.json"
 USERS_FILE = os.path.join("data", "users.json")
 
+@contextmanager
+def users_lock() -> Iterator[None]:
+    """
+    Hold the users.json lock (threads and worker processes) around a
+    load_users → modify → save_users sequence, so two writers can't
+    overwrite each other's changes. Re-entrant within a thread.
+    """
+    with fileLock.file_lock(DATA_PATH):
+        yield
+
 def load_users() -> List[Dict[str, Any]]:
     """
     Load all users from users.json. 
@@ -21,18 +33,20 @@ def save_users(users: List[Dict[str, Any]]):
     """
     Save the full list of users to users.json safely using a temporary file.
     """
-    tmp = DATA_PATH.with_suffix(".tmp")
-    with tmp.open("w", encoding="utf-8") as f:
-        json.dump(users, f, ensure_ascii=False, indent=2)
-    os.replace(tmp, DATA_PATH)
+    with users_lock():
+        tmp = DATA_PATH.with_suffix(".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(users, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, DATA_PATH)
 
 def add_user(new_user: Dict[str, Any]):
     """
     Add a new user to users.json.
     """
-    users = load_users()
-    users.append(new_user)
-    save_users(users)
+    with users_lock():
+        users = load_users()
+        users.append(new_user)
+        save_users(users)
 
 def find_user_by_username(username: str) -> Dict[str, Any] | None:
     """
@@ -48,36 +62,39 @@ def update_user(username: str, updated_fields: Dict[str, Any]):
     """
     Update an existing user with new fields. Raises ValueError if not found.
     """
-    users = load_users()
-    for idx, user in enumerate(users):
-        if user.get("userName") == username:
-            users[idx].update(updated_fields)
-            save_users(users)
-            return
+    with users_lock():
+        users = load_users()
+        for idx, user in enumerate(users):
+            if user.get("userName") == username:
+                users[idx].update(updated_fields)
+                save_users(users)
+                return
     raise ValueError(f"User '{username}' not found")
 
 def delete_user(username: str):
     """
     Delete a user by username. Raises ValueError if not found.
     """
-    users = load_users()
-    for idx, user in enumerate(users):
-        if user.get("userName") == username:
-            users.pop(idx)
-            save_users(users)
-            return
+    with users_lock():
+        users = load_users()
+        for idx, user in enumerate(users):
+            if user.get("userName") == username:
+                users.pop(idx)
+                save_users(users)
+                return
     raise ValueError(f"User '{username}' not found")
 
 def update_user_record(updated_user: dict) -> dict:
     """
     Replace a user record in users.json by userName and return the updated dict.
     """
-    users = load_users()
-    for idx, user in enumerate(users):
-        if user.get("userName") == updated_user.get("userName"):
-            users[idx] = updated_user
-            save_users(users)
-            return updated_user
+    with users_lock():
+        users = load_users()
+        for idx, user in enumerate(users):
+            if user.get("userName") == updated_user.get("userName"):
+                users[idx] = updated_user
+                save_users(users)
+                return updated_user
     raise ValueError("User not found when attempting to update")
 
 
@@ -100,31 +117,33 @@ def add_to_watchlist(username: str, movie_title: str) -> List[str]:
     """
     Add a movie title to a user's watchlist (idempotent).
     """
-    user = find_user_by_username(username)
-    if not user:
-        raise ValueError("User not found")
+    with users_lock():
+        user = find_user_by_username(username)
+        if not user:
+            raise ValueError("User not found")
 
-    watchlist = user.get("watchlist") or []
-    if movie_title not in watchlist:
-        watchlist.append(movie_title)
-        user["watchlist"] = watchlist
-        update_user_record(user)
+        watchlist = user.get("watchlist") or []
+        if movie_title not in watchlist:
+            watchlist.append(movie_title)
+            user["watchlist"] = watchlist
+            update_user_record(user)
 
-    return watchlist
+        return watchlist
 
 
 def remove_from_watchlist(username: str, movie_title: str) -> List[str]:
     """
     Remove a movie title from a user's watchlist (no error if not present).
     """
-    user = find_user_by_username(username)
-    if not user:
-        raise ValueError("User not found")
+    with users_lock():
+        user = find_user_by_username(username)
+        if not user:
+            raise ValueError("User not found")
 
-    watchlist = user.get("watchlist") or []
-    if movie_title in watchlist:
-        watchlist.remove(movie_title)
-        user["watchlist"] = watchlist
-        update_user_record(user)
+        watchlist = user.get("watchlist") or []
+        if movie_title in watchlist:
+            watchlist.remove(movie_title)
+            user["watchlist"] = watchlist
+            update_user_record(user)
 
-    return watchlist
\ No newline at end of file
+        return watchlist
\ No newline at end of file
@@ -1,18 +1,23 @@
 from passlib.hash import bcrypt
 from typing import Dict, Any
 from pathlib import Path
-import json
-import csv
 
-from ..repositories.usersRepo import load_users, save_users, add_user, update_user
+from ..repositories.usersRepo import load_users, save_users, add_user, update_user, users_lock
 from ..repositories.adminRepo import load_admins
-from ..repositories.reviewsRepo import DATA_PATH as REVIEWS_DATA_PATH
+from ..repositories import (
+    activeBans,
+    moderationRepo,
+    reportedReviewIndex,
+    reviewReportCounter,
+    reviewsRepo,
+    reviewUserIndex,
+    reviewVoteStore,
+)
+from ..repositories.reviewsRepo import write_reviews_file
 
 # Project/data paths
 PROJECT_ROOT = Path(__file__).resolve().parents[3]
 DATA_DIR = PROJECT_ROOT / "data"
-BANS_JSON = DATA_DIR / "bans.json"
-REPORTS_JSON = DATA_DIR / "reports.json"
 
 
 # !!! ADMINS WILL BE MADE MANUALLY, NO REGISTRATION FOR ADMINS THUS NO ENDPOINT !!!
@@ -142,7 +147,8 @@ class AuthService:
         - users.json (userName field)
         - bans.json (userName, reportedBy, reviewUser)
         - reports.json (review.user, reportedBy)
-        - all review CSVs under data/imdb (User column)
+        - the review CSVs under data/imdb that hold the user's reviews (User column)
+        - the usefulness vote store (as review author and as voter)
         """
 
         if not new_username:
@@ -152,75 +158,33 @@ class AuthService:
             raise ValueError("New username must be different from current username")
 
         # 1) users.json
-        users = load_users()
-        found = False
-        for u in users:
-            if u.get("userName") == current_username:
-                u["userName"] = new_username
-                found = True
-
-        if not found:
-            raise ValueError("User not found")
-
-        save_users(users)
-
-        # 2) bans.json
-        if BANS_JSON.exists():
-            with BANS_JSON.open("r", encoding="utf-8") as f:
-                bans = json.load(f)
-
-            bans_changed = False
-            for b in bans:
-                # userName (who is banned)
-                if b.get("userName") == current_username:
-                    b["userName"] = new_username
-                    bans_changed = True
-                # reportedBy (who reported)
-                if b.get("reportedBy") == current_username:
-                    b["reportedBy"] = new_username
-                    bans_changed = True
-                # reviewUser (author of review that was banned)
-                if b.get("reviewUser") == current_username:
-                    b["reviewUser"] = new_username
-                    bans_changed = True
-
-            if bans_changed:
-                tmp = BANS_JSON.with_suffix(".tmp")
-                with tmp.open("w", encoding="utf-8") as f:
-                    json.dump(bans, f, ensure_ascii=False, indent=2)
-                tmp.replace(BANS_JSON)
-
-        # 3) reports.json
-        if REPORTS_JSON.exists():
-            with REPORTS_JSON.open("r", encoding="utf-8") as f:
-                reports = json.load(f)
-
-            reports_changed = False
-            for r in reports:
-                # reportedBy (if present)
-                if r.get("reportedBy") == current_username:
-                    r["reportedBy"] = new_username
-                    reports_changed = True
-
-                review = r.get("review") or {}
-                # review.user (author of the review)
-                if review.get("user") == current_username:
-                    review["user"] = new_username
-                    reports_changed = True
-
-            if reports_changed:
-                tmp = REPORTS_JSON.with_suffix(".tmp")
-                with tmp.open("w", encoding="utf-8") as f:
-                    json.dump(reports, f, ensure_ascii=False, indent=2)
-                tmp.replace(REPORTS_JSON)
-
-        # 4) All movie review CSVs (data/imdb/*.csv)
-        if REVIEWS_DATA_PATH.exists():
-            for csv_path in REVIEWS_DATA_PATH.glob("*/*.csv"):
-                with csv_path.open("r", newline="", encoding="utf-8") as f:
-                    reader = csv.DictReader(f)
-                    rows = list(reader)
-                    fieldnames = reader.fieldnames or []
+        with users_lock():
+            users = load_users()
+            found = False
+            for u in users:
+                if u.get("userName") == current_username:
+                    u["userName"] = new_username
+                    found = True
+
+            if not found:
+                raise ValueError("User not found")
+
+            save_users(users)
+            activeBans.rename(current_username, new_username)
+
+        # 2) bans.json and 3) reports.json, through moderationRepo's stores
+        # and locks so the updates land in the live journals
+        moderationRepo.rename_user_in_bans(current_username, new_username)
+        moderationRepo.rename_user_in_reports(current_username, new_username)
+
+        # 4) Review CSVs – only the movies the user index says they reviewed
+        for movie in reviewUserIndex.movies_for_user(current_username):
+            csv_path = reviewsRepo.DATA_PATH / movie / "movieReviews.csv"
+            # Pending report counts are keyed by username; fold them in first
+            reviewReportCounter.fold_reports(csv_path.parent)
+            with reviewsRepo.review_lock(csv_path):
+                old_version = reviewsRepo.reviews_version(movie)
+                fieldnames, rows = reviewsRepo.read_review_file(csv_path)
 
                 rows_changed = False
                 for row in rows:
@@ -229,7 +193,14 @@ class AuthService:
                         rows_changed = True
 
                 if rows_changed:
-                    with csv_path.open("w", newline="", encoding="utf-8") as f:
-                        writer = csv.DictWriter(f, fieldnames=fieldnames)
-                        writer.writeheader()
-                        writer.writerows(rows)
\ No newline at end of file
+                    write_reviews_file(csv_path, rows, fieldnames)
+                    new_version = reviewsRepo.reviews_version(movie)
+                    reviewUserIndex.record_rename(
+                        movie, old_version, new_version, current_username, new_username,
+                    )
+                    reportedReviewIndex.record_rename(
+                        csv_path.parent, old_version, new_version, current_username, new_username,
+                    )
+
+        # 5) Votes: pending deltas are keyed by author, dedup entries by voter
+        reviewVoteStore.rename_user(current_username, new_username)
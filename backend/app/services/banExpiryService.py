@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..repositories import activeBans
+from ..repositories.usersRepo import load_users, save_users, users_lock
+
+logger = logging.getLogger(__name__)
+
+# Longest the sweeper sleeps, so bans set by other code paths are still
+# picked up reasonably soon after they run out
+SWEEP_INTERVAL_SECONDS = 60.0
+
+
+class BanExpiryService:
+    """
+    Clears ban expiries that have run out.
+
+    Expired bans are popped from the active-ban heap (activeBans) and their
+    banExpiresAt is removed from users.json in one write per sweep. Each
+    expiry is logged as a "ban expired" event; running totals are kept in
+    `metrics`.
+
+    Every uvicorn worker runs a sweeper, but a sweep holds the users.json
+    lock from the pop to the write. The pop moves activeBans' signal file
+    and the others reload when it moved, so once one worker has cleared an
+    expiry the others pop nothing and don't touch the file.
+    """
+
+    def __init__(self):
+        self.metrics: Dict[str, Any] = {
+            "sweeps": 0,
+            "expired": 0,
+            "userWrites": 0,
+            "lastSweepAt": None,
+            "lastSweepSeconds": None,
+        }
+
+    def sweep(self, now: Optional[float] = None) -> List[str]:
+        """Expire every ban that has run out by `now`; returns the usernames."""
+        started = time.perf_counter()
+        now = time.time() if now is None else now
+        with users_lock():
+            expired: List[Tuple[str, float]] = activeBans.pop_expired(now)
+            if expired:
+                expiries = dict(expired)
+                users = load_users()
+                changed = False
+                for user in users:
+                    name = user.get("userName")
+                    # Leave a newer ban written since the table was fed untouched
+                    if name in expiries and _same_expiry(user.get("banExpiresAt"), expiries[name]):
+                        del user["banExpiresAt"]
+                        changed = True
+                if changed:
+                    save_users(users)
+                    self.metrics["userWrites"] += 1
+
+        for name, expires_at in expired:
+            logger.info("ban expired", extra={"userName": name, "banExpiresAt": expires_at})
+
+        self.metrics["sweeps"] += 1
+        self.metrics["expired"] += len(expired)
+        self.metrics["lastSweepAt"] = now
+        self.metrics["lastSweepSeconds"] = round(time.perf_counter() - started, 6)
+        return [name for name, _ in expired]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current metrics plus the size of the active-ban set."""
+        return {**self.metrics, "activeBans": activeBans.active_count(), "nextExpiry": activeBans.next_expiry()}
+
+    async def run(self, stop: asyncio.Event) -> None:
+        """
+        Sweep until `stop` is set, sleeping until the next expiry (at most
+        SWEEP_INTERVAL_SECONDS). Sweeps run in a worker thread since they
+        touch users.json.
+        """
+        while not stop.is_set():
+            try:
+                await asyncio.to_thread(self.sweep)
+                next_expiry = await asyncio.to_thread(activeBans.next_expiry)
+            except Exception:
+                logger.exception("ban expiry sweep failed")
+                next_expiry = None
+            delay = SWEEP_INTERVAL_SECONDS
+            if next_expiry is not None:
+                delay = min(delay, max(next_expiry - time.time(), 0.0) + 0.01)
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+
+def _same_expiry(stored: Any, expires_at: float) -> bool:
+    try:
+        return float(stored) == float(expires_at)
+    except (TypeError, ValueError):
+        return False
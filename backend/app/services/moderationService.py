@@ -1,16 +1,20 @@
 from __future__ import annotations
 
-from typing import List, Optional, Tuple, Literal
+from typing import Any, Dict, List, Optional, Tuple, Literal
 from datetime import datetime
 
 from ..models.models import (
     Report,
     ReportCreate,
     ReportDecisionRequest,
+    ReportDecisionItem,
+    ReportDecisionResult,
+    ReportGroup,
+    ModerationStats,
     Ban,
 )
-from ..repositories import moderationRepo
-from ..repositories.usersRepo import load_users, save_users
+from ..repositories import activeBans, moderationRepo
+from ..repositories.usersRepo import load_users, save_users, users_lock
 
 
 # Types for clarity only (no runtime behaviour change)
@@ -24,6 +28,9 @@ BAN_OPTION_TO_SECONDS: dict[BanOption, int] = {
     "30d": 30 * 24 * 3600,
 }
 
+# Upper bound on entries in one POST /moderation/reports/decisions
+MAX_BATCH_DECISIONS = 1000
+
 
 class ModerationService:
     """
@@ -79,6 +86,39 @@ class ModerationService:
         """
         return moderationRepo.list_reports(status=status)
 
+    def page_reports(
+        self,
+        status: Optional[ReportStatus] = None,
+        reason_type: Optional[str] = None,
+        reported_by: Optional[str] = None,
+        movie_title: Optional[str] = None,
+        cursor: Optional[str] = None,
+        amount: int = 20,
+        descending: bool = True,
+        include_body: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Admin story: page through reports newest (or oldest) first, filtered
+        by status, reason type, reporter and movie. With include_body=False
+        the review snapshots leave out the review body.
+
+        Returns {"items": [...], "nextCursor": str | None}.
+        """
+        reports, next_cursor = moderationRepo.page_reports(
+            status=status,
+            reason_type=reason_type,
+            reported_by=reported_by,
+            movie_title=movie_title,
+            cursor=cursor,
+            amount=amount,
+            descending=descending,
+        )
+        exclude = None if include_body else {"review": {"body"}}
+        return {
+            "items": [r.model_dump(mode="json", exclude=exclude) for r in reports],
+            "nextCursor": next_cursor,
+        }
+
     def list_reports_for_review(
         self,
         movie_title: str,
@@ -107,75 +147,243 @@ class ModerationService:
           - confirm → status=confirmed, penalties incremented for registered user,
                       optional ban created & logged in bans.json + banExpiresAt updated.
         """
-        report = moderationRepo.get_report_by_id(report_id)
-        if report is None:
-            raise ValueError("Report not found")
-
-        if report.status in ("confirmed", "rejected"):
-            raise ValueError("Report already decided")
-
-        now = datetime.utcnow()
-
-        # Common fields for both paths
-        report.handledByAdmin = admin_username
-        report.handledAt = now
+        # The status check and every write happen under the reports lock, so
+        # a report can only be decided once
+        with moderationRepo.reports_locked():
+            report = moderationRepo.get_report_by_id(report_id)
+            if report is None:
+                raise ValueError("Report not found")
+
+            if report.status in ("confirmed", "rejected"):
+                raise ValueError("Report already decided")
+
+            now = datetime.utcnow()
+
+            # Common fields for both paths
+            report.handledByAdmin = admin_username
+            report.handledAt = now
+
+            if decision.action == "reject":
+                # ── Reject branch ──
+                report.status = "rejected"
+                report.banDurationSeconds = None
+
+                moderationRepo.replace_report(report)
+                return report, None
+
+            # ── Confirm branch ──
+            report.status = "confirmed"
+
+            # 3.1 Increment penalties for registered users
+            self._increment_penalties_for_review_author(report)
+
+            # 3.2 Ban handling
+            ban_obj: Optional[Ban] = None
+
+            if decision.banOption is None:
+                # Confirm but no ban
+                report.banDurationSeconds = None
+                moderationRepo.replace_report(report)
+                return report, None
+
+            # Confirm with ban
+            ban_option = decision.banOption
+            if ban_option not in BAN_OPTION_TO_SECONDS:
+                raise ValueError(f"Invalid ban option: {ban_option}")
+
+            ban_duration_seconds = BAN_OPTION_TO_SECONDS[ban_option]  # type: ignore[arg-type]
+            report.banDurationSeconds = ban_duration_seconds
+
+            # Create ban record in bans.json
+            review_snapshot = report.review
+            ban_obj = moderationRepo.add_ban(
+                user_name=review_snapshot.user,
+                reported_by=report.reportedBy,
+                report_id=report.reportId,
+                movie_title=review_snapshot.movieTitle,
+                review_user=review_snapshot.user,
+                reason_type=report.reasonType,
+                reason=report.reason,
+                ban_option=ban_option,
+                ban_duration_seconds=ban_duration_seconds,
+                banned_at=now,
+            )
+
+            # 3.3 Update banExpiresAt for registered users (if they exist)
+            self._update_ban_expires_for_user(
+                username=review_snapshot.user,
+                banned_until=ban_obj.bannedUntil,
+            )
+
+            # 3.4 Persist updated report
+            moderationRepo.replace_report(report)
 
-        if decision.action == "reject":
-            # ── Reject branch ──
-            report.status = "rejected"
-            report.banDurationSeconds = None
+            return report, ban_obj
 
-            moderationRepo.replace_report(report)
-            return report, None
+    def decide_reports(
+        self,
+        decisions: List[ReportDecisionItem],
+        admin_username: str,
+    ) -> List[ReportDecisionResult]:
+        """
+        Implements POST /moderation/reports/decisions.
 
-        # ── Confirm branch ──
-        report.status = "confirmed"
+        Every entry is decided like decide_report, but as one unit of work:
+        the reports, bans and users files are each written once at most.
+        Penalties are added up per review author, and a user banned by
+        several entries gets the latest bannedUntil among them.
 
-        # 3.1 Increment penalties for registered users
-        self._increment_penalties_for_review_author(report)
+        Entries that can't be decided (unknown or already decided report,
+        repeated reportId) are reported back with ok=false; the rest are
+        still applied.
+        """
+        if not decisions:
+            raise ValueError("No decisions given")
+        if len(decisions) > MAX_BATCH_DECISIONS:
+            raise ValueError(f"At most {MAX_BATCH_DECISIONS} decisions per request")
+
+        # One unit of work: no other request or worker can decide these
+        # reports between the "already decided" check and the writes
+        with moderationRepo.reports_locked():
+            now = datetime.utcnow()
+            results: List[ReportDecisionResult] = []
+            decided: List[Report] = []
+            ban_specs: List[dict] = []
+            ban_results: List[ReportDecisionResult] = []
+            penalties: Dict[str, int] = {}
+            seen = set()
+
+            for decision in decisions:
+                report_id = decision.reportId
+                report = None if report_id in seen else moderationRepo.get_report_by_id(report_id)
+                error = None
+                if report_id in seen:
+                    error = "Duplicate reportId in batch"
+                elif report is None:
+                    error = "Report not found"
+                elif report.status in ("confirmed", "rejected"):
+                    error = "Report already decided"
+                seen.add(report_id)
+                if error is not None:
+                    results.append(ReportDecisionResult(reportId=report_id, ok=False, error=error))
+                    continue
+
+                report.handledByAdmin = admin_username
+                report.handledAt = now
+                report.banDurationSeconds = None
+                result = ReportDecisionResult(reportId=report_id, ok=True, report=report)
+                results.append(result)
+                decided.append(report)
+
+                if decision.action == "reject":
+                    report.status = "rejected"
+                    continue
+
+                report.status = "confirmed"
+                review_author = report.review.user
+                penalties[review_author] = penalties.get(review_author, 0) + 1
+
+                if decision.banOption is not None:
+                    ban_duration_seconds = BAN_OPTION_TO_SECONDS[decision.banOption]
+                    report.banDurationSeconds = ban_duration_seconds
+                    ban_specs.append(dict(
+                        user_name=review_author,
+                        reported_by=report.reportedBy,
+                        report_id=report.reportId,
+                        movie_title=report.review.movieTitle,
+                        review_user=review_author,
+                        reason_type=report.reasonType,
+                        reason=report.reason,
+                        ban_option=decision.banOption,
+                        ban_duration_seconds=ban_duration_seconds,
+                        banned_at=now,
+                    ))
+                    ban_results.append(result)
+
+            # One write per affected file: bans, users, reports
+            banned_until: Dict[str, datetime] = {}
+            if ban_specs:
+                for result, ban in zip(ban_results, moderationRepo.add_bans(ban_specs)):
+                    result.ban = ban
+                    if ban.userName not in banned_until or ban.bannedUntil > banned_until[ban.userName]:
+                        banned_until[ban.userName] = ban.bannedUntil
+
+            if penalties or banned_until:
+                self._apply_user_penalties(penalties, banned_until)
+
+            if decided:
+                moderationRepo.replace_reports(decided)
+
+            return results
 
-        # 3.2 Ban handling
-        ban_obj: Optional[Ban] = None
+    # ─────────────────────────────────────────────
+    # 3b. Grouped queue (one entry per reported review)
+    # ─────────────────────────────────────────────
 
-        if decision.banOption is None:
-            # Confirm but no ban
-            report.banDurationSeconds = None
-            moderationRepo.replace_report(report)
-            return report, None
-
-        # Confirm with ban
-        ban_option = decision.banOption
-        if ban_option not in BAN_OPTION_TO_SECONDS:
-            raise ValueError(f"Invalid ban option: {ban_option}")
-
-        ban_duration_seconds = BAN_OPTION_TO_SECONDS[ban_option]  # type: ignore[arg-type]
-        report.banDurationSeconds = ban_duration_seconds
-
-        # Create ban record in bans.json
-        review_snapshot = report.review
-        ban_obj = moderationRepo.add_ban(
-            user_name=review_snapshot.user,
-            reported_by=report.reportedBy,
-            report_id=report.reportId,
-            movie_title=review_snapshot.movieTitle,
-            review_user=review_snapshot.user,
-            reason_type=report.reasonType,
-            reason=report.reason,
-            ban_option=ban_option,
-            ban_duration_seconds=ban_duration_seconds,
-            banned_at=now,
-        )
+    def list_report_groups(self, amount: int = 20, offset: int = 0) -> List[ReportGroup]:
+        """
+        Admin story: see the pending work once per review instead of once
+        per report.
+        """
+        return moderationRepo.list_report_groups(amount=amount, offset=offset)
 
-        # 3.3 Update banExpiresAt for registered users (if they exist)
-        self._update_ban_expires_for_user(
-            username=review_snapshot.user,
-            banned_until=ban_obj.bannedUntil,
-        )
+    def next_report_groups(self, k: int = 10) -> List[ReportGroup]:
+        """
+        Admin story: the k pending reviews with the most impact, scored on
+        report count, report rate, author penalties and review visibility.
+        """
+        return moderationRepo.next_report_groups(k=k)
 
-        # 3.4 Persist updated report
-        moderationRepo.replace_report(report)
+    def decide_report_group(
+        self,
+        movie_title: str,
+        review_user: str,
+        decision: ReportDecisionRequest,
+        admin_username: str,
+    ) -> Tuple[List[Report], Optional[Ban]]:
+        """
+        Resolve every pending report against one review with one decision.
 
-        return report, ban_obj
+        The group counts as one offence: confirm adds a single penalty and,
+        with a banOption, creates a single ban tied to the latest report.
+        Reports, bans and users are each written once.
+        """
+        # Under the reports lock, like decide_reports
+        with moderationRepo.reports_locked():
+            reports = moderationRepo.list_group_reports(movie_title, review_user)
+            if not reports:
+                raise ValueError("No pending reports for this review")
+
+            now = datetime.utcnow()
+            latest = max(reports, key=lambda r: (r.dateReported, r.reportId))
+            for report in reports:
+                report.handledByAdmin = admin_username
+                report.handledAt = now
+                report.banDurationSeconds = None
+                report.status = "rejected" if decision.action == "reject" else "confirmed"
+
+            ban: Optional[Ban] = None
+            if decision.action == "confirm":
+                banned_until: Dict[str, datetime] = {}
+                if decision.banOption is not None:
+                    latest.banDurationSeconds = BAN_OPTION_TO_SECONDS[decision.banOption]
+                    ban = moderationRepo.add_bans([dict(
+                        user_name=review_user,
+                        reported_by=latest.reportedBy,
+                        report_id=latest.reportId,
+                        movie_title=movie_title,
+                        review_user=review_user,
+                        reason_type=latest.reasonType,
+                        reason=latest.reason,
+                        ban_option=decision.banOption,
+                        ban_duration_seconds=latest.banDurationSeconds,
+                        banned_at=now,
+                    )])[0]
+                    banned_until[review_user] = ban.bannedUntil
+                self._apply_user_penalties({review_user: 1}, banned_until)
+
+            moderationRepo.replace_reports(reports)
+            return reports, ban
 
     # ─────────────────────────────────────────────
     # 3a. Helpers: penalties + banExpiresAt
@@ -188,25 +396,58 @@ class ModerationService:
         CSV-only reviewers (no users.json entry) are ignored here.
         """
         review_author = report.review.user
-        users = load_users()
-        updated = False
-
-        for user in users:
-            if user.get("userName") == review_author:
-                # Ensure penalties field exists and is int-like
-                penalties = user.get("penalties", 0)
-                try:
-                    penalties = int(penalties)
-                except (ValueError, TypeError):
-                    penalties = 0
-                user["penalties"] = penalties + 1
-                updated = True
-                break
-
-        if updated:
-            save_users(users)
+        with users_lock():
+            users = load_users()
+            updated = False
+
+            for user in users:
+                if user.get("userName") == review_author:
+                    # Ensure penalties field exists and is int-like
+                    penalties = user.get("penalties", 0)
+                    try:
+                        penalties = int(penalties)
+                    except (ValueError, TypeError):
+                        penalties = 0
+                    user["penalties"] = penalties + 1
+                    updated = True
+                    break
+
+            if updated:
+                save_users(users)
         # If not found → CSV-only reviewer; nothing to update.
 
+    def _apply_user_penalties(
+        self,
+        penalties: Dict[str, int],
+        banned_until: Dict[str, datetime],
+    ) -> None:
+        """
+        Batch form of the two helpers below: add penalties and set
+        banExpiresAt for several registered users with one users.json write.
+        """
+        with users_lock():
+            users = load_users()
+            updated = False
+
+            for user in users:
+                name = user.get("userName")
+                if name in penalties:
+                    try:
+                        current = int(user.get("penalties", 0))
+                    except (ValueError, TypeError):
+                        current = 0
+                    user["penalties"] = current + penalties[name]
+                    updated = True
+                if name in banned_until:
+                    user["banExpiresAt"] = int(banned_until[name].timestamp())
+                    updated = True
+
+            if updated:
+                save_users(users)
+                for user in users:
+                    if user.get("userName") in banned_until:
+                        activeBans.set_ban(user["userName"], user["banExpiresAt"])
+
     def _update_ban_expires_for_user(self, username: str, banned_until: datetime) -> None:
         """
         For registered users, set banExpiresAt to the Unix timestamp of banned_until.
@@ -214,18 +455,21 @@ class ModerationService:
         If user doesn't exist in users.json → do nothing (CSV-only reviewer).
         If user already has a future banExpiresAt → we simply overwrite with this latest ban.
         """
-        users = load_users()
-        updated = False
-        ts = int(banned_until.timestamp())
-
-        for user in users:
-            if user.get("userName") == username:
-                user["banExpiresAt"] = ts
-                updated = True
-                break
-
-        if updated:
-            save_users(users)
+        with users_lock():
+            users = load_users()
+            updated = False
+            ts = int(banned_until.timestamp())
+
+            for user in users:
+                if user.get("userName") == username:
+                    user["banExpiresAt"] = ts
+                    updated = True
+                    break
+
+            if updated:
+                save_users(users)
+                # Keep the in-memory ban table used by ensure_not_banned in step
+                activeBans.set_ban(username, ts)
 
     # ─────────────────────────────────────────────
     # 4. Bans listing
@@ -238,4 +482,25 @@ class ModerationService:
           - GET /moderation/bans → list all bans
           - GET /moderation/bans?userName=foo → all bans for 'foo'
         """
-        return moderationRepo.list_bans(user_name=user_name)
\ No newline at end of file
+        return moderationRepo.list_bans(user_name=user_name)
+    # ─────────────────────────────────────────────
+    # 5. Dashboard statistics
+    # ─────────────────────────────────────────────
+
+    def moderation_stats(
+        self,
+        days: int = 30,
+        top: int = 10,
+        ban_expiry: Optional[Dict[str, Any]] = None,
+    ) -> ModerationStats:
+        """
+        Admin story: dashboard figures. Everything here is kept up to date
+        as reports are filed and decided and bans issued, so a refresh only
+        reads counters. `ban_expiry` is the sweeper's metrics snapshot.
+        """
+        return ModerationStats(
+            **moderationRepo.report_stats(days=days, top=top),
+            bansPerOption=moderationRepo.bans_per_option(),
+            activeBans=activeBans.active_count(),
+            banExpiry=ban_expiry,
+        )
@@ -0,0 +1,334 @@
+"""
+Bulk ingest of IMDb-style review dumps.
+
+save_review appends one row and recomputes the movie's rating after every
+call, which is far too slow for dumps with millions of rows. The pipeline
+here works in two passes:
+
+  1. Stream the input CSV once. Each row is validated, normalised into the
+     canonical CSV_HEADERS layout and routed to a per-movie spool file
+     through a buffered writer. Nothing is held in memory per row.
+  2. For every movie that received rows (in parallel worker processes):
+     under reviewsRepo.review_lock, skip users who already reviewed the
+     movie or appear earlier in the dump and append the remaining rows to
+     movieReviews.csv in one buffered write; then compute the movie's
+     rating aggregates once.
+
+Holding the movie's review lock keeps the append from interleaving with
+review writes and vote/report folds of a running server, which take the
+same lock. Movies that received rows with Reports > 0 are registered with
+reportedReviewIndex so report listings visit them. The other derived
+indexes (sort orderings, search segments, columns, offsets) notice the new
+CSV version and rebuild on next use; reviewUserIndex picks up new
+reviewers at its next full scan.
+
+metadata.json is written from the parent process with the returned
+aggregates.
+"""
+from __future__ import annotations
+
+import csv
+import shutil
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, IO, Iterable, Optional, Tuple
+
+from ..repositories import reportedReviewIndex, reviewsRepo, reviewStorage
+from ..repositories.moviesRepo import compute_movie_rating_updates, apply_movie_rating_updates
+from ..repositories.reviewFields import date_ordinal, to_int
+
+CSV_HEADERS = reviewsRepo.CSV_HEADERS
+
+# Lower-cased input header → canonical CSV header
+HEADER_ALIASES: Dict[str, str] = {
+    "movie title": "Movie Title",
+    "movie": "Movie Title",
+    "movietitle": "Movie Title",
+    "date of review": "Date of Review",
+    "date": "Date of Review",
+    "review date": "Date of Review",
+    "user": "User",
+    "username": "User",
+    "user name": "User",
+    "usefulness vote": "Usefulness Vote",
+    "useful votes": "Usefulness Vote",
+    "usefulvotes": "Usefulness Vote",
+    "total votes": "Total Votes",
+    "totalvotes": "Total Votes",
+    "user's rating out of 10": "User's Rating out of 10",
+    "rating": "User's Rating out of 10",
+    "user rating": "User's Rating out of 10",
+    "review title": "Review Title",
+    "title": "Review Title",
+    "review": "Review",
+    "body": "Review",
+    "review text": "Review",
+    "reports": "Reports",
+}
+
+# Max spool files kept open at once while routing rows
+MAX_OPEN_SPOOLS = 128
+SPOOL_BUFFER_BYTES = 1 << 20
+
+
+def _to_count(value: Any) -> Optional[int]:
+    """Vote/report counts: blank → 0, negative or non-numeric → invalid."""
+    if value is None or str(value).strip() == "":
+        return 0
+    try:
+        number = int(float(str(value).replace(",", "")))
+    except ValueError:
+        return None
+    return number if number >= 0 else None
+
+
+def normalize_row(raw: Dict[str, Any], default_movie: Optional[str] = None) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """
+    Map one input row onto CSV_HEADERS.
+    Returns (row, None) when valid, or (None, reason) when rejected.
+    """
+    row: Dict[str, Any] = {}
+    for key, value in raw.items():
+        if key is None:
+            continue
+        canonical = HEADER_ALIASES.get(key.strip().lower())
+        if canonical and canonical not in row:
+            row[canonical] = value.strip() if isinstance(value, str) else value
+
+    movie = row.get("Movie Title") or default_movie
+    if not movie:
+        return None, "missingMovie"
+    if "/" in movie or "\\" in movie or movie in (".", ".."):
+        return None, "invalidMovie"
+    user = row.get("User")
+    if not user:
+        return None, "missingUser"
+
+    rating_raw = row.get("User's Rating out of 10")
+    rating: Any = ""
+    if rating_raw not in (None, ""):
+        try:
+            rating_value = float(rating_raw)
+        except ValueError:
+            return None, "invalidRating"
+        if not 1 <= rating_value <= 10:
+            return None, "invalidRating"
+        rating = int(rating_value) if rating_value.is_integer() else rating_value
+
+    counts = {}
+    for column in ("Usefulness Vote", "Total Votes", "Reports"):
+        counts[column] = _to_count(row.get(column))
+        if counts[column] is None:
+            return None, "invalidCount"
+    if counts["Usefulness Vote"] > counts["Total Votes"]:
+        return None, "invalidCount"
+
+    if not (row.get("Review Title") or row.get("Review")):
+        return None, "emptyReview"
+
+    # Dates are stored as e.g. "13 March 2003"; keep unparseable text as is
+    date_text = row.get("Date of Review") or ""
+    ordinal = date_ordinal(date_text)
+    if ordinal:
+        date_text = date.fromordinal(ordinal).strftime("%d %B %Y")
+
+    return {
+        "Movie Title": movie,
+        "Date of Review": date_text,
+        "User": user,
+        "Usefulness Vote": counts["Usefulness Vote"],
+        "Total Votes": counts["Total Votes"],
+        "User's Rating out of 10": rating,
+        "Review Title": row.get("Review Title") or "",
+        "Review": row.get("Review") or "",
+        "Reports": counts["Reports"],
+    }, None
+
+
+class _SpoolRouter:
+    """Buffered per-movie spool writers with a cap on open file handles."""
+
+    def __init__(self, spool_dir: Path):
+        self.spool_dir = spool_dir
+        self.paths: Dict[str, Path] = {}
+        self._open: "OrderedDict[str, Tuple[IO[str], Any]]" = OrderedDict()
+
+    def write(self, movie: str, row: Dict[str, Any]) -> None:
+        handle = self._open.get(movie)
+        if handle is None:
+            path = self.paths.setdefault(movie, self.spool_dir / f"{len(self.paths)}.csv")
+            f = path.open("a", newline="", encoding="utf-8", buffering=SPOOL_BUFFER_BYTES)
+            handle = (f, csv.DictWriter(f, fieldnames=CSV_HEADERS))
+            self._open[movie] = handle
+            if len(self._open) > MAX_OPEN_SPOOLS:
+                _, (old_f, _) = self._open.popitem(last=False)
+                old_f.close()
+        else:
+            self._open.move_to_end(movie)
+        handle[1].writerow(row)
+
+    def close(self) -> None:
+        for f, _ in self._open.values():
+            f.close()
+        self._open.clear()
+
+
+def _existing_users(csv_path: Path) -> set:
+    return {row.get("User") for row in reviewsRepo.read_review_file(csv_path)[1] if row.get("User")}
+
+
+def _merge_movie(args: Tuple[str, str, str, str]) -> Tuple[str, int, int, Dict[str, Any]]:
+    """
+    Process-pool worker: append one movie's spooled rows to its CSV,
+    skipping duplicate users, then compute the rating aggregates.
+    Returns (movie, appended, duplicates, metadata updates).
+    """
+    movie, spool_path, csv_path_str, storage_name = args
+    # Spawned workers re-import reviewsRepo; use the parent's engine
+    reviewsRepo.REVIEW_STORAGE = storage_name
+    csv_path = Path(csv_path_str)
+    with reviewsRepo.review_lock(csv_path):
+        appended, duplicates, reported = _append_spool(spool_path, csv_path, storage_name)
+    if reported:
+        reportedReviewIndex.register_movie(csv_path.parent)
+    return movie, appended, duplicates, compute_movie_rating_updates(csv_path)
+
+
+def _append_spool(spool_path: str, csv_path: Path, storage_name: str) -> Tuple[int, int, bool]:
+    """
+    Append the spooled rows of users new to the movie (caller holds the
+    review lock). Returns (appended, duplicates, any appended row reported).
+    """
+    storage = reviewStorage.get_storage(storage_name)
+    seen = _existing_users(csv_path)
+    reports_column = CSV_HEADERS.index("Reports")
+
+    if storage.name == "sqlite" or reviewsRepo.stored_path(csv_path) != csv_path:
+        # Compressed blocks / SQLite: append all new rows in one write
+        new_rows = []
+        duplicates = 0
+        with open(spool_path, "r", newline="", encoding="utf-8") as spool:
+            for values in csv.reader(spool):
+                if values[2] in seen:
+                    duplicates += 1
+                    continue
+                seen.add(values[2])
+                new_rows.append(dict(zip(CSV_HEADERS, values)))
+        if new_rows:
+            storage.append_rows(csv_path, new_rows)
+        return len(new_rows), duplicates, any(to_int(r["Reports"]) > 0 for r in new_rows)
+
+    new_file = not csv_path.exists()
+    if not new_file:
+        # Make sure appended rows start on a fresh line
+        with csv_path.open("rb") as f:
+            f.seek(0, 2)
+            if f.tell() > 0:
+                f.seek(-1, 2)
+                if f.read(1) not in (b"\n", b"\r"):
+                    with csv_path.open("a", newline="", encoding="utf-8") as out:
+                        out.write("\r\n")
+
+    appended = 0
+    duplicates = 0
+    reported = False
+    with open(spool_path, "r", newline="", encoding="utf-8") as spool, \
+         csv_path.open("a", newline="", encoding="utf-8", buffering=SPOOL_BUFFER_BYTES) as out:
+        writer = csv.writer(out)
+        if new_file:
+            writer.writerow(CSV_HEADERS)
+        for values in csv.reader(spool):
+            user = values[2]
+            if user in seen:
+                duplicates += 1
+                continue
+            seen.add(user)
+            writer.writerow(values)
+            appended += 1
+            reported = reported or to_int(values[reports_column]) > 0
+
+    return appended, duplicates, reported
+
+
+class ReviewIngestService:
+    """Streams review dumps into the per-movie CSVs."""
+
+    def ingest_file(
+        self,
+        source: Path,
+        default_movie: Optional[str] = None,
+        workers: Optional[int] = None,
+        encoding: str = "utf-8",
+    ) -> Dict[str, Any]:
+        with Path(source).open("r", newline="", encoding=encoding) as f:
+            return self.ingest_rows(csv.DictReader(f), default_movie=default_movie, workers=workers)
+
+    def ingest_rows(
+        self,
+        rows: Iterable[Dict[str, Any]],
+        default_movie: Optional[str] = None,
+        workers: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Ingest an iterable of dict rows (e.g. a csv.DictReader).
+
+        Rows for movies without a data/imdb/<MovieTitle>/metadata.json are
+        rejected as "unknownMovie". Returns a summary:
+          {"rowsRead", "rowsIngested", "duplicates", "rejected": {reason: n},
+           "movies": {title: rows appended}}
+        """
+        data_path = reviewsRepo.DATA_PATH
+        rejected: Dict[str, int] = {}
+        rows_read = 0
+        known_movies: Dict[str, bool] = {}
+
+        spool_dir = Path(tempfile.mkdtemp(prefix="review-ingest-"))
+        router = _SpoolRouter(spool_dir)
+        try:
+            # Pass 1: validate + route
+            for raw in rows:
+                rows_read += 1
+                row, reason = normalize_row(raw, default_movie)
+                if row is not None:
+                    movie = row["Movie Title"]
+                    if movie not in known_movies:
+                        known_movies[movie] = (data_path / movie / "metadata.json").exists()
+                    if not known_movies[movie]:
+                        row, reason = None, "unknownMovie"
+                if row is None:
+                    rejected[reason] = rejected.get(reason, 0) + 1
+                    continue
+                router.write(row["Movie Title"], row)
+            router.close()
+
+            # Pass 2: per-movie merge, dedup and aggregates
+            jobs = [
+                (movie, str(path), str(data_path / movie / "movieReviews.csv"), reviewsRepo.REVIEW_STORAGE)
+                for movie, path in router.paths.items()
+            ]
+            if workers == 1 or len(jobs) <= 1:
+                results = [_merge_movie(job) for job in jobs]
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    results = list(pool.map(_merge_movie, jobs))
+        finally:
+            router.close()
+            shutil.rmtree(spool_dir, ignore_errors=True)
+
+        movies: Dict[str, int] = {}
+        duplicates = 0
+        for movie, appended, dups, updates in results:
+            movies[movie] = appended
+            duplicates += dups
+            apply_movie_rating_updates(movie, updates)
+
+        return {
+            "rowsRead": rows_read,
+            "rowsIngested": sum(movies.values()),
+            "duplicates": duplicates,
+            "rejected": rejected,
+            "movies": movies,
+        }
@@ -1,10 +1,13 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from fastapi import HTTPException
 from datetime import date
 import sys
 from backend.app.repositories.moviesRepo import load_movie_by_title
 from ..repositories.moviesRepo import recompute_movie_ratings
-from ..repositories.reviewsRepo import load_reviews, save_review, update_review, delete_review, find_review_by_user
+from ..repositories import reviewSearchIndex, reviewVoteStore
+from ..repositories.reviewColumns import load_review_columns
+from ..repositories.reviewFields import to_int
+from ..repositories.reviewsRepo import load_reviews, load_reviews_by_user, save_review, update_review, delete_review, find_review_by_user, find_indexed_review, SORT_FIELDS
 from ..models.models import ReviewCreate
 from ..models.models import Review
 
@@ -21,11 +24,102 @@ CSV_KEYS = {
     "reportCount": "Reports"
 }
 
+# fields= names accepted on review listings → CSV columns
+LIST_FIELDS = {
+    "movieTitle": "Movie Title",
+    "date": "Date of Review",
+    "user": "User",
+    **CSV_KEYS,
+}
+
+EMPTY_RATING_STATS: Dict[str, Any] = {
+    "reviewCount": 0,
+    "ratingCount": 0,
+    "average": None,
+    "median": None,
+    "histogram": {str(i): 0 for i in range(1, 11)},
+    "percentiles": {"p10": None, "p25": None, "p50": None, "p75": None, "p90": None},
+    "voteRatio": None,
+    "reviewsPerYear": {},
+}
+
 
 class ReviewService:
 
-    def get_reviews(self, movieTitle: str, count: int = 10):
-        return load_reviews(movieTitle, count)
+    def get_reviews(
+        self,
+        movieTitle: str,
+        count: int = 10,
+        offset: int = 0,
+        sort_by: Optional[str] = None,
+        descending: bool = True,
+        fields: Optional[List[str]] = None,
+        preview_chars: Optional[int] = None,
+    ):
+        """
+        One page of reviews. sort_by may be "usefulness", "date" or "rating";
+        None keeps file order. fields picks columns by their backend names
+        (see LIST_FIELDS); preview_chars shortens the review body.
+        """
+        if sort_by is not None and sort_by not in SORT_FIELDS:
+            raise ValueError("Invalid sort_by value. Use usefulness, date or rating")
+        columns = None
+        if fields is not None:
+            unknown = [f for f in fields if f not in LIST_FIELDS]
+            if unknown or not fields:
+                raise ValueError(f"Invalid fields value. Use any of: {', '.join(LIST_FIELDS)}")
+            columns = [LIST_FIELDS[f] for f in fields]
+        if preview_chars is not None and preview_chars < 0:
+            raise ValueError("preview_chars cannot be negative")
+        return load_reviews(
+            movieTitle,
+            count,
+            offset=offset,
+            sort_by=sort_by,
+            descending=descending,
+            fields=columns,
+            preview_chars=preview_chars,
+        )
+
+    def get_reviews_by_user(self, username: str, count: int = 10, offset: int = 0) -> List[Dict[str, Any]]:
+        """One page of a user's reviews across all movies, ordered by movie title."""
+        if not username:
+            raise ValueError("Username cannot be empty")
+        return load_reviews_by_user(username, count, offset=offset)
+
+    def search_reviews(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Top `limit` reviews across all movies matching `query` (BM25)."""
+        if not query or not query.strip():
+            raise ValueError("Search query cannot be empty")
+        return reviewSearchIndex.search(query, limit)
+
+    def get_rating_stats(self, movieTitle: str) -> Dict[str, Any]:
+        """
+        Rating histogram / median / percentiles for one movie, plus the share
+        of useful votes (pending votes included) and reviews per year.
+        """
+        if not load_movie_by_title(movieTitle):
+            raise ValueError(f"Movie '{movieTitle}' does not exist.")
+        columns = load_review_columns(movieTitle)
+        if columns is None:
+            # Movie exists but has no reviews file yet
+            return {"movieTitle": movieTitle, **EMPTY_RATING_STATS}
+        return {
+            "movieTitle": movieTitle,
+            **columns.rating_stats(),
+            "voteRatio": columns.vote_ratio(reviewVoteStore.pending_deltas(movieTitle)),
+            "reviewsPerYear": {str(year): count for year, count in columns.year_histogram().items()},
+        }
+
+    def get_rating_stats_bulk(self, movieTitles: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Stats for many movies at once; unknown titles map to None."""
+        result: Dict[str, Optional[Dict[str, Any]]] = {}
+        for title in movieTitles:
+            try:
+                result[title] = self.get_rating_stats(title)
+            except ValueError:
+                result[title] = None
+        return result
 
     def create_review(self, movieTitle: str, review: ReviewCreate, current_user: Dict[str, str]) -> None:
 
@@ -137,3 +231,28 @@ class ReviewService:
             recompute_movie_ratings(movieTitle)
         except Exception:
             pass
+
+    def vote_review(
+        self,
+        movieTitle: str,
+        username: str,
+        useful: bool,
+        current_user: Dict[str, str]
+    ) -> Dict[str, Any]:
+        """
+        Record current_user's usefulness vote on username's review.
+        One vote per voter and review; voting again the other way changes it.
+        """
+        if current_user["username"] == username:
+            raise HTTPException(status_code=403, detail="Not allowed to vote on your own review")
+
+        if not find_indexed_review(movieTitle, username):
+            raise ValueError(f"Review by user '{username}' for movie '{movieTitle}' not found.")
+
+        counted = reviewVoteStore.vote(movieTitle, username, current_user["username"], useful)
+        review = find_indexed_review(movieTitle, username) or {}
+        return {
+            "counted": counted,
+            "usefulVotes": to_int(review.get("Usefulness Vote")),
+            "totalVotes": to_int(review.get("Total Votes")),
+        }
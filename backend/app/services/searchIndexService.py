@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Dict, List
+
+from ..repositories import reviewSearchIndex
+
+logger = logging.getLogger(__name__)
+
+# How often segments are checked against the CSVs; edits made outside
+# reviewsRepo (or by another worker) show up in searches within this delay
+REFRESH_INTERVAL_SECONDS = 30.0
+
+
+class SearchIndexService:
+    """
+    Keeps the review search segments in step with the CSVs.
+
+    Queries only build the segments missing on their first run and otherwise
+    read the ones already in memory; this refresher rebuilds the missing or
+    stale ones in the background.
+    """
+
+    def __init__(self):
+        self.metrics: Dict[str, Any] = {"refreshes": 0, "rebuilt": 0}
+
+    def refresh(self) -> List[str]:
+        """Rebuild every missing or stale segment; returns the titles rebuilt."""
+        rebuilt = reviewSearchIndex.refresh()
+        self.metrics["refreshes"] += 1
+        self.metrics["rebuilt"] += len(rebuilt)
+        return rebuilt
+
+    async def run(self, stop: asyncio.Event) -> None:
+        """Refresh every REFRESH_INTERVAL_SECONDS until `stop` is set."""
+        while not stop.is_set():
+            try:
+                await asyncio.to_thread(self.refresh)
+            except Exception:
+                logger.exception("search index refresh failed")
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=REFRESH_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
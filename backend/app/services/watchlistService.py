@@ -11,6 +11,8 @@ PROJECT_ROOT = Path(__file__).resolve().parents[3]  # .../COSC310-Project
 IMDB_ROOT = os.getenv("IMDB_ROOT", str(PROJECT_ROOT / "data" / "imdb"))
 WATCHLIST_ALLOW_UNKNOWN = os.getenv("WATCHLIST_ALLOW_UNKNOWN", "0") == "1"
 MOVIE_REVIEWS_FILENAME = "movieReviews.csv"
+# Movies kept in compressed storage have this file instead of the CSV
+MOVIE_BLOCKS_FILENAME = "movieReviews.blocks"
 
 
 def _movie_reviews_path(movie_title: str) -> str:
@@ -38,7 +40,14 @@ def _assert_movie_exists(movie_title: str) -> None:
     Ensure that the given movieTitle exists under data/imdb/<MovieTitle>/movieReviews.csv.
     """
     movie_reviews_path = _movie_reviews_path(movie_title)
-    if not os.path.exists(movie_reviews_path):
+    movie_dir = os.path.dirname(movie_reviews_path)
+    if not any(
+        os.path.exists(path)
+        for path in (
+            movie_reviews_path,
+            os.path.join(movie_dir, MOVIE_BLOCKS_FILENAME),
+        )
+    ):
         if WATCHLIST_ALLOW_UNKNOWN:
             return  # allow bypassing in non-strict environments
         # IMPORTANT: keep this exact string for the tests
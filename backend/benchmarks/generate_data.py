@@ -0,0 +1,385 @@
+"""
+Deterministic synthetic data/ tree for scale testing.
+
+Writes the same on-disk formats the backend reads:
+
+  <out>/imdb/<Movie>/metadata.json
+  <out>/imdb/<Movie>/movieReviews.csv     canonical CSV_HEADERS
+  <out>/users.json  <out>/admins.json  <out>/reports.json  <out>/bans.json
+
+Popularity is Zipfian: movie i (1-based rank) gets reviews in proportion to
+1 / i**movie_skew, reviewers and watchlist entries are drawn with the same
+kind of skew over users and movies. Every movie and every block of users is
+generated from its own seed, so the output only depends on the arguments,
+not on --workers. Movies and user blocks are written by a process pool.
+
+Reported reviews get a non-zero "Reports" count and matching entries in
+reports.json; some confirmed reports carry a ban (bans.json) and the review
+authors get penalties / banExpiresAt in users.json. All users and admins
+share the password "password".
+
+Usage (from the project root):
+    python -m backend.benchmarks.generate_data /tmp/bench-data
+    python -m backend.benchmarks.generate_data /tmp/bench-data --movies 100000 --reviews 10000000 --users 1000000
+    python -m backend.benchmarks.repositories --source /tmp/bench-data
+"""
+import argparse
+import bisect
+import csv
+import itertools
+import json
+import random
+import shutil
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from passlib.hash import bcrypt
+
+from backend.app.repositories.reviewsRepo import CSV_HEADERS
+
+MAX_MOVIES = 100_000
+MAX_REVIEWS = 10_000_000
+MAX_USERS = 1_000_000
+
+PASSWORD = "password"
+# Fixed salt keeps the output byte-for-byte reproducible
+PASSWORD_SALT = "syntheticdatasetsalt.."
+USER_BLOCK = 50_000
+WRITE_BUFFER_BYTES = 1 << 20
+BAN_OPTIONS = {"3d": 3 * 86400, "7d": 7 * 86400, "30d": 30 * 86400}
+
+WORDS = (
+    "the film movie story plot acting cast scene director character performance ending script visual "
+    "music score camera moment really great good bad boring brilliant slow fast classic sequel original "
+    "hero villain action drama comedy twist dialogue screen audience time best worst love hate watch "
+    "again never always still felt made makes beautiful dark funny long short perfect mess"
+).split()
+GENRES = ["Action", "Adventure", "Animation", "Comedy", "Crime", "Drama", "Fantasy", "Horror",
+          "Mystery", "Romance", "Sci-Fi", "Thriller", "War", "Western"]
+NAMES = ["Alex", "Sam", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie", "Avery", "Quinn",
+         "Parker", "Rowan", "Drew", "Kai", "Robin", "Sky", "Noel", "Emery", "Reese", "Hayden"]
+SURNAMES = ["Smith", "Lee", "Garcia", "Chen", "Khan", "Novak", "Silva", "Okafor", "Kim", "Rossi",
+            "Müller", "Dubois", "Tanaka", "Singh", "Cohen", "Walsh", "Ivanov", "Haddad", "Berg", "Lopez"]
+
+
+def movie_title(index: int) -> str:
+    return f"Movie {index + 1:06d}"
+
+
+def user_name(index: int) -> str:
+    return f"user{index + 1:07d}"
+
+
+def zipf_cumulative(n: int, skew: float) -> array:
+    """Cumulative weights of ranks 1..n with weight 1 / rank**skew."""
+    return array("d", itertools.accumulate(1.0 / (rank ** skew) for rank in range(1, n + 1)))
+
+
+def apportion(total: int, n: int, skew: float, cap: int) -> List[int]:
+    """Split `total` over n Zipf-weighted ranks (largest remainder), at most `cap` each."""
+    weights = [1.0 / (rank ** skew) for rank in range(1, n + 1)]
+    scale = total / sum(weights)
+    shares = [w * scale for w in weights]
+    counts = [min(int(s), cap) for s in shares]
+    # Only the rounding remainder is redistributed; rows above the cap are dropped
+    remainder = total - sum(int(s) for s in shares)
+    by_fraction = sorted(range(n), key=lambda i: (-(shares[i] - int(shares[i])), i))
+    for i in by_fraction:
+        if remainder <= 0:
+            break
+        if counts[i] < cap:
+            counts[i] += 1
+            remainder -= 1
+    return counts
+
+
+def _draw(rng: random.Random, cumulative: array) -> int:
+    return bisect.bisect_left(cumulative, rng.random() * cumulative[-1])
+
+
+def _distinct(rng: random.Random, cumulative: array, count: int) -> List[int]:
+    """`count` distinct indices, Zipf-skewed where feasible, topped up uniformly."""
+    n = len(cumulative)
+    if count > n // 2:
+        return rng.sample(range(n), count)
+    chosen: Dict[int, None] = {}
+    for _ in range(count * 4):
+        if len(chosen) >= count:
+            break
+        chosen[_draw(rng, cumulative)] = None
+    while len(chosen) < count:
+        chosen[rng.randrange(n)] = None
+    return list(chosen)
+
+
+def _text(rng: random.Random, chars: int) -> str:
+    words: List[str] = []
+    length = 0
+    while length < chars:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    text = " ".join(words)
+    return text[0].upper() + text[1:] + "."
+
+
+def _person(rng: random.Random) -> str:
+    return f"{rng.choice(NAMES)} {rng.choice(SURNAMES)}"
+
+
+# ─────────────────────────────────────────────────────────────
+# Workers
+# ─────────────────────────────────────────────────────────────
+
+_USER_WEIGHTS: Optional[array] = None
+_MOVIE_WEIGHTS: Optional[array] = None
+
+
+def _init_worker(users: int, user_skew: float, movies: int, movie_skew: float) -> None:
+    global _USER_WEIGHTS, _MOVIE_WEIGHTS
+    _USER_WEIGHTS = zipf_cumulative(users, user_skew)
+    _MOVIE_WEIGHTS = zipf_cumulative(movies, movie_skew)
+
+
+def _write_movie(job: Tuple[str, int, int, int, float, str]) -> Tuple[int, List[Dict[str, Any]]]:
+    """
+    Write one movie folder. Returns (reviews written, snapshots of the
+    reviews that were marked as reported).
+    """
+    out, index, review_count, seed, report_rate, reference = job
+    rng = random.Random(seed * 1_000_003 + index)
+    title = movie_title(index)
+    today = date.fromisoformat(reference)
+    released = today - timedelta(days=rng.randrange(30, 40 * 365))
+    movie_dir = Path(out) / "imdb" / title
+    movie_dir.mkdir(parents=True, exist_ok=True)
+
+    ratings: List[int] = []
+    reported: List[Dict[str, Any]] = []
+    mean_rating = rng.uniform(3.5, 9.0)
+    with (movie_dir / "movieReviews.csv").open(
+        "w", newline="", encoding="utf-8", buffering=WRITE_BUFFER_BYTES
+    ) as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADERS)
+        for user_index in _distinct(rng, _USER_WEIGHTS, review_count):
+            rating = max(1, min(10, round(rng.gauss(mean_rating, 2.0))))
+            ratings.append(rating)
+            total_votes = min(int(rng.paretovariate(1.2)) - 1, 100_000)
+            useful_votes = rng.randint(0, total_votes) if total_votes else 0
+            written = released + timedelta(days=rng.randrange(max((today - released).days, 1)))
+            review_title = _text(rng, rng.randint(10, 60)).rstrip(".")
+            body = _text(rng, min(int(rng.lognormvariate(6.41, 0.9)), 10_000))
+            reports = rng.randint(1, 3) if rng.random() < report_rate else 0
+            writer.writerow([
+                title, f"{written.day} {written:%B %Y}", user_name(user_index), useful_votes,
+                total_votes, rating, review_title, body, reports,
+            ])
+            if reports:
+                reported.append({
+                    "movieTitle": title, "user": user_name(user_index), "rating": float(rating),
+                    "usefulVotes": useful_votes, "totalVotes": total_votes, "title": review_title,
+                    "body": body, "reportCount": reports,
+                })
+
+    metadata = {
+        "title": title,
+        "movieIMDbRating": round(sum(ratings) / len(ratings), 1) if ratings else round(mean_rating, 1),
+        "totalRatingCount": len(ratings) * rng.randint(20, 200),
+        "totalUserReviews": str(len(ratings)),
+        "totalCriticReviews": str(rng.randint(0, 600)),
+        "metaScore": str(rng.randint(20, 100)),
+        "movieGenres": rng.sample(GENRES, rng.randint(1, 3)),
+        "directors": [_person(rng) for _ in range(rng.randint(1, 2))],
+        "datePublished": released.isoformat(),
+        "creators": [_person(rng) for _ in range(rng.randint(1, 3))],
+        "mainStars": [_person(rng) for _ in range(3)],
+        "description": _text(rng, rng.randint(120, 400)),
+        "duration": rng.randint(75, 200),
+    }
+    (movie_dir / "metadata.json").write_text(json.dumps(metadata), encoding="utf-8")
+    return len(ratings), reported
+
+
+def _write_users(job: Tuple[str, int, int, int, int, str, Dict[int, Dict[str, Any]]]) -> str:
+    """Write users [start, stop) as a JSON array fragment into a part file."""
+    out, start, stop, seed, movies, password_hash, overrides = job
+    rng = random.Random(seed * 7_000_003 + start)
+    part = Path(out) / f".users.{start:08d}.part"
+    with part.open("w", encoding="utf-8", buffering=WRITE_BUFFER_BYTES) as f:
+        for index in range(start, stop):
+            watchlist = _distinct(rng, _MOVIE_WEIGHTS, min(int(rng.expovariate(0.5)), movies))
+            user = {
+                "userName": user_name(index),
+                "passwordHash": password_hash,
+                "role": "user",
+                "penalties": 0,
+                "watchlist": [movie_title(m) for m in sorted(watchlist)],
+            }
+            user.update(overrides.get(index, {}))
+            if index:
+                f.write(",\n")
+            f.write("  " + json.dumps(user, ensure_ascii=False))
+    return str(part)
+
+
+# ─────────────────────────────────────────────────────────────
+# Moderation data (parent process)
+# ─────────────────────────────────────────────────────────────
+
+def build_moderation(
+    reported: List[Dict[str, Any]], users: int, admins: int, seed: int, reference: str
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], Dict[int, Dict[str, Any]]]:
+    """reports.json, bans.json and per-user overrides (penalties, banExpiresAt)."""
+    rng = random.Random(seed * 13_000_003)
+    now = datetime.fromisoformat(reference)
+    reports: List[Dict[str, Any]] = []
+    bans: List[Dict[str, Any]] = []
+    overrides: Dict[int, Dict[str, Any]] = {}
+
+    for snapshot in reported:
+        author = int(snapshot["user"][4:]) - 1
+        for n in range(1, snapshot["reportCount"] + 1):
+            reported_at = now - timedelta(seconds=rng.randrange(90 * 86400))
+            status = rng.choices(["pending", "confirmed", "rejected"], weights=[6, 3, 2])[0]
+            report = {
+                "reportId": len(reports) + 1,
+                "review": dict(snapshot, reportCount=n),
+                "reportedBy": user_name(rng.randrange(users)),
+                "status": status,
+                "dateReported": reported_at.isoformat(),
+                "reasonType": rng.choice(["spam", "offensive", "spoiler", "other"]),
+                "reason": None,
+                "handledByAdmin": None,
+                "handledAt": None,
+                "banDurationSeconds": None,
+            }
+            if status != "pending":
+                handled_at = reported_at + timedelta(seconds=rng.randrange(1, 3 * 86400))
+                report["handledByAdmin"] = f"admin{rng.randrange(admins) + 1}"
+                report["handledAt"] = handled_at.isoformat()
+            if status == "confirmed":
+                user = overrides.setdefault(author, {"penalties": 0})
+                user["penalties"] += 1
+                if rng.random() < 0.5:
+                    option = rng.choice(list(BAN_OPTIONS))
+                    until = handled_at + timedelta(seconds=BAN_OPTIONS[option])
+                    report["banDurationSeconds"] = BAN_OPTIONS[option]
+                    bans.append({
+                        "banId": len(bans) + 1,
+                        "userName": snapshot["user"],
+                        "reportedBy": report["reportedBy"],
+                        "reportId": report["reportId"],
+                        "movieTitle": snapshot["movieTitle"],
+                        "reviewUser": snapshot["user"],
+                        "reasonType": report["reasonType"],
+                        "reason": None,
+                        "banOption": option,
+                        "banDurationSeconds": BAN_OPTIONS[option],
+                        "bannedAt": handled_at.isoformat(),
+                        "bannedUntil": until.isoformat(),
+                    })
+                    user["banExpiresAt"] = max(user.get("banExpiresAt", 0), int(until.timestamp()))
+            reports.append(report)
+    return reports, bans, overrides
+
+
+# ─────────────────────────────────────────────────────────────
+# Driver
+# ─────────────────────────────────────────────────────────────
+
+def generate(
+    out: Path,
+    movies: int = 1000,
+    reviews: int = 100_000,
+    users: int = 20_000,
+    admins: int = 2,
+    movie_skew: float = 1.1,
+    user_skew: float = 0.9,
+    report_rate: float = 0.002,
+    seed: int = 310,
+    workers: Optional[int] = None,
+    reference: str = "2025-12-01",
+) -> Dict[str, Any]:
+    if not (1 <= movies <= MAX_MOVIES and 0 <= reviews <= MAX_REVIEWS and 1 <= users <= MAX_USERS):
+        raise ValueError(f"Supported up to {MAX_MOVIES} movies, {MAX_REVIEWS} reviews and {MAX_USERS} users")
+    out.mkdir(parents=True, exist_ok=True)
+    password_hash = bcrypt.using(rounds=12, salt=PASSWORD_SALT).hash(PASSWORD)
+    counts = apportion(reviews, movies, movie_skew, cap=users)
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(users, user_skew, movies, movie_skew)
+    ) as pool:
+        jobs = [(str(out), i, counts[i], seed, report_rate, reference) for i in range(movies)]
+        written = 0
+        reported: List[Dict[str, Any]] = []
+        for count, snapshots in pool.map(_write_movie, jobs, chunksize=max(1, movies // 256)):
+            written += count
+            reported.extend(snapshots)
+
+        reports, bans, overrides = build_moderation(reported, users, admins, seed, reference)
+        blocks = [
+            (str(out), start, min(start + USER_BLOCK, users), seed, movies, password_hash,
+             {i: v for i, v in overrides.items() if start <= i < start + USER_BLOCK})
+            for start in range(0, users, USER_BLOCK)
+        ]
+        parts = list(pool.map(_write_users, blocks))
+
+    with (out / "users.json").open("w", encoding="utf-8") as f:
+        f.write("[\n")
+        for part in parts:
+            with open(part, "r", encoding="utf-8") as p:
+                shutil.copyfileobj(p, f, WRITE_BUFFER_BYTES)
+            Path(part).unlink()
+        f.write("\n]\n")
+    (out / "admins.json").write_text(json.dumps([
+        {"adminName": f"admin{i + 1}", "passwordHash": password_hash, "role": "admin"} for i in range(admins)
+    ], indent=2), encoding="utf-8")
+    (out / "reports.json").write_text(json.dumps(reports, indent=2), encoding="utf-8")
+    (out / "bans.json").write_text(json.dumps(bans, indent=2), encoding="utf-8")
+
+    return {
+        "movies": movies,
+        "reviews": written,
+        "users": users,
+        "admins": admins,
+        "reports": len(reports),
+        "bans": len(bans),
+        "topMovieReviews": counts[0] if counts else 0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Write a deterministic synthetic data/ tree")
+    parser.add_argument("out", type=Path, help="Output directory (the equivalent of data/)")
+    parser.add_argument("--movies", type=int, default=1000, help=f"Up to {MAX_MOVIES}")
+    parser.add_argument("--reviews", type=int, default=100_000, help=f"Up to {MAX_REVIEWS}")
+    parser.add_argument("--users", type=int, default=20_000, help=f"Up to {MAX_USERS}")
+    parser.add_argument("--admins", type=int, default=2)
+    parser.add_argument("--movie-skew", type=float, default=1.1, help="Zipf exponent of movie popularity")
+    parser.add_argument("--user-skew", type=float, default=0.9, help="Zipf exponent of reviewer activity")
+    parser.add_argument("--report-rate", type=float, default=0.002, help="Share of reviews that are reported")
+    parser.add_argument("--reference-date", default="2025-12-01", help="'Today' for review, report and ban dates")
+    parser.add_argument("--seed", type=int, default=310)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="Write into a non-empty directory")
+    args = parser.parse_args()
+
+    if args.out.exists() and any(args.out.iterdir()) and not args.force:
+        parser.error(f"{args.out} is not empty (use --force to write into it anyway)")
+
+    start = time.perf_counter()
+    summary = generate(
+        args.out, args.movies, args.reviews, args.users, args.admins, args.movie_skew, args.user_skew,
+        args.report_rate, args.seed, args.workers, args.reference_date,
+    )
+    summary["seconds"] = round(time.perf_counter() - start, 2)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
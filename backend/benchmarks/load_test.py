@@ -0,0 +1,413 @@
+"""
+HTTP load test: a weighted mix of real endpoint calls against the app.
+
+By default requests go in-process through httpx's ASGI transport to
+backend.app.main:app, with every repository and service path repointed at a
+temp copy of a data root (the checked-in data/ or a generated one via
+--source), so the real data/ is never written. With --url the same mix is
+sent to a running server instead (e.g. a local uvicorn) and writes land in
+that server's data.
+
+Each virtual user registers its own account, then loops over the mix until
+--duration runs out: catalog browse, filtered movie search, review search,
+review pages (plain and sorted), review create/update, reports, watchlist
+add/remove and login. The report shows throughput, a latency histogram and
+p50/p95/p99 per route, plus:
+
+  errors        5xx responses, transport errors and unexpected statuses
+  lost updates  writes that were acknowledged (2xx) but are missing at the
+                end: watchlist entries, review titles and report records
+
+Exits with status 1 if the error rate exceeds --max-error-rate or any update
+was lost.
+
+Usage (from the project root):
+    python -m backend.benchmarks.load_test
+    python -m backend.benchmarks.load_test --source /tmp/bench-data --users 32 --duration 60
+    python -m backend.benchmarks.load_test --url http://127.0.0.1:8000 --admin admin1
+"""
+import argparse
+import asyncio
+import bisect
+import contextlib
+import io
+import json
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set
+
+import httpx
+
+from backend.app.main import app
+from backend.app.repositories import adminRepo
+from backend.app.services import authenticationService, watchlistService
+from backend.benchmarks.repositories import DATA_CONSTANTS, DEFAULT_SOURCE, RESULTS_DIR, repointed
+
+# Service-level path constants on top of the repository ones
+SERVICE_CONSTANTS = [
+    (watchlistService, "IMDB_ROOT", "imdb"),
+    (authenticationService, "DATA_DIR", ""),
+]
+
+PASSWORD = "loadtest-password"
+SEARCH_WORDS = ["great", "boring", "acting", "story", "ending", "villain", "masterpiece", "plot"]
+# Upper bounds (ms) of the latency histogram buckets; the last one is open
+BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+
+
+class RouteStats:
+    def __init__(self) -> None:
+        self.samples: List[float] = []
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+        self.statuses: Dict[str, int] = {}
+        self.errors = 0
+
+    def record(self, elapsed_ms: float, status: str, ok: bool) -> None:
+        self.samples.append(elapsed_ms)
+        self.buckets[bisect.bisect_left(BUCKETS_MS, elapsed_ms)] += 1
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if not ok:
+            self.errors += 1
+
+    def summary(self, seconds: float) -> Dict[str, Any]:
+        ordered = sorted(self.samples)
+
+        def pct(q: float) -> float:
+            return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+        return {
+            "requests": len(ordered),
+            "throughput": len(ordered) / seconds,
+            "errors": self.errors,
+            "errorRate": self.errors / len(ordered),
+            "statuses": self.statuses,
+            "p50Ms": pct(50),
+            "p95Ms": pct(95),
+            "p99Ms": pct(99),
+            "meanMs": statistics.fmean(ordered),
+            "histogramMs": {
+                (f"<={b}" if i < len(BUCKETS_MS) else f">{BUCKETS_MS[-1]}"): n
+                for i, (b, n) in enumerate(zip(BUCKETS_MS + [BUCKETS_MS[-1]], self.buckets))
+            },
+        }
+
+
+class Catalog:
+    """What the virtual users pick from: movie titles, genres and seen reviews."""
+
+    def __init__(self, movies: List[Dict[str, Any]]):
+        self.titles = [m["title"] for m in movies]
+        self.genres = sorted({g for m in movies for g in m.get("movieGenres") or []}) or ["Drama"]
+        self.reviews: List[tuple] = []  # (movie, user) seen on review pages
+
+
+class VirtualUser:
+    """One simulated client and the state its acknowledged writes should leave behind."""
+
+    def __init__(self, index: int, seed: int):
+        self.name = f"loadtest-vu-{index}"
+        self.rng = random.Random(seed * 1_000_003 + index)
+        self.watchlist: Set[str] = set()
+        self.review_titles: Dict[str, str] = {}  # movie → latest acknowledged title
+        self.counter = 0
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"X-Username": self.name}
+
+
+class Step(NamedTuple):
+    route: str  # method + path template, used to group results
+    method: str
+    url: str
+    expected: Set[int]
+    kwargs: Dict[str, Any]
+    on_success: Optional[Callable[[httpx.Response], None]] = None
+
+
+# ─────────────────────────────────────────────────────────────
+# Mix
+# ─────────────────────────────────────────────────────────────
+
+def _browse(vu, catalog):
+    return Step("GET /movies", "GET", "/movies", {200}, {})
+
+
+def _filtered(vu, catalog):
+    params = {"genre": vu.rng.choice(catalog.genres), "min_rating": vu.rng.randint(0, 8), "sort_by": "rating"}
+    return Step("GET /movies/get-filtered-movies", "GET", "/movies/get-filtered-movies", {200, 404}, {"params": params})
+
+
+def _search(vu, catalog):
+    return Step("GET /all-reviews/search", "GET", "/all-reviews/search", {200},
+                {"params": {"q": vu.rng.choice(SEARCH_WORDS), "limit": 10}})
+
+
+def _page(vu, catalog, sort_by=None):
+    movie = vu.rng.choice(catalog.titles)
+    params: Dict[str, Any] = {"amount": 10, "offset": vu.rng.randrange(50)}
+    if sort_by:
+        params["sort_by"] = sort_by
+
+    def seen(response):
+        for row in response.json()[:3]:
+            if row.get("User") and len(catalog.reviews) < 10_000:
+                catalog.reviews.append((movie, row["User"]))
+
+    route = "GET /reviews/{movieTitle}" + (" (sorted)" if sort_by else "")
+    return Step(route, "GET", f"/reviews/{movie}", {200, 404}, {"params": params}, seen)
+
+
+def _create_review(vu, catalog):
+    candidates = [t for t in catalog.titles if t not in vu.review_titles]
+    if not candidates:
+        return _update_review(vu, catalog)
+    movie = vu.rng.choice(candidates)
+    title = f"{vu.name} review"
+    body = {"rating": vu.rng.randint(1, 10), "title": title, "body": "Load test review. " * 10}
+
+    def done(response):
+        vu.review_titles[movie] = title
+
+    return Step("POST /reviews/{movieTitle}", "POST", f"/reviews/{movie}", {200}, {"json": body, "headers": vu.headers}, done)
+
+
+def _update_review(vu, catalog):
+    if not vu.review_titles:
+        return _create_review(vu, catalog)
+    movie = vu.rng.choice(sorted(vu.review_titles))
+    vu.counter += 1
+    title = f"{vu.name} edit {vu.counter}"
+
+    def done(response):
+        vu.review_titles[movie] = title
+
+    return Step("PUT /reviews/{movieTitle}/{username}", "PUT", f"/reviews/{movie}/{vu.name}", {200},
+                {"json": {"title": title}, "headers": vu.headers}, done)
+
+
+def _report(vu, catalog):
+    if not catalog.reviews:
+        return _page(vu, catalog)
+    movie, user = vu.rng.choice(catalog.reviews)
+    vu.counter += 1
+    return Step("POST /moderation/reports/{movie_title}/{review_user}", "POST",
+                f"/moderation/reports/{movie}/{user}", {200, 400},
+                {"json": {"reasonType": "spam", "reason": f"{vu.name} {vu.counter}"}, "headers": vu.headers})
+
+
+def _watchlist(vu, catalog):
+    movie = vu.rng.choice(catalog.titles)
+    if movie in vu.watchlist:
+        return Step("DELETE /watchlist/{movieTitle}", "DELETE", f"/watchlist/{movie}", {200},
+                    {"headers": vu.headers}, lambda r: vu.watchlist.discard(movie))
+    return Step("POST /watchlist/{movieTitle}", "POST", f"/watchlist/{movie}", {200},
+                {"headers": vu.headers}, lambda r: vu.watchlist.add(movie))
+
+
+def _login(vu, catalog):
+    return Step("POST /auth/login", "POST", "/auth/login", {200}, {"json": {"username": vu.name, "password": PASSWORD}})
+
+
+# (weight, step factory)
+MIX = [
+    (3, _browse),
+    (3, _filtered),
+    (2, _search),
+    (8, _page),
+    (3, lambda vu, catalog: _page(vu, catalog, vu.rng.choice(["usefulness", "date", "rating"]))),
+    (1, _create_review),
+    (1, _update_review),
+    (1, _report),
+    (3, _watchlist),
+    (1, _login),
+]
+
+
+# ─────────────────────────────────────────────────────────────
+# Driver
+# ─────────────────────────────────────────────────────────────
+
+async def _send(client, stats: Dict[str, RouteStats], step: Step) -> Optional[httpx.Response]:
+    start = time.perf_counter()
+    try:
+        response = await client.request(step.method, step.url, **step.kwargs)
+    except httpx.HTTPError as exc:
+        elapsed = (time.perf_counter() - start) * 1e3
+        stats.setdefault(step.route, RouteStats()).record(elapsed, type(exc).__name__, False)
+        return None
+    elapsed = (time.perf_counter() - start) * 1e3
+    ok = response.status_code in step.expected
+    stats.setdefault(step.route, RouteStats()).record(elapsed, str(response.status_code), ok)
+    if ok and response.status_code < 300 and step.on_success is not None:
+        step.on_success(response)
+    return response
+
+
+async def _virtual_user(client, vu: VirtualUser, catalog: Catalog, stats, deadline: float) -> None:
+    weights = [w for w, _ in MIX]
+    factories = [f for _, f in MIX]
+    while time.perf_counter() < deadline:
+        factory = vu.rng.choices(factories, weights=weights)[0]
+        await _send(client, stats, factory(vu, catalog))
+
+
+async def _check_lost_updates(client, vus: List[VirtualUser], admin: Optional[str], reports_before: Optional[int],
+                              stats: Dict[str, RouteStats]) -> Dict[str, Any]:
+    lost: Dict[str, Any] = {"watchlist": [], "reviews": [], "reports": None}
+    for vu in vus:
+        response = await client.get("/watchlist", headers=vu.headers)
+        stored = set(response.json().get("watchlist", [])) if response.status_code == 200 else set()
+        if stored != vu.watchlist:
+            lost["watchlist"].append({
+                "user": vu.name, "missing": sorted(vu.watchlist - stored), "unexpected": sorted(stored - vu.watchlist),
+            })
+
+        response = await client.get(f"/reviews/by-user/{vu.name}", params={"amount": 100})
+        stored_titles = {r.get("Movie Title"): r.get("Review Title") for r in response.json()} \
+            if response.status_code == 200 else {}
+        for movie, title in vu.review_titles.items():
+            if stored_titles.get(movie) != title:
+                lost["reviews"].append({"user": vu.name, "movie": movie, "expected": title,
+                                        "stored": stored_titles.get(movie)})
+
+    if admin is not None and reports_before is not None:
+        acknowledged = sum(
+            s.statuses.get("200", 0) for route, s in stats.items() if route.startswith("POST /moderation/reports/")
+        )
+        response = await client.get("/moderation/reports", headers={"X-Username": admin})
+        stored = len(response.json()) - reports_before
+        if stored != acknowledged:
+            lost["reports"] = {"acknowledged": acknowledged, "stored": stored}
+    return lost
+
+
+async def run(client, users: int, duration: float, seed: int, admin: Optional[str]) -> Dict[str, Any]:
+    movies = (await client.get("/movies")).json()
+    catalog = Catalog(movies)
+    vus = [VirtualUser(i, seed) for i in range(users)]
+    for vu in vus:
+        response = await client.post("/auth/register", json={"username": vu.name, "password": PASSWORD})
+        if response.status_code not in (200, 400):  # 400: already registered on a reused server
+            raise RuntimeError(f"Could not register {vu.name}: {response.status_code} {response.text}")
+        vu.watchlist = set((await client.get("/watchlist", headers=vu.headers)).json().get("watchlist", []))
+    reports_before = None
+    if admin is not None:
+        reports_before = len((await client.get("/moderation/reports", headers={"X-Username": admin})).json())
+
+    stats: Dict[str, RouteStats] = {}
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(_virtual_user(client, vu, catalog, stats, deadline) for vu in vus))
+    seconds = time.perf_counter() - started
+
+    lost = await _check_lost_updates(client, vus, admin, reports_before, stats)
+    routes = {route: s.summary(seconds) for route, s in sorted(stats.items())}
+    total = sum(r["requests"] for r in routes.values())
+    return {
+        "seconds": seconds,
+        "requests": total,
+        "throughput": total / seconds,
+        "errors": sum(r["errors"] for r in routes.values()),
+        "routes": routes,
+        "lostUpdates": lost,
+    }
+
+
+async def _in_process(source: Path, users: int, duration: float, seed: int, admin: Optional[str]) -> Dict[str, Any]:
+    work = Path(tempfile.mkdtemp(prefix="load-test-"))
+    try:
+        root = work / "data"
+        shutil.copytree(source, root, ignore=shutil.ignore_patterns("*.tmp", "movieReviews.*.*"))
+        with repointed(root, DATA_CONSTANTS + SERVICE_CONSTANTS), contextlib.redirect_stdout(io.StringIO()):
+            if admin is None:
+                admins = adminRepo.load_admins()
+                admin = admins[0]["adminName"] if admins else None
+            # Unhandled exceptions become 500s instead of aborting the run
+            transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+            async with app.router.lifespan_context(app):
+                async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=60) as client:
+                    return await run(client, users, duration, seed, admin)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+async def _remote(url: str, users: int, duration: float, seed: int, admin: Optional[str]) -> Dict[str, Any]:
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    async with httpx.AsyncClient(base_url=url, timeout=60, limits=limits) as client:
+        return await run(client, users, duration, seed, admin)
+
+
+def _print_report(result: Dict[str, Any], max_error_rate: float) -> List[str]:
+    print(f"{result['requests']} requests in {result['seconds']:.1f}s ({result['throughput']:.0f} req/s)\n")
+    print(f"{'route':<56}{'req':>7}{'req/s':>8}{'err':>6}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for route, r in result["routes"].items():
+        print(f"{route:<56}{r['requests']:>7}{r['throughput']:>8.1f}{r['errors']:>6}"
+              f"{r['p50Ms']:>9.2f}{r['p95Ms']:>9.2f}{r['p99Ms']:>9.2f}")
+    print("\nlatency histogram (requests per bucket, ms)")
+    print(f"{'route':<56}" + "".join(f"{k:>8}" for k in next(iter(result["routes"].values()))["histogramMs"]))
+    for route, r in result["routes"].items():
+        print(f"{route:<56}" + "".join(f"{n:>8}" for n in r["histogramMs"].values()))
+
+    flags = []
+    for route, r in result["routes"].items():
+        if r["errorRate"] > max_error_rate:
+            flags.append(f"error rate {r['errorRate']:.1%} on {route} (statuses {r['statuses']})")
+    lost = result["lostUpdates"]
+    if lost["watchlist"]:
+        flags.append(f"lost watchlist updates for {len(lost['watchlist'])} users")
+    if lost["reviews"]:
+        flags.append(f"{len(lost['reviews'])} acknowledged review writes missing")
+    if lost["reports"]:
+        flags.append(f"reports acknowledged {lost['reports']['acknowledged']}, stored {lost['reports']['stored']}")
+    print()
+    for flag in flags:
+        print(f"FLAG: {flag}")
+    if not flags:
+        print("no errors above threshold, no lost updates")
+    return flags
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", help="Base URL of a running server (default: in-process ASGI)")
+    parser.add_argument("--source", type=Path, default=DEFAULT_SOURCE, help="Data root to copy for in-process runs")
+    parser.add_argument("--users", type=int, default=16, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds of load")
+    parser.add_argument("--admin", help="Admin name used to count reports (in-process: first admin)")
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=310)
+    parser.add_argument("--out", type=Path, help="Results JSON (default: benchmark-results/load-<time>.json)")
+    args = parser.parse_args()
+
+    started = datetime.now(timezone.utc)
+    if args.url:
+        result = asyncio.run(_remote(args.url, args.users, args.duration, args.seed, args.admin))
+    else:
+        result = asyncio.run(_in_process(args.source, args.users, args.duration, args.seed, args.admin))
+    flags = _print_report(result, args.max_error_rate)
+
+    out = args.out or RESULTS_DIR / f"load-{started:%Y%m%dT%H%M%SZ}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps({
+        "benchmark": "load",
+        "startedAt": started.isoformat(),
+        "target": args.url or "in-process",
+        "users": args.users,
+        "duration": args.duration,
+        "seed": args.seed,
+        "flags": flags,
+        **result,
+    }, indent=2), encoding="utf-8")
+    print(f"\nwrote {out}")
+    sys.exit(1 if flags else 0)
+
+
+if __name__ == "__main__":
+    main()
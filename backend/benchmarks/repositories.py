@@ -0,0 +1,367 @@
+"""
+Benchmark harness for the repository modules.
+
+Copies a data root (the checked-in data/ by default, or a generated one via
+--source) into a temp directory, repoints every repository path constant at
+the copy and drives moviesRepo, reviewsRepo, usersRepo, moderationRepo and
+reportsRepo through their main operations, one at a time and as a weighted
+read/write mix per module. The real data/ is never written.
+
+For every operation it reports ops/sec, p50/p99/mean latency, bytes
+read/written per call (rchar/wchar from /proc/self/io, i.e. read()/write()
+syscalls; mmap'ed reads are not counted) and the peak Python heap of one call
+(tracemalloc, measured in a separate untimed pass), which is the per-call
+memory figure. The process peak RSS after each operation is recorded as
+well, but it is a high-water mark over the whole run: it never goes down and
+can only be attributed to the operation that first raised it. Results are
+written as JSON so runs can be compared with --compare.
+
+Usage (from the project root):
+    python -m backend.benchmarks.repositories
+    python -m backend.benchmarks.repositories --source /tmp/bench-data --ops 500 --only reviewsRepo usersRepo
+    python -m backend.benchmarks.repositories --out after.json --compare before.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from backend.app.models.models import Review
+from backend.app.repositories import adminRepo, moderationRepo, moviesRepo, reportsRepo, reviewsRepo, usersRepo
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_SOURCE = PROJECT_ROOT / "data"
+RESULTS_DIR = PROJECT_ROOT / "benchmark-results"
+
+# (module, attribute, path relative to the data root)
+DATA_CONSTANTS = [
+    (moviesRepo, "DATA_PATH", "imdb"),
+    (reviewsRepo, "DATA_PATH", "imdb"),
+    (reportsRepo, "DATA_PATH", "imdb"),
+    (usersRepo, "DATA_PATH", "users.json"),
+    (adminRepo, "DATA_PATH", "admins.json"),
+    (moderationRepo, "DATA_DIR", ""),
+    (moderationRepo, "IMDB_DIR", "imdb"),
+    (moderationRepo, "REPORTS_FILE", "reports.json"),
+    (moderationRepo, "BANS_FILE", "bans.json"),
+]
+
+
+@contextlib.contextmanager
+def repointed(root: Path, constants=DATA_CONSTANTS):
+    """Point every repository (or every entry of `constants`) at `root` for the duration of the block."""
+    saved = [(module, attr, getattr(module, attr)) for module, attr, _ in constants]
+    try:
+        for module, attr, rel in constants:
+            path = root / rel if rel else root
+            # Some services keep their paths as strings
+            setattr(module, attr, str(path) if isinstance(getattr(module, attr), str) else path)
+        yield
+    finally:
+        for module, attr, value in saved:
+            setattr(module, attr, value)
+
+
+def _io_counters() -> Optional[Dict[str, int]]:
+    try:
+        with open("/proc/self/io", encoding="ascii") as f:
+            return {k: int(v) for k, v in (line.split(":") for line in f)}
+    except OSError:
+        return None
+
+
+def _process_peak_rss_kb() -> int:
+    """Peak RSS of the whole process so far (getrusage cannot be reset)."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss  # bytes on macOS
+
+
+def _percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+# ─────────────────────────────────────────────────────────────
+# Workload
+# ─────────────────────────────────────────────────────────────
+
+class Dataset:
+    """Names sampled from the data root plus state created by write operations."""
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self.movies = sorted(p.parent.name for p in reviewsRepo.DATA_PATH.glob("*/metadata.json"))
+        self.users = [u["userName"] for u in usersRepo.load_users()]
+        self.reviews = [
+            (movie, r["User"])
+            for movie in self.movies
+            for r in reviewsRepo.load_reviews(movie, 50, fields=["User"])
+        ]
+        self.report_ids = [r.reportId for r in moderationRepo.load_reports()]
+        self.added_reviews: List[tuple] = []
+        self.counter = 0
+
+    def next_name(self, prefix: str) -> str:
+        self.counter += 1
+        return f"bench-{prefix}-{self.counter}"
+
+    def movie(self) -> str:
+        return self.rng.choice(self.movies)
+
+    def user(self) -> str:
+        return self.rng.choice(self.users)
+
+    def review(self) -> tuple:
+        return self.rng.choice(self.reviews)
+
+
+def _save_review(d: Dataset) -> None:
+    movie = d.movie()
+    user = d.next_name("reviewer")
+    reviewsRepo.save_review(movie, Review(
+        movieTitle=movie, user=user, rating=d.rng.randint(1, 10), title="Benchmark",
+        body="Benchmark review body. " * 20, usefulVotes=0, totalVotes=0, reportCount=0,
+    ))
+    d.added_reviews.append((movie, user))
+
+
+def _update_review(d: Dataset) -> None:
+    if not d.added_reviews:
+        return _save_review(d)
+    movie, user = d.rng.choice(d.added_reviews)
+    reviewsRepo.update_review(movie, user, {"Review Title": d.next_name("title")})
+
+
+def _delete_review(d: Dataset) -> None:
+    if not d.added_reviews:
+        return _save_review(d)
+    reviewsRepo.delete_review(*d.added_reviews.pop())
+
+
+def _create_report(d: Dataset) -> None:
+    movie, user = d.review()
+    report = moderationRepo.create_report_for_review(movie, user, d.user(), "spam", "benchmark")
+    d.report_ids.append(report.reportId)
+
+
+def _replace_report(d: Dataset) -> None:
+    if not d.report_ids:
+        return _create_report(d)
+    report = moderationRepo.get_report_by_id(d.rng.choice(d.report_ids))
+    if report is not None:
+        report.reason = d.next_name("reason")
+        moderationRepo.replace_report(report)
+
+
+def _add_ban(d: Dataset) -> None:
+    movie, user = d.review()
+    moderationRepo.add_ban(
+        user_name=user, reported_by=d.user(), report_id=0, movie_title=movie, review_user=user,
+        reason_type="spam", reason="benchmark", ban_option="3d", ban_duration_seconds=3 * 86400,
+    )
+
+
+class Operation(NamedTuple):
+    name: str
+    kind: str  # "read" | "write"
+    weight: int  # share in the module's mix
+    run: Callable[[Dataset], Any]
+
+
+WORKLOADS: Dict[str, List[Operation]] = {
+    "moviesRepo": [
+        Operation("load_all_movies", "read", 2, lambda d: moviesRepo.load_all_movies()),
+        Operation("load_movie_by_title", "read", 8, lambda d: moviesRepo.load_movie_by_title(d.movie())),
+        Operation("update_movies", "write", 1,
+                  lambda d: moviesRepo.update_movies(d.movie(), {"description": d.next_name("description")})),
+    ],
+    "reviewsRepo": [
+        Operation("load_reviews", "read", 8,
+                  lambda d: reviewsRepo.load_reviews(d.movie(), 10, d.rng.randrange(100))),
+        Operation("load_reviews_sorted", "read", 3,
+                  lambda d: reviewsRepo.load_reviews(d.movie(), 10, sort_by=d.rng.choice(reviewsRepo.SORT_FIELDS))),
+        Operation("find_review_by_user", "read", 2, lambda d: reviewsRepo.find_review_by_user(*d.review())),
+        Operation("load_reviews_by_user", "read", 1, lambda d: reviewsRepo.load_reviews_by_user(d.review()[1])),
+        Operation("save_review", "write", 1, _save_review),
+        Operation("update_review", "write", 1, _update_review),
+        Operation("delete_review", "write", 1, _delete_review),
+    ],
+    "usersRepo": [
+        Operation("find_user_by_username", "read", 10, lambda d: usersRepo.find_user_by_username(d.user())),
+        Operation("add_to_watchlist", "write", 1, lambda d: usersRepo.add_to_watchlist(d.user(), d.movie())),
+        Operation("remove_from_watchlist", "write", 1, lambda d: usersRepo.remove_from_watchlist(d.user(), d.movie())),
+        Operation("add_user", "write", 1, lambda d: usersRepo.add_user({
+            "userName": d.next_name("user"), "passwordHash": "", "role": "user", "penalties": 0, "watchlist": [],
+        })),
+    ],
+    "moderationRepo": [
+        Operation("create_report_for_review", "write", 1, _create_report),
+        Operation("list_pending_reports", "read", 3, lambda d: moderationRepo.list_pending_reports()),
+        Operation("get_report_by_id", "read", 4,
+                  lambda d: moderationRepo.get_report_by_id(d.rng.choice(d.report_ids or [1]))),
+        Operation("replace_report", "write", 1, _replace_report),
+        Operation("list_reports_for_review", "read", 2, lambda d: moderationRepo.list_reports_for_review(*d.review())),
+        Operation("add_ban", "write", 1, _add_ban),
+        Operation("list_bans", "read", 2, lambda d: moderationRepo.list_bans(d.user())),
+        Operation("report_stats", "read", 1, lambda d: moderationRepo.report_stats()),
+    ],
+    "reportsRepo": [
+        Operation("load_all_reports", "read", 1, lambda d: reportsRepo.load_all_reports()),
+    ],
+}
+
+
+# ─────────────────────────────────────────────────────────────
+# Measurement
+# ─────────────────────────────────────────────────────────────
+
+def measure(repo: str, name: str, kind: str, step: Callable[[], Any], ops: int, max_seconds: float,
+            traced_ops: int) -> Dict[str, Any]:
+    """Time `step` up to `ops` times (or `max_seconds`), then trace a few calls for heap peak."""
+    step()  # warm caches / lazy indexes
+    samples: List[float] = []
+    io_before = _io_counters()
+    deadline = time.perf_counter() + max_seconds
+    while len(samples) < ops and time.perf_counter() < deadline:
+        start = time.perf_counter()
+        step()
+        samples.append((time.perf_counter() - start) * 1e3)
+    io_after = _io_counters()
+
+    peak = 0
+    tracemalloc.start()
+    for _ in range(min(traced_ops, len(samples))):
+        tracemalloc.reset_peak()
+        step()
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+
+    def per_op(key: str) -> Optional[int]:
+        if io_before is None or io_after is None:
+            return None
+        return (io_after[key] - io_before[key]) // len(samples)
+
+    return {
+        "repo": repo,
+        "operation": name,
+        "kind": kind,
+        "ops": len(samples),
+        "opsPerSec": len(samples) / (sum(samples) / 1e3) if sum(samples) else None,
+        "p50Ms": _percentile(samples, 50),
+        "p99Ms": _percentile(samples, 99),
+        "meanMs": statistics.fmean(samples),
+        "bytesReadPerOp": per_op("rchar"),
+        "bytesWrittenPerOp": per_op("wchar"),
+        "peakTracedBytes": peak,
+        # Cumulative high-water mark, not this operation's footprint
+        "processPeakRssKb": _process_peak_rss_kb(),
+    }
+
+
+def run(repos: List[str], ops: int, seed: int, max_seconds: float, traced_ops: int) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    dataset = Dataset(rng)
+    results = []
+    for repo in repos:
+        workload = WORKLOADS[repo]
+        for op in workload:
+            results.append(measure(repo, op.name, op.kind, lambda: op.run(dataset), ops, max_seconds, traced_ops))
+
+        if len(workload) < 2:
+            continue
+
+        def mixed(workload=workload):
+            op = rng.choices(workload, weights=[o.weight for o in workload])[0]
+            op.run(dataset)
+
+        results.append(measure(repo, "mix", "mix", mixed, ops, max_seconds, traced_ops))
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print_table(results: List[Dict[str, Any]], baseline: Dict[tuple, Dict[str, Any]]) -> None:
+    header = f"{'repo':<16}{'operation':<26}{'ops/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'read B':>12}{'write B':>12}{'heap KB':>10}"
+    if baseline:
+        header += f"{'vs base':>9}"
+    print(header)
+    for r in results:
+        line = (
+            f"{r['repo']:<16}{r['operation']:<26}{r['opsPerSec'] or 0:>10.0f}{r['p50Ms']:>10.3f}{r['p99Ms']:>10.3f}"
+            f"{r['bytesReadPerOp'] if r['bytesReadPerOp'] is not None else '-':>12}"
+            f"{r['bytesWrittenPerOp'] if r['bytesWrittenPerOp'] is not None else '-':>12}"
+            f"{r['peakTracedBytes'] / 1024:>10.0f}"
+        )
+        base = baseline.get((r["repo"], r["operation"]))
+        if base and base.get("opsPerSec") and r["opsPerSec"]:
+            line += f"{r['opsPerSec'] / base['opsPerSec']:>8.2f}x"
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--source", type=Path, default=DEFAULT_SOURCE, help="Data root to copy (default: data/)")
+    parser.add_argument("--only", nargs="+", choices=list(WORKLOADS), default=list(WORKLOADS))
+    parser.add_argument("--ops", type=int, default=200, help="Calls per operation")
+    parser.add_argument("--max-seconds", type=float, default=10.0, help="Time budget per operation")
+    parser.add_argument("--traced-ops", type=int, default=5, help="Calls per operation run under tracemalloc")
+    parser.add_argument("--seed", type=int, default=310)
+    parser.add_argument("--out", type=Path, help="Results JSON (default: benchmark-results/repositories-<time>.json)")
+    parser.add_argument("--compare", type=Path, help="Earlier results JSON to compare ops/sec against")
+    args = parser.parse_args()
+
+    started = datetime.now(timezone.utc)
+    work = Path(tempfile.mkdtemp(prefix="repo-bench-"))
+    try:
+        root = work / "data"
+        shutil.copytree(args.source, root, ignore=shutil.ignore_patterns("*.tmp", "movieReviews.*.*"))
+        with repointed(root), contextlib.redirect_stdout(io.StringIO()):  # repos print progress
+            results = run(args.only, args.ops, args.seed, args.max_seconds, args.traced_ops)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    baseline = {}
+    if args.compare:
+        previous = json.loads(args.compare.read_text(encoding="utf-8"))
+        baseline = {(r["repo"], r["operation"]): r for r in previous["results"]}
+    _print_table(results, baseline)
+
+    out = args.out or RESULTS_DIR / f"repositories-{started:%Y%m%dT%H%M%SZ}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps({
+        "benchmark": "repositories",
+        "startedAt": started.isoformat(),
+        "gitCommit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "reviewStorage": reviewsRepo.REVIEW_STORAGE,
+        "source": str(args.source),
+        "ops": args.ops,
+        "seed": args.seed,
+        "results": results,
+    }, indent=2), encoding="utf-8")
+    print(f"\nwrote {out}")
+
+
+if __name__ == "__main__":
+    main()
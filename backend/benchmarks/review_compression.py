@@ -0,0 +1,88 @@
+"""
+Disk footprint and page-read latency: plain CSV vs compressed blocks.
+
+Copies every data/imdb/*/movieReviews.csv into a temp directory, packs each
+copy with every codec and reads the same random pages from all formats.
+
+Usage (from the project root):
+    python -m backend.benchmarks.review_compression
+    python -m backend.benchmarks.review_compression --pages 2000 --amount 10 --rows-per-block 128
+"""
+import argparse
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from backend.app.repositories import reviewBlockStore, reviewFileReader
+from backend.app.repositories.reviewsRepo import DATA_PATH
+
+
+def _percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+def _time_pages(read, paths, pages, amount, seed):
+    rng = random.Random(seed)
+    samples = []
+    for _ in range(pages):
+        path, rows = rng.choice(paths)
+        offset = rng.randrange(max(rows - amount, 1))
+        start = time.perf_counter()
+        read(path, offset, offset + amount)
+        samples.append((time.perf_counter() - start) * 1e3)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=1000, help="Random pages to read per format")
+    parser.add_argument("--amount", type=int, default=10, help="Rows per page")
+    parser.add_argument("--rows-per-block", type=int, default=reviewBlockStore.ROWS_PER_BLOCK)
+    parser.add_argument("--seed", type=int, default=310)
+    args = parser.parse_args()
+
+    work = Path(tempfile.mkdtemp(prefix="review-compression-"))
+    try:
+        csv_paths = []
+        for source in sorted(DATA_PATH.glob("*/movieReviews.csv")):
+            target = work / "csv" / source.parent.name / source.name
+            target.parent.mkdir(parents=True)
+            shutil.copyfile(source, target)
+            csv_paths.append((target, reviewFileReader.count_rows(target)))
+
+        formats = {"csv": (reviewFileReader.read_range, csv_paths)}
+        sizes = {"csv": sum(p.stat().st_size for p, _ in csv_paths)}
+        for codec in reviewBlockStore.CODECS:
+            packed = []
+            start = time.perf_counter()
+            for path, rows in csv_paths:
+                target = work / codec / path.parent.name / path.name
+                target.parent.mkdir(parents=True)
+                shutil.copyfile(path, target)
+                packed.append((reviewBlockStore.pack_csv(target, codec, rows_per_block=args.rows_per_block), rows))
+            print(f"packed {codec:<5} in {time.perf_counter() - start:.2f}s")
+            formats[codec] = (reviewBlockStore.read_range, packed)
+            sizes[codec] = sum(p.stat().st_size for p, _ in packed)
+
+        print(f"\n{len(csv_paths)} movies, {sum(r for _, r in csv_paths)} reviews, "
+              f"{args.pages} random pages of {args.amount}\n")
+        print(f"{'format':<8}{'bytes':>12}{'ratio':>8}{'p50 ms':>10}{'p99 ms':>10}{'mean ms':>10}")
+        for name, (read, paths) in formats.items():
+            if name != "csv":
+                reviewBlockStore._BLOCKS.clear()
+            samples = _time_pages(read, paths, args.pages, args.amount, args.seed)
+            print(
+                f"{name:<8}{sizes[name]:>12}{sizes[name] / sizes['csv']:>8.2f}"
+                f"{_percentile(samples, 50):>10.3f}{_percentile(samples, 99):>10.3f}"
+                f"{statistics.fmean(samples):>10.3f}"
+            )
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Side-by-side latency of the review storage engines (csv, compressed, sqlite).
+
+Copies data/imdb into a temp directory once per engine, migrates the copy
+into that engine and runs the same seeded mix of reviewsRepo calls against
+it: random pages, date-sorted pages, find_review_by_user, then save_review,
+update_review and delete_review. Metadata recomputation is switched off so
+only storage work is measured; the real data/imdb is never written.
+
+Usage (from the project root):
+    python -m backend.benchmarks.review_storage
+    python -m backend.benchmarks.review_storage --ops 500 --engines csv sqlite
+"""
+import argparse
+import contextlib
+import io
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from backend.app.models.models import Review
+from backend.app.repositories import moviesRepo, reviewsRepo, reviewStorage
+
+
+def _percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+def _timed(samples, fn, *args, **kwargs):
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    samples.append((time.perf_counter() - start) * 1e3)
+
+
+def _run(movies, ops, seed):
+    rng = random.Random(seed)
+    results = {name: [] for name in ("page", "sortedPage", "findByUser", "append", "update", "delete")}
+    users = {m: [r["User"] for r in reviewsRepo.load_all_reviews(m)] for m in movies}
+    movies = [m for m in movies if users[m]]
+
+    for _ in range(ops):
+        movie = rng.choice(movies)
+        offset = rng.randrange(max(len(users[movie]) - 10, 1))
+        _timed(results["page"], reviewsRepo.load_reviews, movie, 10, offset)
+        _timed(results["sortedPage"], reviewsRepo.load_reviews, movie, 10, offset, sort_by="date")
+        _timed(results["findByUser"], reviewsRepo.find_review_by_user, movie, rng.choice(users[movie]))
+
+    added = []
+    for i in range(ops):
+        movie = rng.choice(movies)
+        user = f"bench-user-{i}"
+        _timed(results["append"], reviewsRepo.save_review, movie, Review(
+            movieTitle=movie, user=user, rating=rng.randint(1, 10), title="Benchmark",
+            body="Benchmark review body. " * 20, usefulVotes=0, totalVotes=0, reportCount=0,
+        ))
+        added.append((movie, user))
+    for movie, user in added:
+        _timed(results["update"], reviewsRepo.update_review, movie, user, {"Review Title": "Edited"})
+    with contextlib.redirect_stdout(io.StringIO()):  # "Deletion successful"
+        for movie, user in added:
+            _timed(results["delete"], reviewsRepo.delete_review, movie, user)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ops", type=int, default=200, help="Operations of each kind per engine")
+    parser.add_argument("--engines", nargs="+", default=list(reviewStorage.ENGINES), choices=list(reviewStorage.ENGINES))
+    parser.add_argument("--seed", type=int, default=310)
+    args = parser.parse_args()
+
+    source = reviewsRepo.DATA_PATH
+    movies = sorted(p.parent.name for p in source.glob("*/movieReviews.csv"))
+    work = Path(tempfile.mkdtemp(prefix="review-storage-"))
+    saved = (reviewsRepo.DATA_PATH, moviesRepo.DATA_PATH, reviewsRepo.REVIEW_STORAGE, reviewsRepo.recompute_movie_ratings)
+    reviewsRepo.recompute_movie_ratings = lambda title: None
+    try:
+        print(f"{len(movies)} movies, {args.ops} operations of each kind per engine\n")
+        print(f"{'engine':<12}{'operation':<12}{'ops/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'mean ms':>10}")
+        for engine in args.engines:
+            root = work / engine
+            root.mkdir()
+            for movie in movies:
+                shutil.copytree(source / movie, root / movie, ignore=shutil.ignore_patterns("movieReviews.*.*"))
+            reviewsRepo.DATA_PATH = moviesRepo.DATA_PATH = root
+            reviewsRepo.REVIEW_STORAGE = engine
+            start = time.perf_counter()
+            for movie in movies:
+                reviewStorage.migrate(root / movie / "movieReviews.csv", engine)
+            print(f"{engine:<12}{'migrate':<12}{'':>10}{'':>10}{'':>10}{(time.perf_counter() - start) * 1e3:>10.1f}")
+
+            for name, samples in _run(movies, args.ops, args.seed).items():
+                print(
+                    f"{engine:<12}{name:<12}{len(samples) / (sum(samples) / 1e3):>10.0f}"
+                    f"{_percentile(samples, 50):>10.3f}{_percentile(samples, 99):>10.3f}"
+                    f"{statistics.fmean(samples):>10.3f}"
+                )
+    finally:
+        reviewsRepo.DATA_PATH, moviesRepo.DATA_PATH, reviewsRepo.REVIEW_STORAGE, reviewsRepo.recompute_movie_ratings = saved
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+Bulk-load a review dump into data/imdb.
+
+Usage (from the project root):
+    python -m backend.ingest_reviews dump.csv
+    python -m backend.ingest_reviews "Joker reviews.csv" --movie "Joker" --workers 4
+
+The dump may use the canonical movieReviews.csv headers or common aliases
+(movie, user, rating, title, body, ...). Rows for movies that do not exist
+yet, invalid rows and (movie, user) duplicates are skipped and counted.
+"""
+import argparse
+import json
+from pathlib import Path
+
+from backend.app.services.reviewIngestService import ReviewIngestService
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stream a review CSV dump into data/imdb")
+    parser.add_argument("source", type=Path, help="CSV file to ingest")
+    parser.add_argument("--movie", help="Movie title for dumps without a 'Movie Title' column")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--encoding", default="utf-8")
+    args = parser.parse_args()
+
+    summary = ReviewIngestService().ingest_file(
+        args.source,
+        default_movie=args.movie,
+        workers=args.workers,
+        encoding=args.encoding,
+    )
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Move reviews between storage engines (see reviewStorage).
+
+Usage (from the project root):
+    python -m backend.migrate_reviews --to sqlite
+    python -m backend.migrate_reviews --to csv --movie "Joker"
+    python -m backend.migrate_reviews --to compressed --keep-source
+
+Each movie is read from whichever engine currently holds it and rewritten
+into the target one. Afterwards run the backend with REVIEW_STORAGE set to
+the same engine.
+"""
+import argparse
+import json
+
+from backend.app.repositories import reviewsRepo, reviewStorage
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Move reviews between storage engines")
+    parser.add_argument("--to", required=True, choices=sorted(reviewStorage.ENGINES), help="Target engine")
+    parser.add_argument("--movie", action="append", help="Only migrate this movie (repeatable)")
+    parser.add_argument("--keep-source", action="store_true", help="Leave the SQLite rows / files behind")
+    args = parser.parse_args()
+
+    movies = args.movie or sorted(d.name for d in reviewsRepo.DATA_PATH.iterdir() if d.is_dir())
+    summary = {"migrated": {}, "skipped": []}
+    for movie in movies:
+        source = reviewStorage.migrate(reviewsRepo.DATA_PATH / movie / "movieReviews.csv", args.to, args.keep_source)
+        if source is None:
+            summary["skipped"].append(movie)
+        else:
+            summary["migrated"][movie] = source
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,4 +6,21 @@ ROOT = Path(__file__).resolve().parents[1]
 root_str = str(ROOT)
 
 if root_str not in sys.path:
-    sys.path.insert(0, root_str)
\ No newline at end of file
+    sys.path.insert(0, root_str)
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _fresh_active_bans(monkeypatch, tmp_path):
+    # The active-ban table is process-wide; start every test from users.json
+    from backend.app.repositories import activeBans
+
+    monkeypatch.setattr(activeBans, "_EXPIRES", {})
+    monkeypatch.setattr(activeBans, "_HEAP", [])
+    monkeypatch.setattr(activeBans, "_SOURCE", None)
+    monkeypatch.setattr(activeBans, "_STAMP", None)
+    monkeypatch.setattr(activeBans, "_CHECKED_AT", None)
+    # Ban changes replace a signal file; keep it out of the real data/
+    signal = tmp_path / "users.json.bans"
+    monkeypatch.setattr(activeBans, "_signal_path", lambda: signal)
@@ -0,0 +1,141 @@
+import asyncio
+import json
+import multiprocessing
+import time
+from datetime import datetime
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from backend.app.main import app
+from backend.app.repositories import activeBans, reviewsRepo, usersRepo
+from backend.app.services import banExpiryService
+from backend.app.services.banExpiryService import BanExpiryService
+from backend.app.services.moderationService import ModerationService
+
+
+def write_users(tmp_path, monkeypatch, users):
+    users_file = tmp_path / "users.json"
+    users_file.write_text(json.dumps(users), encoding="utf-8")
+    monkeypatch.setattr(usersRepo, "DATA_PATH", users_file)
+    return users_file
+
+
+def in_other_process(target, *args):
+    """Run `target` in a forked worker that shares this test's files."""
+    worker = multiprocessing.get_context("fork").Process(target=target, args=args)
+    worker.start()
+    worker.join(10)
+    assert worker.exitcode == 0
+
+
+def _ban(username, expires_at):
+    ModerationService()._update_ban_expires_for_user(username, datetime.fromtimestamp(expires_at))
+
+
+def test_sweep_clears_expired_bans_in_one_write(tmp_path, monkeypatch):
+    now = time.time()
+    users_file = write_users(tmp_path, monkeypatch, [
+        {"userName": "a", "banExpiresAt": now + 10},
+        {"userName": "b", "banExpiresAt": now + 20},
+        {"userName": "c", "banExpiresAt": now + 3600},
+        {"userName": "d"},
+    ])
+    saves = []
+    real_save = usersRepo.save_users
+    monkeypatch.setattr(banExpiryService, "save_users", lambda users: saves.append(1) or real_save(users))
+    service = BanExpiryService()
+
+    assert service.sweep(now) == []
+    assert sorted(service.sweep(now + 30)) == ["a", "b"]
+    assert len(saves) == 1
+
+    stored = {u["userName"]: u for u in json.loads(users_file.read_text(encoding="utf-8"))}
+    assert "banExpiresAt" not in stored["a"] and "banExpiresAt" not in stored["b"]
+    assert stored["c"]["banExpiresAt"] == now + 3600
+    metrics = service.snapshot()
+    assert (metrics["sweeps"], metrics["expired"], metrics["userWrites"], metrics["activeBans"]) == (2, 2, 1, 1)
+    assert metrics["nextExpiry"] == now + 3600
+
+
+def test_sweep_keeps_a_newer_ban_written_elsewhere(tmp_path, monkeypatch):
+    now = time.time()
+    users_file = write_users(tmp_path, monkeypatch, [{"userName": "a", "banExpiresAt": now + 10}])
+    activeBans.active_count()  # table loaded with the old expiry
+    in_other_process(_ban, "a", int(now + 999))
+
+    # The moved signal reloads the table, so the newer ban is kept
+    assert BanExpiryService().sweep(now + 30) == []
+    assert activeBans.ban_expires_at("a") == int(now + 999)
+    assert json.loads(users_file.read_text(encoding="utf-8"))[0]["banExpiresAt"] == int(now + 999)
+
+
+def test_only_one_worker_clears_an_expiry(tmp_path, monkeypatch):
+    now = time.time()
+    write_users(tmp_path, monkeypatch, [{"userName": "a", "banExpiresAt": now + 10}])
+    saves = []
+    real_save = usersRepo.save_users
+    monkeypatch.setattr(banExpiryService, "save_users", lambda users: saves.append(1) or real_save(users))
+    activeBans.active_count()
+    # Another worker's table, loaded before the first worker sweeps
+    other = (dict(activeBans._EXPIRES), list(activeBans._HEAP), activeBans._STAMP)
+
+    assert BanExpiryService().sweep(now + 30) == ["a"]
+    monkeypatch.setattr(activeBans, "_EXPIRES", other[0])
+    monkeypatch.setattr(activeBans, "_HEAP", other[1])
+    monkeypatch.setattr(activeBans, "_STAMP", other[2])
+
+    # users.json changed underneath it, so its table reloads and pops nothing
+    assert BanExpiryService().sweep(now + 30) == []
+    assert len(saves) == 1
+
+
+def test_bans_written_by_another_process_are_seen(tmp_path, monkeypatch):
+    now = int(time.time())
+    write_users(tmp_path, monkeypatch, [{"userName": "a"}, {"userName": "b"}])
+    monkeypatch.setattr(activeBans, "RECHECK_SECONDS", 0.0)
+    assert not activeBans.is_banned("a")
+
+    in_other_process(_ban, "a", now + 60)
+    assert activeBans.is_banned("a")
+    assert activeBans.next_expiry() == now + 60
+
+    in_other_process(BanExpiryService().sweep, now + 120)
+    assert not activeBans.is_banned("a")
+    assert activeBans.active_count() == 0
+
+
+def test_ban_checks_only_look_at_the_signal_between_rechecks(tmp_path, monkeypatch):
+    write_users(tmp_path, monkeypatch, [{"userName": "a"}])
+    assert not activeBans.is_banned("a")
+
+    # Other users.json writes leave the table alone
+    usersRepo.add_to_watchlist("a", "Joker")
+    with patch.object(usersRepo, "load_users", side_effect=AssertionError("users.json reloaded")), \
+         patch.object(activeBans, "_stamp", side_effect=AssertionError("signal checked")):
+        assert not activeBans.is_banned("a")
+
+    # Past the recheck delay a check stats the signal, which hasn't moved
+    monkeypatch.setattr(activeBans, "RECHECK_SECONDS", 0.0)
+    with patch.object(usersRepo, "load_users", side_effect=AssertionError("users.json reloaded")):
+        assert not activeBans.is_banned("a")
+
+
+def test_lifespan_runs_the_sweeper(tmp_path, monkeypatch):
+    expires_at = time.time() + 0.05
+    users_file = write_users(tmp_path, monkeypatch, [{"userName": "a", "banExpiresAt": expires_at}])
+    # The lifespan also starts the search refresher; keep it off the real data/
+    monkeypatch.setattr(reviewsRepo, "DATA_PATH", tmp_path / "imdb", raising=False)
+    assert activeBans.is_banned("a")
+
+    expired_before = app.state.ban_expiry_service.metrics["expired"]
+    with TestClient(app):
+        deadline = time.time() + 5
+        while activeBans.active_count() and time.time() < deadline:
+            time.sleep(0.02)
+
+    assert activeBans.active_count() == 0
+    # The sweeper /moderation/stats reports on is the one the lifespan ran
+    assert app.state.ban_expiry_service.snapshot()["expired"] == expired_before + 1
+    assert not list((tmp_path / "imdb").glob("*/movieReviews.search.json"))
+    assert "banExpiresAt" not in json.loads(users_file.read_text(encoding="utf-8"))[0]
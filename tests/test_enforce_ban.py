@@ -1,10 +1,16 @@
+import json
 import time
+from datetime import datetime, timedelta
 from unittest.mock import patch
 
+import pytest
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
 
 from backend.app.main import app
 from backend.app.dependencies import ensure_not_banned
+from backend.app.repositories import activeBans, usersRepo
+from backend.app.services.moderationService import ModerationService
 
 client = TestClient(app)
 
@@ -40,6 +46,7 @@ def test_banned_user_cannot_create_review(mock_find_user):
         "watchlist": [],
         "banExpiresAt": future_ts,
     }
+    activeBans.set_ban("bannedUser", future_ts)
 
     response = client.post(
         "/reviews/Joker",
@@ -65,6 +72,7 @@ def test_banned_user_cannot_delete_review(mock_find_user):
         "watchlist": [],
         "banExpiresAt": future_ts,
     }
+    activeBans.set_ban("bannedUser", future_ts)
 
     response = client.delete(
         "/reviews/Joker/bannedUser",
@@ -95,6 +103,7 @@ def test_unbanned_user_can_create_review(mock_find_user):
         "watchlist": [],
         "banExpiresAt": past_ts,
     }
+    activeBans.set_ban("bannedUser", past_ts)
 
     # Avoid touching the real reviewService logic; just assert we reach the controller.
     with patch(
@@ -138,4 +147,47 @@ def test_admin_is_never_blocked_even_if_ban_in_future(mock_find_user):
     result = ensure_not_banned(admin_user)
 
     # The dependency should simply pass the admin through
-    assert result is admin_user
\ No newline at end of file
+    assert result is admin_user
+
+# ---------- Active-ban table ----------
+
+
+def test_ban_check_reads_no_files(tmp_path, monkeypatch):
+    users_file = tmp_path / "users.json"
+    users_file.write_text(
+        json.dumps([
+            {"userName": "old", "banExpiresAt": 1},
+            {"userName": "current", "banExpiresAt": time.time() + 3600},
+        ]),
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(usersRepo, "DATA_PATH", users_file)
+
+    # Loaded once from users.json; expired bans are left out
+    assert activeBans.is_banned("current") and not activeBans.is_banned("old")
+    assert activeBans.active_count() == 1
+
+    with patch("backend.app.repositories.usersRepo.load_users") as mock_load:
+        with pytest.raises(HTTPException) as exc:
+            ensure_not_banned({"username": "current", "role": "user"})
+        assert exc.value.status_code == 403
+        assert ensure_not_banned({"username": "other", "role": "user"})["username"] == "other"
+    mock_load.assert_not_called()
+
+
+def test_ban_table_is_fed_by_moderation_and_renames():
+    users = [{"userName": "alice"}]
+    with patch("backend.app.services.moderationService.load_users", return_value=users), \
+            patch("backend.app.services.moderationService.save_users"):
+        ModerationService()._update_ban_expires_for_user("alice", datetime.now() + timedelta(hours=1))
+    assert activeBans.is_banned("alice")
+
+    activeBans.rename("alice", "alicia")
+    assert activeBans.is_banned("alicia") and not activeBans.is_banned("alice")
+
+    # A newer, already expired ban replaces the active one
+    expired_at = time.time() - 1
+    activeBans.set_ban("alicia", expired_at)
+    assert not activeBans.is_banned("alicia")
+    assert activeBans.pop_expired() == [("alicia", expired_at)]
+    assert activeBans.active_count() == 0 and activeBans.next_expiry() is None
@@ -0,0 +1,49 @@
+import csv
+import json
+
+import pytest
+
+from backend.app.models.models import Ban, Movie, Report
+from backend.app.repositories import reviewsRepo
+from backend.benchmarks import generate_data
+
+
+def tree(root):
+    return {p.relative_to(root): p.read_bytes() for p in sorted(root.rglob("*")) if p.is_file()}
+
+
+def test_apportion_is_zipf_skewed_and_capped():
+    counts = generate_data.apportion(1000, 10, 1.1, cap=200)
+    assert counts[0] == 200
+    assert counts == sorted(counts, reverse=True)
+    assert sum(counts) <= 1000
+
+
+def test_generated_tree_is_deterministic_and_loads(tmp_path):
+    kwargs = dict(movies=12, reviews=600, users=150, report_rate=0.05, seed=7)
+    summary = generate_data.generate(tmp_path / "a", workers=1, **kwargs)
+    generate_data.generate(tmp_path / "b", workers=2, **kwargs)
+    assert tree(tmp_path / "a") == tree(tmp_path / "b")
+
+    root = tmp_path / "a"
+    movie_dirs = sorted((root / "imdb").iterdir())
+    assert len(movie_dirs) == 12
+    for movie_dir in movie_dirs:
+        Movie(**json.loads((movie_dir / "metadata.json").read_text(encoding="utf-8")))
+        with (movie_dir / "movieReviews.csv").open(newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            rows = list(reader)
+        assert reader.fieldnames == reviewsRepo.CSV_HEADERS
+        assert len({r["User"] for r in rows}) == len(rows)  # one review per user and movie
+
+    users = json.loads((root / "users.json").read_text(encoding="utf-8"))
+    assert len(users) == 150 and users[0]["userName"] == "user0000001"
+    reports = [Report.model_validate(r) for r in json.loads((root / "reports.json").read_text(encoding="utf-8"))]
+    bans = [Ban.model_validate(b) for b in json.loads((root / "bans.json").read_text(encoding="utf-8"))]
+    assert summary["reports"] == len(reports) > 0
+    assert summary["bans"] == len(bans)
+
+
+def test_refuses_sizes_beyond_the_supported_scale(tmp_path):
+    with pytest.raises(ValueError):
+        generate_data.generate(tmp_path, users=generate_data.MAX_USERS + 1)
@@ -1,3 +1,6 @@
+import json
+import multiprocessing
+
 import pytest
 from unittest.mock import patch
 from datetime import datetime, timedelta
@@ -13,9 +16,20 @@ from backend.app.models.models import (
     Report,
     ReportCreate,
     ReportDecisionRequest,
+    ReportDecisionItem,
+    ReportDecisionResult,
     Ban,
 )
 from backend.app.main import app
+from backend.app.repositories import moderationRepo, usersRepo
+
+
+@pytest.fixture(autouse=True)
+def _temp_moderation_files(tmp_path, monkeypatch):
+    # Decisions lock reports.json and users.json; keep the lock files off data/
+    monkeypatch.setattr(moderationRepo, "REPORTS_FILE", tmp_path / "reports.json")
+    monkeypatch.setattr(moderationRepo, "BANS_FILE", tmp_path / "bans.json")
+    monkeypatch.setattr(usersRepo, "DATA_PATH", tmp_path / "users.json")
 
 
 # ---------------------------------------------------------------------------
@@ -426,4 +440,239 @@ def test_update_ban_expires_ignores_missing_user(mock_load_users):
         service._update_ban_expires_for_user("TVpotatoCat", base_time)
 
     mock_save_users.assert_not_called()
-    assert "banExpiresAt" not in users[0]
\ No newline at end of file
+    assert "banExpiresAt" not in users[0]
+
+# ---------------------------------------------------------------------------
+# Batch decisions
+# ---------------------------------------------------------------------------
+
+@patch("backend.app.services.moderationService.save_users")
+@patch("backend.app.services.moderationService.load_users")
+@patch("backend.app.services.moderationService.moderationRepo.replace_reports")
+@patch("backend.app.services.moderationService.moderationRepo.add_bans")
+@patch("backend.app.services.moderationService.moderationRepo.get_report_by_id")
+def test_decide_reports_batches_writes_and_aggregates_per_user(
+    mock_get, mock_add_bans, mock_replace_reports, mock_load_users, mock_save_users
+):
+    decided = make_pending_report(report_id=4)
+    decided.status = "rejected"
+    reports = {
+        1: make_pending_report(report_id=1),
+        2: make_pending_report(report_id=2),
+        3: make_pending_report(report_id=3, user="Other"),
+        4: decided,
+    }
+    mock_get.side_effect = lambda report_id: reports.get(report_id)
+    mock_add_bans.side_effect = lambda specs: [
+        make_ban_from_report(reports[s["report_id"]], s["ban_option"]) for s in specs
+    ]
+    users = [{"userName": "TVpotatoCat", "penalties": 1}]
+    mock_load_users.return_value = users
+
+    results = ModerationService().decide_reports(
+        [
+            ReportDecisionItem(reportId=1, action="confirm", banOption="3d"),
+            ReportDecisionItem(reportId=2, action="confirm", banOption="30d"),
+            ReportDecisionItem(reportId=3, action="reject"),
+            ReportDecisionItem(reportId=4, action="reject"),
+            ReportDecisionItem(reportId=99, action="reject"),
+            ReportDecisionItem(reportId=1, action="reject"),
+        ],
+        admin_username="admin1",
+    )
+
+    assert [(r.reportId, r.ok, r.error) for r in results] == [
+        (1, True, None),
+        (2, True, None),
+        (3, True, None),
+        (4, False, "Report already decided"),
+        (99, False, "Report not found"),
+        (1, False, "Duplicate reportId in batch"),
+    ]
+    assert [r.report.status for r in results[:3]] == ["confirmed", "confirmed", "rejected"]
+    assert results[1].ban.banOption == "30d" and results[2].ban is None
+
+    # One write per file, with per-user aggregates
+    mock_add_bans.assert_called_once()
+    assert [s["report_id"] for s in mock_add_bans.call_args.args[0]] == [1, 2]
+    mock_replace_reports.assert_called_once()
+    assert [r.reportId for r in mock_replace_reports.call_args.args[0]] == [1, 2, 3]
+    mock_save_users.assert_called_once_with(users)
+    assert users[0]["penalties"] == 3
+    assert users[0]["banExpiresAt"] == int(results[1].ban.bannedUntil.timestamp())
+
+
+def test_decide_reports_rejects_empty_batch():
+    with pytest.raises(ValueError, match="No decisions given"):
+        ModerationService().decide_reports([], admin_username="admin1")
+
+
+def _decide_in_worker(start, results):
+    start.wait()
+    decided = ModerationService().decide_reports(
+        [ReportDecisionItem(reportId=1, action="confirm", banOption="7d")], admin_username="admin1"
+    )
+    results.put([(r.ok, r.error) for r in decided])
+
+
+def test_concurrent_batches_decide_a_report_once(tmp_path, monkeypatch):
+    (tmp_path / "users.json").write_text(json.dumps([{"userName": "TVpotatoCat", "penalties": 0}]), encoding="utf-8")
+    monkeypatch.setattr(
+        moderationRepo, "build_snapshot_and_increment_reports", lambda movie, user: make_snapshot(movie, user)
+    )
+    moderationRepo.create_report_for_review("Joker", "TVpotatoCat", "alice", "spam", None)
+
+    ctx = multiprocessing.get_context("fork")
+    start, results = ctx.Event(), ctx.Queue()
+    workers = [ctx.Process(target=_decide_in_worker, args=(start, results)) for _ in range(2)]
+    for p in workers:
+        p.start()
+    start.set()
+    outcomes = sorted(results.get(timeout=30)[0] for _ in workers)
+    for p in workers:
+        p.join(30)
+
+    assert outcomes == [(False, "Report already decided"), (True, None)]
+    assert len(moderationRepo.load_bans()) == 1
+    assert json.loads((tmp_path / "users.json").read_text(encoding="utf-8"))[0]["penalties"] == 1
+
+
+@patch("backend.app.controllers.moderationController.moderation_service.decide_reports")
+def test_integration_decide_reports_endpoint(mock_decide):
+    report = make_pending_report()
+    report.status = "rejected"
+    mock_decide.return_value = [
+        ReportDecisionResult(reportId=1, ok=True, report=report),
+        ReportDecisionResult(reportId=2, ok=False, error="Report not found"),
+    ]
+
+    response = client.post(
+        "/moderation/reports/decisions",
+        json=[{"reportId": 1, "action": "reject"}, {"reportId": 2, "action": "confirm", "banOption": "3d"}],
+        headers={"X-Username": "admin1"},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["decided"] == 1
+    assert body["results"][1]["error"] == "Report not found"
+    items = mock_decide.call_args.kwargs["decisions"]
+    assert [i.reportId for i in items] == [1, 2]
+
+
+# ---------------------------------------------------------------------------
+# Paged report listing
+# ---------------------------------------------------------------------------
+
+@patch("backend.app.services.moderationService.moderationRepo.page_reports")
+def test_page_reports_can_leave_out_review_bodies(mock_page):
+    mock_page.return_value = ([make_pending_report()], "next")
+    service = ModerationService()
+
+    page = service.page_reports(status="pending", include_body=False)
+    assert page["nextCursor"] == "next"
+    assert "body" not in page["items"][0]["review"]
+    assert page["items"][0]["review"]["title"] == "Good movie"
+    assert service.page_reports()["items"][0]["review"]["body"] == "Body text"
+    assert mock_page.call_args_list[0].kwargs["status"] == "pending"
+
+
+@patch("backend.app.controllers.moderationController.moderation_service.page_reports")
+def test_integration_reports_page_endpoint(mock_page):
+    mock_page.return_value = {"items": [], "nextCursor": None}
+
+    response = client.get(
+        "/moderation/reports/page",
+        params={"reasonType": "spam", "amount": 5, "include_body": "false"},
+        headers={"X-Username": "admin1"},
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {"items": [], "nextCursor": None}
+    kwargs = mock_page.call_args.kwargs
+    assert kwargs["reason_type"] == "spam" and kwargs["amount"] == 5 and kwargs["include_body"] is False
+
+    bad = client.get("/moderation/reports/page", params={"status": "open"}, headers={"X-Username": "admin1"})
+    assert bad.status_code == 400
+
+
+# ---------------------------------------------------------------------------
+# Grouped queue
+# ---------------------------------------------------------------------------
+
+@patch.object(ModerationService, "_apply_user_penalties")
+@patch("backend.app.services.moderationService.moderationRepo.replace_reports")
+@patch("backend.app.services.moderationService.moderationRepo.add_bans")
+@patch("backend.app.services.moderationService.moderationRepo.list_group_reports")
+def test_decide_report_group_confirms_all_with_one_ban(mock_list, mock_add_bans, mock_replace, mock_penalties):
+    reports = [make_pending_report(report_id=i) for i in (1, 2, 3)]
+    reports[1].dateReported += timedelta(hours=1)
+    mock_list.return_value = reports
+    mock_add_bans.side_effect = lambda specs: [make_ban_from_report(reports[1], "7d")]
+
+    decided, ban = ModerationService().decide_report_group(
+        "Joker", "TVpotatoCat", ReportDecisionRequest(action="confirm", banOption="7d"), "admin1"
+    )
+
+    assert [r.status for r in decided] == ["confirmed"] * 3
+    assert [r.banDurationSeconds for r in decided] == [None, BAN_OPTION_TO_SECONDS["7d"], None]
+    assert mock_add_bans.call_args.args[0][0]["report_id"] == 2
+    mock_penalties.assert_called_once_with({"TVpotatoCat": 1}, {"TVpotatoCat": ban.bannedUntil})
+    mock_replace.assert_called_once_with(decided)
+
+
+@patch("backend.app.services.moderationService.moderationRepo.list_group_reports", return_value=[])
+def test_decide_report_group_without_pending_reports_raises(mock_list):
+    with pytest.raises(ValueError, match="No pending reports"):
+        ModerationService().decide_report_group(
+            "Joker", "nobody", ReportDecisionRequest(action="reject"), "admin1"
+        )
+
+
+@patch("backend.app.controllers.moderationController.moderation_service.decide_report_group")
+def test_integration_decide_report_group_endpoint(mock_decide):
+    report = make_pending_report()
+    report.status = "rejected"
+    mock_decide.return_value = ([report], None)
+
+    response = client.post(
+        "/moderation/queue/Joker/TVpotatoCat/decision",
+        json={"action": "reject"},
+        headers={"X-Username": "admin1"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["reports"][0]["status"] == "rejected"
+    assert mock_decide.call_args.kwargs["movie_title"] == "Joker"
+
+
+@patch("backend.app.controllers.moderationController.moderation_service.next_report_groups")
+def test_integration_queue_next_endpoint(mock_next):
+    mock_next.return_value = []
+
+    response = client.get("/moderation/queue/next", params={"k": 3}, headers={"X-Username": "admin1"})
+
+    assert response.status_code == 200
+    mock_next.assert_called_once_with(k=3)
+    assert client.get("/moderation/queue/next", params={"k": 0}, headers={"X-Username": "admin1"}).status_code == 422
+
+
+@patch("backend.app.services.moderationService.activeBans.active_count", return_value=1)
+@patch("backend.app.services.moderationService.moderationRepo.bans_per_option", return_value={"7d": 2})
+@patch("backend.app.services.moderationService.moderationRepo.report_stats")
+def test_integration_stats_endpoint(mock_stats, mock_bans, mock_active):
+    mock_stats.return_value = {
+        "pending": 3, "confirmed": 2, "rejected": 1,
+        "reportsPerDay": {"2024-01-01": 4},
+        "medianDecisionSeconds": 60.0,
+        "topMovies": [{"movieTitle": "Joker", "reports": 4}],
+    }
+
+    response = client.get("/moderation/stats", params={"days": 7}, headers={"X-Username": "admin1"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["bansPerOption"] == {"7d": 2} and body["activeBans"] == 1
+    assert body["topMovies"] == [{"movieTitle": "Joker", "reports": 4}]
+    mock_stats.assert_called_once_with(days=7, top=10)
+    assert set(body["banExpiry"]) >= {"sweeps", "expired", "userWrites", "activeBans", "nextExpiry"}
@@ -5,7 +5,7 @@ from pathlib import Path
 
 import pytest
 
-from backend.app.repositories import moderationRepo
+from backend.app.repositories import moderationRepo, reviewReportCounter, usersRepo
 from backend.app.models.models import Report
 
 
@@ -27,27 +27,6 @@ def setup_temp_data_dir(tmp_path, monkeypatch):
     return data_dir, imdb_dir, reports_file, bans_file
 
 
-# ---------------------------------------------------------------------------
-# _read_json_list basic behaviour
-# ---------------------------------------------------------------------------
-
-def test_read_json_list_missing_and_empty(tmp_path):
-    missing = tmp_path / "missing.json"
-    assert moderationRepo._read_json_list(missing) == []
-
-    empty = tmp_path / "empty.json"
-    empty.write_text("   ", encoding="utf-8")
-    assert moderationRepo._read_json_list(empty) == []
-
-
-def test_read_json_list_invalid_raises(tmp_path):
-    bad = tmp_path / "bad.json"
-    bad.write_text("{not valid json", encoding="utf-8")
-
-    with pytest.raises(json.JSONDecodeError):
-        moderationRepo._read_json_list(bad)
-
-
 # ---------------------------------------------------------------------------
 # build_snapshot_and_increment_reports
 # ---------------------------------------------------------------------------
@@ -89,10 +68,17 @@ def test_build_snapshot_and_increment_reports_happy_path(tmp_path, monkeypatch):
 
     snapshot = moderationRepo.build_snapshot_and_increment_reports("Joker", "TVpotatoCat")
 
-    # CSV should have Reports incremented
+    # The increment is journaled, not written into the CSV ...
+    with csv_path.open("r", newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert rows[0]["Reports"] == "1"
+
+    # ... until the pending counts are folded back in
+    reviewReportCounter.fold_reports(csv_path.parent)
     with csv_path.open("r", newline="", encoding="utf-8") as f:
         rows = list(csv.DictReader(f))
     assert rows[0]["Reports"] == "2"
+    assert not (csv_path.parent / reviewReportCounter.JOURNAL_FILENAME).exists()
 
     # Snapshot fields parsed correctly
     assert snapshot.movieTitle == "Joker"
@@ -207,6 +193,237 @@ def test_list_pending_and_list_reports_for_review(tmp_path, monkeypatch):
     assert none_for_other_movie == []
 
 
+def test_report_store_parses_once_and_follows_the_files(tmp_path, monkeypatch):
+    _, imdb_dir, reports_file, _ = setup_temp_data_dir(tmp_path, monkeypatch)
+    _write_sample_csv(imdb_dir, "Joker", "TVpotatoCat", reports="0")
+    r1 = moderationRepo.create_report_for_review("Joker", "TVpotatoCat", "Alice", "spam", "one")
+    moderationRepo.create_report_for_review("Joker", "TVpotatoCat", "Bob", "abuse", "two")
+
+    parsed = moderationRepo._report_store().by_id[2]
+
+    # Written through on create/replace: lookups never go back to the file
+    r1.status = "rejected"
+    moderationRepo.replace_report(r1)
+    assert moderationRepo.get_report_by_id(r1.reportId).status == "rejected"
+    assert [r.reportId for r in moderationRepo.list_reports(status="pending")] == [2]
+    assert [r.reportId for r in moderationRepo.list_reports_for_review("Joker", "TVpotatoCat")] == [1, 2]
+    assert moderationRepo.get_report_by_id(999) is None
+    assert moderationRepo._report_store().by_id[2] is parsed
+
+    # Returned reports are copies
+    moderationRepo.get_report_by_id(2).status = "confirmed"
+    assert moderationRepo.get_report_by_id(2).status == "pending"
+
+    # An outside edit changes the file version and is picked up
+    moderationRepo.compact_reports()
+    data = json.loads(reports_file.read_text(encoding="utf-8"))
+    data[1]["status"] = "confirmed"
+    reports_file.write_text(json.dumps(data), encoding="utf-8")
+    assert moderationRepo.list_reports(status="pending") == []
+    assert [r.reportId for r in moderationRepo.list_reports(status="confirmed")] == [2]
+    assert moderationRepo._report_store().by_id[2] is not parsed
+
+
+def _make_report(report_id, movie, reporter, reason_type, minutes):
+    return Report.model_validate({
+        "reportId": report_id,
+        "review": {
+            "movieTitle": movie, "user": "author", "rating": 5, "usefulVotes": 0,
+            "totalVotes": 0, "title": "t", "body": "b", "reportCount": 1,
+        },
+        "reportedBy": reporter,
+        "dateReported": datetime(2024, 1, 1) + timedelta(minutes=minutes),
+        "reasonType": reason_type,
+    })
+
+
+def test_page_reports_by_date_with_filters_and_cursor(tmp_path, monkeypatch):
+    setup_temp_data_dir(tmp_path, monkeypatch)
+    # File order differs from date order; "Rare" is selective enough to be sorted directly
+    reports = [
+        _make_report(i, "Rare" if i % 20 == 0 else "Joker", f"u{i % 3}", "spam" if i % 2 else "abuse", (i * 7) % 100)
+        for i in range(1, 101)
+    ]
+    moderationRepo.save_reports(reports)
+
+    def walk(amount, **filters):
+        ids, cursor = [], None
+        while True:
+            page, cursor = moderationRepo.page_reports(amount=amount, cursor=cursor, **filters)
+            ids.extend(r.reportId for r in page)
+            if cursor is None:
+                return ids
+
+    def expected(predicate, descending=True):
+        chosen = [r for r in reports if predicate(r)]
+        chosen.sort(key=lambda r: (r.dateReported, r.reportId), reverse=descending)
+        return [r.reportId for r in chosen]
+
+    assert walk(7) == expected(lambda r: True)
+    assert walk(7, descending=False) == expected(lambda r: True, descending=False)
+    assert walk(4, reason_type="spam", reported_by="u1") == expected(
+        lambda r: r.reasonType == "spam" and r.reportedBy == "u1"
+    )
+    assert walk(2, movie_title="Rare") == expected(lambda r: r.review.movieTitle == "Rare")
+    assert walk(5, status="confirmed") == []
+
+    # Status changes move reports between filtered pages
+    first = moderationRepo.get_report_by_id(3)
+    first.status = "confirmed"
+    moderationRepo.replace_report(first)
+    assert walk(5, status="confirmed") == [3]
+
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        moderationRepo.page_reports(cursor="not-a-cursor")
+
+
+def test_report_groups_follow_new_and_decided_reports(tmp_path, monkeypatch):
+    _, imdb_dir, _, _ = setup_temp_data_dir(tmp_path, monkeypatch)
+    _write_sample_csv(imdb_dir, "Joker", "TVpotatoCat", reports="0")
+    moderationRepo.save_reports([
+        _make_report(1, "Other", "alice", "spam", 5),
+        _make_report(2, "Other", "bob", "abuse", 1),
+    ])
+
+    for reporter, reason in (("alice", "spam"), ("bob", "spam"), ("alice", "abuse")):
+        moderationRepo.create_report_for_review("Joker", "TVpotatoCat", reporter, reason, None)
+
+    groups = moderationRepo.list_report_groups()
+    assert [(g.movieTitle, g.reportCount) for g in groups] == [("Joker", 3), ("Other", 2)]
+    joker = groups[0]
+    assert joker.distinctReporters == 2
+    assert joker.reasons == {"spam": 2, "abuse": 1}
+    assert joker.latestReportId == 5 and joker.latestSnapshot.reportCount == 3
+    assert moderationRepo.list_report_groups(amount=1, offset=1)[0].movieTitle == "Other"
+
+    # Deciding reports takes them out of their group
+    latest = moderationRepo.get_report_by_id(5)
+    latest.status = "rejected"
+    moderationRepo.replace_report(latest)
+    joker = moderationRepo.get_report_group("Joker", "TVpotatoCat")
+    assert (joker.reportCount, joker.reasons, joker.latestReportId) == (2, {"spam": 2}, 4)
+
+    decided = moderationRepo.list_group_reports("Joker", "TVpotatoCat")
+    for report in decided:
+        report.status = "confirmed"
+    moderationRepo.replace_reports(decided)
+    assert moderationRepo.get_report_group("Joker", "TVpotatoCat") is None
+    assert [g.movieTitle for g in moderationRepo.list_report_groups()] == ["Other"]
+
+
+def test_next_report_groups_by_priority(tmp_path, monkeypatch):
+    setup_temp_data_dir(tmp_path, monkeypatch)
+    users_file = tmp_path / "users.json"
+    users_file.write_text(json.dumps([{"userName": "author", "penalties": 0}]), encoding="utf-8")
+    monkeypatch.setattr(usersRepo, "DATA_PATH", users_file)
+
+    reports = [
+        # Burst: 3 reports within minutes
+        *(_make_report(i, "Burst", f"r{i}", "spam", i) for i in (1, 2, 3)),
+        # Same count spread over 10 hours
+        *(_make_report(i, "Slow", f"r{i}", "spam", (i - 4) * 300) for i in (4, 5, 6)),
+        _make_report(7, "Single", "r7", "spam", 0),
+    ]
+    moderationRepo.save_reports(reports)
+
+    def order(k=10):
+        return [g.movieTitle for g in moderationRepo.next_report_groups(k)]
+
+    assert order() == ["Burst", "Slow", "Single"]
+    assert order(k=1) == ["Burst"]
+    assert moderationRepo.next_report_groups(1)[0].priority > 0
+
+    # New reports only push the changed group
+    store = moderationRepo._report_store()
+    seq = store.heap_seq
+    store.add_many([_make_report(i, "Single", f"r{i}", "abuse", 1).model_dump(mode="json") for i in (8, 9, 10, 11)])
+    assert order()[0] == "Single"
+    assert store.heap_seq == seq + 1  # one push, no rebuild
+
+    # Deciding a group drops it from the queue
+    decided = moderationRepo.list_group_reports("Single", "author")
+    for report in decided:
+        report.status = "rejected"
+    moderationRepo.replace_reports(decided)
+    assert order() == ["Burst", "Slow"]
+
+
+def test_next_report_groups_rescore_on_penalty_changes(tmp_path, monkeypatch):
+    setup_temp_data_dir(tmp_path, monkeypatch)
+    users_file = tmp_path / "users.json"
+    users_file.write_text(json.dumps([{"userName": "author", "penalties": 0}]), encoding="utf-8")
+    monkeypatch.setattr(usersRepo, "DATA_PATH", users_file)
+
+    first = _make_report(1, "Joker", "r1", "spam", 0)
+    second = _make_report(2, "Joker", "r2", "spam", 1)
+    second.review.user = "offender"
+    second.review.totalVotes = 0
+    first.review.totalVotes = 50
+    moderationRepo.save_reports([first, second])
+    assert [g.reviewUser for g in moderationRepo.next_report_groups()] == ["author", "offender"]
+
+    users_file.write_text(
+        json.dumps([{"userName": "author", "penalties": 0}, {"userName": "offender", "penalties": 5}]),
+        encoding="utf-8",
+    )
+    assert [g.reviewUser for g in moderationRepo.next_report_groups()] == ["offender", "author"]
+
+
+def test_report_stats_follow_reports_and_decisions(tmp_path, monkeypatch):
+    _, imdb_dir, _, _ = setup_temp_data_dir(tmp_path, monkeypatch)
+    _write_sample_csv(imdb_dir, "Joker", "TVpotatoCat", reports="0")
+    moderationRepo.save_reports([
+        _make_report(1, "Other", "alice", "spam", 0),
+        _make_report(2, "Other", "bob", "abuse", 24 * 60),
+        _make_report(3, "Other", "carol", "abuse", 24 * 60 + 5),
+    ])
+    moderationRepo.create_report_for_review("Joker", "TVpotatoCat", "alice", "spam", None)
+
+    stats = moderationRepo.report_stats(days=2, top=2)
+    today = datetime.utcnow().date().isoformat()
+    assert (stats["pending"], stats["confirmed"], stats["rejected"]) == (4, 0, 0)
+    assert stats["reportsPerDay"][today] == 1 and len(stats["reportsPerDay"]) == 2
+    assert moderationRepo._report_store().per_day == {"2024-01-01": 1, "2024-01-02": 2, today: 1}
+    assert stats["medianDecisionSeconds"] is None
+    assert stats["topMovies"] == [{"movieTitle": "Other", "reports": 3}, {"movieTitle": "Joker", "reports": 1}]
+
+    # Decisions after 1h, 2h and 6h: the median is the middle one
+    decided = []
+    for report_id, hours in ((1, 1), (2, 2), (3, 6)):
+        report = moderationRepo.get_report_by_id(report_id)
+        report.status = "confirmed" if report_id != 3 else "rejected"
+        report.handledAt = report.dateReported + timedelta(hours=hours)
+        decided.append(report)
+    moderationRepo.replace_reports(decided)
+
+    stats = moderationRepo.report_stats()
+    assert (stats["pending"], stats["confirmed"], stats["rejected"]) == (1, 2, 1)
+    assert stats["medianDecisionSeconds"] == 2 * 3600
+    assert len(stats["reportsPerDay"]) == 30
+
+    # A reload from disk rebuilds the same aggregates
+    monkeypatch.setattr(moderationRepo, "_REPORT_STORE", None)
+    assert moderationRepo.report_stats() == stats
+
+
+def test_count_ranking_keeps_keys_sorted_by_count():
+    import random
+
+    rng = random.Random(7)
+    ranking = moderationRepo.CountRanking()
+    counts = {}
+    for _ in range(2000):
+        key = rng.choice("abcdefgh")
+        if counts.get(key) and rng.random() < 0.4:
+            ranking.remove(key)
+            counts[key] -= 1
+        else:
+            ranking.add(key)
+            counts[key] = counts.get(key, 0) + 1
+        assert [c for _, c in ranking.top(8)] == sorted((c for c in counts.values() if c), reverse=True)
+    assert dict(ranking.top(8)) == {k: c for k, c in counts.items() if c}
+
+
 # ---------------------------------------------------------------------------
 # Bans: add_ban + list_bans
 # ---------------------------------------------------------------------------
@@ -237,7 +454,7 @@ def test_add_ban_and_list_bans(tmp_path, monkeypatch):
     assert ban1.bannedAt == base_time
     assert ban1.bannedUntil == base_time + timedelta(seconds=seconds)
 
-    # Second ban for a different user to exercise _next_ban_id and filtering
+    # Second ban for a different user to exercise id allocation and filtering
     ban2 = moderationRepo.add_ban(
         user_name="OtherUser",
         reported_by="Charlie",
@@ -259,4 +476,6 @@ def test_add_ban_and_list_bans(tmp_path, monkeypatch):
     assert [b.userName for b in cat_bans] == ["TVpotatoCat"]
 
     none = moderationRepo.list_bans(user_name="Nobody")
-    assert none == []
\ No newline at end of file
+    assert none == []
+
+    assert moderationRepo.bans_per_option() == {"3d": 1, "7d": 1}
@@ -0,0 +1,170 @@
+import json
+import multiprocessing
+
+from backend.app.repositories import moderationRepo, recordLog
+from backend.app.repositories.recordLog import RecordLog
+
+
+def journal_entries(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_writes_are_journal_lines_until_compaction(tmp_path, monkeypatch):
+    snapshot = tmp_path / "bans.json"
+    snapshot.write_text(json.dumps([{"banId": 1, "userName": "a"}]), encoding="utf-8")
+    log = RecordLog(snapshot, "banId")
+
+    log.add({"banId": 2, "userName": "b"})
+    log.update({"banId": 1, "userName": "a", "note": "x"})
+    log.update({"banId": 1, "userName": "a", "note": "x"})  # unchanged: nothing written
+    assert journal_entries(log.journal_path) == [
+        {"op": "add", "item": {"banId": 2, "userName": "b"}},
+        {"op": "update", "id": 1, "set": {"note": "x"}},
+    ]
+    assert json.loads(snapshot.read_text(encoding="utf-8")) == [{"banId": 1, "userName": "a"}]
+
+    # Another reader sees snapshot + journal; a torn last line is skipped
+    with log.journal_path.open("a", encoding="utf-8") as f:
+        f.write('{"op": "add", "item": {"banId": 3')
+    other = RecordLog(snapshot, "banId")
+    assert other.items() == [{"banId": 1, "userName": "a", "note": "x"}, {"banId": 2, "userName": "b"}]
+    assert other.next_key() == 3
+
+    monkeypatch.setattr(recordLog, "COMPACT_AFTER", 3)
+    log.add({"banId": 3, "userName": "c"})
+    assert not log.journal_path.exists()
+    assert [b["banId"] for b in json.loads(snapshot.read_text(encoding="utf-8"))] == [1, 2, 3]
+
+    # The existing reader notices the new snapshot
+    other.sync()
+    assert other.items() == log.items()
+
+
+def test_moderation_repo_appends_reports_and_bans(tmp_path, monkeypatch):
+    reports_file = tmp_path / "reports.json"
+    bans_file = tmp_path / "bans.json"
+    monkeypatch.setattr(moderationRepo, "REPORTS_FILE", reports_file)
+    monkeypatch.setattr(moderationRepo, "BANS_FILE", bans_file)
+    monkeypatch.setattr(
+        moderationRepo,
+        "build_snapshot_and_increment_reports",
+        lambda movie, user: moderationRepo.ReviewSnapshot(
+            movieTitle=movie, user=user, rating=5, usefulVotes=0, totalVotes=0, title="t", body="b", reportCount=1
+        ),
+    )
+
+    report = moderationRepo.create_report_for_review("Joker", "bob", "alice", "spam", None)
+    report.status = "confirmed"
+    moderationRepo.replace_report(report)
+    moderationRepo.add_ban(
+        user_name="bob", reported_by="alice", report_id=report.reportId, movie_title="Joker",
+        review_user="bob", reason_type="spam", reason=None, ban_option="3d", ban_duration_seconds=60,
+    )
+
+    assert not reports_file.exists() and not bans_file.exists()
+    entries = journal_entries(recordLog.journal_path(reports_file))
+    assert [e["op"] for e in entries] == ["add", "update"]
+    assert entries[1]["set"] == {"status": "confirmed"}
+    assert [b.userName for b in moderationRepo.list_bans()] == ["bob"]
+
+    moderationRepo.compact_reports()
+    moderationRepo.compact_bans()
+    assert json.loads(reports_file.read_text(encoding="utf-8"))[0]["status"] == "confirmed"
+    assert moderationRepo.load_bans()[0].banId == 1
+    assert [r.status for r in moderationRepo.list_reports()] == ["confirmed"]
+
+
+def test_compaction_keeps_lines_appended_by_other_processes(tmp_path):
+    snapshot = tmp_path / "bans.json"
+    log = RecordLog(snapshot, "banId")
+    other = RecordLog(snapshot, "banId")
+    log.add({"banId": 1, "userName": "a"})
+    other.add({"banId": 2, "userName": "b"})  # not seen by `log` yet
+
+    log.compact()
+    assert [b["banId"] for b in json.loads(snapshot.read_text(encoding="utf-8"))] == [1, 2]
+    assert not log.journal_path.exists() and not log.compacting_path.exists()
+
+
+def test_interrupted_compaction_is_replayed(tmp_path):
+    snapshot = tmp_path / "bans.json"
+    log = RecordLog(snapshot, "banId")
+    log.add({"banId": 1, "userName": "a"})
+    # Crashed after moving the journal aside, before the snapshot was written
+    log.journal_path.rename(log.compacting_path)
+    log.add({"banId": 2, "userName": "b"})
+
+    assert [b["banId"] for b in RecordLog(snapshot, "banId").items()] == [1, 2]
+    log.compact()
+    assert not log.compacting_path.exists()
+    assert [b["banId"] for b in json.loads(snapshot.read_text(encoding="utf-8"))] == [1, 2]
+
+
+def test_rename_journals_report_and_ban_updates(tmp_path, monkeypatch):
+    reports_file = tmp_path / "reports.json"
+    bans_file = tmp_path / "bans.json"
+    monkeypatch.setattr(moderationRepo, "REPORTS_FILE", reports_file)
+    monkeypatch.setattr(moderationRepo, "BANS_FILE", bans_file)
+    monkeypatch.setattr(
+        moderationRepo,
+        "build_snapshot_and_increment_reports",
+        lambda movie, user: moderationRepo.ReviewSnapshot(
+            movieTitle=movie, user=user, rating=5, usefulVotes=0, totalVotes=0, title="t", body="b", reportCount=1
+        ),
+    )
+    report = moderationRepo.create_report_for_review("Joker", "bob", "alice", "spam", None)
+    moderationRepo.create_report_for_review("Joker", "carol", "dave", "spam", None)
+    moderationRepo.add_ban(
+        user_name="bob", reported_by="alice", report_id=report.reportId, movie_title="Joker",
+        review_user="bob", reason_type="spam", reason=None, ban_option="3d", ban_duration_seconds=60,
+    )
+
+    assert moderationRepo.rename_user_in_reports("bob", "robert") == 1
+    assert moderationRepo.rename_user_in_bans("alice", "alicia") == 1
+    assert not reports_file.exists() and not bans_file.exists()
+    assert journal_entries(recordLog.journal_path(reports_file))[-1]["set"]["review"]["user"] == "robert"
+    assert [r.review.user for r in moderationRepo.list_reports()] == ["robert", "carol"]
+    assert moderationRepo.list_report_groups()[0].movieTitle == "Joker"
+    assert [(b.userName, b.reportedBy) for b in moderationRepo.list_bans()] == [("bob", "alicia")]
+
+
+def _report_and_ban(start, worker, count):
+    start.wait()
+    for i in range(count):
+        moderationRepo.create_report_for_review("Joker", f"user{worker}-{i}", "alice", "spam", None)
+        moderationRepo.add_ban(
+            user_name=f"user{worker}-{i}", reported_by="alice", report_id=1, movie_title="Joker",
+            review_user=f"user{worker}-{i}", reason_type="spam", reason=None, ban_option="3d",
+            ban_duration_seconds=60,
+        )
+
+
+def test_two_processes_never_journal_the_same_id(tmp_path, monkeypatch):
+    monkeypatch.setattr(moderationRepo, "REPORTS_FILE", tmp_path / "reports.json")
+    monkeypatch.setattr(moderationRepo, "BANS_FILE", tmp_path / "bans.json")
+    monkeypatch.setattr(moderationRepo, "_REPORT_STORE", None)
+    monkeypatch.setattr(moderationRepo, "_BAN_LOG", None)
+    monkeypatch.setattr(
+        moderationRepo,
+        "build_snapshot_and_increment_reports",
+        lambda movie, user: moderationRepo.ReviewSnapshot(
+            movieTitle=movie, user=user, rating=5, usefulVotes=0, totalVotes=0, title="t", body="b", reportCount=1
+        ),
+    )
+    moderationRepo.load_reports()
+    moderationRepo.load_bans()
+
+    ctx = multiprocessing.get_context("fork")
+    start = ctx.Event()
+    workers = [ctx.Process(target=_report_and_ban, args=(start, w, 40)) for w in range(2)]
+    for p in workers:
+        p.start()
+    start.set()
+    for p in workers:
+        p.join(60)
+        assert p.exitcode == 0
+
+    reports = moderationRepo.load_reports()
+    bans = moderationRepo.load_bans()
+    assert sorted(r.reportId for r in reports) == list(range(1, 81))
+    assert sorted(b.banId for b in bans) == list(range(1, 81))
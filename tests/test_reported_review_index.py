@@ -0,0 +1,150 @@
+import csv
+import json
+
+from backend.app.repositories import (
+    moderationRepo,
+    reportedReviewIndex,
+    reportsRepo,
+    reviewColumns,
+    reviewsRepo,
+    reviewReportCounter,
+)
+from backend.app.services import authenticationService
+from backend.app.services.authenticationService import AuthService
+
+
+MOVIES = {
+    "Joker": [("alice", 2), ("bob", 0), ("carol", 1)],
+    "Up": [("dave", 0)],
+}
+
+
+def setup_movies(tmp_path, monkeypatch):
+    monkeypatch.setattr(reviewsRepo, "DATA_PATH", tmp_path, raising=False)
+    monkeypatch.setattr(reviewsRepo, "recompute_movie_ratings", lambda title: None)
+    monkeypatch.setattr(reportsRepo, "DATA_PATH", tmp_path)
+    monkeypatch.setattr(moderationRepo, "IMDB_DIR", tmp_path)
+    monkeypatch.setattr(reviewReportCounter, "_MOVIES", {})
+    monkeypatch.setattr(reportedReviewIndex, "_MOVIES", {})
+    monkeypatch.setattr(reportedReviewIndex, "_REGISTRIES", {})
+    for movie, reviews in MOVIES.items():
+        movie_dir = tmp_path / movie
+        movie_dir.mkdir()
+        with (movie_dir / "movieReviews.csv").open("w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=reviewsRepo.CSV_HEADERS)
+            writer.writeheader()
+            for user, reports in reviews:
+                writer.writerow({
+                    "Movie Title": movie, "Date of Review": "1 January 2020", "User": user,
+                    "Usefulness Vote": 0, "Total Votes": 0, "User's Rating out of 10": 5,
+                    "Review Title": "T", "Review": "B", "Reports": reports,
+                })
+
+
+def full_read(path):
+    raise AssertionError(f"read all of {path}")
+
+
+def listed():
+    return {(r["Movie Title"], r["User"]): r["reportCount"] for r in reportsRepo.load_all_reports()}
+
+
+def test_listing_reads_only_reported_rows(tmp_path, monkeypatch):
+    setup_movies(tmp_path, monkeypatch)
+    assert listed() == {("Joker", "alice"): 2, ("Joker", "carol"): 1}
+    assert (tmp_path / "Joker" / reportedReviewIndex.REPORTED_FILENAME).exists()
+
+    assert (tmp_path / reportedReviewIndex.REGISTRY_FILENAME).exists()
+
+    # A fresh process loads the maps from the sidecars, never the full reviews,
+    # and only visits the registered movies
+    monkeypatch.setattr(reportedReviewIndex, "_MOVIES", {})
+    monkeypatch.setattr(reportedReviewIndex, "_REGISTRIES", {})
+    monkeypatch.setattr(reviewColumns, "_CACHE", {})
+    monkeypatch.setattr(reviewsRepo, "read_review_file", full_read)
+    read, stamped = [], []
+    real_read_rows = reviewsRepo.read_review_rows
+    monkeypatch.setattr(
+        reviewsRepo, "read_review_rows",
+        lambda path, indices: read.append((path.parent.name, indices)) or real_read_rows(path, indices),
+    )
+    real_version = reviewsRepo.review_file_version
+    monkeypatch.setattr(
+        reviewsRepo, "review_file_version",
+        lambda path: stamped.append(path.parent.name) or real_version(path),
+    )
+    assert listed() == {("Joker", "alice"): 2, ("Joker", "carol"): 1}
+    assert read == [("Joker", [0, 2])]
+    assert set(stamped) == {"Joker"}
+
+
+def test_index_follows_reports_deletes_and_folds(tmp_path, monkeypatch):
+    setup_movies(tmp_path, monkeypatch)
+    monkeypatch.setattr(reviewReportCounter, "REPORTS_FOLD_AT", 3)
+    joker = tmp_path / "Joker"
+    listed()
+
+    moderationRepo.build_snapshot_and_increment_reports("Joker", "bob")
+    assert reportedReviewIndex.reported(joker)["bob"] == (1, 0)
+    assert listed()[("Joker", "bob")] == 1
+
+    # Deleting alice moves bob and carol up a row
+    reviewsRepo.delete_review("Joker", "alice")
+    assert reportedReviewIndex.reported(joker) == {"bob": (0, 0), "carol": (1, 1)}
+
+    moderationRepo.build_snapshot_and_increment_reports("Joker", "carol")
+    moderationRepo.build_snapshot_and_increment_reports("Joker", "carol")  # folds
+    assert not (joker / reviewReportCounter.JOURNAL_FILENAME).exists()
+    assert reportedReviewIndex.reported(joker) == {"bob": (0, 1), "carol": (1, 3)}
+    assert listed() == {("Joker", "bob"): 1, ("Joker", "carol"): 3}
+
+
+def test_pending_reports_from_another_process_are_located(tmp_path, monkeypatch):
+    setup_movies(tmp_path, monkeypatch)
+    listed()
+    # What the other process wrote when reporting dave's review
+    with (tmp_path / "Up" / reviewReportCounter.JOURNAL_FILENAME).open("w", encoding="utf-8") as f:
+        f.write(json.dumps({"user": "dave"}) + "\n")
+    with (tmp_path / reportedReviewIndex.REGISTRY_FILENAME).open("a", encoding="utf-8") as f:
+        f.write(json.dumps({"movie": "Up"}) + "\n")
+
+    assert listed()[("Up", "dave")] == 1
+    assert reportedReviewIndex.reported(tmp_path / "Up") == {"dave": (0, 0)}
+
+
+def test_rebuild_keeps_reviews_with_only_pending_reports(tmp_path, monkeypatch):
+    setup_movies(tmp_path, monkeypatch)
+    with (tmp_path / "Up" / reviewReportCounter.JOURNAL_FILENAME).open("w", encoding="utf-8") as f:
+        f.write(json.dumps({"user": "dave"}) + "\n")
+
+    assert reportedReviewIndex.reported(tmp_path / "Up") == {"dave": (0, 0)}
+    assert reportedReviewIndex.reported_movies(tmp_path) == [tmp_path / "Joker", tmp_path / "Up"]
+
+
+def test_reporting_registers_the_movie(tmp_path, monkeypatch):
+    setup_movies(tmp_path, monkeypatch)
+    assert reportedReviewIndex.reported_movies(tmp_path) == [tmp_path / "Joker"]
+
+    moderationRepo.build_snapshot_and_increment_reports("Up", "dave")
+    assert reportedReviewIndex.reported_movies(tmp_path) == [tmp_path / "Joker", tmp_path / "Up"]
+    assert listed()[("Up", "dave")] == 1
+
+    # Another process reads the registry instead of scanning the movies
+    monkeypatch.setattr(reportedReviewIndex, "_REGISTRIES", {})
+    monkeypatch.setattr(reportedReviewIndex, "_current", full_read)
+    assert reportedReviewIndex.reported_movies(tmp_path) == [tmp_path / "Joker", tmp_path / "Up"]
+
+
+def test_rename_carries_reports_over(tmp_path, monkeypatch):
+    setup_movies(tmp_path, monkeypatch)
+    monkeypatch.setattr(moderationRepo, "BANS_FILE", tmp_path / "bans.json")
+    monkeypatch.setattr(moderationRepo, "REPORTS_FILE", tmp_path / "reports.json")
+    monkeypatch.setattr(authenticationService, "load_users", lambda: [{"userName": "carol"}])
+    monkeypatch.setattr(authenticationService, "save_users", lambda users: None)
+    listed()
+    moderationRepo.build_snapshot_and_increment_reports("Joker", "carol")
+
+    AuthService().change_username_everywhere("carol", "caroline")
+
+    assert listed() == {("Joker", "alice"): 2, ("Joker", "caroline"): 2}
+    assert reviewReportCounter.pending_count(tmp_path / "Joker", "carol") == 0
@@ -0,0 +1,155 @@
+import csv
+
+import pytest
+
+from backend.app.models.models import Review
+from backend.app.repositories import reviewsRepo, reviewBlockStore
+from backend.app.repositories.reviewColumns import load_review_columns
+
+
+def make_rows(n, movie="Joker"):
+    return [
+        {
+            "Movie Title": movie,
+            "Date of Review": f"{(i % 28) + 1} March 2003",
+            "User": f"user{i}",
+            "Usefulness Vote": str(i % 7),
+            "Total Votes": "10",
+            "User's Rating out of 10": str((i % 10) + 1),
+            "Review Title": f"Title {i}",
+            "Review": f"Body {i}, with \"quotes\" and a comma" * 3,
+            "Reports": "0",
+        }
+        for i in range(n)
+    ]
+
+
+def write_csv(path, rows):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=reviewsRepo.CSV_HEADERS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+@pytest.mark.parametrize("codec", ["zlib", "lzma"])
+def test_pack_and_read_pages_across_blocks(tmp_path, codec):
+    rows = make_rows(150)
+    csv_path = tmp_path / "Joker" / "movieReviews.csv"
+    write_csv(csv_path, rows)
+
+    blocks = reviewBlockStore.pack_csv(csv_path, codec=codec)
+    assert not csv_path.exists()
+    assert blocks.stat().st_size < sum(len(r["Review"]) for r in rows)
+
+    assert reviewBlockStore.count_rows(blocks) == 150
+    assert reviewBlockStore.read_range(blocks, 60, 70) == rows[60:70]  # spans two frames
+    assert reviewBlockStore.read_rows(blocks, [149, 0, 64]) == [rows[149], rows[0], rows[64]]
+    assert reviewBlockStore.read_all(blocks) == (reviewsRepo.CSV_HEADERS, rows)
+
+    reviewBlockStore.unpack_csv(blocks)
+    with csv_path.open(newline="", encoding="utf-8") as f:
+        assert list(csv.DictReader(f)) == rows
+
+
+def test_block_writes_use_their_own_temp_file(tmp_path):
+    path = tmp_path / reviewBlockStore.BLOCKS_FILENAME
+    # Another writer's temp file under the old fixed name is left alone
+    other = path.with_name(path.name + ".tmp")
+    other.write_bytes(b"someone else's rewrite")
+
+    reviewBlockStore.write_blocks(path, reviewsRepo.CSV_HEADERS, make_rows(3))
+
+    assert other.read_bytes() == b"someone else's rewrite"
+    assert reviewBlockStore.count_rows(path) == 3
+    assert sorted(p.name for p in tmp_path.iterdir() if p.name.endswith(".tmp")) == [other.name]
+
+
+def test_append_recompresses_only_the_last_frame(tmp_path):
+    rows = make_rows(130)
+    path = tmp_path / reviewBlockStore.BLOCKS_FILENAME
+    reviewBlockStore.write_blocks(path, reviewsRepo.CSV_HEADERS, rows[:100])
+    before = reviewBlockStore.read_index(path).blocks
+
+    reviewBlockStore.append_rows(path, rows[100:101])
+    reviewBlockStore.append_rows(path, rows[101:130])
+
+    after = reviewBlockStore.read_index(path).blocks
+    assert after[0] == before[0]  # full first frame untouched
+    assert [b[2] for b in after] == [64, 64, 2]
+    assert reviewBlockStore.read_all(path)[1] == rows
+
+
+@pytest.mark.parametrize("torn", [0.5, 0.999])
+def test_torn_append_falls_back_to_the_previous_trailer(tmp_path, torn):
+    rows = make_rows(70)
+    path = tmp_path / reviewBlockStore.BLOCKS_FILENAME
+    reviewBlockStore.write_blocks(path, reviewsRepo.CSV_HEADERS, rows[:65])
+    size = path.stat().st_size
+    reviewBlockStore.append_rows(path, rows[65:68])
+
+    # Cut the append short, as a crash or a reader racing the write would see it
+    data = path.read_bytes()
+    path.write_bytes(data[:size + int((len(data) - size) * torn)])
+    assert reviewBlockStore.read_all(path)[1] == rows[:65]
+
+    # The torn bytes become garbage for the next append
+    reviewBlockStore.append_rows(path, rows[65:70])
+    assert reviewBlockStore.read_all(path)[1] == rows
+
+
+def test_not_a_block_file_still_raises(tmp_path):
+    path = tmp_path / reviewBlockStore.BLOCKS_FILENAME
+    path.write_bytes(reviewBlockStore.MAGIC + b"no trailer here" * 10)
+    with pytest.raises(ValueError):
+        reviewBlockStore.read_index(path)
+
+
+def test_append_compacts_when_mostly_garbage(tmp_path, monkeypatch):
+    monkeypatch.setattr(reviewBlockStore, "COMPACT_MIN_GARBAGE", 0)
+    path = tmp_path / reviewBlockStore.BLOCKS_FILENAME
+    rows = make_rows(40)
+    reviewBlockStore.write_blocks(path, reviewsRepo.CSV_HEADERS, rows[:1])
+    for row in rows[1:]:
+        reviewBlockStore.append_rows(path, [row])
+
+    compact = tmp_path / "compact.blocks"
+    reviewBlockStore.write_blocks(compact, reviewsRepo.CSV_HEADERS, rows)
+    assert path.stat().st_size < 3 * compact.stat().st_size
+    assert reviewBlockStore.read_all(path)[1] == rows
+
+
+def test_reviews_repo_in_compressed_mode(tmp_path, monkeypatch):
+    monkeypatch.setattr(reviewsRepo, "DATA_PATH", tmp_path, raising=False)
+    monkeypatch.setattr(reviewsRepo, "recompute_movie_ratings", lambda title: None)
+    monkeypatch.setattr(reviewsRepo, "REVIEW_STORAGE", "compressed")
+    rows = make_rows(70)
+    csv_path = tmp_path / "Joker" / "movieReviews.csv"
+    write_csv(csv_path, rows)
+    reviewBlockStore.pack_csv(csv_path)
+
+    page = reviewsRepo.load_reviews("Joker", amount=5, offset=62)
+    assert [r["User"] for r in page] == [f"user{i}" for i in range(62, 67)]
+    top = reviewsRepo.load_reviews("Joker", amount=1, sort_by="usefulness")
+    assert top[0]["Usefulness Vote"] == "6"
+
+    reviewsRepo.save_review("Joker", Review(
+        movieTitle="Joker", user="zed", rating=9, title="New", body="Fresh",
+        usefulVotes=0, totalVotes=0, reportCount=0,
+    ))
+    assert reviewsRepo.load_reviews("Joker", amount=1, offset=70)[0]["User"] == "zed"
+
+    reviewsRepo.update_review("Joker", "user3", {"Review Title": "Edited"})
+    reviewsRepo.delete_review("Joker", "user0")
+    assert not csv_path.exists()
+    assert reviewsRepo.load_reviews("Joker", amount=1)[0]["User"] == "user1"
+    assert reviewsRepo.load_reviews("Joker", amount=1, offset=2)[0]["Review Title"] == "Edited"
+    assert reviewsRepo.load_reviews_by_user("zed")[0]["Review"] == "Fresh"
+    assert len(load_review_columns("Joker")) == 70
+
+    # Switching back: the next rewrite produces a CSV again
+    monkeypatch.setattr(reviewsRepo, "REVIEW_STORAGE", "csv")
+    reviewsRepo.delete_review("Joker", "zed")
+    assert csv_path.exists()
+    assert not (tmp_path / "Joker" / reviewBlockStore.BLOCKS_FILENAME).exists()
+    assert len(reviewsRepo.load_all_reviews("Joker")) == 69
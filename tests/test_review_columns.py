@@ -0,0 +1,174 @@
+import csv
+import json
+from datetime import date
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from backend.app.repositories import moviesRepo, reviewColumns, reviewsRepo
+
+
+def write_csv(csv_path, rows):
+    csv_path.parent.mkdir(parents=True, exist_ok=True)
+    with csv_path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=reviewsRepo.CSV_HEADERS)
+        writer.writeheader()
+        for user, rating, useful, total, reports, when in rows:
+            writer.writerow({
+                "Movie Title": "Joker",
+                "Date of Review": when,
+                "User": user,
+                "Usefulness Vote": useful,
+                "Total Votes": total,
+                "User's Rating out of 10": rating,
+                "Review Title": "t",
+                "Review": "b",
+                "Reports": reports,
+            })
+
+
+ROWS = [
+    ("alice", "8", "10", "20", "0", "13 March 2003"),
+    ("bob", "", "5", "10", "2", "1 January 2020"),
+    ("alice", "5", "0", "10", "", "5 May 2020"),
+    ("carol", "oops", "1", "x", "1", "unknown"),
+]
+
+
+def test_build_columns_parses_and_interns(tmp_path):
+    csv_path = tmp_path / "Joker" / "movieReviews.csv"
+    write_csv(csv_path, ROWS)
+
+    cols = reviewColumns.columns_for_csv(csv_path)
+
+    assert len(cols) == 4
+    np.testing.assert_array_equal(cols.rating[[0, 2]], [8.0, 5.0])
+    assert np.isnan(cols.rating[1]) and np.isnan(cols.rating[3])
+    assert cols.useful_votes.tolist() == [10, 5, 0, 1]
+    assert cols.total_votes.tolist() == [20, 10, 10, 0]
+    assert cols.reports.tolist() == [0, 2, 0, 1]
+    assert cols.date_ordinal[0] == date(2003, 3, 13).toordinal()
+    assert cols.date_ordinal[3] == 0
+    assert cols.users == ["alice", "bob", "carol"]
+    assert cols.user_codes.tolist() == [0, 1, 0, 2]
+
+    assert cols.average_rating() == 6.5
+    assert cols.vote_ratio() == pytest.approx(16 / 40)
+    assert cols.vote_ratio({"bob": (3, 4), "gone": (1, 6)}) == pytest.approx(20 / 50)
+    assert cols.year_histogram() == {2003: 1, 2020: 2}
+
+
+def test_current_reports_adds_pending_counts(tmp_path):
+    csv_path = tmp_path / "Joker" / "movieReviews.csv"
+    write_csv(csv_path, ROWS)
+    cols = reviewColumns.columns_for_csv(csv_path)
+
+    assert cols.current_reports({}) is cols.reports
+    assert cols.current_reports({"alice": 3, "nobody": 1}).tolist() == [3, 2, 3, 1]
+    assert cols.reports.tolist() == [0, 2, 0, 1]
+
+
+def test_columns_cached_beside_csv_and_rebuilt_on_change(tmp_path):
+    csv_path = tmp_path / "Joker" / "movieReviews.csv"
+    write_csv(csv_path, ROWS)
+    reviewColumns.columns_for_csv(csv_path)
+    assert (csv_path.parent / reviewColumns.COLUMNS_FILENAME).exists()
+
+    # Fresh process: served from the .npz without parsing the CSV
+    reviewColumns._CACHE.clear()
+    with patch.object(reviewColumns, "build_columns", side_effect=AssertionError("CSV parsed")):
+        assert len(reviewColumns.columns_for_csv(csv_path)) == 4
+
+    # CSV changed → rebuilt
+    write_csv(csv_path, ROWS[:2])
+    assert len(reviewColumns.columns_for_csv(csv_path)) == 2
+    assert reviewColumns.columns_for_csv(tmp_path / "Nope" / "movieReviews.csv") is None
+
+
+def test_recompute_movie_ratings_uses_columns(tmp_path, monkeypatch):
+    monkeypatch.setattr(moviesRepo, "DATA_PATH", tmp_path, raising=False)
+    csv_path = tmp_path / "Joker" / "movieReviews.csv"
+    write_csv(csv_path, ROWS)
+    metadata_path = tmp_path / "Joker" / "metadata.json"
+    metadata_path.write_text(json.dumps({"title": "Joker", "movieIMDbRating": 1.0}), encoding="utf-8")
+
+    moviesRepo.recompute_movie_ratings("Joker")
+
+    metadata = json.loads(metadata_path.read_text(encoding="utf-8"))
+    assert metadata["movieIMDbRating"] == 6.5
+    assert metadata["totalRatingCount"] == 2
+    assert metadata["totalUserReviews"] == 4
+
+
+def test_rating_stats_histogram_and_percentiles(tmp_path):
+    csv_path = tmp_path / "Joker" / "movieReviews.csv"
+    write_csv(csv_path, [
+        (f"u{i}", str(r), "0", "0", "0", "1 January 2020")
+        for i, r in enumerate([1, 2, 2, 7.6, 8, 8, 9, 10, 10, 10])
+    ] + [("blank", "", "0", "0", "0", "")])
+
+    cols = reviewColumns.columns_for_csv(csv_path)
+    stats = cols.rating_stats()
+
+    assert stats["reviewCount"] == 11
+    assert stats["ratingCount"] == 10
+    assert stats["histogram"] == {
+        "1": 1, "2": 2, "3": 0, "4": 0, "5": 0,
+        "6": 0, "7": 0, "8": 3, "9": 1, "10": 3,
+    }
+    assert stats["median"] == 8.0
+    assert stats["percentiles"]["p50"] == 8.0
+    assert stats["percentiles"]["p90"] == 10.0
+    assert stats["average"] == pytest.approx(6.76)
+
+    # Cached on the columns object, i.e. per CSV version
+    assert cols.rating_stats() is stats
+    write_csv(csv_path, [("only", "4", "0", "0", "0", "")])
+    assert reviewColumns.columns_for_csv(csv_path).rating_stats()["median"] == 4.0
+
+
+def test_rating_stats_without_ratings(tmp_path):
+    csv_path = tmp_path / "Joker" / "movieReviews.csv"
+    write_csv(csv_path, [])
+    stats = reviewColumns.columns_for_csv(csv_path).rating_stats()
+    assert stats["ratingCount"] == 0
+    assert stats["median"] is None
+    assert sum(stats["histogram"].values()) == 0
+
+
+def test_rating_stats_endpoint_adds_votes_and_years(tmp_path, monkeypatch):
+    from backend.app.repositories import reviewVoteStore
+    from backend.app.services.reviewService import ReviewService
+
+    monkeypatch.setattr(reviewsRepo, "DATA_PATH", tmp_path, raising=False)
+    monkeypatch.setattr(reviewVoteStore, "_MOVIES", {})
+    write_csv(tmp_path / "Joker" / "movieReviews.csv", ROWS)
+    reviewVoteStore.vote("Joker", "carol", "dave", True)
+
+    with patch("backend.app.services.reviewService.load_movie_by_title", return_value={"title": "Joker"}):
+        stats = ReviewService().get_rating_stats("Joker")
+
+    assert stats["ratingCount"] == 2
+    assert stats["voteRatio"] == pytest.approx(17 / 41)
+    assert stats["reviewsPerYear"] == {"2003": 1, "2020": 2}
+
+
+def test_columns_are_saved_through_unique_temp_files(tmp_path):
+    csv_path = tmp_path / "Joker" / "movieReviews.csv"
+    write_csv(csv_path, ROWS)
+    cols = reviewColumns.build_columns(csv_path)
+    names = []
+    real = reviewColumns.tempfile.NamedTemporaryFile
+
+    def spy(*args, **kwargs):
+        f = real(*args, **kwargs)
+        names.append(f.name)
+        return f
+
+    with patch.object(reviewColumns.tempfile, "NamedTemporaryFile", spy):
+        cols.save(csv_path.with_name(reviewColumns.COLUMNS_FILENAME))
+        cols.save(csv_path.with_name(reviewColumns.COLUMNS_FILENAME))
+    assert len(set(names)) == 2
+    assert not list(csv_path.parent.glob("*.tmp"))
+    assert len(reviewColumns.ReviewColumns.load(csv_path.with_name(reviewColumns.COLUMNS_FILENAME))) == 4
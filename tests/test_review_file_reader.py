@@ -0,0 +1,122 @@
+import csv
+from datetime import date
+from unittest.mock import patch
+
+from backend.app.models.models import Review
+from backend.app.repositories import reviewFileReader, reviewsRepo
+
+
+def write_tricky_csv(csv_path):
+    csv_path.parent.mkdir(parents=True, exist_ok=True)
+    with csv_path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=reviewsRepo.CSV_HEADERS)
+        writer.writeheader()
+        bodies = [
+            "plain body",
+            'multi\nline "quoted"\nbody, with commas',
+            '""',
+            "last\r\nline",
+        ]
+        for i, body in enumerate(bodies):
+            writer.writerow({
+                "Movie Title": "Joker",
+                "Date of Review": "1 January 2020",
+                "User": f"user{i}",
+                "Usefulness Vote": i,
+                "Total Votes": 10,
+                "User's Rating out of 10": 5,
+                "Review Title": f"Title {i}",
+                "Review": body,
+                "Reports": 0,
+            })
+        f.write("\r\n")  # trailing blank line is ignored like csv.DictReader does
+
+
+def dict_reader_rows(csv_path):
+    with csv_path.open("r", newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def test_offsets_match_dict_reader_on_quoted_multiline_rows(tmp_path):
+    csv_path = tmp_path / "Joker" / "movieReviews.csv"
+    write_tricky_csv(csv_path)
+
+    expected = dict_reader_rows(csv_path)
+    assert reviewFileReader.count_rows(csv_path) == len(expected) == 4
+    assert reviewFileReader.read_range(csv_path, 0, 10) == expected
+    assert reviewFileReader.read_range(csv_path, 1, 3) == expected[1:3]
+    assert reviewFileReader.read_rows(csv_path, [3, 0, 99]) == [expected[3], expected[0]]
+    assert reviewFileReader.read_range(csv_path, 5, 8) == []
+
+
+def test_offset_index_persisted_and_extended_on_append(tmp_path, monkeypatch):
+    monkeypatch.setattr(reviewsRepo, "DATA_PATH", tmp_path, raising=False)
+    monkeypatch.setattr(reviewsRepo, "recompute_movie_ratings", lambda title: None)
+    csv_path = tmp_path / "Joker" / "movieReviews.csv"
+    write_tricky_csv(csv_path)
+    reviewFileReader.offsets_for_csv(csv_path)
+    assert (csv_path.parent / reviewFileReader.OFFSETS_FILENAME).exists()
+
+    reviewsRepo.save_review("Joker", Review(
+        movieTitle="Joker", user="new", rating=9, title="t", body="b\nc", date=date(2024, 1, 1),
+    ))
+    # Appends extend the cached index without rescanning the file
+    with patch.object(reviewFileReader, "build_offsets", side_effect=AssertionError("rescanned")):
+        page = reviewsRepo.load_reviews("Joker", 1, offset=4)
+    assert page[0]["User"] == "new"
+    assert page[0]["Review"] == "b c"
+
+    # Other writers replace the file; the index is rebuilt for the new version
+    reviewsRepo.delete_review("Joker", "user1")
+    assert [r["User"] for r in reviewsRepo.load_reviews("Joker", 10)] == ["user0", "user2", "user3", "new"]
+
+
+def test_load_reviews_only_parses_requested_rows(tmp_path, monkeypatch):
+    monkeypatch.setattr(reviewsRepo, "DATA_PATH", tmp_path, raising=False)
+    write_tricky_csv(tmp_path / "Joker" / "movieReviews.csv")
+
+    with patch.object(reviewsRepo.csv, "DictReader", side_effect=AssertionError("full read")):
+        rows = reviewsRepo.load_reviews("Joker", 2, offset=1)
+    assert [r["User"] for r in rows] == ["user1", "user2"]
+    assert rows[0]["Review"] == 'multi line "quoted" body, with commas'
+
+
+def test_empty_and_header_only_files(tmp_path):
+    empty = tmp_path / "Empty" / "movieReviews.csv"
+    empty.parent.mkdir()
+    empty.write_bytes(b"")
+    assert reviewFileReader.read_range(empty, 0, 10) == []
+
+    header_only = tmp_path / "Header" / "movieReviews.csv"
+    header_only.parent.mkdir()
+    header_only.write_text(",".join(reviewsRepo.CSV_HEADERS) + "\n", encoding="utf-8")
+    assert reviewFileReader.count_rows(header_only) == 0
+    assert reviewFileReader.read_rows(header_only, [0]) == []
+
+
+def test_bare_quote_inside_an_unquoted_field(tmp_path):
+    csv_path = tmp_path / "Odd" / "movieReviews.csv"
+    csv_path.parent.mkdir()
+    csv_path.write_bytes(b'A,B\n1,say 5" tall\n2,x\n3,y\r\n4,z\n')
+
+    expected = dict_reader_rows(csv_path)
+    assert len(expected) == 4
+    assert reviewFileReader.count_rows(csv_path) == 4
+    assert reviewFileReader.read_rows(csv_path, [1, 2]) == expected[1:3]
+    assert reviewFileReader.read_range(csv_path, 0, 4) == expected
+
+
+def test_rewrites_use_their_own_temp_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(reviewsRepo, "DATA_PATH", tmp_path, raising=False)
+    csv_path = tmp_path / "Joker" / "movieReviews.csv"
+    write_tricky_csv(csv_path)
+    # Another writer's temp file under the old fixed name is left alone
+    other = csv_path.with_name(csv_path.name + ".tmp")
+    other.write_text("someone else's rewrite", encoding="utf-8")
+
+    fieldnames, rows = reviewsRepo.read_review_file(csv_path)
+    reviewsRepo.write_reviews_file(csv_path, rows[:2], fieldnames)
+
+    assert other.read_text(encoding="utf-8") == "someone else's rewrite"
+    assert [r["User"] for r in dict_reader_rows(csv_path)] == ["user0", "user1"]
+    assert sorted(p.name for p in csv_path.parent.iterdir() if p.name.endswith(".tmp")) == [other.name]
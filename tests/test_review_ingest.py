@@ -0,0 +1,132 @@
+import csv
+import json
+import threading
+
+import pytest
+
+from backend.app.repositories import moviesRepo, reportsRepo, reviewsRepo
+from backend.app.services.reviewIngestService import ReviewIngestService, normalize_row
+
+
+def setup_data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(reviewsRepo, "DATA_PATH", tmp_path, raising=False)
+    monkeypatch.setattr(moviesRepo, "DATA_PATH", tmp_path, raising=False)
+    for title in ("Joker", "Morbius"):
+        movie_dir = tmp_path / title
+        movie_dir.mkdir()
+        (movie_dir / "metadata.json").write_text(
+            json.dumps({"title": title, "movieIMDbRating": 0}), encoding="utf-8"
+        )
+    # Joker already has one review by "alice"
+    with (tmp_path / "Joker" / "movieReviews.csv").open("w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=reviewsRepo.CSV_HEADERS)
+        writer.writeheader()
+        writer.writerow({
+            "Movie Title": "Joker", "Date of Review": "1 January 2020", "User": "alice",
+            "Usefulness Vote": 1, "Total Votes": 2, "User's Rating out of 10": 10,
+            "Review Title": "t", "Review": "b", "Reports": 0,
+        })
+
+
+def write_dump(path, rows):
+    with path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["movie", "user", "rating", "date", "title", "body", "useful votes", "total votes"])
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def dump_row(movie, user, rating="6", date="2021-05-04", body="text"):
+    return {"movie": movie, "user": user, "rating": rating, "date": date,
+            "title": "T", "body": body, "useful votes": "1", "total votes": "3"}
+
+
+def test_normalize_row_maps_aliases_and_validates():
+    row, reason = normalize_row(dump_row("Joker", "bob", date="2021-05-04"))
+    assert reason is None
+    assert list(row) == reviewsRepo.CSV_HEADERS
+    assert row["Date of Review"] == "04 May 2021"
+    assert row["User's Rating out of 10"] == 6
+    assert row["Reports"] == 0
+
+    assert normalize_row(dump_row("Joker", "bob", rating="11"))[1] == "invalidRating"
+    assert normalize_row(dump_row("Joker", ""))[1] == "missingUser"
+    assert normalize_row({"user": "bob", "body": "x"})[1] == "missingMovie"
+    assert normalize_row({"user": "bob", "body": "x"}, default_movie="Joker")[0]["Movie Title"] == "Joker"
+    assert normalize_row(dump_row("../etc", "bob"))[1] == "invalidMovie"
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_ingest_routes_dedups_and_recomputes_once(tmp_path, monkeypatch, workers):
+    setup_data_dir(tmp_path, monkeypatch)
+    dump = tmp_path / "dump.csv"
+    write_dump(dump, [
+        dump_row("Joker", "alice"),            # already reviewed Joker
+        dump_row("Joker", "bob", rating="4"),
+        dump_row("Morbius", "bob", rating="2"),
+        dump_row("Joker", "bob", rating="9"),  # duplicate within the dump
+        dump_row("Joker", "carol", body="multi\nline, \"quoted\""),
+        dump_row("Nope", "dave"),              # unknown movie
+        dump_row("Morbius", "erin", rating="zero"),
+    ])
+
+    calls = []
+    monkeypatch.setattr(moviesRepo, "update_movies", lambda title, values: calls.append(title))
+
+    summary = ReviewIngestService().ingest_file(dump, workers=workers)
+
+    assert summary["rowsRead"] == 7
+    assert summary["rowsIngested"] == 3
+    assert summary["duplicates"] == 2
+    assert summary["rejected"] == {"unknownMovie": 1, "invalidRating": 1}
+    assert summary["movies"] == {"Joker": 2, "Morbius": 1}
+    assert sorted(calls) == ["Joker", "Morbius"]  # aggregates written once per movie
+
+    joker = reviewsRepo.load_all_reviews("Joker")
+    assert [r["User"] for r in joker] == ["alice", "bob", "carol"]
+    assert joker[1]["User's Rating out of 10"] == "4"
+    assert joker[2]["Review"] == 'multi line, "quoted"'
+    # Morbius had no CSV yet: created with the canonical header
+    morbius_csv = tmp_path / "Morbius" / "movieReviews.csv"
+    assert morbius_csv.read_text(encoding="utf-8").splitlines()[0] == ",".join(reviewsRepo.CSV_HEADERS)
+
+
+def test_ingest_updates_metadata_aggregates(tmp_path, monkeypatch):
+    setup_data_dir(tmp_path, monkeypatch)
+    ReviewIngestService().ingest_rows(
+        [dump_row("Joker", "bob", rating="4"), dump_row("Joker", "carol", rating="7")],
+        workers=1,
+    )
+    metadata = json.loads((tmp_path / "Joker" / "metadata.json").read_text(encoding="utf-8"))
+    assert metadata["movieIMDbRating"] == 7.0
+    assert metadata["totalUserReviews"] == 3
+
+
+def test_ingested_reported_rows_are_listed(tmp_path, monkeypatch):
+    setup_data_dir(tmp_path, monkeypatch)
+    monkeypatch.setattr(reportsRepo, "DATA_PATH", tmp_path)
+    assert reportsRepo.load_all_reports() == []  # every movie scanned and registered
+
+    ReviewIngestService().ingest_rows(
+        [dump_row("Joker", "bob"), {**dump_row("Morbius", "carol"), "reports": "2"}],
+        workers=1,
+    )
+    assert [(r["Movie Title"], r["User"], r["reportCount"]) for r in reportsRepo.load_all_reports()] == [
+        ("Morbius", "carol", 2),
+    ]
+
+
+def test_ingest_appends_under_the_review_lock(tmp_path, monkeypatch):
+    setup_data_dir(tmp_path, monkeypatch)
+    csv_path = tmp_path / "Joker" / "movieReviews.csv"
+    ingest = threading.Thread(
+        target=ReviewIngestService().ingest_rows, args=([dump_row("Joker", "bob")],), kwargs={"workers": 1},
+    )
+    # e.g. a vote fold: read the CSV, then rewrite it
+    with reviewsRepo.review_lock(csv_path):
+        rows = reviewsRepo.read_review_file(csv_path)[1]
+        ingest.start()
+        ingest.join(0.2)  # blocked on the review lock until the rewrite is done
+        reviewsRepo.write_reviews_file(csv_path, rows)
+    ingest.join()
+
+    assert [r["User"] for r in reviewsRepo.load_all_reviews("Joker")] == ["alice", "bob"]
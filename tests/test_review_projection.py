@@ -0,0 +1,78 @@
+import csv
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app.main import app
+from backend.app.repositories import reviewsRepo, reviewBlockStore, reviewFileReader, reviewVoteStore
+
+client = TestClient(app)
+
+
+def setup_movie(tmp_path, monkeypatch, movie="Joker"):
+    monkeypatch.setattr(reviewsRepo, "DATA_PATH", tmp_path, raising=False)
+    monkeypatch.setattr(reviewVoteStore, "_MOVIES", {})
+    movie_dir = tmp_path / movie
+    movie_dir.mkdir()
+    csv_path = movie_dir / "movieReviews.csv"
+    with csv_path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=reviewsRepo.CSV_HEADERS)
+        writer.writeheader()
+        for i, user in enumerate(("alice", "bob")):
+            writer.writerow({
+                "Movie Title": movie, "Date of Review": "1 January 2020", "User": user,
+                "Usefulness Vote": i, "Total Votes": 5, "User's Rating out of 10": 7 + i,
+                "Review Title": f"Title {user}", "Review": "x" * 5000, "Reports": 0,
+            })
+    return csv_path
+
+
+def test_row_builder_projects_and_previews():
+    header = [" User", "Review Title", "Review"]
+    build = reviewFileReader.row_builder(header, ["Review Title", "Review"], preview_chars=3)
+    assert build(["alice", "T", "abcdef"]) == {"Review Title": "T", "Review": "abc"}
+    # Short rows behave like csv.DictReader (missing → None)
+    assert reviewFileReader.row_builder(header, ["User", "Review"])(["bob"]) == {"User": "bob", "Review": None}
+
+
+@pytest.mark.parametrize("packed", [False, True])
+def test_load_reviews_projection_in_both_storage_formats(tmp_path, monkeypatch, packed):
+    csv_path = setup_movie(tmp_path, monkeypatch)
+    if packed:
+        reviewBlockStore.pack_csv(csv_path)
+
+    rows = reviewsRepo.load_reviews(
+        "Joker", 10, fields=["Review Title", "Review"], preview_chars=20, sort_by="rating"
+    )
+    assert rows == [
+        {"Review Title": "Title bob", "Review": "x" * 20},
+        {"Review Title": "Title alice", "Review": "x" * 20},
+    ]
+
+    full = reviewsRepo.load_reviews("Joker", 1, preview_chars=10)
+    assert set(full[0]) == set(reviewsRepo.CSV_HEADERS)
+    assert full[0]["Review"] == "x" * 10
+
+
+def test_projection_keeps_vote_overlay(tmp_path, monkeypatch):
+    setup_movie(tmp_path, monkeypatch)
+    reviewVoteStore.vote("Joker", "bob", "carol", True)
+
+    rows = reviewsRepo.load_reviews("Joker", 10, fields=["Usefulness Vote"])
+    assert rows == [{"Usefulness Vote": "0"}, {"Usefulness Vote": "2"}]
+
+
+def test_listing_endpoint_fields_and_preview(tmp_path, monkeypatch):
+    setup_movie(tmp_path, monkeypatch)
+
+    response = client.get("/reviews/Joker?fields=user,title,rating,body&preview_chars=5&amount=1")
+    assert response.status_code == 200
+    assert response.json() == [{
+        "User": "alice",
+        "Review Title": "Title alice",
+        "User's Rating out of 10": "7",
+        "Review": "xxxxx",
+    }]
+
+    assert client.get("/reviews/Joker?fields=user,password").status_code == 400
+    assert client.get("/reviews/Joker?preview_chars=-1").status_code == 422
@@ -0,0 +1,153 @@
+import csv
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from backend.app.models.models import Review
+from backend.app.repositories import (
+    moderationRepo,
+    reportedReviewIndex,
+    reportsRepo,
+    reviewsRepo,
+    reviewReportCounter,
+    reviewStorage,
+    reviewUserIndex,
+)
+
+
+def setup_movie(tmp_path, monkeypatch, movie="Joker"):
+    monkeypatch.setattr(reviewsRepo, "DATA_PATH", tmp_path, raising=False)
+    monkeypatch.setattr(reviewsRepo, "recompute_movie_ratings", lambda title: None)
+    monkeypatch.setattr(reportsRepo, "DATA_PATH", tmp_path)
+    monkeypatch.setattr(moderationRepo, "IMDB_DIR", tmp_path)
+    monkeypatch.setattr(reviewReportCounter, "_MOVIES", {})
+    movie_dir = tmp_path / movie
+    movie_dir.mkdir()
+    with (movie_dir / "movieReviews.csv").open("w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=reviewsRepo.CSV_HEADERS)
+        writer.writeheader()
+        for user, reports in (("alice", 2), ("bob", 0)):
+            writer.writerow({
+                "Movie Title": movie, "Date of Review": "1 January 2020", "User": user,
+                "Usefulness Vote": 0, "Total Votes": 0, "User's Rating out of 10": 5,
+                "Review Title": "T", "Review": "B", "Reports": reports,
+            })
+    return movie_dir
+
+
+def reports(movie="Joker"):
+    return {r["User"]: r["Reports"] for r in reviewsRepo.load_reviews(movie, 10)}
+
+
+def test_reports_are_overlaid_until_folded(tmp_path, monkeypatch):
+    movie_dir = setup_movie(tmp_path, monkeypatch)
+    monkeypatch.setattr(reviewReportCounter, "REPORTS_FOLD_AT", 4)
+
+    assert moderationRepo.build_snapshot_and_increment_reports("Joker", "bob").reportCount == 1
+    assert moderationRepo.build_snapshot_and_increment_reports("Joker", "alice").reportCount == 3
+    assert reports() == {"alice": "3", "bob": "1"}
+    assert {r["User"]: r["reportCount"] for r in reportsRepo.load_all_reports()} == {"alice": 3, "bob": 1}
+    assert reviewsRepo.load_all_reviews("Joker")[1]["Reports"] == "0"  # CSV untouched
+
+    # A fresh process replays the journal
+    monkeypatch.setattr(reviewReportCounter, "_MOVIES", {})
+    assert reports() == {"alice": "3", "bob": "1"}
+
+    # The fourth pending increment folds everything into the CSV
+    moderationRepo.build_snapshot_and_increment_reports("Joker", "bob")
+    moderationRepo.build_snapshot_and_increment_reports("Joker", "bob")
+    assert [r["Reports"] for r in reviewsRepo.load_all_reviews("Joker")] == ["3", "3"]
+    assert not (movie_dir / reviewReportCounter.JOURNAL_FILENAME).exists()
+    assert reports() == {"alice": "3", "bob": "3"}
+
+
+def test_concurrent_reports_are_all_counted(tmp_path, monkeypatch):
+    setup_movie(tmp_path, monkeypatch)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda _: moderationRepo.build_snapshot_and_increment_reports("Joker", "bob"), range(40)))
+    assert reports()["bob"] == "40"
+
+
+def test_deleting_a_review_forgets_its_pending_reports(tmp_path, monkeypatch):
+    movie_dir = setup_movie(tmp_path, monkeypatch)
+    moderationRepo.build_snapshot_and_increment_reports("Joker", "bob")
+    reviewsRepo.delete_review("Joker", "bob")
+    assert reviewReportCounter.pending_count(movie_dir, "bob") == 0
+    assert reports() == {"alice": "2"}
+
+
+def test_reporting_reads_only_the_reported_row(tmp_path, monkeypatch):
+    movie_dir = setup_movie(tmp_path, monkeypatch)
+    monkeypatch.setattr(reportedReviewIndex, "_MOVIES", {})
+    # Indexes built once
+    reviewUserIndex.movie_rows("Joker", "bob")
+    reportedReviewIndex.reported(movie_dir)
+
+    def full_scan(*args, **kwargs):
+        raise AssertionError("scanned every row")
+
+    monkeypatch.setattr(reviewStorage.CsvStorage, "read_all", full_scan)
+    snapshot = moderationRepo.build_snapshot_and_increment_reports("Joker", "bob")
+    assert (snapshot.user, snapshot.reportCount) == ("bob", 1)
+
+
+def interrupt_fold(movie_dir, *users):
+    """Report `users`, then stop a fold right after it renamed the journal aside."""
+    for user in users:
+        moderationRepo.build_snapshot_and_increment_reports(movie_dir.name, user)
+    (movie_dir / reviewReportCounter.JOURNAL_FILENAME).rename(movie_dir / reviewReportCounter.FOLDING_FILENAME)
+    reviewReportCounter._MOVIES.clear()  # the crashed process is gone
+
+
+def test_fold_interrupted_before_the_csv_rewrite_is_finished(tmp_path, monkeypatch):
+    movie_dir = setup_movie(tmp_path, monkeypatch)
+    interrupt_fold(movie_dir, "bob", "bob", "alice")
+
+    # The next use of the counter folds the leftover counts before the journal
+    assert reviewReportCounter.pending_count(movie_dir, "bob") == 0
+    assert reports() == {"alice": "3", "bob": "2"}
+    assert not (movie_dir / reviewReportCounter.FOLDING_FILENAME).exists()
+    assert [r["Reports"] for r in reviewsRepo.load_all_reviews("Joker")] == ["3", "2"]
+    moderationRepo.build_snapshot_and_increment_reports("Joker", "bob")
+    assert reports() == {"alice": "3", "bob": "3"}
+
+
+def test_fold_interrupted_after_the_csv_rewrite_is_not_applied_twice(tmp_path, monkeypatch):
+    movie_dir = setup_movie(tmp_path, monkeypatch)
+    interrupt_fold(movie_dir, "bob")
+    folding = movie_dir / reviewReportCounter.FOLDING_FILENAME
+    base = reviewsRepo.review_file_version(movie_dir / "movieReviews.csv")
+    with folding.open("a", encoding="utf-8") as f:
+        f.write(json.dumps({"base": list(base)}) + "\n")
+    # The rewrite went through (so the CSV version moved on), then the crash
+    rows = reviewsRepo.load_all_reviews("Joker")
+    rows[1]["Reports"] = "1"
+    reviewsRepo.write_reviews_file(movie_dir / "movieReviews.csv", rows)
+
+    reviewReportCounter.fold_reports(movie_dir)
+    assert not folding.exists()
+    assert reports() == {"alice": "2", "bob": "1"}
+
+
+def test_review_written_during_a_fold_is_kept(tmp_path, monkeypatch):
+    movie_dir = setup_movie(tmp_path, monkeypatch)
+    moderationRepo.build_snapshot_and_increment_reports("Joker", "bob")
+    writer = threading.Thread(target=reviewsRepo.save_review, args=("Joker", Review(
+        movieTitle="Joker", user="carol", rating=7, title="t", body="b", date=date(2024, 1, 1),
+    )))
+    real_read = reviewsRepo.read_review_file
+
+    def read_while_a_review_is_written(path):
+        result = real_read(path)
+        if not writer.is_alive() and writer.ident is None:
+            writer.start()
+            writer.join(0.2)  # blocked on the review lock until the fold is done
+        return result
+
+    monkeypatch.setattr(reviewsRepo, "read_review_file", read_while_a_review_is_written)
+    reviewReportCounter.fold_reports(movie_dir)
+    writer.join()
+    monkeypatch.setattr(reviewsRepo, "read_review_file", real_read)
+
+    assert reports() == {"alice": "2", "bob": "1", "carol": "0"}
@@ -0,0 +1,149 @@
+import csv
+import json
+from datetime import date
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from backend.app.main import app
+from backend.app.models.models import Review
+from backend.app.repositories import reviewsRepo, reviewSearchIndex
+from backend.app.services.searchIndexService import SearchIndexService
+
+
+def write_movie(data_dir, movie, reviews):
+    movie_dir = data_dir / movie
+    movie_dir.mkdir(parents=True, exist_ok=True)
+    with (movie_dir / "movieReviews.csv").open("w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=reviewsRepo.CSV_HEADERS)
+        writer.writeheader()
+        for user, title, body in reviews:
+            writer.writerow({
+                "Movie Title": movie,
+                "Date of Review": "1 January 2020",
+                "User": user,
+                "Usefulness Vote": 0,
+                "Total Votes": 0,
+                "User's Rating out of 10": 7,
+                "Review Title": title,
+                "Review": body,
+                "Reports": 0,
+            })
+    return movie_dir
+
+
+def setup_corpus(tmp_path, monkeypatch):
+    monkeypatch.setattr(reviewsRepo, "DATA_PATH", tmp_path, raising=False)
+    monkeypatch.setattr(reviewsRepo, "recompute_movie_ratings", lambda title: None)
+    write_movie(tmp_path, "Joker", [
+        ("alice", "Dark and brilliant", "Phoenix is brilliant in a dark story"),
+        ("bob", "Overrated", "Slow and dull, not a masterpiece"),
+    ])
+    write_movie(tmp_path, "Avengers Endgame", [
+        ("carol", "Time travel", "Time travel is such a lazy way to write stories"),
+        ("dave", "Fun", "A fun finale with great action"),
+    ])
+    (tmp_path / "Empty Movie").mkdir()  # no CSV at all
+
+
+def test_search_ranks_across_movies_and_persists_segments(tmp_path, monkeypatch):
+    setup_corpus(tmp_path, monkeypatch)
+    # The first query builds the segments that don't exist yet
+    hits = reviewSearchIndex.search("brilliant dark", limit=5)
+    assert hits[0]["movieTitle"] == "Joker"
+    assert hits[0]["user"] == "alice"
+    assert hits[0]["reviewTitle"] == "Dark and brilliant"
+    assert [h["user"] for h in reviewSearchIndex.search("time travel")] == ["carol"]
+    assert reviewSearchIndex.search("nothingmatches") == []
+    assert reviewSearchIndex.search("   ") == []
+
+    segment_file = tmp_path / "Joker" / reviewSearchIndex.SEGMENT_FILENAME
+    raw = json.loads(segment_file.read_text(encoding="utf-8"))
+    assert raw["format"] == reviewSearchIndex.SEGMENT_FORMAT
+    assert raw["postings"]["brilliant"] == {"alice": 2}
+
+    service = SearchIndexService()
+    assert service.refresh() == []
+    assert service.metrics == {"refreshes": 1, "rebuilt": 0}
+
+
+def test_queries_do_not_read_csvs_once_built(tmp_path, monkeypatch):
+    setup_corpus(tmp_path, monkeypatch)
+    reviewSearchIndex.build_index(workers=1)
+
+    with patch.object(reviewSearchIndex, "_build_segment", side_effect=AssertionError("CSV scanned")):
+        assert reviewSearchIndex.search("fun")[0]["user"] == "dave"
+
+
+def test_build_index_in_parallel(tmp_path, monkeypatch):
+    setup_corpus(tmp_path, monkeypatch)
+    built = reviewSearchIndex.build_index(workers=2)
+    assert sorted(built) == ["Avengers Endgame", "Joker"]
+    assert reviewSearchIndex.build_index() == []  # nothing stale any more
+
+
+def test_review_writes_update_index_incrementally(tmp_path, monkeypatch):
+    setup_corpus(tmp_path, monkeypatch)
+    reviewSearchIndex.build_index(workers=1)
+
+    reviewsRepo.save_review("Joker", Review(
+        movieTitle="Joker", user="erin", rating=9, title="Stairs scene",
+        body="The stairs dance is iconic", date=date(2024, 1, 1),
+    ))
+    reviewsRepo.update_review("Joker", "bob", {"Review": "Actually a masterpiece after all"})
+    reviewsRepo.delete_review("Avengers Endgame", "carol")
+
+    journal = tmp_path / "Joker" / reviewSearchIndex.JOURNAL_FILENAME
+    assert len(journal.read_text(encoding="utf-8").splitlines()) == 2
+
+    with patch.object(reviewSearchIndex, "_build_segment", side_effect=AssertionError("CSV scanned")):
+        assert [h["user"] for h in reviewSearchIndex.search("stairs")] == ["erin"]
+        assert [h["user"] for h in reviewSearchIndex.search("dull")] == []
+        assert reviewSearchIndex.search("time travel") == []
+
+    # Reloading from disk (base + journal) gives the same answers
+    monkeypatch.setattr(reviewSearchIndex, "_LOADED_ROOT", None)
+    with patch.object(reviewSearchIndex, "_build_segment", side_effect=AssertionError("CSV scanned")):
+        assert [h["user"] for h in reviewSearchIndex.search("masterpiece")] == ["bob"]
+
+
+def test_stale_segment_is_served_until_refreshed(tmp_path, monkeypatch):
+    setup_corpus(tmp_path, monkeypatch)
+    reviewSearchIndex.build_index(workers=1)
+
+    # Edited outside reviewsRepo: queries keep the last good segment
+    write_movie(tmp_path, "Joker", [("alice", "Changed", "Nothing left about the clown")])
+    with patch.object(reviewSearchIndex, "_build_segment", side_effect=AssertionError("CSV scanned")):
+        assert [h["user"] for h in reviewSearchIndex.search("dull")] == ["bob"]
+
+    assert reviewSearchIndex.refresh(workers=1) == ["Joker"]
+    assert reviewSearchIndex.search("dull") == []
+    assert [h["user"] for h in reviewSearchIndex.search("clown")] == ["alice"]
+
+
+def test_delete_only_visits_the_users_terms():
+    segment = reviewSearchIndex.Segment("Joker", None)
+    segment.upsert("alice", "A", {"dark": 1, "story": 2}, 3)
+    segment.upsert("bob", "B", {"story": 1, "dull": 1}, 2)
+    assert segment.user_terms == {"alice": ["dark", "story"], "bob": ["story", "dull"]}
+
+    segment.postings["unrelated"] = {"carol": 1}
+    segment.delete("alice")
+    assert segment.postings == {"story": {"bob": 1}, "dull": {"bob": 1}, "unrelated": {"carol": 1}}
+    assert segment.total_length == 2
+
+    # Loaded segments derive the same map from their postings
+    loaded = reviewSearchIndex.Segment("Joker", None, segment.docs, segment.postings)
+    assert sorted(loaded.user_terms["bob"]) == ["dull", "story"]
+
+
+def test_search_endpoint(tmp_path, monkeypatch):
+    setup_corpus(tmp_path, monkeypatch)
+    reviewSearchIndex.build_index(workers=1)
+    client = TestClient(app)
+
+    response = client.get("/all-reviews/search", params={"q": "lazy stories", "limit": 3})
+    assert response.status_code == 200
+    assert response.json()[0]["user"] == "carol"
+
+    assert client.get("/all-reviews/search").status_code == 422
@@ -278,3 +278,48 @@ def test_get_reviews_endpoint_success():
 
 
 
+
+
+def test_get_rating_stats_unknown_movie_raises():
+    with patch("backend.app.services.reviewService.load_movie_by_title", return_value=None):
+        with pytest.raises(ValueError, match="does not exist"):
+            ReviewService().get_rating_stats("Nope")
+
+
+def test_get_rating_stats_bulk_maps_unknown_to_none():
+    def fake_movie(title):
+        return {"title": title} if title == "TestMovie" else None
+
+    with patch("backend.app.services.reviewService.load_movie_by_title", side_effect=fake_movie), \
+         patch("backend.app.services.reviewService.load_review_columns", return_value=None):
+        result = ReviewService().get_rating_stats_bulk(["TestMovie", "Nope"])
+
+    assert result["Nope"] is None
+    assert result["TestMovie"]["movieTitle"] == "TestMovie"
+    assert result["TestMovie"]["ratingCount"] == 0
+
+
+def test_rating_stats_endpoints():
+    fake_stats = {"movieTitle": "Joker", "median": 8.0}
+    with patch("backend.app.controllers.reviewController.review_service.get_rating_stats", return_value=fake_stats):
+        response = client.get("/reviews/Joker/stats")
+        assert response.status_code == 200
+        assert response.json() == fake_stats
+
+    with patch("backend.app.controllers.reviewController.review_service.get_rating_stats_bulk",
+               return_value={"Joker": fake_stats, "Nope": None}) as mock_bulk:
+        response = client.get("/all-reviews/stats", params=[("titles", "Joker"), ("titles", "Nope")])
+        assert response.status_code == 200
+        assert response.json() == {"Joker": fake_stats, "Nope": None}
+        mock_bulk.assert_called_once_with(["Joker", "Nope"])
+
+
+def test_movies_titled_like_corpus_queries_are_listed():
+    fake_reviews = [{"title": "Found it", "rating": 7}]
+    with patch("backend.app.controllers.reviewController.review_service.get_reviews",
+               return_value=fake_reviews) as mock_get:
+        for title in ("search", "stats"):
+            response = client.get(f"/reviews/{title}")
+            assert response.status_code == 200
+            assert response.json() == fake_reviews
+        assert [c.args[0] for c in mock_get.call_args_list] == ["search", "stats"]
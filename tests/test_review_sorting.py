@@ -0,0 +1,142 @@
+import csv
+from datetime import date
+
+import pytest
+
+from backend.app.repositories import reviewsRepo, reviewSortIndex, reviewVoteStore
+from backend.app.repositories.reviewFields import date_ordinal
+from backend.app.models.models import Review
+
+
+# ---------------------------------------------------------------------------
+# Helpers to point reviewsRepo at a temporary data dir
+# ---------------------------------------------------------------------------
+
+ROWS = [
+    # user, useful, date, rating
+    ("alice", "5", "13 March 2003", "7"),
+    ("bob", "50", "1 January 2020", "4"),
+    ("carol", "0", "17 November 2025", "10"),
+    ("dave", "12", "not a date", "8"),
+]
+
+
+def setup_movie(tmp_path, monkeypatch, movie="Joker"):
+    monkeypatch.setattr(reviewsRepo, "DATA_PATH", tmp_path, raising=False)
+    monkeypatch.setattr(reviewsRepo, "recompute_movie_ratings", lambda title: None)
+    movie_dir = tmp_path / movie
+    movie_dir.mkdir()
+    csv_path = movie_dir / "movieReviews.csv"
+    with csv_path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=reviewsRepo.CSV_HEADERS)
+        writer.writeheader()
+        for user, useful, when, rating in ROWS:
+            writer.writerow({
+                "Movie Title": movie,
+                "Date of Review": when,
+                "User": user,
+                "Usefulness Vote": useful,
+                "Total Votes": "60",
+                "User's Rating out of 10": rating,
+                "Review Title": f"Title by {user}",
+                "Review": "Body",
+                "Reports": "0",
+            })
+    return csv_path
+
+
+def users(rows):
+    return [r["User"] for r in rows]
+
+
+def test_date_ordinal_parses_free_text_dates():
+    assert date_ordinal("13 March 2003") == date(2003, 3, 13).toordinal()
+    assert date_ordinal("2003-03-13") == date(2003, 3, 13).toordinal()
+    assert date_ordinal("garbage") == 0
+    assert date_ordinal(None) == 0
+
+
+def test_sorted_pages_by_each_field(tmp_path, monkeypatch):
+    setup_movie(tmp_path, monkeypatch)
+
+    assert users(reviewsRepo.load_reviews("Joker", 10, sort_by="usefulness")) == ["bob", "dave", "alice", "carol"]
+    assert users(reviewsRepo.load_reviews("Joker", 10, sort_by="date")) == ["carol", "bob", "alice", "dave"]
+    assert users(reviewsRepo.load_reviews("Joker", 10, sort_by="rating", descending=False)) == ["bob", "alice", "dave", "carol"]
+
+    # Offset pagination over the same ordering
+    assert users(reviewsRepo.load_reviews("Joker", 2, offset=1, sort_by="usefulness")) == ["dave", "alice"]
+    assert users(reviewsRepo.load_reviews("Joker", 2, offset=3, sort_by="usefulness")) == ["carol"]
+    # File order still works with offsets
+    assert users(reviewsRepo.load_reviews("Joker", 2, offset=2)) == ["carol", "dave"]
+
+
+def test_invalid_sort_field_raises(tmp_path, monkeypatch):
+    setup_movie(tmp_path, monkeypatch)
+    with pytest.raises(ValueError, match="Invalid sort field"):
+        reviewsRepo.load_reviews("Joker", sort_by="length")
+
+
+def test_orderings_patched_incrementally_on_writes(tmp_path, monkeypatch):
+    csv_path = setup_movie(tmp_path, monkeypatch)
+    reviewsRepo.load_reviews("Joker", sort_by="usefulness")
+    cached = reviewSortIndex._CACHE[str(csv_path)]
+
+    reviewsRepo.save_review("Joker", Review(
+        movieTitle="Joker", user="erin", rating=9, title="t", body="b",
+        usefulVotes=30, totalVotes=40, date=date(2024, 5, 1),
+    ))
+    reviewsRepo.update_review("Joker", "carol", {"Usefulness Vote": "100"})
+    reviewsRepo.delete_review("Joker", "bob")
+
+    # Same object was patched in place rather than rebuilt
+    assert reviewSortIndex._CACHE[str(csv_path)] is cached
+    assert cached.version == reviewsRepo.reviews_version("Joker")
+    assert users(reviewsRepo.load_reviews("Joker", 10, sort_by="usefulness")) == ["carol", "erin", "dave", "alice"]
+
+    # A fresh build agrees with the incrementally maintained one
+    reviewSortIndex.invalidate(str(csv_path))
+    assert users(reviewsRepo.load_reviews("Joker", 10, sort_by="usefulness")) == ["carol", "erin", "dave", "alice"]
+    assert users(reviewsRepo.load_reviews("Joker", 10, sort_by="date")) == ["carol", "erin", "alice", "dave"]
+
+
+def test_external_write_triggers_rebuild(tmp_path, monkeypatch):
+    csv_path = setup_movie(tmp_path, monkeypatch)
+    reviewsRepo.load_reviews("Joker", sort_by="rating")
+
+    # Rewrite the file behind the index's back (e.g. moderation)
+    text = csv_path.read_text(encoding="utf-8").replace(",10,", ",1,")
+    csv_path.write_text(text, encoding="utf-8")
+
+    assert users(reviewsRepo.load_reviews("Joker", 1, sort_by="rating")) == ["dave"]
+
+
+def test_pending_votes_move_reviews_in_the_usefulness_ordering(tmp_path, monkeypatch):
+    csv_path = setup_movie(tmp_path, monkeypatch)
+    monkeypatch.setattr(reviewVoteStore, "_MOVIES", {})
+    assert users(reviewsRepo.load_reviews("Joker", 10, sort_by="usefulness")) == ["bob", "dave", "alice", "carol"]
+    cached = reviewSortIndex._CACHE[str(csv_path)]
+
+    for voter in range(8):
+        reviewVoteStore.vote("Joker", "alice", f"voter{voter}", True)
+    assert users(reviewsRepo.load_reviews("Joker", 10, sort_by="usefulness")) == ["bob", "alice", "dave", "carol"]
+    reviewVoteStore.vote("Joker", "alice", "voter0", False)
+    reviewVoteStore.vote("Joker", "alice", "voter1", False)
+    assert users(reviewsRepo.load_reviews("Joker", 10, sort_by="usefulness")) == ["bob", "dave", "alice", "carol"]
+    # Moved in place, not rebuilt
+    assert reviewSortIndex._CACHE[str(csv_path)] is cached
+
+    # Folding moves the deltas into the CSV; the rebuilt ordering agrees
+    reviewVoteStore.vote("Joker", "carol", "voter0", True)
+    reviewVoteStore.fold_votes("Joker")
+    assert users(reviewsRepo.load_reviews("Joker", 10, sort_by="usefulness")) == ["bob", "dave", "alice", "carol"]
+    assert reviewSortIndex._CACHE[str(csv_path)] is not cached
+
+
+def test_delete_shifts_later_rows_in_place():
+    rows = [{"User": u, "Usefulness Vote": v, "Date of Review": "", "User's Rating out of 10": 1} for u, v in
+            [("a", 3), ("b", 1), ("c", 2)]]
+    orderings = reviewSortIndex.MovieOrderings(None, rows)
+    entries = orderings._sorted["usefulness"]
+    orderings.delete(0)
+    assert orderings._sorted["usefulness"] is entries
+    assert entries == [(1, 0), (2, 1)]
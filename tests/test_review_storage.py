@@ -0,0 +1,129 @@
+import csv
+import sqlite3
+
+import pytest
+
+from backend.app.models.models import Review
+from backend.app.repositories import reviewsRepo, reviewStorage, reviewBlockStore
+from backend.app.repositories.reviewColumns import load_review_columns
+
+
+def make_rows(n, movie="Joker"):
+    return [
+        {
+            "Movie Title": movie,
+            "Date of Review": f"{(i % 28) + 1} March 2003",
+            "User": f"user{i}",
+            "Usefulness Vote": str(i % 7),
+            "Total Votes": "10",
+            "User's Rating out of 10": str((i % 10) + 1),
+            "Review Title": f"Title {i}",
+            "Review": f"Body {i}, with \"quotes\" and a comma",
+            "Reports": "0",
+        }
+        for i in range(n)
+    ]
+
+
+def setup_movie(tmp_path, monkeypatch, engine, rows, movie="Joker"):
+    monkeypatch.setattr(reviewsRepo, "DATA_PATH", tmp_path, raising=False)
+    monkeypatch.setattr(reviewsRepo, "recompute_movie_ratings", lambda title: None)
+    monkeypatch.setattr(reviewsRepo, "REVIEW_STORAGE", engine)
+    csv_path = tmp_path / movie / "movieReviews.csv"
+    csv_path.parent.mkdir(parents=True)
+    with csv_path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=reviewsRepo.CSV_HEADERS)
+        writer.writeheader()
+        writer.writerows(rows)
+    reviewStorage.migrate(csv_path, engine)
+    return csv_path
+
+
+@pytest.mark.parametrize("engine", ["csv", "compressed", "sqlite"])
+def test_repo_operations_behave_the_same_on_every_engine(tmp_path, monkeypatch, engine):
+    rows = make_rows(70)
+    setup_movie(tmp_path, monkeypatch, engine, rows)
+
+    assert reviewsRepo.load_reviews("Joker", amount=3, offset=65) == rows[65:68]
+    assert reviewsRepo.load_reviews("Joker", amount=1, fields=["Review"], preview_chars=6) == [{"Review": "Body 0"}]
+    assert reviewsRepo.load_reviews("Joker", amount=1, sort_by="usefulness")[0]["Usefulness Vote"] == "6"
+    assert reviewsRepo.find_review_by_user("Joker", "user42") == rows[42]
+    assert reviewsRepo.find_review_by_user("Joker", "nobody") is None
+
+    reviewsRepo.save_review("Joker", Review(
+        movieTitle="Joker", user="zed", rating=9, title="New", body="Fresh",
+        usefulVotes=0, totalVotes=0, reportCount=0,
+    ))
+    reviewsRepo.update_review("Joker", "user3", {"Review Title": "Edited"})
+    reviewsRepo.delete_review("Joker", "user0")
+
+    stored = reviewsRepo.load_all_reviews("Joker")
+    assert [r["User"] for r in stored] == [f"user{i}" for i in range(1, 70)] + ["zed"]
+    assert stored[2]["Review Title"] == "Edited"
+    assert stored[-1]["User's Rating out of 10"] == "9.0"
+    assert reviewsRepo.load_reviews_by_user("zed")[0]["Review"] == "Fresh"
+    assert len(load_review_columns("Joker")) == 70
+
+
+@pytest.mark.parametrize("engine", ["csv", "compressed", "sqlite"])
+def test_user_lookups_do_not_read_every_row(tmp_path, monkeypatch, engine):
+    rows = make_rows(30)
+    setup_movie(tmp_path, monkeypatch, engine, rows)
+    assert reviewsRepo.find_review_by_user("Joker", "user1") == rows[1]  # builds the user index
+
+    storage = reviewStorage.get_storage(engine)
+
+    def full_scan(*args, **kwargs):
+        raise AssertionError("read every row")
+
+    monkeypatch.setattr(type(storage), "read_all", full_scan)
+    assert reviewsRepo.find_review_by_user("Joker", "user17") == rows[17]
+    assert reviewsRepo.find_review_by_user("Joker", "nobody") is None
+    assert reviewsRepo.find_user_row_at(tmp_path / "Joker" / "movieReviews.csv", "user5") == (5, rows[5])
+
+
+def test_storage_engines_must_implement_the_interface():
+    class Partial(reviewStorage.ReviewStorage):
+        def exists(self, moviePath):
+            return False
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_sqlite_engine_uses_wal_and_indexes(tmp_path, monkeypatch):
+    csv_path = setup_movie(tmp_path, monkeypatch, "sqlite", make_rows(5))
+    assert not csv_path.exists()
+
+    conn = sqlite3.connect(tmp_path / reviewStorage.DB_FILENAME)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    indexes = {row[1] for row in conn.execute("SELECT * FROM sqlite_master WHERE type = 'index'")}
+    assert {"reviews_movie_pos", "reviews_user", "reviews_movie_date"} <= indexes
+    plan = " ".join(str(row) for row in conn.execute(
+        "EXPLAIN QUERY PLAN SELECT pos FROM reviews INDEXED BY reviews_user WHERE user = ? AND movie = ? ORDER BY pos",
+        ("user1", "Joker"),
+    ))
+    assert "reviews_user" in plan
+
+    # Every write changes the version the derived indexes key on
+    before = reviewsRepo.reviews_version("Joker")
+    reviewsRepo.update_review("Joker", "user1", {"Review": "Changed"})
+    assert reviewsRepo.reviews_version("Joker") != before
+
+
+def test_migrate_round_trip(tmp_path, monkeypatch):
+    rows = make_rows(10)
+    csv_path = setup_movie(tmp_path, monkeypatch, "compressed", rows)
+
+    assert reviewStorage.migrate(csv_path, "sqlite") == "compressed"
+    assert not (csv_path.parent / reviewBlockStore.BLOCKS_FILENAME).exists()
+    assert reviewStorage.get_storage("sqlite").read_all(csv_path)[1] == rows
+
+    assert reviewStorage.migrate(csv_path, "csv") == "sqlite"
+    assert not reviewStorage.get_storage("sqlite").exists(csv_path)
+    with csv_path.open(newline="", encoding="utf-8") as f:
+        assert list(csv.DictReader(f)) == rows
+
+    assert reviewStorage.migrate(tmp_path / "Missing" / "movieReviews.csv", "sqlite") is None
+    with pytest.raises(ValueError):
+        reviewStorage.get_storage("parquet")
@@ -0,0 +1,131 @@
+import csv
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from backend.app.main import app
+from backend.app.models.models import Review
+from backend.app.repositories import moderationRepo, reviewsRepo, reviewUserIndex
+from backend.app.services import authenticationService
+from backend.app.services.authenticationService import AuthService
+
+client = TestClient(app)
+
+
+MOVIES = {
+    "Joker": ["alice", "bob", "carol"],
+    "Morbius": ["bob"],
+    "Up": ["carol", "alice"],
+}
+
+
+def setup_movies(tmp_path, monkeypatch):
+    monkeypatch.setattr(reviewsRepo, "DATA_PATH", tmp_path, raising=False)
+    monkeypatch.setattr(reviewsRepo, "recompute_movie_ratings", lambda title: None)
+    for movie, users in MOVIES.items():
+        movie_dir = tmp_path / movie
+        movie_dir.mkdir()
+        with (movie_dir / "movieReviews.csv").open("w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=reviewsRepo.CSV_HEADERS)
+            writer.writeheader()
+            for user in users:
+                writer.writerow({
+                    "Movie Title": movie, "Date of Review": "1 January 2020", "User": user,
+                    "Usefulness Vote": 0, "Total Votes": 0, "User's Rating out of 10": 5,
+                    "Review Title": f"{user} on {movie}", "Review": "Body", "Reports": 0,
+                })
+
+
+def titles(rows):
+    return [(r["Movie Title"], r["User"]) for r in rows]
+
+
+def test_reviews_by_user_across_movies_with_pagination(tmp_path, monkeypatch):
+    setup_movies(tmp_path, monkeypatch)
+
+    assert reviewUserIndex.movies_for_user("alice") == ["Joker", "Up"]
+    assert titles(reviewsRepo.load_reviews_by_user("carol")) == [("Joker", "carol"), ("Up", "carol")]
+    assert titles(reviewsRepo.load_reviews_by_user("bob", amount=1, offset=1)) == [("Morbius", "bob")]
+    assert reviewsRepo.load_reviews_by_user("nobody") == []
+    # Per-movie maps are persisted beside the CSVs
+    assert (tmp_path / "Joker" / reviewUserIndex.USERS_FILENAME).exists()
+
+
+def test_index_follows_review_writes(tmp_path, monkeypatch):
+    setup_movies(tmp_path, monkeypatch)
+    reviewUserIndex.refresh()
+
+    reviewsRepo.save_review("Morbius", Review(
+        movieTitle="Morbius", user="alice", rating=3, title="Meh", body="Body",
+        usefulVotes=0, totalVotes=0, reportCount=0,
+    ))
+    assert titles(reviewsRepo.load_reviews_by_user("alice")) == [
+        ("Joker", "alice"), ("Morbius", "alice"), ("Up", "alice"),
+    ]
+
+    # Deleting shifts later rows; carol's Joker row moves from 2 to 1
+    reviewsRepo.delete_review("Joker", "bob")
+    assert reviewUserIndex.locate("carol") == [("Joker", 1), ("Up", 0)]
+    assert reviewUserIndex.movies_for_user("bob") == ["Morbius"]
+
+    reviewsRepo.update_review("Up", "alice", {"Review Title": "Changed"})
+    assert [r["Review Title"] for r in reviewsRepo.load_reviews_by_user("alice")][-1] == "Changed"
+
+
+def test_index_rebuilds_after_external_edit(tmp_path, monkeypatch):
+    setup_movies(tmp_path, monkeypatch)
+    reviewUserIndex.refresh()
+
+    rows = reviewsRepo.load_all_reviews("Up")
+    rows[0]["User"] = "dave"
+    reviewsRepo.write_reviews_file(tmp_path / "Up" / "movieReviews.csv", rows)
+
+    # Movies already listed for a user are re-checked on every lookup
+    assert reviewUserIndex.movies_for_user("carol") == ["Joker"]
+    # Users new to a movie edited elsewhere show up with the next full scan
+    monkeypatch.setattr(reviewUserIndex, "REFRESH_INTERVAL_SECONDS", 0.0)
+    assert reviewUserIndex.movies_for_user("dave") == ["Up"]
+
+
+def test_lookups_only_stat_the_users_movies(tmp_path, monkeypatch):
+    setup_movies(tmp_path, monkeypatch)
+    reviewUserIndex.refresh()
+
+    checked = []
+    real_version = reviewsRepo.review_file_version
+    monkeypatch.setattr(
+        reviewsRepo, "review_file_version",
+        lambda path: checked.append(path.parent.name) or real_version(path),
+    )
+    assert reviewUserIndex.locate("bob") == [("Joker", 1), ("Morbius", 0)]
+    assert sorted(checked) == ["Joker", "Morbius"]
+
+
+def test_change_username_only_rewrites_indexed_files(tmp_path, monkeypatch):
+    setup_movies(tmp_path, monkeypatch)
+    monkeypatch.setattr(moderationRepo, "BANS_FILE", tmp_path / "bans.json")
+    monkeypatch.setattr(moderationRepo, "REPORTS_FILE", tmp_path / "reports.json")
+
+    written = []
+    real_write = authenticationService.write_reviews_file
+    monkeypatch.setattr(
+        authenticationService, "write_reviews_file",
+        lambda path, rows, fieldnames: written.append(path.parent.name) or real_write(path, rows, fieldnames),
+    )
+    with patch("backend.app.services.authenticationService.load_users", return_value=[{"userName": "bob"}]), \
+         patch("backend.app.services.authenticationService.save_users"):
+        AuthService().change_username_everywhere("bob", "robert")
+
+    assert sorted(written) == ["Joker", "Morbius"]
+    assert reviewUserIndex.movies_for_user("bob") == []
+    assert titles(reviewsRepo.load_reviews_by_user("robert")) == [("Joker", "robert"), ("Morbius", "robert")]
+
+
+def test_by_user_endpoint(tmp_path, monkeypatch):
+    setup_movies(tmp_path, monkeypatch)
+
+    response = client.get("/reviews/by-user/alice?amount=1&offset=1")
+    assert response.status_code == 200
+    assert titles(response.json()) == [("Up", "alice")]
+
+    assert client.get("/reviews/by-user/nobody").status_code == 404
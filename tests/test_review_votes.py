@@ -0,0 +1,194 @@
+import csv
+import json
+import threading
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+
+from fastapi.testclient import TestClient
+
+from backend.app.main import app
+from backend.app.models.models import Review
+from backend.app.repositories import moderationRepo, reviewsRepo, reviewVoteStore
+from backend.app.services import authenticationService
+from backend.app.services.authenticationService import AuthService
+
+client = TestClient(app)
+
+
+def setup_movie(tmp_path, monkeypatch, movie="Joker"):
+    monkeypatch.setattr(reviewsRepo, "DATA_PATH", tmp_path, raising=False)
+    monkeypatch.setattr(reviewsRepo, "recompute_movie_ratings", lambda title: None)
+    monkeypatch.setattr(reviewVoteStore, "_MOVIES", {})
+    movie_dir = tmp_path / movie
+    movie_dir.mkdir()
+    with (movie_dir / "movieReviews.csv").open("w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=reviewsRepo.CSV_HEADERS)
+        writer.writeheader()
+        for user, useful, total in (("alice", 3, 5), ("bob", 0, 0)):
+            writer.writerow({
+                "Movie Title": movie, "Date of Review": "1 January 2020", "User": user,
+                "Usefulness Vote": useful, "Total Votes": total, "User's Rating out of 10": 5,
+                "Review Title": "T", "Review": "B", "Reports": 0,
+            })
+    return movie_dir
+
+
+def counts(movie="Joker"):
+    return {
+        r["User"]: (r["Usefulness Vote"], r["Total Votes"])
+        for r in reviewsRepo.load_reviews(movie, 10)
+    }
+
+
+def test_votes_are_deduped_and_overlaid_on_reads(tmp_path, monkeypatch):
+    setup_movie(tmp_path, monkeypatch)
+
+    assert reviewVoteStore.vote("Joker", "alice", "v1", True) is True
+    assert reviewVoteStore.vote("Joker", "alice", "v1", True) is False  # same vote again
+    assert reviewVoteStore.vote("Joker", "alice", "v2", False) is True
+    assert counts()["alice"] == ("4", "7")
+
+    # Changing your mind moves the useful count, not the total
+    assert reviewVoteStore.vote("Joker", "alice", "v2", True) is True
+    assert counts()["alice"] == ("5", "7")
+    assert counts()["bob"] == ("0", "0")
+
+
+def test_journal_is_replayed_by_a_fresh_store(tmp_path, monkeypatch):
+    movie_dir = setup_movie(tmp_path, monkeypatch)
+
+    reviewVoteStore.vote("Joker", "bob", "v1", True)
+    reviewVoteStore.vote("Joker", "bob", "v2", False)
+    assert len((movie_dir / reviewVoteStore.JOURNAL_FILENAME).read_text().splitlines()) == 2
+    # CSV untouched
+    assert reviewsRepo.load_all_reviews("Joker")[1]["Total Votes"] == "0"
+
+    # e.g. another worker process
+    monkeypatch.setattr(reviewVoteStore, "_MOVIES", {})
+    assert reviewVoteStore.pending_delta("Joker", "bob") == (1, 2)
+    assert reviewVoteStore.vote("Joker", "bob", "v1", True) is False
+
+
+def test_pending_votes_are_folded_into_the_csv(tmp_path, monkeypatch):
+    movie_dir = setup_movie(tmp_path, monkeypatch)
+    monkeypatch.setattr(reviewVoteStore, "VOTES_FOLD_AT", 3)
+
+    for voter in ("v1", "v2", "v3"):
+        reviewVoteStore.vote("Joker", "alice", voter, True)
+
+    rows = reviewsRepo.load_all_reviews("Joker")
+    assert (rows[0]["Usefulness Vote"], rows[0]["Total Votes"]) == ("6", "8")
+    assert reviewVoteStore.pending_delta("Joker", "alice") == (0, 0)
+    assert not (movie_dir / reviewVoteStore.JOURNAL_FILENAME).exists()
+    assert counts()["alice"] == ("6", "8")
+    # Voters survive the fold, so dedup still applies
+    assert reviewVoteStore.vote("Joker", "alice", "v1", True) is False
+
+
+def test_fold_interrupted_before_the_csv_rewrite_keeps_its_deltas(tmp_path, monkeypatch):
+    movie_dir = setup_movie(tmp_path, monkeypatch)
+    reviewVoteStore.vote("Joker", "alice", "v1", True)
+    reviewVoteStore.vote("Joker", "bob", "v1", False)
+
+    def crash(*args, **kwargs):
+        raise OSError("disk full")
+
+    with monkeypatch.context() as m:
+        m.setattr(reviewsRepo, "write_reviews_file", crash)
+        with pytest.raises(OSError):
+            reviewVoteStore.fold_votes("Joker")
+
+    # The journal is gone; the snapshot's "fold" section still holds the deltas
+    assert not (movie_dir / reviewVoteStore.JOURNAL_FILENAME).exists()
+    assert "fold" in json.loads((movie_dir / reviewVoteStore.SNAPSHOT_FILENAME).read_text())
+    monkeypatch.setattr(reviewVoteStore, "_MOVIES", {})
+    assert counts() == {"alice": ("4", "6"), "bob": ("0", "1")}
+
+    # Folding again applies them exactly once
+    reviewVoteStore.fold_votes("Joker")
+    monkeypatch.setattr(reviewVoteStore, "_MOVIES", {})
+    assert counts() == {"alice": ("4", "6"), "bob": ("0", "1")}
+    assert reviewVoteStore.vote("Joker", "alice", "v1", True) is False
+
+
+def test_leftover_folding_journal_is_replayed(tmp_path, monkeypatch):
+    movie_dir = setup_movie(tmp_path, monkeypatch)
+    reviewVoteStore.vote("Joker", "alice", "v1", True)
+    # Crash right after the journal was renamed aside
+    (movie_dir / reviewVoteStore.JOURNAL_FILENAME).rename(movie_dir / reviewVoteStore.FOLDING_FILENAME)
+
+    monkeypatch.setattr(reviewVoteStore, "_MOVIES", {})
+    assert counts()["alice"] == ("4", "6")
+    reviewVoteStore.fold_votes("Joker")
+    assert not (movie_dir / reviewVoteStore.FOLDING_FILENAME).exists()
+    assert reviewsRepo.load_all_reviews("Joker")[0]["Total Votes"] == "6"
+
+
+def test_rename_moves_votes_as_author_and_voter(tmp_path, monkeypatch):
+    setup_movie(tmp_path, monkeypatch)
+    monkeypatch.setattr(moderationRepo, "BANS_FILE", tmp_path / "bans.json")
+    monkeypatch.setattr(moderationRepo, "REPORTS_FILE", tmp_path / "reports.json")
+    monkeypatch.setattr(authenticationService, "load_users", lambda: [{"userName": "bob"}])
+    monkeypatch.setattr(authenticationService, "save_users", lambda users: None)
+    reviewVoteStore.vote("Joker", "bob", "v1", True)  # bob as author
+    reviewVoteStore.vote("Joker", "alice", "bob", True)  # bob as voter
+
+    AuthService().change_username_everywhere("bob", "robert")
+
+    assert counts()["robert"] == ("1", "1")
+    # robert can't vote twice; a new "bob" starts without history
+    assert reviewVoteStore.vote("Joker", "alice", "robert", True) is False
+    assert reviewVoteStore.vote("Joker", "alice", "bob", True) is True
+    monkeypatch.setattr(reviewVoteStore, "_MOVIES", {})
+    assert counts()["alice"] == ("5", "7")
+
+
+def test_deleting_a_review_drops_its_votes(tmp_path, monkeypatch):
+    setup_movie(tmp_path, monkeypatch)
+    reviewVoteStore.vote("Joker", "bob", "v1", True)
+
+    reviewsRepo.delete_review("Joker", "bob")
+    assert reviewVoteStore.pending_delta("Joker", "bob") == (0, 0)
+
+
+@patch("backend.app.dependencies.find_user_by_username")
+def test_vote_endpoint(mock_find_user, tmp_path, monkeypatch):
+    setup_movie(tmp_path, monkeypatch)
+    mock_find_user.side_effect = lambda name: {"userName": name, "role": "user"}
+
+    response = client.post("/reviews/Joker/alice/vote", json={"useful": True}, headers={"X-Username": "carol"})
+    assert response.status_code == 200
+    assert response.json() == {"counted": True, "usefulVotes": 4, "totalVotes": 6}
+
+    response = client.post("/reviews/Joker/alice/vote", json={"useful": True}, headers={"X-Username": "carol"})
+    assert response.json()["counted"] is False
+
+    own = client.post("/reviews/Joker/alice/vote", json={"useful": True}, headers={"X-Username": "alice"})
+    assert own.status_code == 403
+
+    missing = client.post("/reviews/Joker/nobody/vote", json={"useful": True}, headers={"X-Username": "carol"})
+    assert missing.status_code == 400
+
+
+def test_review_written_during_a_fold_is_kept(tmp_path, monkeypatch):
+    setup_movie(tmp_path, monkeypatch)
+    reviewVoteStore.vote("Joker", "alice", "v1", True)
+    writer = threading.Thread(target=reviewsRepo.save_review, args=("Joker", Review(
+        movieTitle="Joker", user="carol", rating=7, title="t", body="b", date=date(2024, 1, 1),
+    )))
+    real_load = reviewsRepo.load_all_reviews
+
+    def load_while_a_review_is_written(movie):
+        rows = real_load(movie)
+        writer.start()
+        writer.join(0.2)  # blocked on the review lock until the fold is done
+        return rows
+
+    monkeypatch.setattr(reviewsRepo, "load_all_reviews", load_while_a_review_is_written)
+    reviewVoteStore.fold_votes("Joker")
+    writer.join()
+    monkeypatch.setattr(reviewsRepo, "load_all_reviews", real_load)
+
+    assert counts() == {"alice": ("4", "6"), "bob": ("0", "0"), "carol": ("0", "0")}